@@ -4,6 +4,8 @@
 支持币安和OKX交易所的插拔式架构
 """
 
+import asyncio
+import importlib
 from abc import ABC, abstractmethod
 from datetime import datetime
 from decimal import Decimal
@@ -117,6 +119,39 @@ class ExchangeInfo:
     supported_intervals: List[TimeInterval]
 
 
+def cancel_outcome(order_id: str, result: Any) -> Dict[str, Any]:
+    """把单个订单的撤单返回值或异常转换为统一结果
+
+    返回 {"order_id", "success", "error", "result"}，交易所以返回值（而非异常）
+    表示的拒绝（status为rejected或OKX的sCode非0）同样视为失败。
+    """
+    error = None
+    if isinstance(result, BaseException):
+        error = str(result) or type(result).__name__
+        result = None
+    elif isinstance(result, dict):
+        info = result.get("info")
+        code = info.get("sCode") if isinstance(info, dict) else None
+        if result.get("status") == "rejected":
+            error = "rejected"
+        elif code not in (None, "", "0", 0):
+            error = info.get("sMsg") or f"sCode {code}"
+    return {"order_id": order_id, "success": error is None, "error": error, "result": result}
+
+
+def batch_cancel_outcomes(order_ids: List[str], results: List[Any]) -> List[Dict[str, Any]]:
+    """按订单ID对齐批量撤单接口的返回值，交易所未返回的订单视为未确认"""
+    by_id = {
+        str(result["id"]): result
+        for result in results
+        if isinstance(result, dict) and result.get("id") is not None
+    }
+    return [
+        cancel_outcome(order_id, by_id.get(str(order_id), LookupError("交易所未返回该订单的撤单结果")))
+        for order_id in order_ids
+    ]
+
+
 class BaseExchangeAdapter(ABC):
     """交易所适配器抽象基类"""
     
@@ -293,6 +328,25 @@ class BaseExchangeAdapter(ABC):
         """取消期货订单"""
         pass
     
+    async def cancel_spot_orders(self, symbol: str, order_ids: List[str]) -> List[Dict[str, Any]]:
+        """批量取消现货订单，返回与order_ids一一对应的cancel_outcome结果
+
+        默认并发逐个取消，单个订单被拒绝不影响其余订单，支持批量接口的交易所可覆盖
+        """
+        results = await asyncio.gather(
+            *(self.cancel_spot_order(symbol, order_id) for order_id in order_ids),
+            return_exceptions=True
+        )
+        return [cancel_outcome(order_id, result) for order_id, result in zip(order_ids, results)]
+    
+    async def cancel_futures_orders(self, symbol: str, order_ids: List[str]) -> List[Dict[str, Any]]:
+        """批量取消期货订单，返回与order_ids一一对应的cancel_outcome结果"""
+        results = await asyncio.gather(
+            *(self.cancel_futures_order(symbol, order_id) for order_id in order_ids),
+            return_exceptions=True
+        )
+        return [cancel_outcome(order_id, result) for order_id, result in zip(order_ids, results)]
+    
     # 账户信息
     @abstractmethod
     async def get_spot_balance(self) -> Dict[str, Any]:
@@ -357,6 +411,12 @@ class ExchangeAdapterFactory:
     
     _adapters = {}
     
+    # 延迟加载的内置适配器：首次创建时才导入（会引入ccxt）
+    _lazy_adapters = {
+        "binance": ".binance.spot",
+        "okx": ".okx.spot",
+    }
+    
     @classmethod
     def register(cls, name: str, adapter_class):
         """注册交易所适配器"""
@@ -374,6 +434,9 @@ class ExchangeAdapterFactory:
         """创建交易所适配器实例"""
         name = exchange_name.lower()
         
+        if name not in cls._adapters:
+            cls._load_adapter(name)
+        
         if name not in cls._adapters:
             raise ValueError(f"不支持的交易所: {exchange_name}")
         
@@ -391,8 +454,21 @@ class ExchangeAdapterFactory:
     
     @classmethod
     def get_supported_exchanges(cls) -> List[str]:
-        """获取支持的交易所列表"""
-        return list(cls._adapters.keys())
+        """获取支持的交易所列表（不触发适配器导入）"""
+        names = list(cls._adapters.keys())
+        names.extend(name for name in cls._lazy_adapters if name not in cls._adapters)
+        return names
+    
+    @classmethod
+    def _load_adapter(cls, name: str):
+        """导入延迟加载的适配器模块，模块导入时通过装饰器完成注册"""
+        module_path = cls._lazy_adapters.get(name)
+        if module_path is None:
+            return
+        try:
+            importlib.import_module(module_path, package=__package__)
+        except ImportError as e:
+            logger.warning("交易所适配器加载失败", exchange=name, error=str(e))
 
 
 # 装饰器：自动注册适配器
@@ -18,7 +18,7 @@ from websockets.exceptions import ConnectionClosed
 
 from ..base import (
     BaseExchangeAdapter, MarketData, OrderBook, Trade, Candle, TimeInterval,
-    OrderType, OrderSide, MarketType, ExchangeInfo, register_exchange
+    OrderType, OrderSide, MarketType, ExchangeInfo, register_exchange, batch_cancel_outcomes
 )
 
 logger = structlog.get_logger(__name__)
@@ -391,6 +391,24 @@ class OKXSpotAdapter(BaseExchangeAdapter):
             self.logger.error(f"取消现货订单失败: {e}")
             raise
     
+    async def cancel_spot_orders(self, symbol: str, order_ids: List[str]) -> List[Dict[str, Any]]:
+        """批量取消现货订单，交易所支持时使用批量撤单接口"""
+        if not self.ccxt_client.has.get('cancelOrders'):
+            return await super().cancel_spot_orders(symbol, order_ids)
+        
+        try:
+            if not self.api_key:
+                raise Exception("需要API密钥才能取消订单")
+            
+            results = await self.ccxt_client.cancel_orders(order_ids, symbol.upper())
+            outcomes = batch_cancel_outcomes(order_ids, results)
+            self.logger.info(f"批量取消现货订单: {sum(o['success'] for o in outcomes)}/{len(order_ids)}个成功")
+            return outcomes
+            
+        except Exception as e:
+            self.logger.error(f"批量取消现货订单失败: {e}")
+            raise
+    
     async def cancel_futures_order(self, symbol: str, order_id: str) -> Dict[str, Any]:
         """现货适配器不支持期货订单取消"""
         raise NotImplementedError("现货适配器不支持期货订单取消")
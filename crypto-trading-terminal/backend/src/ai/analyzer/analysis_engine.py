@@ -15,6 +15,7 @@ from .market_analyzer import MarketAnalyzer, MarketInsight
 from .signal_analyzer import SignalAnalyzer, SignalInsight
 from .performance_analyzer import PerformanceAnalyzer, PerformanceInsight
 from .insight_generator import InsightGenerator, GeneratedInsight
+from ..models.inference_server import BatchInferenceServer
 
 logger = structlog.get_logger()
 
@@ -37,6 +38,8 @@ class AnalysisConfig:
     cache_expiry_minutes: int
     performance_tracking_enabled: bool
     alert_thresholds: Dict[str, Decimal]
+    inference_batch_size: int = 256
+    inference_max_wait_ms: float = 5.0
 
 
 class AnalysisEngine:
@@ -68,6 +71,9 @@ class AnalysisEngine:
         self.performance_analyzer = None
         self.insight_generator = None
         
+        # Micro-batching servers wrapping the AI models
+        self.inference_servers: Dict[str, BatchInferenceServer] = {}
+        
         # Analysis state
         self.status = AnalysisStatus.STOPPED
         self.analysis_task: Optional[asyncio.Task] = None
@@ -100,15 +106,27 @@ class AnalysisEngine:
         try:
             logger.info("初始化分析引擎组件")
             
+            # Route per-symbol predictions through micro-batching servers
+            models = dict(ai_models)
+            for name in ("price_predictor", "signal_scorer"):
+                if ai_models.get(name) is not None:
+                    server = BatchInferenceServer(
+                        ai_models[name],
+                        max_batch_size=self.config.inference_batch_size,
+                        max_wait_ms=self.config.inference_max_wait_ms
+                    )
+                    self.inference_servers[name] = server
+                    models[name] = server
+            
             # Initialize analyzers with AI models
             self.market_analyzer = MarketAnalyzer(
-                price_predictor=ai_models.get("price_predictor"),
-                signal_scorer=ai_models.get("signal_scorer")
+                price_predictor=models.get("price_predictor"),
+                signal_scorer=models.get("signal_scorer")
             )
             
             self.signal_analyzer = SignalAnalyzer(
-                signal_scorer=ai_models.get("signal_scorer"),
-                price_predictor=ai_models.get("price_predictor")
+                signal_scorer=models.get("signal_scorer"),
+                price_predictor=models.get("price_predictor")
             )
             
             self.performance_analyzer = PerformanceAnalyzer()
@@ -158,6 +176,9 @@ class AnalysisEngine:
             except asyncio.CancelledError:
                 pass
         
+        for server in self.inference_servers.values():
+            await server.close()
+        
         logger.info("实时分析引擎已停止")
     
     async def _analysis_loop(self):
@@ -193,8 +214,12 @@ class AnalysisEngine:
     
     async def _process_symbol_analyses(self, symbols: List[str]):
         """Process analysis for multiple symbols concurrently"""
-        # Limit concurrent analyses
-        semaphore = asyncio.Semaphore(self.config.max_concurrent_analyses)
+        # Limit concurrent analyses; with batched inference a whole batch of
+        # symbols must be in flight together for their predictions to coalesce
+        limit = self.config.max_concurrent_analyses
+        if self.inference_servers:
+            limit = max(limit, self.config.inference_batch_size)
+        semaphore = asyncio.Semaphore(limit)
         
         async def process_symbol(symbol: str):
             async with semaphore:
@@ -527,6 +552,9 @@ class AnalysisEngine:
                 "cached_symbols": len(self.market_data_cache),
                 "analysis_results": len(self.analysis_results),
                 "insights_cache": len(self.insights_cache)
+            },
+            "inference": {
+                name: server.get_stats() for name, server in self.inference_servers.items()
             }
         }
     
@@ -7,10 +7,12 @@ from .base_model import BaseAIModel
 from .price_predictor import PricePredictor
 from .signal_scorer import SignalScorer
 from .strategy_optimizer import StrategyOptimizer
+from .inference_server import BatchInferenceServer
 
 __all__ = [
     'BaseAIModel',
     'PricePredictor',
     'SignalScorer',
-    'StrategyOptimizer'
+    'StrategyOptimizer',
+    'BatchInferenceServer'
 ]
\ No newline at end of file
@@ -116,7 +116,21 @@ class BaseAIModel(ABC):
     async def predict(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Make prediction using the model"""
         pass
-    
+
+    async def predict_batch(self, batch: List[Dict[str, Any]],
+                            return_exceptions: bool = False) -> List[Any]:
+        """Make predictions for many inputs
+
+        Default implementation calls predict() for each input; vectorized models
+        override this with a single forward pass. With return_exceptions=True a
+        failing input yields its exception in place of a result, mirroring
+        asyncio.gather.
+        """
+        return list(await asyncio.gather(
+            *(self.predict(data) for data in batch),
+            return_exceptions=return_exceptions
+        ))
+
     @abstractmethod
     async def train(self, training_data: List[Dict[str, Any]], 
                    validation_data: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
@@ -146,7 +160,20 @@ class BaseAIModel(ABC):
             self.prediction_times = self.prediction_times[-1000:]
         
         return latency
-    
+
+    async def _track_batch_end(self, start_time: float, batch_size: int) -> float:
+        """Track batch end time; latency is recorded per prediction"""
+        latency = (time.time() - start_time) / max(1, batch_size)
+
+        self.prediction_times.append(latency)
+        self.metadata.prediction_count += batch_size
+        self.metadata.last_prediction = datetime.now(timezone.utc)
+
+        if len(self.prediction_times) > 1000:
+            self.prediction_times = self.prediction_times[-1000:]
+
+        return latency
+
     def get_average_latency(self) -> float:
         """Get average prediction latency"""
         if not self.prediction_times:
@@ -0,0 +1,114 @@
+"""
+Batch Inference Server
+Collects prediction requests for a few milliseconds and scores them with one vectorized model pass
+"""
+
+import asyncio
+import time
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from .base_model import BaseAIModel
+
+
+class BatchInferenceServer:
+    """Micro-batching front end for an AI model
+
+    Exposes the same predict() coroutine as the wrapped model so analyzers can use
+    it as a drop-in replacement. Requests arriving within max_wait_ms of the first
+    pending request are stacked and passed to the model's predict_batch() together;
+    a full batch is flushed immediately without waiting for the timer.
+    """
+
+    def __init__(self, model: BaseAIModel, max_batch_size: int = 256, max_wait_ms: float = 5.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        # Requests waiting for the next flush
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+        # Performance tracking
+        self.stats = {
+            "requests": 0,
+            "batches": 0,
+            "failed_requests": 0,
+            "largest_batch": 0,
+            "total_batch_time": 0.0
+        }
+
+    async def predict(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue one input for the next batch and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((data, future))
+        self.stats["requests"] += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait_ms / 1000.0, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Hand all pending requests to the model as one batch"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        """Score one batch and resolve the waiting requests"""
+        started = time.perf_counter()
+        try:
+            results = await self.model.predict_batch([data for data, _ in batch], return_exceptions=True)
+        except Exception as e:
+            # Model-level failure (not trained, error state) fails every request
+            results = [e] * len(batch)
+
+        self.stats["batches"] += 1
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+        self.stats["total_batch_time"] += time.perf_counter() - started
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                # Caller was cancelled while waiting
+                continue
+            if isinstance(result, BaseException):
+                self.stats["failed_requests"] += 1
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def close(self):
+        """Flush pending requests and wait for in-flight batches"""
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching statistics"""
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "average_batch_size": (
+                (self.stats["requests"] - len(self._pending)) / batches if batches else 0.0
+            ),
+            "average_batch_time": self.stats["total_batch_time"] / batches if batches else 0.0,
+            "pending_requests": len(self._pending),
+            "inflight_batches": len(self._inflight),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms
+        }
@@ -11,10 +11,18 @@ from decimal import Decimal
 from typing import Dict, Any, List, Optional, Tuple, NamedTuple
 from dataclasses import dataclass
 from enum import Enum
+from pathlib import Path
 import structlog
 import warnings
 warnings.filterwarnings('ignore')
 
+from ..utils.sequence_windows import (
+    DEFAULT_CHUNK_SIZE,
+    feature_matrix,
+    flatten_sequences,
+    open_sequence_memmap
+)
+
 logger = structlog.get_logger()
 
 
@@ -56,6 +64,9 @@ class DataProcessor:
             "outlier_threshold": 3.0,
             "feature_scaling": "standard",
             "sequence_length": 60,
+            "sequence_chunk_size": DEFAULT_CHUNK_SIZE,
+            "sequence_memory_limit_mb": 1024,
+            "sequence_output_dir": None,
             "validation_split": 0.2,
             "test_split": 0.1,
             "random_seed": 42
@@ -278,31 +289,40 @@ class DataProcessor:
             df['volume_change'] = df['volume'].pct_change()
             feature_cols.append('volume_change')
         
-        # Create sequences
+        # Create sequences as strided windows over one contiguous float32 matrix
         sequence_length = self.config["sequence_length"]
-        features_sequences = []
-        targets = []
+        matrix = feature_matrix(df, feature_cols)
+        sequence_count = max(0, len(df) - sequence_length)
+        width = sequence_length * len(feature_cols)
+        
+        # Spill flattened sequences to a memory-mapped file when they exceed the memory limit
+        output = None
+        output_dir = self.config.get("sequence_output_dir")
+        memory_limit = self.config.get("sequence_memory_limit_mb", 1024) * 1024 * 1024
+        if output_dir and sequence_count * width * matrix.itemsize > memory_limit:
+            output_path = Path(output_dir) / f"lstm_sequences_{datetime.now(timezone.utc):%Y%m%d_%H%M%S_%f}.npy"
+            output = open_sequence_memmap(output_path, (sequence_count, width), matrix.dtype)
+            logger.info("序列数据超出内存限制，写入内存映射文件",
+                       path=str(output_path), sequences=sequence_count, width=width)
+        
+        features = flatten_sequences(
+            matrix, sequence_length, out=output,
+            chunk_size=self.config.get("sequence_chunk_size", DEFAULT_CHUNK_SIZE)
+        )
         
-        for i in range(sequence_length, len(df)):
-            # Extract sequence
-            sequence = df.iloc[i-sequence_length:i][feature_cols]
-            features_sequences.append(sequence.values.flatten())
-            
-            # Extract target (next price or price change)
-            if 'close' in df.columns:
-                next_price = df.iloc[i]['close']
-                targets.append([next_price])
-            else:
-                # Use last price change as target
-                if 'price_change' in df.columns:
-                    targets.append([df.iloc[i]['price_change']])
-                else:
-                    targets.append([0.0])
-        
-        # Convert to DataFrames
-        feature_names = [f"feature_{j}" for j in range(len(features_sequences[0]))]
-        features_df = pd.DataFrame(features_sequences, columns=feature_names)
-        targets_df = pd.DataFrame(targets, columns=['target'])
+        # Extract target (next price or price change)
+        if 'close' in df.columns:
+            targets = df['close'].to_numpy()[sequence_length:]
+        elif 'price_change' in df.columns:
+            # Use last price change as target
+            targets = df['price_change'].to_numpy()[sequence_length:]
+        else:
+            targets = np.zeros(sequence_count)
+        
+        # Wrap without copying
+        feature_names = [f"feature_{j}" for j in range(width)]
+        features_df = pd.DataFrame(features, columns=feature_names, copy=False)
+        targets_df = pd.DataFrame({'target': targets})
         
         return features_df, targets_df
     
@@ -0,0 +1,84 @@
+"""
+Sequence Windows
+Zero-copy sliding windows over a contiguous feature matrix for sequence model training
+"""
+
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def feature_matrix(df: pd.DataFrame, columns: List[str], dtype=np.float32) -> np.ndarray:
+    """Extract columns as one contiguous row-major matrix"""
+    return np.ascontiguousarray(df[columns].to_numpy(dtype=dtype))
+
+
+def sequence_windows(matrix: np.ndarray, sequence_length: int) -> np.ndarray:
+    """Strided view of shape (rows - sequence_length, sequence_length, features)
+
+    Window k covers rows k .. k + sequence_length - 1 and is paired with row
+    k + sequence_length as its target, so the final full window (which has no
+    target row) is dropped. No data is copied.
+    """
+    if sequence_length < 1:
+        raise ValueError("sequence_length must be at least 1")
+
+    count = len(matrix) - sequence_length
+    if count <= 0:
+        return np.empty((0, sequence_length, matrix.shape[1]), dtype=matrix.dtype)
+
+    # sliding_window_view appends the window axis last: (windows, features, length)
+    windows = sliding_window_view(matrix, sequence_length, axis=0)
+    return windows[:count].transpose(0, 2, 1)
+
+
+def iter_sequence_chunks(matrix: np.ndarray, sequence_length: int,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yield (start, flattened windows) chunks
+
+    For a row-major matrix the flattened chunk is itself a read-only strided
+    view (consecutive rows overlap in memory), so iterating copies nothing.
+    """
+    windows = sequence_windows(matrix, sequence_length)
+    width = sequence_length * matrix.shape[1]
+    for start in range(0, len(windows), chunk_size):
+        chunk = windows[start:start + chunk_size]
+        yield start, chunk.reshape(len(chunk), width)
+
+
+def flatten_sequences(matrix: np.ndarray, sequence_length: int,
+                      out: Optional[np.ndarray] = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+    """Write flattened windows into out (an array or memmap), chunk by chunk
+
+    Each output row is the window's rows concatenated, matching
+    ``df.iloc[i - sequence_length:i].values.flatten()``.
+    """
+    windows = sequence_windows(matrix, sequence_length)
+    features = matrix.shape[1]
+    shape = (len(windows), sequence_length * features)
+
+    if out is None:
+        out = np.empty(shape, dtype=matrix.dtype)
+    elif out.shape != shape:
+        raise ValueError(f"output shape {out.shape} does not match {shape}")
+
+    for start in range(0, len(windows), chunk_size):
+        stop = min(start + chunk_size, len(windows))
+        out[start:stop].reshape(stop - start, sequence_length, features)[...] = windows[start:stop]
+        if isinstance(out, np.memmap):
+            out.flush()
+
+    return out
+
+
+def open_sequence_memmap(path: Union[str, Path], shape: Tuple[int, int], dtype=np.float32) -> np.memmap:
+    """Create a .npy-backed memmap that can be reopened with np.load(mmap_mode='r')"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
@@ -2,11 +2,18 @@
 API路由模块
 """
 
-from .routes import market, trading, user, system
+import importlib
 
 __all__ = [
     "market",
     "trading", 
     "user",
     "system"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # 路由模块按需导入，只启用部分功能的进程不会加载其余子系统
+    if name in __all__:
+        return importlib.import_module(f".routes.{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
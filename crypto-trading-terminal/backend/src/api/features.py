@@ -0,0 +1,84 @@
+"""
+功能开关与路由延迟加载
+按配置只导入并注册启用的路由模块，例如仅提供行情服务的进程
+不会加载交易、风控和报表子系统
+"""
+
+import importlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import FastAPI
+
+# 功能名 -> (路由模块, URL前缀, 标签)
+FEATURE_ROUTES: Dict[str, Tuple[str, str, List[str]]] = {
+    "market": (".routes.market", "/api/v1/market", ["market"]),
+    "trading": (".routes.trading", "/api/v1/trading", ["trading"]),
+    "user": (".routes.user", "/api/v1/user", ["user"]),
+    "system": (".routes.system", "/api/v1/system", ["system"]),
+    "order_history": (".routes.order_history", "/api/v1/order-history", ["order-history"]),
+    "risk_alerts": (".routes.risk_alerts", "/api/v1/risk-alerts", ["risk-alerts"]),
+    "emergency_stop": (".routes.emergency_stop", "/api/v1/emergency-stop", ["emergency-stop"]),
+    "reports": (".routes.reports", "/api/v1/reports", ["reports"]),
+}
+
+# 预设的进程角色
+FEATURE_PROFILES: Dict[str, List[str]] = {
+    "all": list(FEATURE_ROUTES.keys()),
+    "market": ["market", "system"],
+    "trading": ["trading", "user", "system", "order_history", "risk_alerts", "emergency_stop"],
+    "reports": ["reports", "system"],
+}
+
+
+def resolve_features(spec: str) -> List[str]:
+    """解析功能配置
+
+    spec为逗号分隔的预设角色或功能名，例如 "market" 或 "market,reports"。
+    """
+    features: List[str] = []
+    for item in (part.strip().lower() for part in spec.split(",")):
+        if not item:
+            continue
+        if item in FEATURE_PROFILES:
+            names = FEATURE_PROFILES[item]
+        elif item in FEATURE_ROUTES:
+            names = [item]
+        else:
+            raise ValueError(f"未知的功能: {item}")
+        for name in names:
+            if name not in features:
+                features.append(name)
+    return features
+
+
+def include_feature_routers(app: FastAPI, features: Iterable[str]) -> List[str]:
+    """导入并注册启用功能的路由，返回已注册的功能列表"""
+    included = []
+    for name in features:
+        module_path, prefix, tags = FEATURE_ROUTES[name]
+        module = importlib.import_module(module_path, __package__)
+        app.include_router(module.router, prefix=prefix, tags=tags)
+        included.append(name)
+    return included
+
+
+# 当前进程启用的功能
+_enabled_features: Optional[List[str]] = None
+
+
+def set_enabled_features(features: List[str]):
+    """记录当前进程启用的功能"""
+    global _enabled_features
+    _enabled_features = list(features)
+
+
+def get_enabled_features() -> List[str]:
+    """获取当前进程启用的功能"""
+    if _enabled_features is None:
+        return list(FEATURE_ROUTES.keys())
+    return list(_enabled_features)
+
+
+def is_feature_enabled(name: str) -> bool:
+    """判断功能是否启用"""
+    return name in get_enabled_features()
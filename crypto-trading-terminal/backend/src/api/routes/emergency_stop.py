@@ -350,7 +350,8 @@ async def get_emergency_stop_status(
                     "triggered_at": stop.triggered_at.isoformat(),
                     "expires_at": stop.expires_at.isoformat() if stop.expires_at else None,
                     "orders_affected": stop.orders_affected,
-                    "total_amount": stop.total_amount
+                    "total_amount": stop.total_amount,
+                    "failed_order_ids": stop.failed_order_ids
                 })
         
         # 检查用户交易是否被停止
@@ -3,8 +3,8 @@ Report generation API routes
 Provides endpoints for PDF/CSV report generation and download
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Header
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
@@ -13,31 +13,53 @@ import asyncio
 import os
 from pathlib import Path
 
-# Import report components
-import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '../../../backend/src'))
+from ...config import settings
 
-from reports.report_generator import ReportGenerator
-from reports.report_types import ReportRequest, ReportType, ExportFormat
-from reports.report_templates import ReportTemplateManager
+# Import report components (the PDF backend is loaded on first PDF export)
+from ...reports.report_generator import ReportGenerator
+from ...reports.report_index import REPORT_RETENTION, ReportRecord
+from ...reports.report_sources import DatabaseTradeSource
+from ...reports.report_types import ReportRequest, ReportType, ExportFormat, ReportJob
+from ...reports.report_templates import ReportTemplateManager
 
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+MEDIA_TYPES = {'.pdf': 'application/pdf', '.csv': 'text/csv', '.txt': 'text/plain'}
+
 # Global report generator instance
 _report_generator = None
 _template_manager = ReportTemplateManager()
 
 
+# Async drivers used by the API's own engine; report workers read trades with a blocking connection
+SYNC_DRIVERS = {'sqlite+aiosqlite': 'sqlite', 'postgresql+asyncpg': 'postgresql'}
+
+
+def _sync_database_url(database_url: str) -> str:
+    scheme, separator, rest = database_url.partition("://")
+    return f"{SYNC_DRIVERS.get(scheme, scheme)}{separator}{rest}"
+
+
 def get_report_generator() -> ReportGenerator:
-    """Get or create report generator instance"""
+    """Get or create report generator instance reading trades from the configured database"""
     global _report_generator
     if _report_generator is None:
         _report_generator = ReportGenerator()
+        _report_generator.set_trade_source(DatabaseTradeSource(_sync_database_url(settings.DATABASE_URL)))
     return _report_generator
 
 
+async def shutdown_report_generator():
+    """Stop the render worker processes and close the report index (called on app shutdown)"""
+    global _report_generator
+    if _report_generator is not None:
+        generator, _report_generator = _report_generator, None
+        await asyncio.to_thread(generator.jobs.shutdown)
+        generator.index.close()
+
+
 class ReportTypeEnum(str, Enum):
     """Report type enumeration"""
     ACCOUNT_SUMMARY = "account_summary"
@@ -67,6 +89,7 @@ class ReportRequestModel(BaseModel):
     include_charts: bool = Field(True, description="Include charts in report")
     template_id: Optional[str] = Field(None, description="Custom template ID")
     custom_parameters: Optional[Dict[str, str]] = Field(None, description="Custom parameters")
+    user_id: Optional[int] = Field(None, description="Owner of the report")
 
 
 class ReportResponseModel(BaseModel):
@@ -80,6 +103,24 @@ class ReportResponseModel(BaseModel):
     format: ExportFormatEnum
     report_type: ReportTypeEnum
     status: str = "completed"
+    user_id: Optional[int] = None
+
+
+class ReportJobModel(BaseModel):
+    """Report generation job status model"""
+    job_id: str
+    status: str
+    progress: float
+    rows_written: int
+    total_rows: Optional[int] = None
+    report_type: ReportTypeEnum
+    format: ExportFormatEnum
+    created_at: datetime
+    updated_at: datetime
+    status_url: str
+    report_id: Optional[str] = None
+    download_url: Optional[str] = None
+    error: Optional[str] = None
 
 
 class ReportTemplateModel(BaseModel):
@@ -96,6 +137,82 @@ class ReportListResponse(BaseModel):
     """Report list response model"""
     reports: List[ReportResponseModel]
     total: int
+    next_cursor: Optional[str] = None
+
+
+def _to_internal_request(request: ReportRequestModel) -> ReportRequest:
+    """Convert and validate an API request"""
+    internal_request = ReportRequest(
+        report_type=ReportType(request.report_type.value),
+        export_format=ExportFormat(request.export_format.value),
+        start_date=request.start_date,
+        end_date=request.end_date,
+        exchanges=request.exchanges,
+        assets=request.assets,
+        include_charts=request.include_charts,
+        template_id=request.template_id,
+        custom_parameters=request.custom_parameters,
+        user_id=request.user_id
+    )
+    
+    # Validate request
+    if internal_request.start_date >= internal_request.end_date:
+        raise HTTPException(status_code=400, detail="Start date must be before end date")
+    
+    if (internal_request.end_date - internal_request.start_date).days > 365:
+        raise HTTPException(status_code=400, detail="Report period cannot exceed 1 year")
+    
+    return internal_request
+
+
+def _job_to_model(job: ReportJob) -> ReportJobModel:
+    return ReportJobModel(
+        job_id=job.job_id,
+        status=job.status.value,
+        progress=job.progress,
+        rows_written=job.rows_written,
+        total_rows=job.total_rows,
+        report_type=ReportTypeEnum(job.report_type.value),
+        format=ExportFormatEnum(job.export_format.value),
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        status_url=f"/api/reports/jobs/{job.job_id}",
+        report_id=job.report_id,
+        download_url=f"/api/reports/download/{job.report_id}" if job.report_id else None,
+        error=job.error
+    )
+
+
+@router.post("/jobs", response_model=ReportJobModel, status_code=202)
+async def submit_report_job(
+    request: ReportRequestModel,
+    background_tasks: BackgroundTasks,
+    report_generator: ReportGenerator = Depends(get_report_generator)
+):
+    """Queue a report for rendering in the background; poll the returned status_url for progress"""
+    internal_request = _to_internal_request(request)
+    try:
+        job = await report_generator.submit_report(internal_request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to submit report: {str(e)}")
+    
+    # Clean up old reports in background
+    background_tasks.add_task(cleanup_old_reports)
+    return _job_to_model(job)
+
+
+@router.get("/jobs/{job_id}", response_model=ReportJobModel)
+async def get_report_job(
+    job_id: str,
+    report_generator: ReportGenerator = Depends(get_report_generator)
+):
+    """Get the status and progress of a report generation job"""
+    job = await asyncio.to_thread(report_generator.jobs.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return _job_to_model(job)
 
 
 @router.post("/generate", response_model=ReportResponseModel)
@@ -104,28 +221,9 @@ async def generate_report(
     background_tasks: BackgroundTasks,
     report_generator: ReportGenerator = Depends(get_report_generator)
 ):
-    """Generate a new report"""
+    """Generate a new report and wait for it; rendering runs off the event loop"""
+    internal_request = _to_internal_request(request)
     try:
-        # Convert request model to internal format
-        internal_request = ReportRequest(
-            report_type=ReportType(request.report_type.value),
-            export_format=ExportFormat(request.export_format.value),
-            start_date=request.start_date,
-            end_date=request.end_date,
-            exchanges=request.exchanges,
-            assets=request.assets,
-            include_charts=request.include_charts,
-            template_id=request.template_id,
-            custom_parameters=request.custom_parameters
-        )
-        
-        # Validate request
-        if internal_request.start_date >= internal_request.end_date:
-            raise HTTPException(status_code=400, detail="Start date must be before end date")
-        
-        if (internal_request.end_date - internal_request.start_date).days > 365:
-            raise HTTPException(status_code=400, detail="Report period cannot exceed 1 year")
-        
         # Generate report
         response = await report_generator.generate_report(internal_request)
         
@@ -140,52 +238,107 @@ async def generate_report(
             expires_at=response.expires_at,
             generation_time=response.generation_time,
             format=ExportFormatEnum(response.format.value),
-            report_type=ReportTypeEnum(response.report_type.value)
+            report_type=ReportTypeEnum(response.report_type.value),
+            user_id=request.user_id
         )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate report: {str(e)}")
 
 
+def _parse_range(range_header: str, file_size: int):
+    """Parse a single "bytes=start-end" range into inclusive offsets"""
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        raise ValueError("Only single byte ranges are supported")
+
+    first, _, last = spec.strip().partition("-")
+    if first:
+        start = int(first)
+        end = min(int(last), file_size - 1) if last else file_size - 1
+    else:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length <= 0:
+            raise ValueError("Empty suffix range")
+        start, end = max(file_size - length, 0), file_size - 1
+
+    if start > end or start >= file_size:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+async def _stream_file(file_path: Path, start: int, end: int, chunk_size: int = DOWNLOAD_CHUNK_SIZE):
+    """Read [start, end] in chunks on a worker thread so the event loop never blocks on disk I/O"""
+    handle = await asyncio.to_thread(open, file_path, 'rb')
+    try:
+        await asyncio.to_thread(handle.seek, start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await asyncio.to_thread(handle.read, min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        await asyncio.to_thread(handle.close)
+
+
+async def _remove_report_file(record: ReportRecord):
+    try:
+        await asyncio.to_thread(Path(record.file_path).unlink, True)
+    except OSError:
+        pass
+
+
 @router.get("/download/{report_id}")
 async def download_report(
     report_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
     report_generator: ReportGenerator = Depends(get_report_generator)
 ):
-    """Download a generated report"""
+    """Download a generated report, honouring single byte-range requests"""
     try:
-        file_path = Path(report_generator.output_directory) / f"{report_id}.pdf"
-        
-        # Check if file exists
-        if not file_path.exists():
-            # Try CSV extension
-            file_path = Path(report_generator.output_directory) / f"{report_id}.csv"
-            if not file_path.exists():
-                raise HTTPException(status_code=404, detail="Report not found")
+        record = await asyncio.to_thread(report_generator.index.get, report_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Report not found")
         
         # Check if file is expired
-        file_stat = file_path.stat()
-        file_modified = datetime.fromtimestamp(file_stat.st_mtime)
-        if datetime.now() - file_modified > timedelta(days=7):
-            # Clean up expired file
-            file_path.unlink()
+        if record.is_expired():
+            await asyncio.to_thread(report_generator.index.remove, report_id)
+            await _remove_report_file(record)
             raise HTTPException(status_code=404, detail="Report has expired")
         
-        # Determine content type
-        if file_path.suffix.lower() == '.pdf':
-            media_type = 'application/pdf'
-            filename = f"trading_report_{report_id}.pdf"
-        elif file_path.suffix.lower() == '.csv':
-            media_type = 'text/csv'
-            filename = f"trading_report_{report_id}.csv"
-        else:
-            media_type = 'application/octet-stream'
-            filename = f"trading_report_{report_id}"
+        file_path = Path(record.file_path)
+        try:
+            file_size = (await asyncio.to_thread(file_path.stat)).st_size
+        except FileNotFoundError:
+            await asyncio.to_thread(report_generator.index.remove, report_id)
+            raise HTTPException(status_code=404, detail="Report not found")
         
-        return FileResponse(
-            path=str(file_path),
+        suffix = file_path.suffix.lower()
+        media_type = MEDIA_TYPES.get(suffix, 'application/octet-stream')
+        headers = {
+            "Accept-Ranges": "bytes",
+            "Content-Disposition": f'attachment; filename="trading_report_{report_id}{suffix}"'
+        }
+        
+        start, end, status_code = 0, file_size - 1, 200
+        if range_header:
+            try:
+                start, end = _parse_range(range_header, file_size)
+            except ValueError:
+                raise HTTPException(status_code=416, detail="Requested range not satisfiable",
+                                    headers={"Content-Range": f"bytes */{file_size}"})
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+        headers["Content-Length"] = str(end - start + 1)
+        
+        return StreamingResponse(
+            _stream_file(file_path, start, end),
+            status_code=status_code,
             media_type=media_type,
-            filename=filename
+            headers=headers
         )
         
     except HTTPException:
@@ -238,69 +391,59 @@ async def get_templates_by_type(report_type: ReportTypeEnum):
         raise HTTPException(status_code=500, detail=f"Failed to get templates: {str(e)}")
 
 
+def _record_to_model(record: ReportRecord) -> ReportResponseModel:
+    return ReportResponseModel(
+        report_id=record.report_id,
+        file_path=record.file_path,
+        file_size=record.file_size,
+        download_url=f"/api/reports/download/{record.report_id}",
+        expires_at=record.expires_at,
+        generation_time=record.generation_time,
+        format=ExportFormatEnum(record.export_format),
+        # Files indexed from before the index existed carry no type
+        report_type=ReportTypeEnum(record.report_type or ReportTypeEnum.ACCOUNT_SUMMARY.value),
+        status="completed",
+        user_id=record.user_id
+    )
+
+
 @router.get("/list", response_model=ReportListResponse)
 async def list_reports(
     limit: int = 50,
-    offset: int = 0,
+    cursor: Optional[str] = None,
+    report_type: Optional[ReportTypeEnum] = None,
+    user_id: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
     report_generator: ReportGenerator = Depends(get_report_generator)
 ):
-    """List generated reports"""
+    """List generated reports, newest first; pass next_cursor back to fetch the following page"""
+    if not 1 <= limit <= 500:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 500")
+    
+    filters = {
+        "report_type": report_type.value if report_type else None,
+        "user_id": user_id,
+        "start_date": start_date,
+        "end_date": end_date
+    }
+    
     try:
-        reports_dir = Path(report_generator.output_directory)
-        
-        if not reports_dir.exists():
-            return ReportListResponse(reports=[], total=0)
-        
-        # Get all report files
-        report_files = []
-        for file_path in reports_dir.iterdir():
-            if file_path.is_file() and file_path.suffix in ['.pdf', '.csv']:
-                stat = file_path.stat()
-                file_modified = datetime.fromtimestamp(stat.st_mtime)
-                
-                # Skip expired files
-                if datetime.now() - file_modified <= timedelta(days=7):
-                    report_files.append({
-                        'file_path': str(file_path),
-                        'file_size': stat.st_size,
-                        'modified': file_modified,
-                        'report_id': file_path.stem
-                    })
-        
-        # Sort by modification date (newest first)
-        report_files.sort(key=lambda x: x['modified'], reverse=True)
-        
-        # Apply pagination
-        paginated_files = report_files[offset:offset + limit]
-        
-        # Convert to response model
-        reports = []
-        for file_info in paginated_files:
-            try:
-                # Determine format and type from file or additional metadata
-                format_enum = ExportFormatEnum.CSV if file_info['file_path'].endswith('.csv') else ExportFormatEnum.PDF
-                
-                # For now, assume account summary type (in real implementation, 
-                # this would be stored in metadata)
-                report_type = ReportTypeEnum.ACCOUNT_SUMMARY
-                
-                reports.append(ReportResponseModel(
-                    report_id=file_info['report_id'],
-                    file_path=file_info['file_path'],
-                    file_size=file_info['file_size'],
-                    download_url=f"/api/reports/download/{file_info['report_id']}",
-                    expires_at=file_info['modified'] + timedelta(days=7),
-                    generation_time=0.0,  # Would be stored in metadata
-                    format=format_enum,
-                    report_type=report_type,
-                    status="completed"
-                ))
-            except Exception:
-                # Skip files that can't be processed
-                continue
-        
-        return ReportListResponse(reports=reports, total=len(report_files))
-        
+        records, next_cursor = await asyncio.to_thread(
+            report_generator.index.list, limit=limit, cursor=cursor, **filters
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to list reports: {str(e)}")
+    
+    try:
+        total = await asyncio.to_thread(report_generator.index.count, **filters)
+        return ReportListResponse(
+            reports=[_record_to_model(record) for record in records],
+            total=total,
+            next_cursor=next_cursor
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list reports: {str(e)}")
 
@@ -312,20 +455,12 @@ async def delete_report(
 ):
     """Delete a generated report"""
     try:
-        reports_dir = Path(report_generator.output_directory)
-        
-        # Find and delete the report file
-        deleted = False
-        for extension in ['.pdf', '.csv']:
-            file_path = reports_dir / f"{report_id}{extension}"
-            if file_path.exists():
-                file_path.unlink()
-                deleted = True
-                break
-        
-        if not deleted:
+        record = await asyncio.to_thread(report_generator.index.remove, report_id)
+        if record is None:
             raise HTTPException(status_code=404, detail="Report not found")
         
+        await _remove_report_file(record)
+        
         return {"message": f"Report {report_id} deleted successfully"}
         
     except HTTPException:
@@ -340,11 +475,13 @@ async def reports_health_check():
     try:
         generator = get_report_generator()
         templates_count = len(_template_manager.get_available_templates())
+        reports_indexed = await asyncio.to_thread(generator.index.count)
         
         return {
             "status": "healthy",
             "service": "reports",
             "templates_available": templates_count,
+            "reports_indexed": reports_indexed,
             "output_directory": str(generator.output_directory),
             "timestamp": datetime.now().isoformat()
         }
@@ -359,27 +496,14 @@ async def reports_health_check():
 
 
 async def cleanup_old_reports():
-    """Background task to clean up old report files"""
+    """Background task to delete expired reports from the index and disk"""
     try:
         generator = get_report_generator()
-        reports_dir = Path(generator.output_directory)
-        
-        if not reports_dir.exists():
-            return
-        
-        # Remove files older than 7 days
-        cutoff_date = datetime.now() - timedelta(days=7)
-        
-        for file_path in reports_dir.iterdir():
-            if file_path.is_file():
-                file_modified = datetime.fromtimestamp(file_path.stat().st_mtime)
-                if file_modified < cutoff_date:
-                    try:
-                        file_path.unlink()
-                    except Exception:
-                        # Continue cleaning even if some files fail
-                        continue
+        for record in await asyncio.to_thread(generator.index.purge_expired):
+            # Continue cleaning even if some files fail
+            await _remove_report_file(record)
+        await asyncio.to_thread(generator.index.purge_jobs, datetime.now() - REPORT_RETENTION)
         
     except Exception:
         # Silently fail cleanup task
-        pass
\ No newline at end of file
+        pass
@@ -6,14 +6,16 @@
 import asyncio
 import json
 import logging
+import time
+from collections.abc import MutableMapping
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Set, Union
+from typing import Dict, Iterator, List, Optional, Any, Set, Tuple, Union
 from enum import Enum
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, and_, or_, func, desc
+from sqlalchemy import select, update, insert, and_, or_, func, desc
 from sqlalchemy.orm import selectinload
 
 from ..storage.models import (
@@ -21,6 +23,8 @@ from ..storage.models import (
     OrderStatus, ExecutionResultStatus, MarketType
 )
 from ..storage.database import get_db_session
+from ..adapters.base import ExchangeAdapterFactory
+from ..config import settings
 from ..notification.risk_alert_integration import (
     RiskAlertNotificationManager,
     get_risk_alert_notification_manager,
@@ -110,18 +114,84 @@ class StopRecord:
     total_amount: float
     metadata: Dict[str, Any]
     notification_sent: bool = False
+    time_to_flat_ms: Optional[float] = None  # 从触发到交易所撤单完成的耗时
+    failed_order_ids: List[int] = field(default_factory=list)  # 交易所未确认撤销、仍为原状态的订单
+
+
+class ActiveStopRegistry(MutableMapping):
+    """活跃停止记录
+    
+    按 stop_id 存取，同时维护 (停止级别, 目标) 索引，使停止检查为O(1)。
+    全局停止不区分目标，统一索引在 (GLOBAL, None) 下。
+    """
+    
+    def __init__(self):
+        self._stops: Dict[str, StopRecord] = {}
+        self._by_target: Dict[Tuple[StopLevel, Union[int, str]], Dict[str, StopRecord]] = {}
+    
+    def __getitem__(self, stop_id: str) -> StopRecord:
+        return self._stops[stop_id]
+    
+    def __setitem__(self, stop_id: str, stop_record: StopRecord):
+        if stop_id in self._stops:
+            self._unindex(stop_id, self._stops[stop_id])
+        self._stops[stop_id] = stop_record
+        self._by_target.setdefault(self._key(stop_record), {})[stop_id] = stop_record
+    
+    def __delitem__(self, stop_id: str):
+        stop_record = self._stops.pop(stop_id)
+        self._unindex(stop_id, stop_record)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._stops)
+    
+    def __len__(self) -> int:
+        return len(self._stops)
+    
+    @staticmethod
+    def _key(stop_record: StopRecord) -> Tuple[StopLevel, Union[int, str, None]]:
+        if stop_record.stop_level == StopLevel.GLOBAL:
+            return (StopLevel.GLOBAL, None)
+        return (stop_record.stop_level, stop_record.target_id)
+    
+    def _unindex(self, stop_id: str, stop_record: StopRecord):
+        key = self._key(stop_record)
+        records = self._by_target.get(key)
+        if records is not None:
+            records.pop(stop_id, None)
+            if not records:
+                del self._by_target[key]
+    
+    def find_active(self, level: StopLevel, target_id: Union[int, str, None] = None) -> Optional[StopRecord]:
+        """查找目标的有效停止记录"""
+        key = (StopLevel.GLOBAL, None) if level == StopLevel.GLOBAL else (level, target_id)
+        records = self._by_target.get(key)
+        if not records:
+            return None
+        for stop_record in records.values():
+            if stop_record.status == StopStatus.ACTIVE:
+                return stop_record
+        return None
 
 
 class EmergencyStopService:
     """紧急停止服务"""
     
-    def __init__(self, db_session: AsyncSession):
+    # 需要撤销的订单状态
+    CANCELLABLE_STATUSES = (OrderStatus.NEW, OrderStatus.PENDING, OrderStatus.SUBMITTED)
+    
+    def __init__(self, db_session: AsyncSession, exchange_adapters: Optional[Dict[str, Any]] = None):
         self.db_session = db_session
         self.notification_manager = get_notification_manager()
         self.risk_alert_manager = get_risk_alert_notification_manager()
         
-        # 活跃停止记录
-        self.active_stops: Dict[str, StopRecord] = {}
+        # 活跃停止记录，按 (级别, 目标) 建立索引
+        self.active_stops: ActiveStopRegistry = ActiveStopRegistry()
+        
+        # 交易所适配器，按交易所名称注册，用于撤销交易所挂单
+        self.exchange_adapters: Dict[str, Any] = dict(exchange_adapters or {})
+        self.cancel_batch_size = 20       # 单次批量撤单的最大订单数
+        self.max_parallel_cancels = 8     # 同时进行的批量撤单请求数
         
         # 停止规则缓存
         self.stop_rules: Dict[str, EmergencyStopConfig] = {}
@@ -136,12 +206,19 @@ class EmergencyStopService:
             "active_stops": 0,
             "orders_cancelled": 0,
             "amount_preserved": 0.0,
+            "exchange_cancels_sent": 0,
+            "exchange_cancel_failures": 0,
+            "last_time_to_flat_ms": None,
             "by_level": {},
             "by_reason": {}
         }
         
         logger.info("紧急停止服务初始化完成")
     
+    def register_exchange_adapter(self, exchange: str, adapter: Any):
+        """注册交易所适配器"""
+        self.exchange_adapters[exchange] = adapter
+    
     async def start_monitoring(self):
         """启动监控任务"""
         if self.is_monitoring:
@@ -188,19 +265,22 @@ class EmergencyStopService:
             
             # 执行停止操作
             start_time = datetime.now()
+            started = time.perf_counter()
             orders_affected = 0
             total_amount = 0.0
+            failed_order_ids: List[int] = []
             
             if config.stop_level == StopLevel.GLOBAL:
-                orders_affected, total_amount = await self._stop_all_trading(config, triggered_by)
+                orders_affected, total_amount, failed_order_ids = await self._stop_all_trading(config, triggered_by)
             elif config.stop_level == StopLevel.USER:
-                orders_affected, total_amount = await self._stop_user_trading(config, triggered_by)
+                orders_affected, total_amount, failed_order_ids = await self._stop_user_trading(config, triggered_by)
             elif config.stop_level == StopLevel.ACCOUNT:
-                orders_affected, total_amount = await self._stop_account_trading(config, triggered_by)
+                orders_affected, total_amount, failed_order_ids = await self._stop_account_trading(config, triggered_by)
             elif config.stop_level == StopLevel.SYMBOL:
-                orders_affected, total_amount = await self._stop_symbol_trading(config, triggered_by)
+                orders_affected, total_amount, failed_order_ids = await self._stop_symbol_trading(config, triggered_by)
             elif config.stop_level == StopLevel.STRATEGY:
-                orders_affected, total_amount = await self._stop_strategy_trading(config, triggered_by)
+                orders_affected, total_amount, failed_order_ids = await self._stop_strategy_trading(config, triggered_by)
+            time_to_flat_ms = (time.perf_counter() - started) * 1000
             
             # 计算过期时间
             expires_at = None
@@ -221,7 +301,9 @@ class EmergencyStopService:
                 cancelled_by=None,
                 orders_affected=orders_affected,
                 total_amount=total_amount,
-                metadata=config.metadata or {}
+                metadata=config.metadata or {},
+                time_to_flat_ms=time_to_flat_ms,
+                failed_order_ids=failed_order_ids
             )
             
             # 保存到内存和数据库
@@ -237,7 +319,11 @@ class EmergencyStopService:
             # 创建风险预警记录
             await self._create_risk_alert(stop_record, config)
             
-            logger.info(f"紧急停止执行成功: {stop_id}, 影响订单: {orders_affected}, 金额: {total_amount}")
+            self.stats["last_time_to_flat_ms"] = time_to_flat_ms
+            if failed_order_ids:
+                logger.warning(f"紧急停止 {stop_id} 有 {len(failed_order_ids)} 个订单未能在交易所撤销: {failed_order_ids}")
+            logger.info(f"紧急停止执行成功: {stop_id}, 影响订单: {orders_affected}, 金额: {total_amount}, "
+                        f"撤单耗时: {time_to_flat_ms:.1f}ms")
             
             return stop_id
             
@@ -344,6 +430,15 @@ class EmergencyStopService:
         
         return False
     
+    async def is_any_stop_active(
+        self,
+        user_id: Optional[int] = None,
+        account_id: Optional[int] = None,
+        symbol: Optional[str] = None
+    ) -> bool:
+        """检查是否存在影响目标的活跃停止"""
+        return self.is_trading_stopped(user_id=user_id, account_id=account_id, symbol=symbol)
+    
     async def get_active_stops(self) -> List[StopRecord]:
         """获取所有活跃停止"""
         return list(self.active_stops.values())
@@ -422,215 +517,211 @@ class EmergencyStopService:
                 logger.error(f"监控循环错误: {str(e)}")
                 await asyncio.sleep(60)
     
-    async def _stop_all_trading(self, config: EmergencyStopConfig, triggered_by: str) -> tuple[int, float]:
+    async def _stop_all_trading(self, config: EmergencyStopConfig, triggered_by: str) -> tuple[int, float, List[int]]:
         """停止所有交易"""
-        orders_affected = 0
-        total_amount = 0.0
-        
-        # 取消所有活跃订单
-        active_orders = await self.db_session.execute(
-            select(Order).where(Order.status.in_([
-                OrderStatus.NEW,
-                OrderStatus.PENDING,
-                OrderStatus.SUBMITTED
-            ]))
-        )
-        
-        for order in active_orders.scalars().all():
-            if await self._cancel_order(order, config):
-                orders_affected += 1
-                total_amount += float(order.price * order.quantity) if order.price else 0.0
-        
-        # 暂停所有自动订单
-        auto_orders = await self.db_session.execute(
-            select(AutoOrder).where(AutoOrder.status == OrderStatus.NEW)
+        orders_affected, total_amount, failed_order_ids = await self._bulk_stop(
+            config,
+            order_conditions=[],
+            auto_order_conditions=[AutoOrder.status == OrderStatus.NEW]
         )
         
-        for auto_order in auto_orders.scalars().all():
-            auto_order.is_paused = True
-            orders_affected += 1
-        
-        await self.db_session.commit()
-        
         logger.info(f"全局停止完成，影响订单: {orders_affected}")
-        return orders_affected, total_amount
+        return orders_affected, total_amount, failed_order_ids
     
-    async def _stop_user_trading(self, config: EmergencyStopConfig, triggered_by: str) -> tuple[int, float]:
+    async def _stop_user_trading(self, config: EmergencyStopConfig, triggered_by: str) -> tuple[int, float, List[int]]:
         """停止用户交易"""
         user_id = config.target_id
-        orders_affected = 0
-        total_amount = 0.0
-        
-        # 取消用户的所有活跃订单
-        active_orders = await self.db_session.execute(
-            select(Order).join(Account).where(
-                Account.user_id == user_id,
-                Order.status.in_([OrderStatus.NEW, OrderStatus.PENDING, OrderStatus.SUBMITTED])
-            )
-        )
-        
-        for order in active_orders.scalars().all():
-            if await self._cancel_order(order, config):
-                orders_affected += 1
-                total_amount += float(order.price * order.quantity) if order.price else 0.0
-        
-        # 暂停用户的自动订单
-        auto_orders = await self.db_session.execute(
-            select(AutoOrder).where(AutoOrder.user_id == user_id)
+        orders_affected, total_amount, failed_order_ids = await self._bulk_stop(
+            config,
+            order_conditions=[Order.account_id.in_(select(Account.id).where(Account.user_id == user_id))],
+            auto_order_conditions=[AutoOrder.user_id == user_id]
         )
         
-        for auto_order in auto_orders.scalars().all():
-            auto_order.is_paused = True
-            orders_affected += 1
-        
-        await self.db_session.commit()
-        
         logger.info(f"用户 {user_id} 停止完成，影响订单: {orders_affected}")
-        return orders_affected, total_amount
+        return orders_affected, total_amount, failed_order_ids
     
-    async def _stop_account_trading(self, config: EmergencyStopConfig, triggered_by: str) -> tuple[int, float]:
+    async def _stop_account_trading(self, config: EmergencyStopConfig, triggered_by: str) -> tuple[int, float, List[int]]:
         """停止账户交易"""
         account_id = config.target_id
-        orders_affected = 0
-        total_amount = 0.0
-        
-        # 取消账户的所有活跃订单
-        active_orders = await self.db_session.execute(
-            select(Order).where(
-                Order.account_id == account_id,
-                Order.status.in_([OrderStatus.NEW, OrderStatus.PENDING, OrderStatus.SUBMITTED])
-            )
+        orders_affected, total_amount, failed_order_ids = await self._bulk_stop(
+            config,
+            order_conditions=[Order.account_id == account_id],
+            auto_order_conditions=[AutoOrder.account_id == account_id]
         )
         
-        for order in active_orders.scalars().all():
-            if await self._cancel_order(order, config):
-                orders_affected += 1
-                total_amount += float(order.price * order.quantity) if order.price else 0.0
-        
-        # 暂停账户的自动订单
-        auto_orders = await self.db_session.execute(
-            select(AutoOrder).where(AutoOrder.account_id == account_id)
-        )
-        
-        for auto_order in auto_orders.scalars().all():
-            auto_order.is_paused = True
-            orders_affected += 1
-        
-        await self.db_session.commit()
-        
         logger.info(f"账户 {account_id} 停止完成，影响订单: {orders_affected}")
-        return orders_affected, total_amount
+        return orders_affected, total_amount, failed_order_ids
     
-    async def _stop_symbol_trading(self, config: EmergencyStopConfig, triggered_by: str) -> tuple[int, float]:
+    async def _stop_symbol_trading(self, config: EmergencyStopConfig, triggered_by: str) -> tuple[int, float, List[int]]:
         """停止交易对交易"""
         symbol = config.target_id
-        orders_affected = 0
-        total_amount = 0.0
-        
-        # 取消交易对的所有活跃订单
-        active_orders = await self.db_session.execute(
-            select(Order).where(
-                Order.symbol == symbol,
-                Order.status.in_([OrderStatus.NEW, OrderStatus.PENDING, OrderStatus.SUBMITTED])
-            )
+        orders_affected, total_amount, failed_order_ids = await self._bulk_stop(
+            config,
+            order_conditions=[Order.symbol == symbol],
+            auto_order_conditions=[AutoOrder.symbol == symbol]
         )
         
-        for order in active_orders.scalars().all():
-            if await self._cancel_order(order, config):
-                orders_affected += 1
-                total_amount += float(order.price * order.quantity) if order.price else 0.0
-        
-        # 暂停交易对的自动订单
-        auto_orders = await self.db_session.execute(
-            select(AutoOrder).where(AutoOrder.symbol == symbol)
-        )
-        
-        for auto_order in auto_orders.scalars().all():
-            auto_order.is_paused = True
-            orders_affected += 1
-        
-        await self.db_session.commit()
-        
         logger.info(f"交易对 {symbol} 停止完成，影响订单: {orders_affected}")
-        return orders_affected, total_amount
+        return orders_affected, total_amount, failed_order_ids
     
-    async def _stop_strategy_trading(self, config: EmergencyStopConfig, triggered_by: str) -> tuple[int, float]:
+    async def _stop_strategy_trading(self, config: EmergencyStopConfig, triggered_by: str) -> tuple[int, float, List[int]]:
         """停止策略交易"""
         strategy_name = config.target_id
-        orders_affected = 0
-        total_amount = 0.0
         
-        # 取消策略的所有活跃订单
-        auto_orders = await self.db_session.execute(
-            select(AutoOrder).where(AutoOrder.strategy_name == strategy_name)
+        # 策略下单记录在执行记录中关联自动订单
+        strategy_orders = (
+            select(OrderExecution.order_id)
+            .join(AutoOrder, OrderExecution.auto_order_id == AutoOrder.id)
+            .where(AutoOrder.strategy_name == strategy_name)
+        )
+        orders_affected, total_amount, failed_order_ids = await self._bulk_stop(
+            config,
+            order_conditions=[Order.id.in_(strategy_orders)],
+            auto_order_conditions=[AutoOrder.strategy_name == strategy_name],
+            statuses=(OrderStatus.NEW, OrderStatus.PENDING)
         )
         
-        for auto_order in auto_orders.scalars().all():
-            # 取消相关的普通订单
-            if auto_order.order_id:
-                order = await self.db_session.get(Order, auto_order.order_id)
-                if order and order.status in [OrderStatus.NEW, OrderStatus.PENDING]:
-                    if await self._cancel_order(order, config):
-                        orders_affected += 1
-                        total_amount += float(order.price * order.quantity) if order.price else 0.0
-            
-            # 暂停自动订单
-            auto_order.is_paused = True
-            orders_affected += 1
-        
+        logger.info(f"策略 {strategy_name} 停止完成，影响订单: {orders_affected}")
+        return orders_affected, total_amount, failed_order_ids
+    
+    async def _bulk_stop(
+        self,
+        config: EmergencyStopConfig,
+        order_conditions: List[Any],
+        auto_order_conditions: List[Any],
+        statuses: Tuple[OrderStatus, ...] = CANCELLABLE_STATUSES
+    ) -> tuple[int, float, List[int]]:
+        """集合式撤单
+        
+        先暂停自动订单并提交，阻止新的下单；随后并发向交易所发送批量撤单。
+        只有尚未提交到交易所的订单和交易所确认撤销的订单才标记为已取消，
+        撤单失败的订单保持原状态并写入失败的执行记录，其订单ID返回给调用方。
+        """
+        # 暂停自动订单
+        paused = await self.db_session.execute(
+            update(AutoOrder)
+            .where(*auto_order_conditions)
+            .values(is_paused=True)
+            .execution_options(synchronize_session=False)
+        )
+        orders_affected = max(paused.rowcount or 0, 0)
+        
+        open_orders = (await self.db_session.execute(
+            select(Order.id, Order.account_id, Order.symbol, Order.market_type,
+                   Order.exchange_order_id, Order.price, Order.quantity)
+            .where(Order.status.in_(statuses), *order_conditions)
+        )).all()
+        live_orders = [row for row in open_orders if row.exchange_order_id]
+        exchanges = await self._get_account_exchanges({row.account_id for row in live_orders}) if live_orders else {}
+        # 撤单请求期间不持有事务
         await self.db_session.commit()
         
-        logger.info(f"策略 {strategy_name} 停止完成，影响订单: {orders_affected}")
-        return orders_affected, total_amount
+        failed_ids = await self._cancel_on_exchanges(live_orders, exchanges) if live_orders else set()
+        
+        total_amount = 0.0
+        failed_order_ids = [row.id for row in open_orders if row.id in failed_ids]
+        confirmed_ids = [row.id for row in open_orders if row.id not in failed_ids]
+        if confirmed_ids:
+            # 撤单期间已成交的订单保持成交状态
+            cancelled = (await self.db_session.execute(
+                update(Order)
+                .where(Order.id.in_(confirmed_ids), Order.status.in_(statuses))
+                .values(status=OrderStatus.CANCELLED)
+                .returning(Order.id, Order.price, Order.quantity)
+                .execution_options(synchronize_session=False)
+            )).all()
+            orders_affected += len(cancelled)
+            total_amount += sum(float(row.price * row.quantity) for row in cancelled if row.price)
+            confirmed_ids = [row.id for row in cancelled]
+        
+        if confirmed_ids or failed_order_ids:
+            now = datetime.now()
+            reason = config.reason.value
+            await self.db_session.execute(insert(OrderExecution), [
+                {
+                    "order_id": order_id,
+                    "execution_id": f"cancel_{uuid.uuid4().hex[:16]}",
+                    "status": ExecutionResultStatus.SUCCESS if confirmed else ExecutionResultStatus.FAILED,
+                    "success": False,
+                    "message": (f"订单因紧急停止而取消，原因: {reason}" if confirmed
+                                else f"紧急停止撤单未获交易所确认，订单仍在交易所挂单，原因: {reason}"),
+                    "execution_time": now
+                }
+                for order_ids, confirmed in ((confirmed_ids, True), (failed_order_ids, False))
+                for order_id in order_ids
+            ])
+            await self.db_session.commit()
+        
+        return orders_affected, total_amount, failed_order_ids
     
-    async def _cancel_order(self, order: Order, config: EmergencyStopConfig) -> bool:
-        """取消单个订单"""
-        try:
-            # 更新订单状态
-            order.status = OrderStatus.CANCELLED
-            
-            # 创建执行记录
-            execution = OrderExecution(
-                order_id=order.id,
-                execution_id=f"cancel_{uuid.uuid4().hex[:16]}",
-                status=ExecutionResultStatus.SUCCESS,
-                success=False,
-                message=f"订单因紧急停止而取消，原因: {config.reason.value}",
-                execution_time=datetime.now()
-            )
-            
-            self.db_session.add(execution)
-            return True
-            
-        except Exception as e:
-            logger.error(f"取消订单失败 {order.id}: {str(e)}")
-            return False
+    async def _get_account_exchanges(self, account_ids: Set[int]) -> Dict[int, str]:
+        """查询账户所属交易所"""
+        result = await self.db_session.execute(
+            select(Account.id, Account.exchange).where(Account.id.in_(account_ids))
+        )
+        return {
+            account_id: getattr(exchange, "value", exchange)
+            for account_id, exchange in result.all()
+        }
+    
+    async def _cancel_on_exchanges(self, orders: List[Any], account_exchanges: Dict[int, str]) -> Set[int]:
+        """按交易所、市场和交易对分组，限制并发地发送批量撤单，返回未获交易所确认的订单ID"""
+        failed: Set[int] = set()
+        batches: Dict[Tuple[str, str, str], List[Any]] = {}
+        for row in orders:
+            exchange = account_exchanges.get(row.account_id)
+            if exchange not in self.exchange_adapters:
+                logger.error(f"订单 {row.id} 所属交易所 {exchange} 未注册适配器，无法撤单")
+                failed.add(row.id)
+                continue
+            market_type = getattr(row.market_type, "value", row.market_type)
+            batches.setdefault((exchange, market_type, row.symbol), []).append(row)
+        self.stats["exchange_cancel_failures"] += len(failed)
+        
+        semaphore = asyncio.Semaphore(self.max_parallel_cancels)
+        
+        async def cancel_batch(exchange: str, market_type: str, symbol: str, rows: List[Any]):
+            adapter = self.exchange_adapters[exchange]
+            cancel = adapter.cancel_spot_orders if market_type == "spot" else adapter.cancel_futures_orders
+            async with semaphore:
+                try:
+                    outcomes = await cancel(symbol, [row.exchange_order_id for row in rows])
+                except Exception as e:
+                    self.stats["exchange_cancel_failures"] += len(rows)
+                    failed.update(row.id for row in rows)
+                    logger.error(f"交易所撤单失败 {exchange} {symbol}: {str(e)}")
+                    return
+            
+            # 只有交易所逐单确认撤销的订单才算成功
+            confirmed = {str(o["order_id"]) for o in outcomes if o.get("success")}
+            rejected = [row for row in rows if str(row.exchange_order_id) not in confirmed]
+            self.stats["exchange_cancels_sent"] += len(rows) - len(rejected)
+            if rejected:
+                self.stats["exchange_cancel_failures"] += len(rejected)
+                failed.update(row.id for row in rejected)
+                errors = {str(o["order_id"]): o.get("error") for o in outcomes if not o.get("success")}
+                details = {row.exchange_order_id: errors.get(str(row.exchange_order_id)) for row in rejected}
+                logger.error(f"交易所拒绝撤单 {exchange} {symbol}: {details}")
+        
+        size = self.cancel_batch_size
+        await asyncio.gather(*(
+            cancel_batch(exchange, market_type, symbol, rows[i:i + size])
+            for (exchange, market_type, symbol), rows in batches.items()
+            for i in range(0, len(rows), size)
+        ))
+        return failed
     
     def _has_global_stop(self) -> bool:
         """检查是否有全局停止"""
-        for stop_record in self.active_stops.values():
-            if (stop_record.stop_level == StopLevel.GLOBAL and 
-                stop_record.status == StopStatus.ACTIVE):
-                return True
-        return False
+        return self.active_stops.find_active(StopLevel.GLOBAL) is not None
     
     def _has_stop_for_target(self, target_id: Union[int, str], level: StopLevel) -> bool:
         """检查目标是否有停止"""
-        for stop_record in self.active_stops.values():
-            if (stop_record.stop_level == level and 
-                stop_record.target_id == target_id and
-                stop_record.status == StopStatus.ACTIVE):
-                return True
-        return False
+        return self.active_stops.find_active(level, target_id) is not None
     
     async def _get_active_stop_for_target(self, target_id: Union[int, str], level: StopLevel) -> Optional[StopRecord]:
         """获取目标的有效停止记录"""
-        for stop_record in self.active_stops.values():
-            if (stop_record.stop_level == level and 
-                stop_record.target_id == target_id and
-                stop_record.status == StopStatus.ACTIVE):
-                return stop_record
-        return None
+        return self.active_stops.find_active(level, target_id)
     
     async def _save_stop_record(self, stop_record: StopRecord):
         """保存停止记录到数据库"""
@@ -797,6 +888,33 @@ class EmergencyStopService:
             logger.error(f"创建风险预警失败: {str(e)}")
 
 
+def create_exchange_adapters() -> Dict[str, Any]:
+    """使用配置的API密钥为支持的交易所创建撤单适配器
+
+    创建失败的交易所不注册适配器，其挂单在紧急停止时会作为撤单失败返回。
+    """
+    credentials = {
+        "binance": (settings.BINANCE_API_KEY, settings.BINANCE_SECRET_KEY, None, settings.BINANCE_TESTNET),
+        "okx": (settings.OKX_API_KEY, settings.OKX_SECRET_KEY, settings.OKX_PASSPHRASE, settings.OKX_PAPER_TRADING),
+    }
+    adapters: Dict[str, Any] = {}
+    for exchange in ExchangeAdapterFactory.get_supported_exchanges():
+        api_key, secret_key, passphrase, is_testnet = credentials.get(exchange, (None, None, None, True))
+        if not api_key:
+            logger.warning(f"未配置{exchange}的API密钥，紧急停止无法撤销该交易所的挂单")
+        try:
+            adapters[exchange] = ExchangeAdapterFactory.create_adapter(
+                exchange,
+                api_key=api_key,
+                secret_key=secret_key,
+                passphrase=passphrase,
+                is_testnet=is_testnet
+            )
+        except Exception as e:
+            logger.error(f"创建{exchange}撤单适配器失败: {str(e)}")
+    return adapters
+
+
 # 全局紧急停止服务实例
 _global_emergency_stop_service: Optional[EmergencyStopService] = None
 
@@ -815,7 +933,7 @@ def get_emergency_stop_service(db_session: Optional[AsyncSession] = None) -> Eme
             # 这里应该有实际实现，简化处理
             raise ValueError("需要提供数据库会话")
         
-        _global_emergency_stop_service = EmergencyStopService(db_session)
+        _global_emergency_stop_service = EmergencyStopService(db_session, create_exchange_adapters())
     
     return _global_emergency_stop_service
 
@@ -823,5 +941,5 @@ def get_emergency_stop_service(db_session: Optional[AsyncSession] = None) -> Eme
 def init_emergency_stop_service(db_session: AsyncSession) -> EmergencyStopService:
     """初始化全局紧急停止服务"""
     global _global_emergency_stop_service
-    _global_emergency_stop_service = EmergencyStopService(db_session)
+    _global_emergency_stop_service = EmergencyStopService(db_session, create_exchange_adapters())
     return _global_emergency_stop_service
\ No newline at end of file
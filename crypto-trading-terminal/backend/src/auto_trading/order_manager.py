@@ -18,6 +18,7 @@ from ..storage.models import (
     User, Account, Order, AutoOrder, OrderExecution, RiskAlert,
     OrderType, OrderSide, OrderStatus, MarketType, ExecutionResultStatus
 )
+from ..storage.write_behind import WriteBehindWriter, get_write_behind_writer
 from ..utils.exceptions import (
     RiskManagementException, OrderManagementException, 
     ValidationException, ExchangeException
@@ -30,10 +31,13 @@ logger = logging.getLogger(__name__)
 class OrderManager:
     """订单管理器"""
     
-    def __init__(self, db_session: AsyncSession, risk_checker: RiskCheckerService, emergency_stop_service: Optional[EmergencyStopService] = None):
+    def __init__(self, db_session: AsyncSession, risk_checker: RiskCheckerService, emergency_stop_service: Optional[EmergencyStopService] = None,
+                 write_behind: Optional[WriteBehindWriter] = None):
         self.db_session = db_session
         self.risk_checker = risk_checker
         self.emergency_stop_service = emergency_stop_service or get_emergency_stop_service(db_session)
+        # 执行记录只追加，交给后台批量写回；未指定时使用全局写回服务（未启动则逐条写入会话）
+        self.write_behind = write_behind
         self.order_callbacks: Dict[str, Callable] = {}
         self.execution_callbacks: Dict[str, Callable] = {}
     
@@ -588,7 +592,7 @@ class OrderManager:
         error_details: Optional[Dict[str, Any]] = None
     ):
         """创建执行记录"""
-        execution = OrderExecution(
+        record = dict(
             order_id=order_id,
             execution_id=f"exec_{int(datetime.now().timestamp() * 1000)}_{uuid.uuid4().hex[:8]}",
             status=status,
@@ -603,7 +607,13 @@ class OrderManager:
             execution_time=datetime.now()
         )
         
-        self.db_session.add(execution)
+        # 执行记录引用的订单可能尚未提交，会话提交后才交给写回服务，回滚时一并丢弃
+        writer = self.write_behind or get_write_behind_writer()
+        if writer is not None and writer.running:
+            writer.enqueue_after_commit(self.db_session, OrderExecution, record)
+            return
+        
+        self.db_session.add(OrderExecution(**record))
         await self.db_session.flush()
     
     async def _execute_order_with_exchange(
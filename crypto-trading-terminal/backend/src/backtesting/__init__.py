@@ -0,0 +1,43 @@
+"""
+回测模块
+以虚拟时钟和模拟撮合引擎回放历史行情，验证现有策略和条件规则
+"""
+
+from .data_feed import Bar, bars_from_candles, bars_from_ticks, load_csv_bars
+from .virtual_clock import VirtualClock
+from .simulated_exchange import Fill, SimulatedExchange, SimulatedOrder
+from .engine import BacktestConfig, BacktestResult, Backtester, run_backtest
+from .condition_strategy import ConditionRule, ConditionRuleStrategy
+from .parameter_search import (
+    EarlyStopping,
+    ParameterRange,
+    ParameterSearch,
+    SearchResult,
+    SharedBars,
+    StrategyTemplate,
+    TrialResult
+)
+
+__all__ = [
+    'Bar',
+    'bars_from_candles',
+    'bars_from_ticks',
+    'load_csv_bars',
+    'VirtualClock',
+    'Fill',
+    'SimulatedExchange',
+    'SimulatedOrder',
+    'BacktestConfig',
+    'BacktestResult',
+    'Backtester',
+    'run_backtest',
+    'ConditionRule',
+    'ConditionRuleStrategy',
+    'EarlyStopping',
+    'ParameterRange',
+    'ParameterSearch',
+    'SearchResult',
+    'SharedBars',
+    'StrategyTemplate',
+    'TrialResult'
+]
@@ -0,0 +1,141 @@
+"""
+条件规则回测策略
+把 ``ConditionEngine`` 中注册的条件与下单动作绑定，包装成现货策略接口，
+使条件规则可以和普通策略一样交给回测引擎回放
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from ..conditions.base_conditions import MarketData as ConditionMarketData
+from ..conditions.condition_engine import ConditionEngine
+from ..strategies.base import (
+    BaseSpotStrategy,
+    MarketData,
+    OrderRequest,
+    OrderResult,
+    OrderSide,
+    OrderType,
+    StrategyConfig
+)
+from ..strategies.futures.fast_indicators import IncrementalIndicators
+
+
+@dataclass
+class ConditionRule:
+    """条件触发后的下单动作"""
+    condition_id: str
+    order_side: OrderSide
+    quantity: Decimal
+    order_type: OrderType = OrderType.MARKET
+    limit_offset: Decimal = Decimal('0')   # 限价单相对当前价的偏移比例，买单向下、卖单向上
+    cooldown_seconds: int = 0
+    edge_triggered: bool = True            # 仅在条件由不满足变为满足时下单
+
+
+class ConditionRuleStrategy(BaseSpotStrategy):
+    """条件规则策略
+
+    每根K线把行情转换为条件系统的 ``MarketData``（附带RSI、MACD、布林带和
+    MA20/MA50），按顺序同步评估规则引用的条件，满足时生成订单。回测中
+    不经过引擎的线程池和触发队列，结果与 ``ConditionEngine.evaluate_all``
+    的满足判定一致。
+    """
+
+    def __init__(self, config: StrategyConfig, engine: ConditionEngine,
+                 rules: List[ConditionRule], order_manager=None):
+        super().__init__(config, order_manager)
+        self.engine = engine
+        self.rules = rules
+        for rule in rules:
+            if rule.condition_id not in engine.conditions:
+                raise ValueError(f"条件未注册: {rule.condition_id}")
+
+        self.indicators = IncrementalIndicators(ma_short_period=20, ma_long_period=50)
+        self._last_satisfied: Dict[str, bool] = {}
+        self._last_order_time: Dict[str, datetime] = {}
+        self._order_seq = 0
+        self.trigger_count = 0
+
+    def clock_targets(self) -> List[Any]:
+        """需要使用虚拟时钟的对象（条件内部记录评估时间）"""
+        return [self.engine] + [self.engine.conditions[rule.condition_id] for rule in self.rules]
+
+    def _to_condition_market_data(self, market_data: MarketData) -> ConditionMarketData:
+        price = float(market_data.current_price)
+        snapshot = self.indicators.update(price, market_data.timestamp)
+        change = float(market_data.price_change_24h)
+        previous = price - change
+        macd = snapshot['macd']
+        bollinger = snapshot['bollinger']
+        return ConditionMarketData(
+            symbol=market_data.symbol,
+            price=price,
+            volume_24h=float(market_data.volume_24h),
+            price_change_24h=change,
+            price_change_percent_24h=change / previous * 100 if previous else 0.0,
+            high_24h=float(market_data.high_24h or price),
+            low_24h=float(market_data.low_24h or price),
+            timestamp=market_data.timestamp,
+            rsi=snapshot['rsi'],
+            macd=macd.get('macd'),
+            macd_signal=macd.get('signal'),
+            bollinger_upper=bollinger.get('upper'),
+            bollinger_lower=bollinger.get('lower'),
+            moving_average_20=snapshot['sma_short'],
+            moving_average_50=snapshot['sma_long']
+        )
+
+    async def get_next_orders(self, market_data: MarketData) -> List[OrderRequest]:
+        condition_data = self._to_condition_market_data(market_data)
+        now = market_data.timestamp
+        orders = []
+        evaluated: Dict[str, bool] = {}
+
+        for rule in self.rules:
+            condition = self.engine.conditions.get(rule.condition_id)
+            if condition is None or not condition.enabled:
+                continue
+            if rule.condition_id not in evaluated:
+                evaluated[rule.condition_id] = condition.evaluate(condition_data).satisfied
+                # 价格条件按历史价格比较，回放时逐根喂入
+                if hasattr(condition, "update_price_history"):
+                    condition.update_price_history(condition_data.price)
+            satisfied = evaluated[rule.condition_id]
+
+            was_satisfied = self._last_satisfied.get(rule.condition_id, False)
+            if not satisfied or (rule.edge_triggered and was_satisfied):
+                continue
+
+            last_time = self._last_order_time.get(rule.condition_id)
+            if last_time and now - last_time < timedelta(seconds=rule.cooldown_seconds):
+                continue
+
+            orders.append(self._create_order(rule, market_data))
+            self._last_order_time[rule.condition_id] = now
+            self.trigger_count += 1
+
+        self._last_satisfied.update(evaluated)
+        return orders
+
+    def _create_order(self, rule: ConditionRule, market_data: MarketData) -> OrderRequest:
+        self._order_seq += 1
+        price = None
+        if rule.order_type == OrderType.LIMIT:
+            offset = -rule.limit_offset if rule.order_side == OrderSide.BUY else rule.limit_offset
+            price = market_data.current_price * (Decimal('1') + offset)
+        return OrderRequest(
+            order_id=f"{self.config.strategy_id}_{rule.condition_id}_{self._order_seq}",
+            symbol=self.config.symbol,
+            order_type=rule.order_type,
+            order_side=rule.order_side,
+            quantity=rule.quantity,
+            price=price,
+            metadata={'strategy_type': 'condition_rule', 'condition_id': rule.condition_id}
+        )
+
+    async def process_order_result(self, order_result: OrderResult) -> bool:
+        self.update_state_after_order(order_result, self.last_market_data)
+        return order_result.success
@@ -0,0 +1,148 @@
+"""
+回测数据源
+把K线、逐笔行情和CSV文件统一为按时间排序的 ``Bar`` 序列
+"""
+
+import csv
+from datetime import datetime, timezone
+from typing import Any, Iterable, Iterator, Optional
+
+
+class Bar:
+    """回放用的行情单元
+
+    ``timestamp`` 是该K线的收盘时间（逐笔行情即成交时间），策略在这一时刻
+    看到收盘价；撮合引擎用 open/high/low 判断该周期内挂单是否成交。
+    逐笔行情的 open/high/low/close 相同。
+    """
+
+    __slots__ = ("timestamp", "open", "high", "low", "close", "volume", "funding_rate")
+
+    def __init__(
+        self,
+        timestamp: datetime,
+        open: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float = 0.0,
+        funding_rate: Optional[float] = None
+    ):
+        self.timestamp = timestamp
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.funding_rate = funding_rate
+
+    @classmethod
+    def from_tick(cls, timestamp: datetime, price: float, volume: float = 0.0,
+                  funding_rate: Optional[float] = None) -> "Bar":
+        return cls(timestamp, price, price, price, price, volume, funding_rate)
+
+    def __repr__(self):
+        return (f"Bar({self.timestamp.isoformat()}, o={self.open}, h={self.high}, "
+                f"l={self.low}, c={self.close}, v={self.volume})")
+
+
+def _field(item: Any, *names: str, default: Any = None) -> Any:
+    """按候选字段名读取对象属性或字典键"""
+    for name in names:
+        if isinstance(item, dict):
+            if name in item and item[name] is not None:
+                return item[name]
+        else:
+            value = getattr(item, name, None)
+            if value is not None:
+                return value
+    return default
+
+
+def parse_timestamp(value: Any) -> datetime:
+    """解析时间：datetime、毫秒/秒级时间戳或ISO字符串"""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            value = float(text)
+        except ValueError:
+            return datetime.fromisoformat(text.replace("Z", "+00:00"))
+    value = float(value)
+    if value > 1e11:  # 毫秒
+        value /= 1000.0
+    return datetime.fromtimestamp(value, tz=timezone.utc).replace(tzinfo=None)
+
+
+def bars_from_candles(candles: Iterable[Any]) -> Iterator[Bar]:
+    """K线转换为Bar
+
+    支持 ``adapters.base.Candle`` 以及带 open/high/low/close 字段的字典。
+    """
+    for candle in candles:
+        timestamp = _field(candle, "close_time", "timestamp", "open_time")
+        funding_rate = _field(candle, "funding_rate")
+        yield Bar(
+            parse_timestamp(timestamp),
+            float(_field(candle, "open_price", "open")),
+            float(_field(candle, "high_price", "high")),
+            float(_field(candle, "low_price", "low")),
+            float(_field(candle, "close_price", "close")),
+            float(_field(candle, "volume", default=0.0)),
+            float(funding_rate) if funding_rate is not None else None
+        )
+
+
+def bars_from_ticks(ticks: Iterable[Any]) -> Iterator[Bar]:
+    """逐笔行情转换为Bar
+
+    支持存储层 ``market_data`` 表的行（current_price/timestamp）和
+    带 price/timestamp 字段的字典。
+    """
+    for tick in ticks:
+        funding_rate = _field(tick, "funding_rate")
+        yield Bar.from_tick(
+            parse_timestamp(_field(tick, "timestamp")),
+            float(_field(tick, "current_price", "price")),
+            float(_field(tick, "volume", "quantity", default=0.0)),
+            float(funding_rate) if funding_rate is not None else None
+        )
+
+
+def load_csv_bars(path: str, timestamp_column: Optional[str] = None) -> Iterator[Bar]:
+    """从CSV文件流式读取K线
+
+    需要 open/high/low/close 列，时间列默认依次查找 close_time、timestamp、
+    open_time；只有 price 列时按逐笔行情读取。
+    """
+    with open(path, newline="", encoding="utf-8") as handle:
+        reader = csv.DictReader(handle)
+        columns = reader.fieldnames or []
+        time_column = timestamp_column or next(
+            (name for name in ("close_time", "timestamp", "open_time", "time") if name in columns),
+            None
+        )
+        if time_column is None:
+            raise ValueError(f"CSV缺少时间列: {path}")
+
+        if "close" not in columns and "price" in columns:
+            for row in reader:
+                yield Bar.from_tick(
+                    parse_timestamp(row[time_column]),
+                    float(row["price"]),
+                    float(row.get("volume") or 0.0),
+                    float(row["funding_rate"]) if row.get("funding_rate") else None
+                )
+            return
+
+        for row in reader:
+            yield Bar(
+                parse_timestamp(row[time_column]),
+                float(row["open"]),
+                float(row["high"]),
+                float(row["low"]),
+                float(row["close"]),
+                float(row.get("volume") or 0.0),
+                float(row["funding_rate"]) if row.get("funding_rate") else None
+            )
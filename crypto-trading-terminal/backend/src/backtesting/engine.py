@@ -0,0 +1,456 @@
+"""
+事件驱动回测引擎
+把历史K线或逐笔行情按时间顺序回放给现有策略，订单通过模拟撮合引擎成交，
+成交结果经 ``process_order_result`` 回传，策略代码保持不变
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..strategies.base import (
+    MarketData,
+    OrderResult,
+    SpotStrategyInterface,
+    StrategyStatus
+)
+from ..strategies.futures.base_futures_strategy import (
+    FuturesMarketData,
+    FuturesOrderResult,
+    FuturesStrategyInterface,
+    FuturesStrategyStatus
+)
+from .data_feed import Bar
+from .simulated_exchange import Fill, SimulatedExchange, SimulatedOrder
+from .virtual_clock import VirtualClock
+
+logger = logging.getLogger(__name__)
+
+
+def _to_decimal(value: float) -> Decimal:
+    return Decimal(repr(float(value)))
+
+
+@dataclass
+class BacktestConfig:
+    """回测配置"""
+    initial_balance: float = 10000.0
+    maker_fee_rate: float = 0.001            # 0.1%
+    taker_fee_rate: float = 0.001
+    slippage_bps: float = 0.0                # 市价单和止损单的不利滑点（基点）
+    latency_ms: float = 0.0                  # 下单到生效的延迟
+    spread_bps: float = 0.0                  # 由收盘价构造买一卖一的价差
+    order_timeout_seconds: Optional[float] = None  # None时使用策略配置的order_timeout_seconds
+    funding_interval_hours: int = 8          # 合约资金费率结算间隔
+    equity_interval: int = 1                 # 每隔多少根K线记录一次权益
+    strategy_log_level: Optional[int] = logging.ERROR  # 回测期间策略日志级别，None为不调整
+
+
+@dataclass
+class BacktestResult:
+    """回测结果
+
+    ``trades`` 中每条成交的字段与 ``PerformanceAnalyzer`` 的交易记录一致
+    （timestamp/symbol/side/quantity/price/pnl/commission/strategy），
+    可直接通过 ``to_performance_data()`` 传入 ``analyze_performance``。
+    """
+    strategy_id: str
+    symbol: str
+    initial_balance: float
+    final_equity: float
+    equity_curve: List[Tuple[datetime, float]]
+    trades: List[Dict[str, Any]]
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    bars_processed: int = 0
+    elapsed_seconds: float = 0.0
+    statistics: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def total_return(self) -> float:
+        if self.initial_balance <= 0:
+            return 0.0
+        return self.final_equity / self.initial_balance - 1.0
+
+    @property
+    def max_drawdown(self) -> float:
+        if not self.equity_curve:
+            return 0.0
+        equity = np.fromiter((value for _, value in self.equity_curve), dtype=np.float64)
+        peaks = np.maximum.accumulate(equity)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdowns = np.where(peaks > 0, (peaks - equity) / peaks, 0.0)
+        return float(drawdowns.max())
+
+    def to_performance_data(self) -> Dict[str, Any]:
+        """PerformanceAnalyzer.analyze_performance 的 performance_data 参数"""
+        return {
+            "trades": self.trades,
+            "equity_curve": self.equity_curve,
+            "initial_balance": self.initial_balance
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "strategy_id": self.strategy_id,
+            "symbol": self.symbol,
+            "start_time": self.start_time.isoformat() if self.start_time else None,
+            "end_time": self.end_time.isoformat() if self.end_time else None,
+            "bars_processed": self.bars_processed,
+            "trades": len(self.trades),
+            "initial_balance": self.initial_balance,
+            "final_equity": self.final_equity,
+            "total_return": self.total_return,
+            "max_drawdown": self.max_drawdown,
+            "elapsed_seconds": self.elapsed_seconds,
+            **self.statistics
+        }
+
+
+class _RollingWindow:
+    """滚动24小时成交量、最高价、最低价和24小时前收盘价"""
+
+    def __init__(self, span: timedelta = timedelta(hours=24)):
+        self.span = span
+        self._bars: Deque[Tuple[datetime, float, float]] = deque()  # (时间, 收盘价, 成交量)
+        self._highs: Deque[Tuple[datetime, float]] = deque()        # 单调递减
+        self._lows: Deque[Tuple[datetime, float]] = deque()         # 单调递增
+        self.volume = 0.0
+        self.reference_close: Optional[float] = None
+
+    def update(self, bar: Bar):
+        timestamp = bar.timestamp
+        self._bars.append((timestamp, bar.close, bar.volume))
+        self.volume += bar.volume
+        while self._highs and self._highs[-1][1] <= bar.high:
+            self._highs.pop()
+        self._highs.append((timestamp, bar.high))
+        while self._lows and self._lows[-1][1] >= bar.low:
+            self._lows.pop()
+        self._lows.append((timestamp, bar.low))
+
+        cutoff = timestamp - self.span
+        while self._bars[0][0] <= cutoff:
+            _, close, volume = self._bars.popleft()
+            self.volume -= volume
+            self.reference_close = close
+        while self._highs[0][0] <= cutoff:
+            self._highs.popleft()
+        while self._lows[0][0] <= cutoff:
+            self._lows.popleft()
+        if self.reference_close is None:
+            self.reference_close = self._bars[0][1]
+
+    @property
+    def high(self) -> float:
+        return self._highs[0][1]
+
+    @property
+    def low(self) -> float:
+        return self._lows[0][1]
+
+
+class Backtester:
+    """回测引擎
+
+    用法::
+
+        backtester = Backtester(GridStrategy(config), BacktestConfig(slippage_bps=2))
+        result = await backtester.run(load_csv_bars("btcusdt_1m.csv"))
+        insight = await analyzer.analyze_performance(config.strategy_id, "strategy",
+                                                     result.to_performance_data())
+
+    每根K线的处理顺序：推进虚拟时钟到收盘时间 -> 撮合已生效挂单并回传成交 ->
+    过期超时挂单 -> 以收盘价构造行情调用 ``get_next_orders`` -> 提交新订单 -> 记录权益。
+    策略不调用 ``start()``（避免启动按真实时间运行的监控任务），直接置为运行状态。
+    """
+
+    def __init__(self, strategy: Any, config: Optional[BacktestConfig] = None,
+                 clock: Optional[VirtualClock] = None):
+        if not isinstance(strategy, (SpotStrategyInterface, FuturesStrategyInterface)):
+            raise TypeError(f"不支持的策略类型: {type(strategy).__name__}")
+
+        self.strategy = strategy
+        self.config = config or BacktestConfig()
+        self.clock = clock or VirtualClock()
+        self.is_futures = isinstance(strategy, FuturesStrategyInterface)
+
+        timeout = self.config.order_timeout_seconds
+        if timeout is None:
+            timeout = getattr(strategy.config, "order_timeout_seconds", None)
+        self.exchange = SimulatedExchange(
+            initial_balance=self.config.initial_balance,
+            maker_fee_rate=self.config.maker_fee_rate,
+            taker_fee_rate=self.config.taker_fee_rate,
+            slippage_bps=self.config.slippage_bps,
+            latency_ms=self.config.latency_ms,
+            order_timeout_seconds=timeout
+        )
+
+        self.symbol = strategy.config.symbol
+        self.strategy_id = strategy.config.strategy_id
+        self._window = _RollingWindow()
+        self._half_spread = self.config.spread_bps / 20000.0
+        self._history_limit = (200, 100) if self.is_futures else (100, 50)
+        self._funding_rate = 0.0
+        self._funding_period: Optional[int] = None
+
+        self.trades: List[Dict[str, Any]] = []
+        self.equity_curve: List[Tuple[datetime, float]] = []
+        self.stats = {
+            'bars_processed': 0,
+            'orders_generated': 0,
+            'fills': 0,
+            'expired_orders': 0,
+            'funding_payments': 0
+        }
+
+    async def run(self, bars: Iterable[Bar]) -> BacktestResult:
+        """回放行情并返回回测结果"""
+        iterator = iter(bars)
+        first = next(iterator, None)
+        if first is None:
+            return self._build_result(None, None, 0.0)
+
+        strategy = self.strategy
+        targets = [strategy, strategy.state]
+        clock_targets = getattr(strategy, "clock_targets", None)
+        if callable(clock_targets):
+            targets.extend(clock_targets())
+
+        previous_level = None
+        strategy_logger = getattr(strategy, "logger", None)
+        if self.config.strategy_log_level is not None and strategy_logger is not None:
+            previous_level = strategy_logger.level
+            strategy_logger.setLevel(self.config.strategy_log_level)
+
+        started = time.perf_counter()
+        last_bar = first
+        self.clock.set(first.timestamp)
+        try:
+            with self.clock.patch(VirtualClock.modules_for(*targets)):
+                await self._start_strategy()
+                last_bar = await self._process_bar(first)
+                count = 1
+                for bar in iterator:
+                    last_bar = await self._process_bar(bar)
+                    count += 1
+                    if count % 1024 == 0:
+                        # 让出事件循环，处理策略内部创建的任务
+                        await asyncio.sleep(0)
+                self._stop_strategy()
+        finally:
+            if previous_level is not None:
+                strategy_logger.setLevel(previous_level)
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"回测完成 {self.strategy_id}: {self.stats['bars_processed']}根K线, "
+                    f"{self.stats['fills']}笔成交, 耗时{elapsed:.2f}秒")
+        if not self.equity_curve or self.equity_curve[-1][0] != last_bar.timestamp:
+            self.equity_curve.append((last_bar.timestamp, self.exchange.equity(last_bar.close)))
+        return self._build_result(first.timestamp, last_bar, elapsed)
+
+    async def _start_strategy(self):
+        strategy = self.strategy
+        if not await strategy.initialize():
+            raise RuntimeError(f"策略初始化失败: {strategy.state.last_error}")
+        start_specific = getattr(strategy, "_start_specific", None)
+        if start_specific is not None:
+            await start_specific()
+        strategy.state.status = FuturesStrategyStatus.RUNNING if self.is_futures else StrategyStatus.RUNNING
+        strategy.state.started_at = self.clock.now()
+
+    def _stop_strategy(self):
+        state = self.strategy.state
+        if state.status in (StrategyStatus.RUNNING, FuturesStrategyStatus.RUNNING):
+            state.status = FuturesStrategyStatus.STOPPED if self.is_futures else StrategyStatus.STOPPED
+            state.stopped_at = self.clock.now()
+
+    async def _process_bar(self, bar: Bar) -> Bar:
+        strategy = self.strategy
+        exchange = self.exchange
+        now = bar.timestamp
+        self.clock.set(now)
+        self._window.update(bar)
+
+        if self.is_futures:
+            self._settle_funding(bar)
+
+        fills = exchange.match(bar)
+        if fills:
+            for fill in fills:
+                self._record_trade(fill)
+                await strategy.process_order_result(self._fill_result(fill))
+
+        for order in exchange.expire_orders(now):
+            self.stats['expired_orders'] += 1
+            await strategy.process_order_result(self._expired_result(order))
+
+        market_data = self._build_market_data(bar)
+        strategy.last_market_data = market_data
+        history = strategy.market_data_history
+        history.append(market_data)
+        if len(history) > self._history_limit[0]:
+            strategy.market_data_history = history[-self._history_limit[1]:]
+
+        if self.is_futures:
+            self._sync_margin(bar.close)
+            strategy.state.update_risk_metrics(market_data)
+
+        if strategy.state.is_trading_allowed():
+            orders = await strategy.get_next_orders(market_data)
+            if orders:
+                self.stats['orders_generated'] += len(orders)
+                for order in orders:
+                    exchange.submit(order, now)
+
+        self.stats['bars_processed'] += 1
+        if self.stats['bars_processed'] % self.config.equity_interval == 0:
+            self.equity_curve.append((now, exchange.equity(bar.close)))
+        return bar
+
+    def _build_market_data(self, bar: Bar):
+        window = self._window
+        close = bar.close
+        price = _to_decimal(close)
+        if self._half_spread:
+            bid = _to_decimal(close * (1.0 - self._half_spread))
+            ask = _to_decimal(close * (1.0 + self._half_spread))
+        else:
+            bid = ask = price
+        reference = window.reference_close if window.reference_close is not None else close
+        kwargs = dict(
+            symbol=self.symbol,
+            current_price=price,
+            bid_price=bid,
+            ask_price=ask,
+            volume_24h=_to_decimal(window.volume),
+            price_change_24h=_to_decimal(close - reference),
+            timestamp=bar.timestamp,
+            high_24h=_to_decimal(window.high),
+            low_24h=_to_decimal(window.low),
+            previous_close=_to_decimal(reference)
+        )
+        if not self.is_futures:
+            return MarketData(**kwargs)
+        return FuturesMarketData(
+            funding_rate=_to_decimal(self._funding_rate),
+            mark_price=price,
+            **kwargs
+        )
+
+    def _settle_funding(self, bar: Bar):
+        """在资金费率结算时点按持仓收付资金费"""
+        if bar.funding_rate is not None:
+            self._funding_rate = bar.funding_rate
+        interval = self.config.funding_interval_hours * 3600
+        if interval <= 0:
+            return
+        period = math.floor(bar.timestamp.timestamp() / interval)
+        if self._funding_period is not None and period > self._funding_period:
+            if self.exchange.apply_funding(bar.open, self._funding_rate):
+                self.stats['funding_payments'] += 1
+        self._funding_period = period
+
+    def _sync_margin(self, price: float):
+        """用模拟账户的保证金水平更新合约策略状态"""
+        state = self.strategy.state
+        position = self.exchange.position
+        if not position:
+            state.margin_level = Decimal('999')
+            return
+        leverage = float(getattr(self.strategy.config, "leverage", 1) or 1)
+        used_margin = abs(position) * price / leverage
+        state.margin_level = _to_decimal(round(self.exchange.equity(price) / used_margin, 6))
+
+    def _fill_result(self, fill: Fill):
+        kwargs = dict(
+            success=True,
+            order_id=fill.order.order_id,
+            filled_quantity=fill.order.request.quantity,
+            average_price=_to_decimal(fill.price),
+            commission=_to_decimal(fill.commission),
+            execution_time=fill.timestamp,
+            latency_ms=self.config.latency_ms,
+            exchange_order_id=f"sim_{fill.order.seq}",
+            fill_time=fill.timestamp
+        )
+        if self.is_futures:
+            return FuturesOrderResult(funding_rate=_to_decimal(self._funding_rate) or None, **kwargs)
+        return OrderResult(**kwargs)
+
+    def _expired_result(self, order: SimulatedOrder):
+        kwargs = dict(
+            success=False,
+            order_id=order.order_id,
+            filled_quantity=Decimal('0'),
+            average_price=Decimal('0'),
+            commission=Decimal('0'),
+            execution_time=self.clock.now(),
+            error_message="订单超时未成交，已撤销",
+            error_code="ORDER_EXPIRED",
+            exchange_order_id=f"sim_{order.seq}"
+        )
+        return FuturesOrderResult(**kwargs) if self.is_futures else OrderResult(**kwargs)
+
+    def _record_trade(self, fill: Fill):
+        self.stats['fills'] += 1
+        order = fill.order
+        self.trades.append({
+            "timestamp": fill.timestamp,
+            "symbol": self.symbol,
+            "side": order.side,
+            "quantity": fill.quantity,
+            "price": fill.price,
+            "pnl": fill.realized_pnl - fill.commission,
+            "commission": fill.commission,
+            "strategy": self.strategy_id,
+            "order_id": order.order_id,
+            "order_type": order.order_type,
+            "liquidity": fill.liquidity,
+            "slippage": fill.slippage,
+            "position_after": self.exchange.position
+        })
+
+    def _build_result(self, start: Optional[datetime], last_bar: Optional[Bar],
+                      elapsed: float) -> BacktestResult:
+        final_equity = (self.exchange.equity(last_bar.close) if last_bar
+                        else self.exchange.initial_balance)
+        statistics = dict(self.stats)
+        statistics.update({
+            'orders_submitted': self.exchange.stats['orders_submitted'],
+            'orders_rejected': self.exchange.stats['orders_rejected'],
+            'open_orders': len(self.exchange.open_orders()),
+            'final_position': self.exchange.position,
+            'realized_pnl': self.exchange.realized_pnl,
+            'commission_paid': self.exchange.commission_paid,
+            'funding_paid': self.exchange.funding_paid,
+            'bars_per_second': statistics['bars_processed'] / elapsed if elapsed > 0 else 0.0
+        })
+        return BacktestResult(
+            strategy_id=self.strategy_id,
+            symbol=self.symbol,
+            initial_balance=self.exchange.initial_balance,
+            final_equity=final_equity,
+            equity_curve=self.equity_curve,
+            trades=self.trades,
+            start_time=start,
+            end_time=last_bar.timestamp if last_bar else None,
+            bars_processed=statistics['bars_processed'],
+            elapsed_seconds=elapsed,
+            statistics=statistics
+        )
+
+
+async def run_backtest(strategy: Any, bars: Iterable[Bar],
+                       config: Optional[BacktestConfig] = None) -> BacktestResult:
+    """便捷函数：创建回测引擎并运行"""
+    return await Backtester(strategy, config).run(bars)
@@ -0,0 +1,629 @@
+"""
+策略参数搜索
+在策略配置的参数空间上做网格、随机和逐次减半（successive halving）搜索，
+每组参数用回测引擎在历史行情上评估，试验分发到进程池并行运行。
+
+行情只在主进程加载一次，写入共享内存后以只读数组交给各工作进程；
+试验结果按参数哈希缓存，回撤过大或资金跌破下限的试验提前终止。
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields, replace
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .data_feed import Bar
+from .engine import BacktestConfig, BacktestResult, Backtester
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+# ===== 共享行情 =====
+
+class SharedBars:
+    """只读共享行情
+
+    每根K线占一行：时间（微秒）、开高低收、成交量和资金费率（缺失为NaN）。
+    数据写入 ``multiprocessing.shared_memory``，对象被传给工作进程时只序列化
+    共享内存名称，工作进程直接映射同一块内存，不复制数据。
+    """
+
+    COLUMNS = ("timestamp_us", "open", "high", "low", "close", "volume", "funding_rate")
+
+    def __init__(self, array: np.ndarray, shm: Optional[shared_memory.SharedMemory] = None,
+                 owner: bool = False):
+        self.array = array
+        self.array.flags.writeable = False
+        self._shm = shm
+        self._owner = owner
+        self._fingerprint: Optional[str] = None
+
+    @classmethod
+    def create(cls, bars: Iterable[Bar]) -> "SharedBars":
+        rows = [
+            (_to_microseconds(bar.timestamp), bar.open, bar.high, bar.low, bar.close, bar.volume,
+             bar.funding_rate if bar.funding_rate is not None else math.nan)
+            for bar in bars
+        ]
+        source = np.array(rows, dtype=np.float64).reshape(-1, len(cls.COLUMNS))
+        shm = shared_memory.SharedMemory(create=True, size=max(source.nbytes, 1))
+        array = np.ndarray(source.shape, dtype=np.float64, buffer=shm.buf)
+        array[:] = source
+        return cls(array, shm, owner=True)
+
+    def __getstate__(self):
+        if self._shm is None:
+            return {"array": np.array(self.array)}
+        return {"name": self._shm.name, "shape": self.array.shape, "fingerprint": self.fingerprint}
+
+    def __setstate__(self, state):
+        if "array" in state:
+            self.__init__(state["array"])
+            return
+        shm = shared_memory.SharedMemory(name=state["name"])
+        array = np.ndarray(state["shape"], dtype=np.float64, buffer=shm.buf)
+        self.__init__(array, shm)
+        self._fingerprint = state["fingerprint"]
+
+    def __len__(self) -> int:
+        return self.array.shape[0]
+
+    @property
+    def fingerprint(self) -> str:
+        """数据指纹，用于区分不同数据集上的缓存结果"""
+        if self._fingerprint is None:
+            self._fingerprint = hashlib.sha1(self.array.tobytes()).hexdigest()[:16]
+        return self._fingerprint
+
+    def bars(self, limit: Optional[int] = None) -> Iterator[Bar]:
+        """按时间顺序生成前 ``limit`` 根K线"""
+        rows = self.array if limit is None else self.array[:limit]
+        for timestamp_us, open_, high, low, close, volume, funding_rate in rows.tolist():
+            yield Bar(
+                _EPOCH + timedelta(microseconds=timestamp_us),
+                open_, high, low, close, volume,
+                None if funding_rate != funding_rate else funding_rate
+            )
+
+    def close(self):
+        """释放共享内存，创建方负责删除"""
+        if self._shm is None:
+            return
+        self.array = np.empty((0, len(self.COLUMNS)))
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+
+def _to_microseconds(timestamp: datetime) -> int:
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - _EPOCH) // timedelta(microseconds=1)
+
+
+# ===== 参数空间 =====
+
+@dataclass
+class ParameterRange:
+    """单个参数的取值范围
+
+    ``values`` 给出离散取值；否则在 [low, high] 上取值，网格搜索按 ``step``
+    （或 ``grid_points`` 个等分点）展开，随机搜索均匀采样（``log_scale`` 时按对数均匀）。
+    """
+    name: str
+    values: Optional[List[Any]] = None
+    low: Optional[float] = None
+    high: Optional[float] = None
+    step: Optional[float] = None
+    grid_points: int = 5
+    integer: bool = False
+    log_scale: bool = False
+
+    def __post_init__(self):
+        if self.values is None and (self.low is None or self.high is None):
+            raise ValueError(f"参数 {self.name} 需要 values 或 low/high")
+        if self.values is not None and not self.values:
+            raise ValueError(f"参数 {self.name} 的取值为空")
+        if self.low is not None and self.high is not None and self.low > self.high:
+            raise ValueError(f"参数 {self.name} 的下限大于上限")
+
+    def grid_values(self) -> List[Any]:
+        if self.values is not None:
+            return list(self.values)
+        if self.step:
+            count = int(math.floor((self.high - self.low) / self.step + 1e-9)) + 1
+            points = [self.low + i * self.step for i in range(count)]
+        elif self.log_scale:
+            points = np.geomspace(self.low, self.high, self.grid_points).tolist()
+        else:
+            points = np.linspace(self.low, self.high, self.grid_points).tolist()
+        return self._normalize(points)
+
+    def sample(self, rng: random.Random) -> Any:
+        if self.values is not None:
+            return rng.choice(self.values)
+        if self.integer:
+            return rng.randint(int(self.low), int(self.high))
+        if self.log_scale:
+            value = math.exp(rng.uniform(math.log(self.low), math.log(self.high)))
+        else:
+            value = rng.uniform(self.low, self.high)
+        if self.step:
+            value = self.low + round((value - self.low) / self.step) * self.step
+        return round(value, 10)
+
+    def _normalize(self, points: List[float]) -> List[Any]:
+        if self.integer:
+            return sorted({int(round(point)) for point in points})
+        return [round(point, 10) for point in points]
+
+
+class StrategyTemplate:
+    """根据参数构造策略实例
+
+    参数名必须是策略配置（``StrategyConfig`` / ``FuturesStrategyConfig``）的字段，
+    取值按配置字段原有类型转换（Decimal字段用字符串构造，避免浮点误差）。
+    模板会被序列化到工作进程，策略类需可在模块级导入。
+    """
+
+    def __init__(self, strategy_class: type, base_config: Any, **strategy_kwargs):
+        self.strategy_class = strategy_class
+        self.base_config = base_config
+        self.strategy_kwargs = strategy_kwargs
+        self._field_names = {item.name for item in fields(base_config)}
+
+    def validate(self, names: Iterable[str]):
+        unknown = [name for name in names if name not in self._field_names]
+        if unknown:
+            raise ValueError(f"策略配置没有这些参数: {', '.join(unknown)}")
+
+    def build(self, params: Dict[str, Any], trial_id: str):
+        overrides = {}
+        for name, value in params.items():
+            current = getattr(self.base_config, name)
+            if isinstance(current, Decimal):
+                value = Decimal(str(value))
+            elif isinstance(current, bool):
+                value = bool(value)
+            elif isinstance(current, int):
+                value = int(value)
+            overrides[name] = value
+        config = replace(
+            self.base_config,
+            strategy_id=f"{self.base_config.strategy_id}_{trial_id[:8]}",
+            **overrides
+        )
+        return self.strategy_class(config, **self.strategy_kwargs)
+
+
+# ===== 提前终止与目标函数 =====
+
+@dataclass
+class EarlyStopping:
+    """提前终止规则，每隔 ``check_interval`` 根K线检查一次"""
+    max_drawdown: Optional[float] = 0.5       # 回撤超过该比例终止
+    min_equity_ratio: Optional[float] = 0.5   # 权益低于初始资金的该比例终止
+    check_interval: int = 500
+    min_bars: int = 0                         # 至少回放多少根K线后才检查
+
+
+def _sharpe_ratio(equity: np.ndarray, periods_per_year: float) -> float:
+    if equity.size < 3:
+        return 0.0
+    returns = np.diff(equity) / equity[:-1]
+    std = returns.std()
+    if std == 0 or not np.isfinite(std):
+        return 0.0
+    return float(returns.mean() / std * math.sqrt(periods_per_year))
+
+
+def _trial_metrics(result: BacktestResult) -> Dict[str, float]:
+    """从回测结果计算排序用的指标"""
+    curve = result.equity_curve
+    equity = np.fromiter((value for _, value in curve), dtype=np.float64, count=len(curve))
+    periods_per_year = 0.0
+    if len(curve) > 1:
+        span = (curve[-1][0] - curve[0][0]).total_seconds()
+        if span > 0:
+            periods_per_year = (len(curve) - 1) * 365 * 86400 / span
+    total_return = result.total_return
+    max_drawdown = result.max_drawdown
+    pnls = [trade["pnl"] for trade in result.trades if trade["pnl"]]
+    gross_profit = sum(pnl for pnl in pnls if pnl > 0)
+    gross_loss = -sum(pnl for pnl in pnls if pnl < 0)
+    return {
+        "total_return": total_return,
+        "max_drawdown": max_drawdown,
+        "sharpe_ratio": _sharpe_ratio(equity, periods_per_year),
+        "return_over_drawdown": total_return / max_drawdown if max_drawdown > 0 else total_return,
+        "profit_factor": gross_profit / gross_loss if gross_loss > 0 else (gross_profit and math.inf),
+        "win_rate": sum(1 for pnl in pnls if pnl > 0) / len(pnls) if pnls else 0.0,
+        "trades": float(len(result.trades)),
+        "final_equity": result.final_equity,
+        "commission_paid": result.statistics.get('commission_paid', 0.0)
+    }
+
+
+OBJECTIVES = {
+    "total_return": True,            # 名称 -> 是否越大越好
+    "sharpe_ratio": True,
+    "return_over_drawdown": True,
+    "profit_factor": True,
+    "win_rate": True,
+    "final_equity": True,
+    "max_drawdown": False
+}
+
+
+# ===== 试验 =====
+
+@dataclass
+class TrialResult:
+    """单次试验结果"""
+    trial_id: str
+    params: Dict[str, Any]
+    budget: int                          # 回放的K线数
+    metrics: Dict[str, float] = field(default_factory=dict)
+    score: Optional[float] = None
+    pruned: bool = False
+    prune_reason: Optional[str] = None
+    error: Optional[str] = None
+    bars_processed: int = 0
+    elapsed_seconds: float = 0.0
+    cached: bool = False
+
+    @property
+    def completed(self) -> bool:
+        return self.error is None and not self.pruned
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trial_id": self.trial_id,
+            "params": self.params,
+            "budget": self.budget,
+            "metrics": self.metrics,
+            "score": self.score,
+            "pruned": self.pruned,
+            "prune_reason": self.prune_reason,
+            "error": self.error,
+            "bars_processed": self.bars_processed,
+            "elapsed_seconds": self.elapsed_seconds,
+            "cached": self.cached
+        }
+
+
+@dataclass
+class SearchResult:
+    """搜索结果，``trials`` 按目标函数从优到劣排序"""
+    method: str
+    objective: str
+    trials: List[TrialResult]
+    elapsed_seconds: float
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def best(self) -> Optional[TrialResult]:
+        return self.trials[0] if self.trials and self.trials[0].score is not None else None
+
+    @property
+    def best_params(self) -> Optional[Dict[str, Any]]:
+        return self.best.params if self.best else None
+
+    def top(self, count: int = 10) -> List[TrialResult]:
+        return self.trials[:count]
+
+
+# 工作进程状态，由进程池初始化函数设置
+_worker_data: Optional[SharedBars] = None
+_worker_template: Optional[StrategyTemplate] = None
+_worker_backtest_config: Optional[BacktestConfig] = None
+
+
+def _init_worker(data: Optional[SharedBars], template: Optional[StrategyTemplate],
+                 backtest_config: Optional[BacktestConfig]):
+    global _worker_data, _worker_template, _worker_backtest_config
+    _worker_data = data
+    _worker_template = template
+    _worker_backtest_config = backtest_config
+
+
+def _guarded_bars(bars: Iterator[Bar], backtester: Backtester, rule: EarlyStopping,
+                  verdict: Dict[str, str]) -> Iterator[Bar]:
+    """按提前终止规则截断行情流"""
+    initial = backtester.exchange.initial_balance
+    curve = backtester.equity_curve
+    peak = initial
+    checked = 0
+    for index, bar in enumerate(bars, 1):
+        yield bar
+        if index < rule.min_bars or index % rule.check_interval:
+            continue
+        if len(curve) > checked:
+            peak = max(peak, max(value for _, value in curve[checked:]))
+            checked = len(curve)
+        equity = backtester.exchange.equity(bar.close)
+        if rule.min_equity_ratio is not None and equity < initial * rule.min_equity_ratio:
+            verdict["reason"] = f"权益低于初始资金的{rule.min_equity_ratio:.0%}"
+            return
+        if rule.max_drawdown is not None and peak > 0 and (peak - equity) / peak > rule.max_drawdown:
+            verdict["reason"] = f"回撤超过{rule.max_drawdown:.0%}"
+            return
+
+
+def _run_trial(trial_id: str, params: Dict[str, Any], budget: int,
+               early_stopping: Optional[EarlyStopping]) -> TrialResult:
+    """工作进程入口"""
+    return asyncio.run(_run_trial_async(trial_id, params, budget, early_stopping))
+
+
+async def _run_trial_async(trial_id: str, params: Dict[str, Any], budget: int,
+                           early_stopping: Optional[EarlyStopping]) -> TrialResult:
+    """用当前进程的共享行情和策略模板运行一次试验"""
+    started = time.perf_counter()
+    trial = TrialResult(trial_id=trial_id, params=params, budget=budget)
+    try:
+        strategy = _worker_template.build(params, trial_id)
+        backtester = Backtester(strategy, _worker_backtest_config)
+        bars = _worker_data.bars(budget)
+        verdict: Dict[str, str] = {}
+        if early_stopping is not None:
+            bars = _guarded_bars(bars, backtester, early_stopping, verdict)
+        result = await backtester.run(bars)
+        trial.metrics = _trial_metrics(result)
+        trial.bars_processed = result.bars_processed
+        if verdict:
+            trial.pruned = True
+            trial.prune_reason = verdict["reason"]
+    except Exception as e:
+        trial.error = f"{type(e).__name__}: {e}"
+    trial.elapsed_seconds = time.perf_counter() - started
+    return trial
+
+
+# ===== 搜索 =====
+
+class ParameterSearch:
+    """策略参数搜索服务
+
+    用法::
+
+        search = ParameterSearch(
+            StrategyTemplate(GridStrategy, base_config),
+            [ParameterRange("grid_spacing", low=0.001, high=0.01, step=0.001),
+             ParameterRange("grid_levels", values=[5, 10, 20])],
+            objective="sharpe_ratio",
+            max_workers=8
+        )
+        result = await search.successive_halving(load_csv_bars("btcusdt_1m.csv"), n_trials=81)
+
+    ``objective`` 为 ``OBJECTIVES`` 中的指标名，或接受指标字典返回分数的函数
+    （越大越好，在主进程中调用）。``max_workers=0`` 时在当前进程内顺序运行。
+    """
+
+    def __init__(
+        self,
+        template: StrategyTemplate,
+        parameters: Sequence[ParameterRange],
+        objective: Union[str, Callable[[Dict[str, float]], float]] = "sharpe_ratio",
+        backtest_config: Optional[BacktestConfig] = None,
+        early_stopping: Optional[EarlyStopping] = None,
+        max_workers: Optional[int] = None,
+        seed: Optional[int] = None,
+        cache: Optional[Dict[str, TrialResult]] = None
+    ):
+        if not parameters:
+            raise ValueError("参数空间为空")
+        template.validate(parameter.name for parameter in parameters)
+        if isinstance(objective, str) and objective not in OBJECTIVES:
+            raise ValueError(f"不支持的目标函数: {objective}")
+
+        self.template = template
+        self.parameters = list(parameters)
+        self.objective = objective
+        self.backtest_config = backtest_config or BacktestConfig()
+        self.early_stopping = early_stopping
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self.rng = random.Random(seed)
+        self.cache: Dict[str, TrialResult] = cache if cache is not None else {}
+
+        self.stats = {
+            'trials_run': 0,
+            'cache_hits': 0,
+            'trials_pruned': 0,
+            'trials_failed': 0,
+            'bars_replayed': 0
+        }
+
+    @property
+    def objective_name(self) -> str:
+        return self.objective if isinstance(self.objective, str) else getattr(
+            self.objective, "__name__", "custom")
+
+    # ----- 候选参数 -----
+
+    def grid_candidates(self) -> List[Dict[str, Any]]:
+        candidates: List[Dict[str, Any]] = [{}]
+        for parameter in self.parameters:
+            candidates = [
+                {**candidate, parameter.name: value}
+                for candidate in candidates
+                for value in parameter.grid_values()
+            ]
+        return candidates
+
+    def random_candidates(self, n_trials: int) -> List[Dict[str, Any]]:
+        candidates: List[Dict[str, Any]] = []
+        seen = set()
+        attempts = 0
+        while len(candidates) < n_trials and attempts < n_trials * 20:
+            attempts += 1
+            params = {parameter.name: parameter.sample(self.rng) for parameter in self.parameters}
+            key = _params_key(params)
+            if key in seen:
+                continue
+            seen.add(key)
+            candidates.append(params)
+        return candidates
+
+    # ----- 搜索方法 -----
+
+    async def grid_search(self, bars: Union[Iterable[Bar], SharedBars]) -> SearchResult:
+        """遍历参数网格的全部组合"""
+        return await self._search("grid", bars, self.grid_candidates())
+
+    async def random_search(self, bars: Union[Iterable[Bar], SharedBars], n_trials: int) -> SearchResult:
+        """随机采样 ``n_trials`` 组参数"""
+        return await self._search("random", bars, self.random_candidates(n_trials))
+
+    async def successive_halving(self, bars: Union[Iterable[Bar], SharedBars], n_trials: int,
+                                 min_fraction: Optional[float] = None, eta: int = 3) -> SearchResult:
+        """逐次减半
+
+        所有候选先在前 ``min_fraction`` 的数据上回放，每轮保留得分最高的
+        1/eta 进入下一轮，下一轮的数据量乘以 eta，直到全部数据。
+        """
+        if eta < 2:
+            raise ValueError("eta 至少为2")
+        candidates = self.random_candidates(n_trials)
+        if min_fraction is None:
+            rounds = max(1, int(math.floor(math.log(max(len(candidates), 1), eta))))
+            min_fraction = eta ** -(rounds - 1) if rounds > 1 else 1.0
+        return await self._search("successive_halving", bars, candidates, min_fraction, eta)
+
+    async def _search(self, method: str, bars: Union[Iterable[Bar], SharedBars],
+                      candidates: List[Dict[str, Any]], min_fraction: float = 1.0,
+                      eta: int = 3) -> SearchResult:
+        started = time.perf_counter()
+        owns_data = not isinstance(bars, SharedBars)
+        data = SharedBars.create(bars) if owns_data else bars
+        executor = None
+        try:
+            total = len(data)
+            if total == 0:
+                raise ValueError("回测数据为空")
+            if self.max_workers > 0 and len(candidates) > 1:
+                executor = ProcessPoolExecutor(
+                    max_workers=min(self.max_workers, len(candidates)),
+                    initializer=_init_worker,
+                    initargs=(data, self.template, self.backtest_config)
+                )
+
+            finished: Dict[str, TrialResult] = {}
+            fraction = min(max(min_fraction, 0.0), 1.0)
+            survivors = candidates
+            while survivors:
+                budget = max(1, int(math.ceil(total * fraction)))
+                trials = await self._evaluate(survivors, budget, data, executor)
+                for trial in trials:
+                    finished[_params_key(trial.params)] = trial
+                if fraction >= 1.0:
+                    break
+                ranked = [trial for trial in self._rank(trials) if trial.completed]
+                keep = max(1, len(trials) // eta)
+                survivors = [trial.params for trial in ranked[:keep]]
+                logger.info(f"逐次减半: {budget}根K线上评估{len(trials)}组, 保留{len(survivors)}组")
+                fraction = min(1.0, fraction * eta)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+            if owns_data:
+                data.close()
+
+        elapsed = time.perf_counter() - started
+        ranked = self._rank(finished.values())
+        best = ranked[0] if ranked else None
+        logger.info(f"参数搜索完成({method}): {len(candidates)}组候选, "
+                    f"最优{self.objective_name}={best.score if best else None}, 耗时{elapsed:.2f}秒")
+        return SearchResult(method=method, objective=self.objective_name, trials=ranked,
+                            elapsed_seconds=elapsed, stats=dict(self.stats))
+
+    async def _evaluate(self, candidates: List[Dict[str, Any]], budget: int, data: SharedBars,
+                        executor: Optional[ProcessPoolExecutor]) -> List[TrialResult]:
+        """评估一批候选，命中缓存的不再运行"""
+        results: List[Optional[TrialResult]] = [None] * len(candidates)
+        pending = []
+        for index, params in enumerate(candidates):
+            trial_id = self._trial_id(params, budget, data)
+            cached = self.cache.get(trial_id)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                results[index] = replace(cached, cached=True)
+            else:
+                pending.append((index, trial_id, params))
+
+        if pending:
+            if executor is None:
+                _init_worker(data, self.template, self.backtest_config)
+                try:
+                    outcomes = [await _run_trial_async(trial_id, params, budget, self.early_stopping)
+                                for _, trial_id, params in pending]
+                finally:
+                    _init_worker(None, None, None)
+            else:
+                loop = asyncio.get_running_loop()
+                outcomes = await asyncio.gather(*[
+                    loop.run_in_executor(executor, _run_trial, trial_id, params, budget,
+                                         self.early_stopping)
+                    for _, trial_id, params in pending
+                ])
+            for (index, trial_id, _), trial in zip(pending, outcomes):
+                trial.score = self._score(trial)
+                self.cache[trial_id] = trial
+                self.stats['trials_run'] += 1
+                self.stats['bars_replayed'] += trial.bars_processed
+                if trial.pruned:
+                    self.stats['trials_pruned'] += 1
+                if trial.error:
+                    self.stats['trials_failed'] += 1
+                    logger.warning(f"试验失败 {trial.params}: {trial.error}")
+                results[index] = trial
+        return results
+
+    def _trial_id(self, params: Dict[str, Any], budget: int, data: SharedBars) -> str:
+        payload = json.dumps({
+            "strategy": f"{self.template.strategy_class.__module__}.{self.template.strategy_class.__qualname__}",
+            "config": repr(self.template.base_config),
+            "strategy_kwargs": repr(sorted(self.template.strategy_kwargs.items())),
+            "params": _params_key(params),
+            "budget": budget,
+            "data": data.fingerprint,
+            "backtest": repr(self.backtest_config),
+            "early_stopping": repr(self.early_stopping)
+        }, sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def _score(self, trial: TrialResult) -> Optional[float]:
+        if trial.error is not None or not trial.metrics:
+            return None
+        if callable(self.objective):
+            return float(self.objective(trial.metrics))
+        value = trial.metrics[self.objective]
+        return value if OBJECTIVES[self.objective] else -value
+
+    def _rank(self, trials: Iterable[TrialResult]) -> List[TrialResult]:
+        """完成的试验在前，其后是提前终止的，最后是失败的；同组内回放数据多的在前，再按分数降序"""
+        def sort_key(trial: TrialResult):
+            if trial.score is None:
+                return (2, 0, 0.0)
+            score = trial.score if not math.isnan(trial.score) else -math.inf
+            return (1 if trial.pruned else 0, -trial.budget, -score)
+        return sorted(trials, key=sort_key)
+
+
+def _params_key(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
@@ -0,0 +1,347 @@
+"""
+模拟撮合引擎
+按K线的开高低收撮合策略挂单，计算手续费、滑点和延迟，并维护单一交易对的
+资金与净持仓
+"""
+
+import heapq
+from bisect import insort
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .data_feed import Bar
+
+
+class SimulatedOrder:
+    """撮合引擎内部订单"""
+
+    __slots__ = ("request", "order_id", "side", "order_type", "quantity", "price",
+                 "stop_price", "time_in_force", "submitted_at", "active_at",
+                 "expires_at", "status", "seq")
+
+    def __init__(self, request: Any, submitted_at: datetime, active_at: datetime,
+                 expires_at: Optional[datetime], seq: int):
+        self.request = request
+        self.order_id: str = request.order_id
+        self.side: str = request.order_side.value
+        self.order_type: str = request.order_type.value
+        self.quantity = float(request.quantity)
+        self.price = float(request.price) if request.price is not None else None
+        stop_price = getattr(request, "stop_price", None)
+        self.stop_price = float(stop_price) if stop_price is not None else None
+        self.time_in_force: str = getattr(request, "time_in_force", "GTC") or "GTC"
+        self.submitted_at = submitted_at
+        self.active_at = active_at
+        self.expires_at = expires_at
+        self.status = "pending"  # pending / open / filled / expired / rejected
+        self.seq = seq
+
+
+@dataclass
+class Fill:
+    """成交记录"""
+    order: SimulatedOrder
+    timestamp: datetime
+    price: float
+    quantity: float
+    commission: float
+    liquidity: str            # maker / taker
+    slippage: float           # 相对参考价的不利价差
+    realized_pnl: float       # 本次成交平仓部分的已实现盈亏（未扣手续费）
+
+
+class SimulatedExchange:
+    """模拟交易所
+
+    撮合规则：
+    - 订单在提交时间 + 延迟之后生效，只与之后的K线撮合
+    - 市价单按生效后第一根K线的开盘价成交，加不利滑点，收taker费
+    - 限价买单在最低价触及限价时成交，开盘即低于限价时按开盘价成交；卖单对称；
+      收maker费，无滑点
+    - 止损单在价格穿越触发价后按市价成交（触发价与开盘价中较差者加滑点）；
+      止损限价单触发后转为限价单
+    - IOC/FOK订单在第一根可撮合K线未成交即撤销
+    - 挂单超过超时时间未成交即过期
+    """
+
+    def __init__(
+        self,
+        initial_balance: float = 10000.0,
+        maker_fee_rate: float = 0.001,
+        taker_fee_rate: float = 0.001,
+        slippage_bps: float = 0.0,
+        latency_ms: float = 0.0,
+        order_timeout_seconds: Optional[float] = None
+    ):
+        self.initial_balance = initial_balance
+        self.maker_fee_rate = maker_fee_rate
+        self.taker_fee_rate = taker_fee_rate
+        self.slippage = slippage_bps / 10000.0
+        self.latency = timedelta(milliseconds=latency_ms)
+        self.order_timeout = (timedelta(seconds=order_timeout_seconds)
+                              if order_timeout_seconds else None)
+
+        # 账户
+        self.cash = initial_balance
+        self.position = 0.0
+        self.average_price = 0.0
+        self.realized_pnl = 0.0
+        self.commission_paid = 0.0
+        self.funding_paid = 0.0
+
+        # 订单簿：按价格排序，撮合时只需检查队首
+        self._pending: List[SimulatedOrder] = []            # 等待生效（按生效时间顺序）
+        self._market: List[SimulatedOrder] = []
+        self._buy_limits: List[SimulatedOrder] = []         # 价格从高到低
+        self._sell_limits: List[SimulatedOrder] = []        # 价格从低到高
+        self._buy_stops: List[SimulatedOrder] = []          # 触发价从低到高
+        self._sell_stops: List[SimulatedOrder] = []         # 触发价从高到低
+        self._immediate: List[SimulatedOrder] = []          # 首次参与撮合的IOC/FOK
+        self._expiry_heap: List[Tuple[datetime, int, SimulatedOrder]] = []
+        self.orders: Dict[str, SimulatedOrder] = {}
+        self._seq = 0
+
+        self.stats = {
+            'orders_submitted': 0,
+            'orders_filled': 0,
+            'orders_expired': 0,
+            'orders_rejected': 0,
+            'fills': 0
+        }
+
+    # ===== 下单与撤单 =====
+
+    def submit(self, request: Any, now: datetime) -> SimulatedOrder:
+        """提交订单，订单在 now + 延迟 时生效"""
+        self._seq += 1
+        expires_at = now + self.order_timeout if self.order_timeout else None
+        order = SimulatedOrder(request, now, now + self.latency, expires_at, self._seq)
+        self.stats['orders_submitted'] += 1
+
+        if order.order_type in ("limit", "stop_limit") and not order.price:
+            order.status = "rejected"
+        elif order.order_type in ("stop", "stop_limit") and not order.stop_price:
+            order.status = "rejected"
+        if order.status == "rejected":
+            self.stats['orders_rejected'] += 1
+            return order
+
+        self.orders[order.order_id] = order
+        self._pending.append(order)
+        if expires_at is not None:
+            heapq.heappush(self._expiry_heap, (expires_at, order.seq, order))
+        return order
+
+    def cancel(self, order_id: str) -> bool:
+        """撤销未成交订单"""
+        order = self.orders.pop(order_id, None)
+        if order is None or order.status not in ("pending", "open"):
+            return False
+        self._remove(order)
+        order.status = "cancelled"
+        return True
+
+    def open_orders(self) -> List[SimulatedOrder]:
+        return [order for order in self.orders.values() if order.status in ("pending", "open")]
+
+    # ===== 撮合 =====
+
+    def match(self, bar: Bar) -> List[Fill]:
+        """用一根K线撮合所有已生效订单"""
+        self._activate(bar.timestamp)
+        fills: List[Fill] = []
+
+        if self._market:
+            for order in self._market:
+                reference = bar.open
+                fills.append(self._fill(order, bar.timestamp, self._slip(order.side, reference),
+                                        reference, "taker"))
+            self._market.clear()
+
+        # 止损单先于限价单处理，止损限价单触发后可在同一根K线内成交
+        if self._sell_stops and self._sell_stops[0].stop_price >= bar.low:
+            fills.extend(self._trigger_stops(self._sell_stops, bar, lambda o: o.stop_price >= bar.low))
+        if self._buy_stops and self._buy_stops[0].stop_price <= bar.high:
+            fills.extend(self._trigger_stops(self._buy_stops, bar, lambda o: o.stop_price <= bar.high))
+
+        if self._buy_limits and self._buy_limits[0].price >= bar.low:
+            count = 0
+            for order in self._buy_limits:
+                if order.price < bar.low:
+                    break
+                fills.append(self._fill(order, bar.timestamp, min(order.price, bar.open),
+                                        order.price, "maker"))
+                count += 1
+            del self._buy_limits[:count]
+
+        if self._sell_limits and self._sell_limits[0].price <= bar.high:
+            count = 0
+            for order in self._sell_limits:
+                if order.price > bar.high:
+                    break
+                fills.append(self._fill(order, bar.timestamp, max(order.price, bar.open),
+                                        order.price, "maker"))
+                count += 1
+            del self._sell_limits[:count]
+
+        if self._immediate:
+            # 未成交的IOC/FOK在本根K线结束时随过期订单一起撤销
+            for order in self._immediate:
+                if order.status == "open":
+                    order.expires_at = bar.timestamp
+                    heapq.heappush(self._expiry_heap, (bar.timestamp, order.seq, order))
+            self._immediate.clear()
+
+        return fills
+
+    def expire_orders(self, now: datetime) -> List[SimulatedOrder]:
+        """过期超时未成交的订单"""
+        expired = []
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            _, _, order = heapq.heappop(heap)
+            if order.status in ("pending", "open"):
+                self._remove(order)
+                self._expire(order)
+                expired.append(order)
+        return expired
+
+    def apply_funding(self, mark_price: float, funding_rate: float) -> float:
+        """按持仓名义价值结算资金费率，多头支付正费率"""
+        if not self.position or not funding_rate:
+            return 0.0
+        payment = self.position * mark_price * funding_rate
+        self.cash -= payment
+        self.funding_paid += payment
+        return payment
+
+    # ===== 账户 =====
+
+    def equity(self, mark_price: float) -> float:
+        return self.cash + self.position * mark_price
+
+    def unrealized_pnl(self, mark_price: float) -> float:
+        return (mark_price - self.average_price) * self.position
+
+    # ===== 内部实现 =====
+
+    def _slip(self, side: str, price: float) -> float:
+        return price * (1.0 + self.slippage) if side == "buy" else price * (1.0 - self.slippage)
+
+    def _activate(self, bar_end: datetime):
+        """把生效时间已到的订单放入订单簿"""
+        pending = self._pending
+        if not pending:
+            return
+        count = 0
+        for order in pending:
+            if order.active_at > bar_end:
+                break
+            count += 1
+            if order.status != "pending":
+                continue
+            order.status = "open"
+            kind = order.order_type
+            if kind == "market":
+                self._market.append(order)
+                continue
+            if kind == "limit":
+                self._insert_limit(order)
+            elif order.side == "buy":
+                insort(self._buy_stops, order, key=lambda o: o.stop_price)
+            else:
+                insort(self._sell_stops, order, key=lambda o: -o.stop_price)
+            if order.time_in_force in ("IOC", "FOK"):
+                self._immediate.append(order)
+        del pending[:count]
+
+    def _insert_limit(self, order: SimulatedOrder):
+        if order.side == "buy":
+            insort(self._buy_limits, order, key=lambda o: -o.price)
+        else:
+            insort(self._sell_limits, order, key=lambda o: o.price)
+
+    def _trigger_stops(self, book: List[SimulatedOrder], bar: Bar, triggered) -> List[Fill]:
+        fills = []
+        count = 0
+        for order in book:
+            if not triggered(order):
+                break
+            count += 1
+            if order.order_type == "stop_limit":
+                self._insert_limit(order)
+                continue
+            if order.side == "sell":
+                reference = min(order.stop_price, bar.open)
+            else:
+                reference = max(order.stop_price, bar.open)
+            fills.append(self._fill(order, bar.timestamp, self._slip(order.side, reference),
+                                    reference, "taker"))
+        del book[:count]
+        return fills
+
+    def _remove(self, order: SimulatedOrder):
+        if order.status == "pending":
+            if order in self._pending:
+                self._pending.remove(order)
+            return
+        if order.order_type == "market":
+            books = [self._market]
+        elif order.side == "buy":
+            books = [self._buy_limits, self._buy_stops]
+        else:
+            books = [self._sell_limits, self._sell_stops]
+        for book in books:
+            for index, candidate in enumerate(book):
+                if candidate is order:
+                    del book[index]
+                    return
+
+    def _expire(self, order: SimulatedOrder):
+        order.status = "expired"
+        self.orders.pop(order.order_id, None)
+        self.stats['orders_expired'] += 1
+
+    def _fill(self, order: SimulatedOrder, timestamp: datetime, price: float,
+              reference: float, liquidity: str) -> Fill:
+        quantity = order.quantity
+        fee_rate = self.maker_fee_rate if liquidity == "maker" else self.taker_fee_rate
+        commission = price * quantity * fee_rate
+        signed = quantity if order.side == "buy" else -quantity
+        realized = self._update_position(signed, price)
+
+        self.cash -= signed * price + commission
+        self.commission_paid += commission
+        self.realized_pnl += realized
+
+        order.status = "filled"
+        self.orders.pop(order.order_id, None)
+        self.stats['orders_filled'] += 1
+        self.stats['fills'] += 1
+        return Fill(order, timestamp, price, quantity, commission, liquidity,
+                    abs(price - reference), realized)
+
+    def _update_position(self, signed_quantity: float, price: float) -> float:
+        """更新净持仓和均价，返回平仓部分的已实现盈亏"""
+        if signed_quantity == 0:
+            return 0.0
+        position = self.position
+        realized = 0.0
+        if position == 0 or (position > 0) == (signed_quantity > 0):
+            new_position = position + signed_quantity
+            self.average_price = (self.average_price * position + price * signed_quantity) / new_position
+            self.position = new_position
+            return realized
+
+        closing = min(abs(signed_quantity), abs(position))
+        direction = 1.0 if position > 0 else -1.0
+        realized = (price - self.average_price) * closing * direction
+        new_position = position + signed_quantity
+        if abs(new_position) < 1e-12:
+            new_position = 0.0
+            self.average_price = 0.0
+        elif (new_position > 0) != (position > 0):
+            self.average_price = price
+        self.position = new_position
+        return realized
@@ -0,0 +1,110 @@
+"""
+回测虚拟时钟
+策略内部通过 ``datetime.now()`` 生成订单ID、判断再平衡间隔和冷却期，
+回测时把这些模块的 ``datetime`` 名称替换为读取虚拟时间的子类，
+使策略代码无需修改即可按历史时间运行
+"""
+
+import sys
+from contextlib import contextmanager
+from datetime import datetime as _real_datetime, timezone, tzinfo
+from types import ModuleType
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class _VirtualDatetimeMeta(type):
+    """让 isinstance(x, datetime) 对真实datetime实例仍然成立"""
+
+    def __instancecheck__(cls, instance) -> bool:
+        return isinstance(instance, _real_datetime)
+
+    def __subclasscheck__(cls, subclass) -> bool:
+        return issubclass(subclass, _real_datetime)
+
+
+class VirtualClock:
+    """回测虚拟时钟
+
+    ``now()`` 返回当前回放到的时间点；``patch`` 期间被替换模块中的
+    ``datetime.now()`` / ``datetime.utcnow()`` 都读取该时间。
+    """
+
+    def __init__(self, start: Optional[_real_datetime] = None):
+        self._now: _real_datetime = start or _real_datetime(1970, 1, 1)
+        self._patched: Dict[ModuleType, object] = {}
+        self.datetime_class = self._build_datetime_class()
+
+    def _build_datetime_class(self):
+        clock = self
+
+        class VirtualDatetime(_real_datetime, metaclass=_VirtualDatetimeMeta):
+            @classmethod
+            def now(cls, tz: Optional[tzinfo] = None):
+                return clock.now(tz)
+
+            @classmethod
+            def utcnow(cls):
+                return clock.utcnow()
+
+            @classmethod
+            def today(cls):
+                return clock.now()
+
+        VirtualDatetime.__name__ = "datetime"
+        VirtualDatetime.__qualname__ = "datetime"
+        return VirtualDatetime
+
+    def set(self, moment: _real_datetime):
+        """推进到指定时间点"""
+        self._now = moment
+
+    def now(self, tz: Optional[tzinfo] = None) -> _real_datetime:
+        current = self._now
+        if tz is None:
+            return current
+        if current.tzinfo is None:
+            current = current.replace(tzinfo=timezone.utc)
+        return current.astimezone(tz)
+
+    def utcnow(self) -> _real_datetime:
+        current = self._now
+        if current.tzinfo is not None:
+            current = current.astimezone(timezone.utc).replace(tzinfo=None)
+        return current
+
+    def timestamp(self) -> float:
+        return self._now.timestamp()
+
+    @staticmethod
+    def modules_for(*objects) -> List[ModuleType]:
+        """收集对象类继承链上定义的模块（用于确定需要替换的模块）"""
+        modules: List[ModuleType] = []
+        for obj in objects:
+            cls = obj if isinstance(obj, type) else type(obj)
+            for klass in cls.__mro__:
+                module = sys.modules.get(klass.__module__)
+                if module is None or module in modules:
+                    continue
+                if getattr(module, "datetime", None) is _real_datetime:
+                    modules.append(module)
+        return modules
+
+    @contextmanager
+    def patch(self, modules: Iterable[ModuleType]) -> Iterator["VirtualClock"]:
+        """在上下文内把模块的 ``datetime`` 替换为虚拟时间版本
+
+        替换作用于整个进程，回测应在独立进程或测试中运行，不要与实盘
+        策略共用同一进程。
+        """
+        patched = []
+        for module in modules:
+            if module in self._patched or getattr(module, "datetime", None) is not _real_datetime:
+                continue
+            self._patched[module] = module.datetime
+            module.datetime = self.datetime_class
+            patched.append(module)
+        try:
+            yield self
+        finally:
+            for module in patched:
+                module.datetime = self._patched.pop(module)
@@ -94,6 +94,11 @@ class MarketData:
     open_interest: Optional[float] = None
     funding_rate: Optional[float] = None
 
+    @property
+    def price_change(self) -> float:
+        """24小时价格变化（价格条件使用的字段名）"""
+        return self.price_change_24h
+
 
 class Condition(ABC):
     """基础条件抽象类"""
@@ -28,9 +28,9 @@ from .base_conditions import (
 )
 from .price_conditions import PriceCondition
 from .volume_conditions import VolumeCondition
-from .time_conditions import TimeCondition
+from .time_conditions import TimeCondition, TimeConditionScheduler
 from .indicator_conditions import TechnicalIndicatorCondition
-from .market_alert_conditions import MarketAlertCondition
+from .market_alert_conditions import MarketAlertCondition, SymbolAlertEvaluator
 
 
 class EngineStatus(Enum):
@@ -134,6 +134,12 @@ class ConditionEngine:
         self.result_cache: Dict[str, Tuple[ConditionResult, datetime]] = {}
         self.cache_ttl = self.config.get('cache_ttl', 300)  # 5分钟缓存
         
+        # 时间条件只在状态转换时刻重新评估
+        self.time_scheduler = TimeConditionScheduler(self.config.get('time_scheduler_max_sleep', 60.0))
+        
+        # 同一交易对的市场预警条件共享滚动统计，每笔行情只更新一次
+        self.alert_evaluators: Dict[str, SymbolAlertEvaluator] = {}
+        
         # 并发控制
         self.evaluation_strategy = EvaluationStrategy.ADAPTIVE
         self.max_parallel_evaluations = self.config.get('max_parallel_evaluations', 10)
@@ -170,6 +176,7 @@ class ConditionEngine:
             self.background_tasks.add(asyncio.create_task(self._evaluation_loop()))
             self.background_tasks.add(asyncio.create_task(self._trigger_processor()))
             self.background_tasks.add(asyncio.create_task(self._cache_cleanup_loop()))
+            self.background_tasks.add(asyncio.create_task(self.time_scheduler.run(self._on_time_transition)))
             
             print(f"条件引擎已启动 - 策略: {self.evaluation_strategy.value}")
     
@@ -217,6 +224,14 @@ class ConditionEngine:
             condition_type = condition.condition_type.value
             self.metrics.conditions_by_type[condition_type] = self.metrics.conditions_by_type.get(condition_type, 0) + 1
             
+            if isinstance(condition, TimeCondition):
+                self.time_scheduler.add(condition)
+            elif isinstance(condition, MarketAlertCondition):
+                evaluator = self.alert_evaluators.get(condition.symbol)
+                if evaluator is None:
+                    evaluator = self.alert_evaluators[condition.symbol] = SymbolAlertEvaluator(condition.symbol)
+                evaluator.add_condition(condition)
+            
             print(f"条件已注册: {condition.name or condition_id} ({condition_type})")
             return condition_id
     
@@ -243,6 +258,11 @@ class ConditionEngine:
             self.condition_priority.pop(condition_id, None)
             self.condition_history.pop(condition_id, None)
             self.condition_dependencies.pop(condition_id, None)
+            self.time_scheduler.remove(condition_id)
+            if isinstance(condition, MarketAlertCondition):
+                evaluator = self.alert_evaluators.get(condition.symbol)
+                if evaluator is not None and evaluator.remove_condition(condition_id) and not evaluator.conditions:
+                    del self.alert_evaluators[condition.symbol]
             
             print(f"条件已注销: {condition.name or condition_id}")
             return True
@@ -436,7 +456,9 @@ class ConditionEngine:
                 "evaluation_strategy": self.evaluation_strategy.value,
                 "trigger_mode": self.trigger_mode.value,
                 "metrics": asdict(self.metrics),
-                "conditions_by_type": dict(self.metrics.conditions_by_type)
+                "conditions_by_type": dict(self.metrics.conditions_by_type),
+                "time_scheduler": self.time_scheduler.get_statistics(),
+                "alert_evaluators": [evaluator.get_statistics() for evaluator in self.alert_evaluators.values()]
             }
     
     def clear_cache(self):
@@ -546,6 +568,23 @@ class ConditionEngine:
                 print(f"触发处理器错误: {str(e)}")
                 await asyncio.sleep(1)
     
+    async def _on_time_transition(self, condition: TimeCondition, result: ConditionResult):
+        """时间条件进入满足状态时直接触发，不必等待下一笔行情"""
+        if self.status != EngineStatus.RUNNING or not condition.enabled or not result.satisfied:
+            return
+        
+        trigger_event = TriggerEvent(
+            event_id=str(uuid.uuid4()),
+            condition_id=condition.condition_id,
+            condition_name=condition.name or condition.condition_id,
+            result=result,
+            timestamp=datetime.now(),
+            context=self._create_default_context(),
+            priority=condition.priority,
+            metadata={"time_transition": True}
+        )
+        await self.trigger_queue.put(trigger_event)
+    
     async def _cache_cleanup_loop(self):
         """缓存清理循环"""
         while True:
@@ -3,11 +3,14 @@
 提供各种市场预警和触发条件类型
 """
 
+import bisect
+import math
+import threading
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Union, Set, Tuple
+from typing import Any, Deque, Dict, List, Optional, Union, Set, Tuple
 from dataclasses import dataclass
 from enum import Enum
-import statistics
 
 from .base_conditions import (
     Condition, 
@@ -80,6 +83,256 @@ class MarketAlertData:
     confidence_score: Optional[float] = None
 
 
+def _regression_trend(count: int, total: float, weighted: float) -> float:
+    """由 Σy 与 Σk·y（k从0开始）计算线性回归斜率/均值，与 statistics.linear_regression 等价"""
+    if count < 2 or total == 0:
+        return 0.0
+    sum_x = count * (count - 1) / 2
+    sum_xx = (count - 1) * count * (2 * count - 1) / 6
+    slope = (count * weighted - sum_x * total) / (count * sum_xx - sum_x * sum_x)
+    return slope / (total / count)
+
+
+class _WindowSums:
+    """长度为length的滑动窗口的和、平方和与位置加权和（最旧的元素位置为0）"""
+
+    __slots__ = ("length", "count", "total", "squares", "weighted")
+
+    def __init__(self, length: int):
+        self.length = length
+        self.rebuild([])
+
+    def push(self, value: float, leaving: Optional[float]):
+        """加入一个值，leaving为窗口已满时移出的最旧值"""
+        if leaving is None:
+            self.weighted += self.count * value
+            self.count += 1
+            self.total += value
+            self.squares += value * value
+        else:
+            # 移出位置0的元素后其余元素位置各减1，新元素位于length-1
+            self.weighted += (self.length - 1) * value - (self.total - leaving)
+            self.total += value - leaving
+            self.squares += value * value - leaving * leaving
+
+    def rebuild(self, values: List[float]):
+        """按缓冲区中最近的值重新计算，消除累计误差"""
+        values = values[-self.length:] if values else []
+        self.count = len(values)
+        self.total = sum(values)
+        self.squares = sum(value * value for value in values)
+        self.weighted = sum(index * value for index, value in enumerate(values))
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def stdev(self) -> float:
+        if self.count < 2:
+            return 0.0
+        variance = (self.squares - self.total * self.total / self.count) / (self.count - 1)
+        return math.sqrt(variance) if variance > 0 else 0.0
+
+    def trend(self) -> float:
+        return _regression_trend(self.count, self.total, self.weighted)
+
+
+class _RollingExtremes:
+    """滑动窗口最大值/最小值（单调队列）"""
+
+    __slots__ = ("length", "_highs", "_lows")
+
+    def __init__(self, length: int):
+        self.length = length
+        self._highs: Deque[Tuple[int, float]] = deque()
+        self._lows: Deque[Tuple[int, float]] = deque()
+
+    def push(self, sequence: int, value: float):
+        while self._highs and self._highs[-1][1] <= value:
+            self._highs.pop()
+        self._highs.append((sequence, value))
+        while self._lows and self._lows[-1][1] >= value:
+            self._lows.pop()
+        self._lows.append((sequence, value))
+
+        oldest = sequence - self.length
+        while self._highs[0][0] <= oldest:
+            self._highs.popleft()
+        while self._lows[0][0] <= oldest:
+            self._lows.popleft()
+
+    @property
+    def high(self) -> float:
+        return self._highs[0][1]
+
+    @property
+    def low(self) -> float:
+        return self._lows[0][1]
+
+
+class SymbolAlertState:
+    """单个交易对的滚动预警统计
+
+    只保留最近capacity笔价格、成交量和收益率，各回看周期需要的窗口和、位置加权和与极值逐笔增量更新，
+    预警检查直接读取这些统计而不再切片历史列表。
+    """
+
+    RESYNC_INTERVAL = 4096  # 每隔多少笔按缓冲区重算窗口和
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.ticks = 0
+        self.prices: Deque[float] = deque(maxlen=2)
+        self.volumes: Deque[float] = deque(maxlen=2)
+        self.returns: Deque[float] = deque(maxlen=2)
+        self.lock = threading.RLock()
+
+        self._price_sums: Dict[int, _WindowSums] = {}
+        self._volume_sums: Dict[int, _WindowSums] = {}
+        self._return_sums: Dict[int, _WindowSums] = {}
+        self._extremes: Dict[int, _RollingExtremes] = {}
+
+        # 同一笔行情只计入一次：记录已读取最近一笔行情的条件
+        self._last_tick: Optional[MarketData] = None
+        self._tick_consumers: Set[str] = set()
+
+    def require(self, lookback_periods: int):
+        """登记回看周期，按需扩容缓冲区并建立对应窗口"""
+        lookback_periods = max(lookback_periods, 1)
+        capacity = max(lookback_periods, 2)
+        if capacity > self.prices.maxlen:
+            self.prices = deque(self.prices, maxlen=capacity)
+            self.volumes = deque(self.volumes, maxlen=capacity)
+            self.returns = deque(self.returns, maxlen=capacity)
+
+        half = (lookback_periods + 1) // 2
+        for length in (lookback_periods, half):
+            if length not in self._price_sums:
+                self._price_sums[length] = self._built(length, self.prices)
+        if lookback_periods not in self._volume_sums:
+            self._volume_sums[lookback_periods] = self._built(lookback_periods, self.volumes)
+        if lookback_periods > 1 and lookback_periods - 1 not in self._return_sums:
+            self._return_sums[lookback_periods - 1] = self._built(lookback_periods - 1, self.returns)
+        if lookback_periods not in self._extremes:
+            extremes = _RollingExtremes(lookback_periods)
+            first = self.ticks - len(self.prices)
+            for offset, price in enumerate(self.prices):
+                extremes.push(first + offset, price)
+            self._extremes[lookback_periods] = extremes
+
+    def observe(self, market_data: MarketData, consumer_id: str):
+        """读取一笔行情；其他条件已计入的同一笔行情不再重复计入"""
+        if market_data is self._last_tick and consumer_id not in self._tick_consumers:
+            self._tick_consumers.add(consumer_id)
+            return
+        self.push(market_data.price, market_data.volume_24h)
+        self._last_tick = market_data
+        self._tick_consumers = {consumer_id}
+
+    def push(self, price: float, volume: float):
+        """计入一笔价格和成交量"""
+        if self.prices:
+            previous = self.prices[-1]
+            change = (price - previous) / previous if previous else 0.0
+            self._push_sums(self._return_sums, self.returns, change)
+            self.returns.append(change)
+
+        self._push_sums(self._price_sums, self.prices, price)
+        self._push_sums(self._volume_sums, self.volumes, volume)
+        self.prices.append(price)
+        self.volumes.append(volume)
+
+        for extremes in self._extremes.values():
+            extremes.push(self.ticks, price)
+        self.ticks += 1
+
+        if self.ticks % self.RESYNC_INTERVAL == 0:
+            self._resync()
+
+    def price_back(self, periods: int) -> float:
+        """倒数第periods笔价格（1为最新一笔）"""
+        return self.prices[-periods]
+
+    def price_sums(self, length: int) -> _WindowSums:
+        return self._price_sums[length]
+
+    def volume_sums(self, length: int) -> _WindowSums:
+        return self._volume_sums[length]
+
+    def return_sums(self, length: int) -> _WindowSums:
+        return self._return_sums[length]
+
+    def extremes(self, length: int) -> _RollingExtremes:
+        return self._extremes[length]
+
+    def split_trends(self, lookback_periods: int) -> Tuple[int, float, float]:
+        """回看窗口后半段（较新）与前半段的价格趋势，返回前半段长度和两段趋势"""
+        whole = self._price_sums[lookback_periods]
+        recent = self._price_sums[(lookback_periods + 1) // 2]
+        earlier_count = whole.count - recent.count
+        earlier_total = whole.total - recent.total
+        earlier_weighted = whole.weighted - (recent.weighted + earlier_count * recent.total)
+        return (
+            earlier_count,
+            recent.trend(),
+            _regression_trend(earlier_count, earlier_total, earlier_weighted)
+        )
+
+    @staticmethod
+    def _push_sums(windows: Dict[int, _WindowSums], buffer: Deque[float], value: float):
+        size = len(buffer)
+        for length, sums in windows.items():
+            sums.push(value, buffer[-length] if size >= length else None)
+
+    @staticmethod
+    def _built(length: int, buffer: Deque[float]) -> _WindowSums:
+        sums = _WindowSums(length)
+        sums.rebuild(list(buffer))
+        return sums
+
+    def _resync(self):
+        for windows, buffer in (
+            (self._price_sums, self.prices),
+            (self._volume_sums, self.volumes),
+            (self._return_sums, self.returns)
+        ):
+            values = list(buffer)
+            for sums in windows.values():
+                sums.rebuild(values)
+
+
+class AlertRateCounter:
+    """按时间分桶的预警计数，查询最近窗口内的数量无需扫描预警历史"""
+
+    def __init__(self, window: timedelta = timedelta(hours=24), bucket: timedelta = timedelta(minutes=1)):
+        self.window = window
+        self.bucket_seconds = bucket.total_seconds()
+        self._buckets: Deque[List[Any]] = deque()  # [桶起始秒, 数量]
+        self._total = 0
+
+    def record(self, timestamp: datetime):
+        start = timestamp.timestamp() // self.bucket_seconds * self.bucket_seconds
+        if self._buckets and self._buckets[-1][0] == start:
+            self._buckets[-1][1] += 1
+        else:
+            self._buckets.append([start, 1])
+        self._total += 1
+        self._expire(timestamp)
+
+    def count(self, now: Optional[datetime] = None) -> int:
+        """窗口内的预警数量（精确到桶）"""
+        self._expire(now or datetime.now())
+        return self._total
+
+    def clear(self):
+        self._buckets.clear()
+        self._total = 0
+
+    def _expire(self, now: datetime):
+        cutoff = now.timestamp() - self.window.total_seconds()
+        while self._buckets and self._buckets[0][0] + self.bucket_seconds <= cutoff:
+            self._total -= self._buckets.popleft()[1]
+
+
 class MarketAlertCondition(Condition):
     """市场预警条件"""
     
@@ -110,28 +363,62 @@ class MarketAlertCondition(Condition):
         self.confidence_threshold = confidence_threshold
         
         # 数据存储
-        self.price_history: List[float] = []
-        self.volume_history: List[float] = []
+        self.alert_state = SymbolAlertState(symbol)
+        self.alert_state.require(lookback_periods)
         self.alert_history: List[MarketAlertData] = []
+        self.alert_counter = AlertRateCounter()
         self.statistics: Dict[str, Any] = {}
         self.alert_levels: List[AlertLevel] = []
+        
+        # 预警类型 -> 检查方法（只构建一次）
+        self._alert_checkers = {
+            AlertType.PRICE_CHANGE: self._check_price_change,
+            AlertType.PRICE_BREAKOUT: self._check_price_breakout,
+            AlertType.VOLUME_SPIKE: self._check_volume_spike,
+            AlertType.VOLUME_DIVERGENCE: self._check_volume_divergence,
+            AlertType.TECHNICAL_BREAKOUT: self._check_technical_breakout,
+            AlertType.MOVING_AVERAGE_CROSS: self._check_moving_average_cross,
+            AlertType.RSI_OVERSOLD_OVERBOUGHT: self._check_rsi_levels,
+            AlertType.SUPPORT_RESISTANCE: self._check_support_resistance,
+            AlertType.TREND_REVERSAL: self._check_trend_reversal,
+            AlertType.CORRELATION_BREAK: self._check_correlation_break,
+            AlertType.VOLATILITY_EXPLOSION: self._check_volatility_explosion,
+            AlertType.GAPPING: self._check_gapping,
+            AlertType.LIQUIDATION_CLUSTER: self._check_liquidation_cluster,
+            AlertType.FUNDING_RATE_SPIKE: self._check_funding_rate_spike,
+            AlertType.OPEN_INTEREST_CHANGE: self._check_open_interest_change,
+            AlertType.MARKET_SENTIMENT: self._check_market_sentiment,
+            AlertType.CUSTOM_ALERT: self._check_custom_alert,
+        }
     
     @property
     def condition_type(self) -> ConditionType:
         return ConditionType.MARKET_ALERT
     
+    @property
+    def price_history(self) -> List[float]:
+        """最近的价格（回看窗口内）"""
+        return list(self.alert_state.prices)
+    
+    @property
+    def volume_history(self) -> List[float]:
+        """最近的成交量（回看窗口内）"""
+        return list(self.alert_state.volumes)
+    
     def evaluate(self, market_data: MarketData) -> ConditionResult:
         """评估市场预警条件"""
         try:
-            # 更新历史数据
-            self._update_history(market_data)
-            
-            # 根据预警类型执行评估
-            alert_data = self._evaluate_alert_type(market_data)
+            with self.alert_state.lock:
+                # 更新滚动统计（共享状态时同一笔行情只计入一次）
+                self.alert_state.observe(market_data, self.condition_id)
+                
+                # 根据预警类型执行评估
+                alert_data = self._evaluate_alert_type(market_data)
             
             # 记录预警
             if alert_data:
                 self.alert_history.append(alert_data)
+                self.alert_counter.record(alert_data.timestamp)
                 self._update_statistics(alert_data)
                 
                 # 保持历史数据大小
@@ -161,41 +448,9 @@ class MarketAlertCondition(Condition):
             self._update_statistics_error(str(e))
             return error_result
     
-    def _update_history(self, market_data: MarketData):
-        """更新历史数据"""
-        self.price_history.append(market_data.price)
-        self.volume_history.append(market_data.volume_24h)
-        
-        # 保持历史数据大小
-        max_history = max(self.lookback_periods * 2, 100)
-        if len(self.price_history) > max_history:
-            self.price_history = self.price_history[-self.lookback_periods:]
-        if len(self.volume_history) > max_history:
-            self.volume_history = self.volume_history[-self.lookback_periods:]
-    
     def _evaluate_alert_type(self, market_data: MarketData) -> Optional[MarketAlertData]:
         """评估具体的预警类型"""
-        evaluators = {
-            AlertType.PRICE_CHANGE: self._check_price_change,
-            AlertType.PRICE_BREAKOUT: self._check_price_breakout,
-            AlertType.VOLUME_SPIKE: self._check_volume_spike,
-            AlertType.VOLUME_DIVERGENCE: self._check_volume_divergence,
-            AlertType.TECHNICAL_BREAKOUT: self._check_technical_breakout,
-            AlertType.MOVING_AVERAGE_CROSS: self._check_moving_average_cross,
-            AlertType.RSI_OVERSOLD_OVERBOUGHT: self._check_rsi_levels,
-            AlertType.SUPPORT_RESISTANCE: self._check_support_resistance,
-            AlertType.TREND_REVERSAL: self._check_trend_reversal,
-            AlertType.CORRELATION_BREAK: self._check_correlation_break,
-            AlertType.VOLATILITY_EXPLOSION: self._check_volatility_explosion,
-            AlertType.GAPPING: self._check_gapping,
-            AlertType.LIQUIDATION_CLUSTER: self._check_liquidation_cluster,
-            AlertType.FUNDING_RATE_SPIKE: self._check_funding_rate_spike,
-            AlertType.OPEN_INTEREST_CHANGE: self._check_open_interest_change,
-            AlertType.MARKET_SENTIMENT: self._check_market_sentiment,
-            AlertType.CUSTOM_ALERT: self._check_custom_alert,
-        }
-        
-        evaluator = evaluators.get(self.alert_type)
+        evaluator = self._alert_checkers.get(self.alert_type)
         if evaluator:
             return evaluator(market_data)
         else:
@@ -203,12 +458,13 @@ class MarketAlertCondition(Condition):
     
     def _check_price_change(self, market_data: MarketData) -> Optional[MarketAlertData]:
         """检查价格变动预警"""
-        if len(self.price_history) < self.lookback_periods:
+        state = self.alert_state
+        if state.ticks < self.lookback_periods:
             return None
         
         # 计算价格变动
         current_price = market_data.price
-        reference_price = self.price_history[-self.lookback_periods]
+        reference_price = state.price_back(self.lookback_periods)
         
         price_change = (current_price - reference_price) / reference_price * 100
         abs_change = abs(price_change)
@@ -243,15 +499,16 @@ class MarketAlertCondition(Condition):
     
     def _check_price_breakout(self, market_data: MarketData) -> Optional[MarketAlertData]:
         """检查价格突破预警"""
-        if len(self.price_history) < self.lookback_periods:
+        state = self.alert_state
+        if state.ticks < self.lookback_periods:
             return None
         
         current_price = market_data.price
         
         # 计算支撑阻力位
-        high_prices = self.price_history[-self.lookback_periods:]
-        resistance_level = max(high_prices)
-        support_level = min(high_prices)
+        extremes = state.extremes(self.lookback_periods)
+        resistance_level = extremes.high
+        support_level = extremes.low
         
         # 检查突破
         upper_breakout = current_price > resistance_level
@@ -285,13 +542,14 @@ class MarketAlertCondition(Condition):
     
     def _check_volume_spike(self, market_data: MarketData) -> Optional[MarketAlertData]:
         """检查成交量激增预警"""
-        if len(self.volume_history) < self.lookback_periods:
+        state = self.alert_state
+        if state.ticks < self.lookback_periods:
             return None
         
         current_volume = market_data.volume_24h
         
         # 计算平均成交量
-        avg_volume = statistics.mean(self.volume_history[-self.lookback_periods:])
+        avg_volume = state.volume_sums(self.lookback_periods).mean()
         
         # 计算成交量比率
         volume_ratio = current_volume / avg_volume if avg_volume > 0 else 0
@@ -319,12 +577,13 @@ class MarketAlertCondition(Condition):
     
     def _check_volume_divergence(self, market_data: MarketData) -> Optional[MarketAlertData]:
         """检查量价背离预警"""
-        if len(self.price_history) < self.lookback_periods or len(self.volume_history) < self.lookback_periods:
+        state = self.alert_state
+        if state.ticks < self.lookback_periods:
             return None
         
         # 分析价格和成交量的趋势
-        price_trend = self._analyze_trend(self.price_history[-self.lookback_periods:])
-        volume_trend = self._analyze_trend(self.volume_history[-self.lookback_periods:])
+        price_trend = state.price_sums(self.lookback_periods).trend()
+        volume_trend = state.volume_sums(self.lookback_periods).trend()
         
         # 检测背离
         divergence_detected = False
@@ -392,10 +651,10 @@ class MarketAlertCondition(Condition):
         ma50 = market_data.moving_average_50
         
         # 需要历史数据来确定交叉方向
-        if len(self.price_history) < 2:
+        if self.alert_state.ticks < 2:
             return None
         
-        prev_ma20 = self.price_history[-2] if len(self.price_history) >= 2 else ma20  # 简化的计算
+        prev_ma20 = self.alert_state.price_back(2)  # 简化的计算
         prev_ma50 = ma50  # 简化处理
         
         # 检测金叉和死叉
@@ -473,19 +732,15 @@ class MarketAlertCondition(Condition):
     
     def _check_trend_reversal(self, market_data: MarketData) -> Optional[MarketAlertData]:
         """检查趋势反转预警"""
-        if len(self.price_history) < self.lookback_periods:
+        if self.alert_state.ticks < self.lookback_periods:
             return None
         
-        # 简化的趋势反转检测
-        recent_prices = self.price_history[-self.lookback_periods//2:]
-        earlier_prices = self.price_history[-self.lookback_periods:-self.lookback_periods//2] if len(self.price_history) >= self.lookback_periods else []
+        # 简化的趋势反转检测：回看窗口分为较新的后半段和较早的前半段
+        earlier_count, recent_trend, earlier_trend = self.alert_state.split_trends(self.lookback_periods)
         
-        if len(earlier_prices) < 3:
+        if earlier_count < 3:
             return None
         
-        recent_trend = self._analyze_trend(recent_prices)
-        earlier_trend = self._analyze_trend(earlier_prices)
-        
         # 检测趋势反转
         reversal_detected = False
         direction = AlertDirection.NEUTRAL
@@ -520,20 +775,12 @@ class MarketAlertCondition(Condition):
     
     def _check_volatility_explosion(self, market_data: MarketData) -> Optional[MarketAlertData]:
         """检查波动率激增预警"""
-        if len(self.price_history) < self.lookback_periods:
-            return None
-        
-        # 计算价格波动率
-        recent_prices = self.price_history[-self.lookback_periods:]
-        returns = []
-        
-        for i in range(1, len(recent_prices)):
-            returns.append((recent_prices[i] - recent_prices[i-1]) / recent_prices[i-1])
-        
-        if len(returns) < 3:
+        state = self.alert_state
+        if state.ticks < self.lookback_periods or self.lookback_periods < 4:
             return None
         
-        volatility = statistics.stdev(returns)
+        # 计算价格波动率（回看窗口内相邻价格的收益率标准差）
+        volatility = state.return_sums(self.lookback_periods - 1).stdev()
         threshold = self.threshold_value if isinstance(self.threshold_value, (int, float)) else 0.02
         
         if volatility >= threshold:
@@ -555,11 +802,11 @@ class MarketAlertCondition(Condition):
     
     def _check_gapping(self, market_data: MarketData) -> Optional[MarketAlertData]:
         """检查跳空预警"""
-        if len(self.price_history) < 2:
+        if self.alert_state.ticks < 2:
             return None
         
         current_price = market_data.price
-        previous_price = self.price_history[-1]
+        previous_price = self.alert_state.price_back(1)
         
         gap = abs(current_price - previous_price) / previous_price
         
@@ -640,14 +887,7 @@ class MarketAlertCondition(Condition):
             return 0.0
         
         # 使用线性回归计算趋势
-        n = len(data)
-        x_values = list(range(n))
-        
-        try:
-            slope = statistics.linear_regression(x_values, data).slope
-            return slope / statistics.mean(data) if statistics.mean(data) != 0 else 0
-        except:
-            return 0.0
+        return _regression_trend(len(data), sum(data), sum(index * value for index, value in enumerate(data)))
     
     def _check_condition(self, alert_data: MarketAlertData) -> bool:
         """检查条件是否满足"""
@@ -802,12 +1042,12 @@ class MarketAlertCondition(Condition):
         if not self.statistics:
             return {"message": "没有预警统计数据"}
         
-        recent_alerts = [a for a in self.alert_history if a.timestamp > datetime.now() - timedelta(hours=24)]
+        recent_count = self.alert_counter.count()
         
         stats = self.statistics.copy()
         stats.update({
-            "recent_alerts_count": len(recent_alerts),
-            "alert_frequency_24h": len(recent_alerts) / 24 if recent_alerts else 0,
+            "recent_alerts_count": recent_count,
+            "alert_frequency_24h": recent_count / 24 if recent_count else 0,
             "most_common_alert_type": max(self.statistics.get("alerts_by_type", {}), key=self.statistics["alerts_by_type"].get) if self.statistics.get("alerts_by_type") else None,
             "alert_rate_by_severity": self.statistics.get("alerts_by_severity", {}),
             "direction_distribution": self.statistics.get("alerts_by_direction", {})
@@ -818,7 +1058,9 @@ class MarketAlertCondition(Condition):
     def get_recent_alerts(self, hours: int = 24) -> List[Dict[str, Any]]:
         """获取最近的预警"""
         cutoff_time = datetime.now() - timedelta(hours=hours)
-        recent_alerts = [a for a in self.alert_history if a.timestamp >= cutoff_time]
+        # 预警历史按时间追加，二分定位起点
+        start = bisect.bisect_left(self.alert_history, cutoff_time, key=lambda alert: alert.timestamp)
+        recent_alerts = self.alert_history[start:]
         
         return [
             {
@@ -837,6 +1079,7 @@ class MarketAlertCondition(Condition):
     def clear_alert_history(self):
         """清除预警历史"""
         self.alert_history.clear()
+        self.alert_counter.clear()
         self.statistics.clear()
     
     def to_dict(self) -> Dict[str, Any]:
@@ -875,9 +1118,62 @@ class MarketAlertCondition(Condition):
         self.lookback_periods = data.get("lookback_periods", 20)
         self.confidence_threshold = data.get("confidence_threshold", 0.7)
         
+        if self.alert_state.symbol != self.symbol:
+            self.alert_state = SymbolAlertState(self.symbol)
+        self.alert_state.require(self.lookback_periods)
+        
         return self
 
 
+class SymbolAlertEvaluator:
+    """同一交易对的预警条件共享一份滚动统计
+    
+    每笔行情只更新一次窗口统计，随后依次执行各条件的预警检查，
+    取代每个条件各自维护价格和成交量历史并重复计算均值、标准差和回归。
+    """
+    
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.state = SymbolAlertState(symbol)
+        self.conditions: Dict[str, MarketAlertCondition] = {}
+    
+    def add_condition(self, condition: MarketAlertCondition):
+        """加入条件并改用共享统计"""
+        if condition.symbol != self.symbol:
+            raise ValueError(f"条件交易对 {condition.symbol} 与评估器 {self.symbol} 不一致")
+        with self.state.lock:
+            self.state.require(condition.lookback_periods)
+            condition.alert_state = self.state
+        self.conditions[condition.condition_id] = condition
+    
+    def remove_condition(self, condition_id: str) -> bool:
+        """移除条件，条件恢复使用独立的统计"""
+        condition = self.conditions.pop(condition_id, None)
+        if condition is None:
+            return False
+        condition.alert_state = SymbolAlertState(condition.symbol)
+        condition.alert_state.require(condition.lookback_periods)
+        return True
+    
+    def evaluate(self, market_data: MarketData) -> List[Tuple[MarketAlertCondition, ConditionResult]]:
+        """单次遍历评估全部启用的条件"""
+        with self.state.lock:
+            return [
+                (condition, condition.evaluate(market_data))
+                for condition in self.conditions.values()
+                if condition.enabled
+            ]
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        return {
+            "symbol": self.symbol,
+            "conditions": len(self.conditions),
+            "ticks": self.state.ticks,
+            "buffer_size": self.state.prices.maxlen
+        }
+
+
 def alert_type_to_chinese(alert_type: AlertType) -> str:
     """将预警类型转换为中文"""
     translations = {
@@ -3,8 +3,11 @@
 提供基于时间的各种条件类型和评估逻辑
 """
 
-from datetime import datetime, timedelta, time
-from typing import Any, Dict, List, Optional, Union, Set
+import asyncio
+import heapq
+from datetime import date, datetime, timedelta, time, timezone as dt_timezone
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple, Union, Set
 from dataclasses import dataclass
 from enum import Enum
 
@@ -72,6 +75,69 @@ class DayOfWeek(Enum):
     SUNDAY = 6
 
 
+# 状态不再变化的条件使用的失效时间
+_NEVER = datetime.max.replace(tzinfo=dt_timezone.utc)
+
+# 闭区间右端点之后的第一个时刻
+_EPSILON = timedelta(microseconds=1)
+
+# 每日边界决定状态的时间类型（当日结果只取决于日期和当天的时刻）
+_DAILY_TIME_TYPES = {
+    TimeType.CURRENT_TIME,
+    TimeType.MARKET_OPEN,
+    TimeType.MARKET_CLOSE,
+    TimeType.TRADING_HOURS,
+    TimeType.TIME_RANGE,
+    TimeType.RECURRING_TIME,
+    TimeType.MARKET_SESSION,
+    TimeType.WEEKEND,
+    TimeType.HOLIDAY,
+}
+
+
+@lru_cache(maxsize=64)
+def _market_hours(target_market: str, weekday: int, is_holiday: bool) -> Dict[str, Any]:
+    """获取市场交易时间（按市场和星期缓存，返回的字典不可修改）"""
+    # 根据目标市场类型返回不同的交易时间
+    if target_market == "stock":
+        # 股票市场交易时间（周一到周五）
+        is_trading_day = weekday < 5 and not is_holiday
+        return {
+            "is_trading_day": is_trading_day,
+            "open_hour": 9 if is_trading_day else 0,
+            "open_minute": 30 if is_trading_day else 0,
+            "close_hour": 16 if is_trading_day else 0,
+            "close_minute": 0
+        }
+
+    # 加密货币市场24/7交易；外汇市场周一到周五
+    return {
+        "is_trading_day": weekday < 5 if target_market == "forex" else True,
+        "open_hour": 0,
+        "open_minute": 0,
+        "close_hour": 23,
+        "close_minute": 59
+    }
+
+
+@lru_cache(maxsize=64)
+def _market_holidays(target_market: str, year: int, timezone_name: str) -> FrozenSet[date]:
+    """获取市场节假日（按市场、年份和时区缓存）"""
+    # 这里应该返回真实的节假日列表
+    # 暂时返回一些示例节假日：新年、圣诞节
+    return frozenset({date(year, 1, 1), date(year, 12, 25)})
+
+
+def _parse_clock(value: str, with_seconds: bool = True) -> timedelta:
+    """解析 "HH:MM" 或 "HH:MM:SS" 为距当日零点的时长"""
+    parts = value.split(":")
+    return timedelta(
+        hours=int(parts[0]),
+        minutes=int(parts[1]) if len(parts) > 1 else 0,
+        seconds=int(parts[2]) if with_seconds and len(parts) > 2 else 0
+    )
+
+
 class TimeCondition(Condition):
     """时间条件"""
     
@@ -107,12 +173,22 @@ class TimeCondition(Condition):
             self.tz = pytz.timezone(timezone.value)
         else:
             # 简单的时区处理
-            self.tz = datetime.timezone.utc
+            self.tz = dt_timezone.utc
         
         # 数据存储
         self.time_history: List[datetime] = []
         self.market_sessions: List[Dict[str, Any]] = []
         self.time_triggers: List[Dict[str, Any]] = []
+        
+        # 状态缓存：[valid_from, valid_until) 内结果不变，只需O(1)查表
+        self._cached_result: Optional[ConditionResult] = None
+        self._valid_from: Optional[datetime] = None
+        self._valid_until: Optional[datetime] = None
+        self._countdown_target: Optional[datetime] = None
+        self.schedule_stats = {
+            "cache_hits": 0,
+            "recomputes": 0
+        }
     
     @property
     def condition_type(self) -> ConditionType:
@@ -120,9 +196,13 @@ class TimeCondition(Condition):
     
     def evaluate(self, market_data: MarketData) -> ConditionResult:
         """评估时间条件"""
+        return self.evaluate_at(datetime.now(self.tz), market_data)
+    
+    def evaluate_at(self, current_time: datetime, market_data: Optional[MarketData] = None) -> ConditionResult:
+        """在指定时刻评估时间条件，两次状态转换之间直接返回缓存结果"""
         try:
-            # 获取当前时间
-            current_time = datetime.now(self.tz)
+            if current_time.tzinfo is None:
+                current_time = self._localize(current_time)
             
             # 更新历史
             self.time_history.append(current_time)
@@ -130,7 +210,9 @@ class TimeCondition(Condition):
                 self.time_history = self.time_history[-500:]
             
             # 根据时间类型执行评估
-            result = self._evaluate_time_condition(current_time, market_data)
+            result = self._lookup_state(current_time)
+            if result is None:
+                result = self.refresh_state(current_time, market_data)
             
             # 记录触发时间
             if result.satisfied:
@@ -150,6 +232,182 @@ class TimeCondition(Condition):
             self._update_statistics(error_result)
             return error_result
     
+    @property
+    def next_transition_time(self) -> Optional[datetime]:
+        """缓存状态的失效时刻（下次可能的状态转换），None表示没有缓存"""
+        return self._valid_until if self._cached_result is not None else None
+    
+    def invalidate_state(self):
+        """清除状态缓存（修改时间配置后调用）"""
+        self._cached_result = None
+        self._valid_from = None
+        self._valid_until = None
+        self._countdown_target = None
+    
+    def refresh_state(self, current_time: datetime, market_data: Optional[MarketData] = None) -> ConditionResult:
+        """完整评估一次并计算下次状态转换时刻"""
+        result = self._evaluate_time_condition(current_time, market_data)
+        self.schedule_stats["recomputes"] += 1
+        
+        try:
+            valid_until = self._next_transition(current_time)
+        except Exception:
+            valid_until = None
+        
+        if valid_until is None:
+            # 依赖评估历史或配置无法解析，每次重新评估
+            self.invalidate_state()
+        else:
+            self._cached_result = result
+            self._valid_from = current_time
+            self._valid_until = valid_until
+        
+        return result
+    
+    def _lookup_state(self, current_time: datetime) -> Optional[ConditionResult]:
+        """缓存有效时返回缓存的状态"""
+        cached = self._cached_result
+        if cached is None or not self._valid_from <= current_time < self._valid_until:
+            return None
+        
+        self.schedule_stats["cache_hits"] += 1
+        if self._countdown_target is not None:
+            value = abs((self._countdown_target - current_time).total_seconds())
+        else:
+            value = current_time
+        return ConditionResult(cached.satisfied, value, cached.details)
+    
+    def _next_transition(self, current_time: datetime) -> Optional[datetime]:
+        """计算current_time之后第一个可能改变满足状态的时刻
+        
+        每日类型取今明两天的边界（零点及各类型的时刻），按本地时钟换算为带时区的时刻，
+        夏令时切换前后也落在正确的时刻；多出来的边界只会多一次重新评估。
+        """
+        self._countdown_target = None
+        
+        if self.time_type == TimeType.COUNTDOWN:
+            return self._countdown_transition(current_time)
+        
+        if self.time_type == TimeType.CURRENT_TIME and isinstance(self.time_value, datetime):
+            return self._first_after(current_time, self._around(self.time_value, timedelta(minutes=1)))
+        
+        if self.time_type not in _DAILY_TIME_TYPES:
+            return None
+        
+        today = current_time.date()
+        candidates = []
+        for day in (today, today + timedelta(days=1)):
+            midnight = datetime.combine(day, time())
+            for offset in [timedelta(0)] + self._daily_boundaries(day.weekday()):
+                instants = self._wall_clock_instants(midnight + offset, current_time)
+                if instants is None:
+                    # 处于夏令时跳过的时段内，真实转换时刻无法由本地时钟确定，逐次评估
+                    return None
+                candidates.extend(instants)
+        
+        return self._first_after(current_time, candidates)
+    
+    def _daily_boundaries(self, weekday: int) -> List[timedelta]:
+        """当日可能改变状态的时刻（距零点的时长）"""
+        if self.time_type in (TimeType.WEEKEND, TimeType.HOLIDAY):
+            return []
+        
+        if self.time_type == TimeType.CURRENT_TIME:
+            if isinstance(self.time_value, time):
+                target = timedelta(
+                    hours=self.time_value.hour,
+                    minutes=self.time_value.minute,
+                    seconds=self.time_value.second
+                )
+            else:
+                target = _parse_clock(self.time_value)
+            return self._around(target, timedelta(minutes=1))
+        
+        if self.time_type == TimeType.TIME_RANGE:
+            if isinstance(self.time_value, dict):
+                start = self.time_value.get("start", "00:00")
+                end = self.time_value.get("end", "23:59")
+            else:
+                start, end = self.time_value.split("-")
+            return [_parse_clock(start, with_seconds=False), _parse_clock(end, with_seconds=False) + _EPSILON]
+        
+        if self.time_type == TimeType.RECURRING_TIME:
+            target = _parse_clock(self.time_value.get("time", "12:00"), with_seconds=False)
+            return self._around(target, timedelta(minutes=5))
+        
+        market_hours = self._get_market_hours(weekday)
+        market_open = timedelta(hours=market_hours["open_hour"], minutes=market_hours["open_minute"])
+        market_close = timedelta(hours=market_hours["close_hour"], minutes=market_hours["close_minute"])
+        
+        if self.time_type == TimeType.MARKET_OPEN:
+            return [market_open - timedelta(minutes=30), market_open + timedelta(minutes=5) + _EPSILON]
+        if self.time_type == TimeType.MARKET_CLOSE:
+            return [market_close - timedelta(minutes=5), market_close + timedelta(minutes=30) + _EPSILON]
+        if self.time_type == TimeType.TRADING_HOURS:
+            return [market_open, market_close + _EPSILON]
+        
+        # 市场时段
+        return [
+            market_open - timedelta(minutes=30),
+            market_open,
+            market_close + _EPSILON,
+            market_close + timedelta(hours=2) + _EPSILON
+        ]
+    
+    def _countdown_transition(self, current_time: datetime) -> datetime:
+        """倒计时进入阈值或到期的时刻"""
+        if isinstance(self.time_value, dict):
+            target_datetime_str = self.time_value.get("target")
+            threshold_seconds = self.time_value.get("threshold_seconds", 0)
+        else:
+            target_datetime_str = str(self.time_value)
+            threshold_seconds = 0
+        
+        target_datetime = datetime.fromisoformat(target_datetime_str)
+        if target_datetime.tzinfo is None:
+            target_datetime = self._localize(target_datetime)
+        
+        self._countdown_target = target_datetime
+        return self._first_after(current_time, [
+            target_datetime - timedelta(seconds=threshold_seconds),
+            target_datetime + _EPSILON
+        ])
+    
+    @staticmethod
+    def _around(target, tolerance: timedelta) -> List[Any]:
+        """容差闭区间的两端，以及大于/小于比较在target两侧的边界"""
+        return [target - tolerance, target, target + _EPSILON, target + tolerance + _EPSILON]
+    
+    @staticmethod
+    def _first_after(current_time: datetime, candidates: List[datetime]) -> datetime:
+        upcoming = [candidate for candidate in candidates if candidate > current_time]
+        return min(upcoming) if upcoming else _NEVER
+    
+    def _wall_clock_instants(self, naive: datetime, current_time: Optional[datetime] = None) -> Optional[List[datetime]]:
+        """本地时钟到达naive的时刻
+        
+        夏令时结束时同一本地时间出现两次，两个时刻都返回；夏令时开始时被跳过的本地时间
+        返回跳过时段的两端，current_time落在该时段内时返回None。
+        """
+        if not PYTZ_AVAILABLE or not hasattr(self.tz, "localize"):
+            return [naive.replace(tzinfo=self.tz)]
+        try:
+            return [self.tz.localize(naive, is_dst=None)]
+        except pytz.AmbiguousTimeError:
+            return [self.tz.localize(naive, is_dst=True), self.tz.localize(naive, is_dst=False)]
+        except pytz.NonExistentTimeError:
+            earliest = self.tz.localize(naive, is_dst=True)
+            latest = self.tz.localize(naive, is_dst=False)
+            if current_time is not None and earliest <= current_time < latest:
+                return None
+            return [earliest, latest]
+    
+    def _localize(self, naive: datetime) -> datetime:
+        """把本地时钟时间转换为带时区的时刻"""
+        if hasattr(self.tz, "localize"):
+            return self.tz.localize(naive)
+        return naive.replace(tzinfo=self.tz)
+    
     def _evaluate_time_condition(self, current_time: datetime, market_data: MarketData) -> ConditionResult:
         """评估具体的时间条件"""
         switcher = {
@@ -489,7 +747,7 @@ class TimeCondition(Condition):
             if target_datetime_str:
                 target_datetime = datetime.fromisoformat(target_datetime_str)
                 if target_datetime.tzinfo is None:
-                    target_datetime = self.tz.localize(target_datetime)
+                    target_datetime = self._localize(target_datetime)
             else:
                 return ConditionResult(False, current_time, "缺少目标时间")
             
@@ -535,45 +793,7 @@ class TimeCondition(Condition):
     
     def _get_market_hours(self, weekday: int) -> Dict[str, Any]:
         """获取市场交易时间"""
-        # 根据目标市场类型返回不同的交易时间
-        if self.target_market == "crypto":
-            # 加密货币市场24/7交易
-            return {
-                "is_trading_day": True,
-                "open_hour": 0,
-                "open_minute": 0,
-                "close_hour": 23,
-                "close_minute": 59
-            }
-        elif self.target_market == "stock":
-            # 股票市场交易时间（周一到周五）
-            is_trading_day = weekday < 5 and not self._is_holiday(weekday)
-            return {
-                "is_trading_day": is_trading_day,
-                "open_hour": 9 if is_trading_day else 0,
-                "open_minute": 30 if is_trading_day else 0,
-                "close_hour": 16 if is_trading_day else 0,
-                "close_minute": 0 if is_trading_day else 0
-            }
-        elif self.target_market == "forex":
-            # 外汇市场交易时间
-            # 外汇市场周一到周五，主要交易时间
-            is_trading_day = weekday < 5
-            return {
-                "is_trading_day": is_trading_day,
-                "open_hour": 0,
-                "open_minute": 0,
-                "close_hour": 23,
-                "close_minute": 59
-            }
-        else:
-            return {
-                "is_trading_day": True,
-                "open_hour": 0,
-                "open_minute": 0,
-                "close_hour": 23,
-                "close_minute": 59
-            }
+        return _market_hours(self.target_market, weekday, self._is_holiday(weekday))
     
     def _determine_market_session(self, current_time: datetime) -> MarketSession:
         """确定当前市场时段"""
@@ -630,19 +850,9 @@ class TimeCondition(Condition):
                 return last_day
         return None
     
-    def _get_market_holidays(self, year: int) -> Set[datetime.date]:
+    def _get_market_holidays(self, year: int) -> FrozenSet[date]:
         """获取市场节假日"""
-        # 这里应该返回真实的节假日列表
-        # 暂时返回一些示例节假日
-        holidays = set()
-        
-        # 新年
-        holidays.add(datetime.date(year, 1, 1))
-        
-        # 圣诞节（如果适用）
-        holidays.add(datetime.date(year, 12, 25))
-        
-        return holidays
+        return _market_holidays(self.target_market, year, self.timezone.value)
     
     def _is_holiday(self, weekday: int) -> bool:
         """检查是否为节假日"""
@@ -759,7 +969,8 @@ class TimeCondition(Condition):
         if PYTZ_AVAILABLE:
             self.tz = pytz.timezone(self.timezone.value)
         else:
-            self.tz = datetime.timezone.utc
+            self.tz = dt_timezone.utc
+        self.invalidate_state()
         
         # 重建时间历史
         time_history_strs = data.get("time_history", [])
@@ -768,3 +979,132 @@ class TimeCondition(Condition):
         ]
         
         return self
+
+
+class TimeConditionScheduler:
+    """时间条件调度器
+    
+    登记时为每个条件计算一次下次状态转换时刻，放入按时刻排序的最小堆，
+    只在这些时刻重新评估并计算下一个转换时刻。条件移除或重新登记后，
+    堆中的旧项按序号惰性丢弃。
+    """
+    
+    def __init__(self, max_sleep: float = 60.0):
+        self.max_sleep = max_sleep
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._conditions: Dict[str, TimeCondition] = {}
+        self._entries: Dict[str, int] = {}  # 条件ID -> 有效堆项序号
+        self._states: Dict[str, bool] = {}  # 条件ID -> 调度器最近看到的满足状态
+        self._sequence = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        
+        # 统计数据
+        self.stats = {
+            "fired": 0,
+            "transitions": 0,
+            "errors": 0
+        }
+    
+    def add(self, condition: TimeCondition, now: Optional[datetime] = None) -> Optional[datetime]:
+        """登记条件并返回其下次状态转换时刻（不会再变化时为None）"""
+        now = now or datetime.now(dt_timezone.utc)
+        self._conditions[condition.condition_id] = condition
+        try:
+            result = condition.refresh_state(now.astimezone(condition.tz))
+        except Exception as e:
+            self.stats["errors"] += 1
+            self._entries.pop(condition.condition_id, None)
+            print(f"时间条件调度失败: {condition.name or condition.condition_id} - {str(e)}")
+            return None
+        self._states[condition.condition_id] = result.satisfied
+        return self._push(condition)
+    
+    def remove(self, condition_id: str) -> bool:
+        """移除条件"""
+        self._entries.pop(condition_id, None)
+        self._states.pop(condition_id, None)
+        return self._conditions.pop(condition_id, None) is not None
+    
+    def next_fire_time(self) -> Optional[datetime]:
+        """最早的待触发时刻"""
+        while self._heap and self._entries.get(self._heap[0][2]) != self._heap[0][1]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+    
+    def due(self, now: Optional[datetime] = None) -> List[Tuple[TimeCondition, ConditionResult]]:
+        """重新评估所有到期条件，返回满足状态发生变化的条件及新结果"""
+        now = now or datetime.now(dt_timezone.utc)
+        transitions = []
+        
+        while self._heap and self._heap[0][0] <= now:
+            _, sequence, condition_id = heapq.heappop(self._heap)
+            if self._entries.get(condition_id) != sequence:
+                continue
+            del self._entries[condition_id]
+            
+            condition = self._conditions[condition_id]
+            self.stats["fired"] += 1
+            try:
+                result = condition.refresh_state(now.astimezone(condition.tz))
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"时间条件调度失败: {condition.name or condition_id} - {str(e)}")
+                continue
+            
+            # 行情驱动的评估可能已先刷新了条件自身的缓存，这里按调度器记录的状态判断转换
+            if self._states.get(condition_id) != result.satisfied:
+                self._states[condition_id] = result.satisfied
+                self.stats["transitions"] += 1
+                transitions.append((condition, result))
+            self._push(condition)
+        
+        return transitions
+    
+    async def run(self, on_transition: Callable[[TimeCondition, ConditionResult], Awaitable[Any]]):
+        """休眠到下一个转换时刻，处理到期条件（在后台任务中运行，取消即停止）"""
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                timeout = self.max_sleep
+                next_fire = self.next_fire_time()
+                if next_fire is not None:
+                    remaining = (next_fire - datetime.now(dt_timezone.utc)).total_seconds()
+                    timeout = min(timeout, max(0.0, remaining))
+                
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                
+                for condition, result in self.due():
+                    try:
+                        await on_transition(condition, result)
+                    except Exception as e:
+                        print(f"时间条件转换处理失败: {str(e)}")
+        finally:
+            self._wakeup = None
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取调度统计"""
+        next_fire = self.next_fire_time()
+        return {
+            "conditions": len(self._conditions),
+            "scheduled": len(self._entries),
+            "next_fire_time": next_fire.isoformat() if next_fire else None,
+            "stats": self.stats.copy()
+        }
+    
+    def _push(self, condition: TimeCondition) -> Optional[datetime]:
+        fire_at = condition.next_transition_time
+        if fire_at is None or fire_at == _NEVER:
+            # 依赖评估历史的条件由行情驱动评估，不再变化的条件无需调度
+            self._entries.pop(condition.condition_id, None)
+            return None
+        
+        self._sequence += 1
+        self._entries[condition.condition_id] = self._sequence
+        heapq.heappush(self._heap, (fire_at, self._sequence, condition.condition_id))
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return fire_at
@@ -67,7 +67,25 @@ class Settings(BaseSettings):
     # AI模型配置
     AI_MODEL_PATH: str = Field(default="./models", env="AI_MODEL_PATH")
     AI_PREDICTION_INTERVAL: int = Field(default=300, env="AI_PREDICTION_INTERVAL")  # 5分钟
-    
+
+    # 功能开关：逗号分隔的预设角色(all/market/trading/reports)或路由功能名
+    ENABLED_FEATURES: str = Field(default="all", env="ENABLED_FEATURES")
+
+    # 日志配置
+    LOG_ASYNC: bool = Field(default=True, env="LOG_ASYNC")  # 后台线程写日志
+    LOG_QUEUE_SIZE: int = Field(default=10000, env="LOG_QUEUE_SIZE")  # 队列满时丢弃
+    LOG_BATCH_SIZE: int = Field(default=256, env="LOG_BATCH_SIZE")
+    LOG_FLUSH_INTERVAL: float = Field(default=0.05, env="LOG_FLUSH_INTERVAL")  # 秒
+    LOG_DEBUG_SAMPLE_RATE: float = Field(default=1.0, env="LOG_DEBUG_SAMPLE_RATE")  # debug日志采样比例
+    LOG_RATE_LIMIT_PER_SECOND: int = Field(default=0, env="LOG_RATE_LIMIT_PER_SECOND")  # 每个调用点每秒上限，0为不限
+
+    # 批量写回配置（市场数据、系统日志、订单执行记录等只追加数据）
+    WRITE_BEHIND_ENABLED: bool = Field(default=True, env="WRITE_BEHIND_ENABLED")
+    WRITE_BEHIND_QUEUE_SIZE: int = Field(default=50000, env="WRITE_BEHIND_QUEUE_SIZE")  # 缓冲区上限，满时拒绝或等待
+    WRITE_BEHIND_BATCH_SIZE: int = Field(default=500, env="WRITE_BEHIND_BATCH_SIZE")
+    WRITE_BEHIND_FLUSH_INTERVAL: float = Field(default=0.2, env="WRITE_BEHIND_FLUSH_INTERVAL")  # 秒
+    WRITE_BEHIND_DURABILITY: str = Field(default="commit", env="WRITE_BEHIND_DURABILITY")  # relaxed/commit/fsync
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
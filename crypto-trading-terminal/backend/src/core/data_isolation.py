@@ -9,7 +9,7 @@ import json
 import time
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional, Any, Set, Tuple, Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from collections import defaultdict, deque
 import weakref
@@ -38,6 +38,107 @@ class ValidationResult(Enum):
     ERROR = "error"
 
 
+class ValidationMode(Enum):
+    """验证模式"""
+    FULL = "full"        # 每条行情完整验证
+    SAMPLED = "sampled"  # 按数据流抽样验证，发现违规后自动切换为完整验证
+
+
+class ViolationCode(Enum):
+    """违规代码"""
+    MARKET_TYPE_MISMATCH = "market_type_mismatch"
+    UNKNOWN_NAMESPACE = "unknown_namespace"
+    MISSING_FIELD = "missing_field"
+    INVALID_PRICE = "invalid_price"
+    INVALID_VOLUME = "invalid_volume"
+    MISSING_TIMESTAMP = "missing_timestamp"
+    STALE_DATA = "stale_data"
+    FUTURE_TIMESTAMP = "future_timestamp"
+    PRICE_TOO_LOW = "price_too_low"
+    PRICE_TOO_HIGH = "price_too_high"
+    SPOT_SYMBOL_FORMAT = "spot_symbol_format"
+    FUTURES_SYMBOL_FORMAT = "futures_symbol_format"
+    UNKNOWN_EXCHANGE = "unknown_exchange"
+    UNSUPPORTED_MARKET = "unsupported_market"
+    VALIDATION_EXCEPTION = "validation_exception"
+
+
+# 违规描述模板，参数按代码对应的详情元组填充
+VIOLATION_MESSAGES = {
+    ViolationCode.MARKET_TYPE_MISMATCH: "市场类型不匹配: 期望 {0}, 实际 {1}",
+    ViolationCode.UNKNOWN_NAMESPACE: "未知市场类型的缓存命名空间: {0}",
+    ViolationCode.MISSING_FIELD: "缺失必需字段: {0}",
+    ViolationCode.INVALID_PRICE: "价格不合理: {0}",
+    ViolationCode.INVALID_VOLUME: "交易量不合理: {0}",
+    ViolationCode.MISSING_TIMESTAMP: "缺失时间戳",
+    ViolationCode.STALE_DATA: "数据过于陈旧: 相差 {0:.1f} 秒",
+    ViolationCode.FUTURE_TIMESTAMP: "时间戳在未来",
+    ViolationCode.PRICE_TOO_LOW: "价格过低: {0}",
+    ViolationCode.PRICE_TOO_HIGH: "价格过高: {0}",
+    ViolationCode.SPOT_SYMBOL_FORMAT: "现货符号格式不正确: {0}",
+    ViolationCode.FUTURES_SYMBOL_FORMAT: "期货符号格式不正确: {0}",
+    ViolationCode.UNKNOWN_EXCHANGE: "未知的交易所: {0}",
+    ViolationCode.UNSUPPORTED_MARKET: "{0} 不支持 {1} 市场",
+    ViolationCode.VALIDATION_EXCEPTION: "验证异常: {0}",
+}
+
+# 严重违规（缺失数据或验证异常）判定为无效，仅有警告类违规时判定为警告
+CRITICAL_VIOLATIONS = frozenset({
+    ViolationCode.MISSING_FIELD,
+    ViolationCode.MISSING_TIMESTAMP,
+    ViolationCode.VALIDATION_EXCEPTION,
+})
+WARNING_VIOLATIONS = frozenset({
+    ViolationCode.STALE_DATA,
+    ViolationCode.SPOT_SYMBOL_FORMAT,
+    ViolationCode.FUTURES_SYMBOL_FORMAT,
+})
+
+VALID_EXCHANGES = ('binance', 'okx', 'bybit', 'huobi')
+EXCHANGE_MARKET_SUPPORT = {
+    'binance': ('spot', 'futures'),
+    'okx': ('spot', 'futures'),
+    'bybit': ('spot', 'futures'),
+    'huobi': ('spot',)
+}
+REQUIRED_FIELDS = ('symbol', 'current_price', 'volume_24h', 'timestamp', 'exchange', 'market_type')
+SPOT_SYMBOL_SUFFIXES = ('USDT', 'BTC', 'ETH')
+
+Violation = Tuple[ViolationCode, Tuple[Any, ...]]
+
+
+def format_violation(violation: Violation) -> str:
+    """生成违规描述"""
+    code, details = violation
+    return VIOLATION_MESSAGES[code].format(*details)
+
+
+@dataclass(frozen=True)
+class _StreamRules:
+    """单个交易所/市场类型预先计算好的规则检查结果"""
+    cache_check: bool
+    namespace_known: bool
+    integrity_check: bool
+    timestamp_check: bool
+    price_check: bool
+    symbol_check: bool
+    exchange_check: bool
+    exchange_known: bool
+    market_supported: bool
+
+
+class _StreamSampling:
+    """单个交易所/市场类型的抽样状态"""
+    
+    __slots__ = ('sample_every', 'ticks', 'escalated', 'clean_ticks')
+    
+    def __init__(self, sample_every: int):
+        self.sample_every = sample_every
+        self.ticks = 0
+        self.escalated = False
+        self.clean_ticks = 0
+
+
 @dataclass
 class DataValidationRecord:
     """数据验证记录"""
@@ -49,6 +150,7 @@ class DataValidationRecord:
     validation_result: ValidationResult
     violations: List[str]
     processing_time_ms: float
+    violation_codes: List[ViolationCode] = field(default_factory=list)
 
 
 @dataclass
@@ -95,11 +197,24 @@ class DataIsolationValidator:
         self.max_price_deviation = 0.05  # 5%价格偏差限制
         self.max_data_age_seconds = 300  # 5分钟数据新鲜度
         
+        # 抽样验证配置
+        self.validation_mode = ValidationMode.FULL
+        self.default_sample_every = 100  # 每个数据流每N条行情验证一条
+        self.escalation_clean_ticks = 500  # 完整验证连续无违规N条后恢复抽样
+        self.sampling_overrides: Dict[Tuple[str, str], int] = {}
+        self.stream_sampling: Dict[Tuple[str, str], _StreamSampling] = {}
+        self._stream_rules: Dict[Tuple[str, str], _StreamRules] = {}
+        
         # 统计信息
         self.total_validations = 0
         self.valid_count = 0
         self.invalid_count = 0
         self.warning_count = 0
+        self.sampling_stats = {
+            'skipped_ticks': 0,
+            'escalations': 0,
+            'validation_seconds': 0.0
+        }
         
         # 缓存管理器
         self.cache_manager = get_market_cache()
@@ -156,74 +271,219 @@ class DataIsolationValidator:
         
         logger.info("数据隔离规则已设置")
     
+    def set_validation_mode(self, mode: ValidationMode, sample_every: Optional[int] = None):
+        """设置验证模式，sample_every 为抽样模式下的默认抽样间隔"""
+        if sample_every is not None:
+            if sample_every < 1:
+                raise ValidationError(f"抽样间隔必须大于0: {sample_every}")
+            self.default_sample_every = sample_every
+        
+        self.validation_mode = mode
+        self.stream_sampling.clear()
+        logger.info(f"数据验证模式已设置为: {mode.value}")
+    
+    def set_sampling(self, exchange: str, market_type: str, sample_every: int):
+        """设置单个交易所/市场类型的抽样间隔（1 表示每条都验证）"""
+        if sample_every < 1:
+            raise ValidationError(f"抽样间隔必须大于0: {sample_every}")
+        
+        self.sampling_overrides[(exchange, market_type)] = sample_every
+        sampling = self.stream_sampling.get((exchange, market_type))
+        if sampling is not None:
+            sampling.sample_every = sample_every
+    
+    def refresh_rules(self):
+        """隔离规则或命名空间变更后重新编译规则检查"""
+        self._stream_rules.clear()
+    
+    def _compile_rules(self, exchange: str, market_type: str) -> _StreamRules:
+        """按交易所和市场类型预先计算与行情内容无关的检查"""
+        rules = self._stream_rules.get((exchange, market_type))
+        if rules is None:
+            validation = self.isolation_rules['data_validation']
+            validation_enabled = validation['enabled']
+            rules = _StreamRules(
+                cache_check=self.isolation_rules['cache_isolation']['enabled'],
+                namespace_known=market_type in self.cache_namespaces,
+                integrity_check=validation_enabled,
+                timestamp_check=validation_enabled and validation['timestamp_validation'],
+                price_check=validation_enabled and validation['price_range_validation'],
+                symbol_check=validation_enabled and validation['symbol_format_validation'],
+                exchange_check=validation_enabled and validation['exchange_consistency_validation'],
+                exchange_known=exchange in VALID_EXCHANGES,
+                market_supported=market_type in EXCHANGE_MARKET_SUPPORT.get(exchange, ())
+            )
+            self._stream_rules[(exchange, market_type)] = rules
+        return rules
+    
+    def check_market_data(
+        self,
+        market_data: MarketData,
+        expected_market_type: str,
+        now: Optional[float] = None,
+    ) -> List[Violation]:
+        """
+        执行全部规则检查，返回 (违规代码, 详情) 列表
+        
+        检查顺序与违规描述和逐项验证一致；无违规时返回空列表
+        """
+        market_type = getattr(market_data, 'market_type', None)
+        exchange = getattr(market_data, 'exchange', None)
+        rules = self._compile_rules(exchange, market_type)
+        violations: List[Violation] = []
+        
+        # 1. 市场类型一致性
+        if market_type != expected_market_type:
+            violations.append((ViolationCode.MARKET_TYPE_MISMATCH, (expected_market_type, market_type)))
+        
+        # 2. 缓存命名空间
+        if rules.cache_check and not rules.namespace_known:
+            violations.append((ViolationCode.UNKNOWN_NAMESPACE, (market_type,)))
+        
+        # 3. 数据完整性
+        if rules.integrity_check:
+            for field_name in REQUIRED_FIELDS:
+                if getattr(market_data, field_name, None) is None:
+                    violations.append((ViolationCode.MISSING_FIELD, (field_name,)))
+        
+        price = getattr(market_data, 'current_price', None)
+        if rules.integrity_check:
+            if price is not None and price <= 0:
+                violations.append((ViolationCode.INVALID_PRICE, (price,)))
+            volume = getattr(market_data, 'volume_24h', None)
+            if volume is not None and volume < 0:
+                violations.append((ViolationCode.INVALID_VOLUME, (volume,)))
+        
+        # 4. 时间戳（无时区的时间戳按UTC处理）
+        if rules.timestamp_check:
+            timestamp = getattr(market_data, 'timestamp', None)
+            if timestamp is None:
+                violations.append((ViolationCode.MISSING_TIMESTAMP, ()))
+            else:
+                if timestamp.tzinfo is None:
+                    timestamp = timestamp.replace(tzinfo=timezone.utc)
+                now = time.time() if now is None else now
+                age = now - timestamp.timestamp()
+                if abs(age) > self.max_data_age_seconds:
+                    violations.append((ViolationCode.STALE_DATA, (abs(age),)))
+                if age < 0:
+                    violations.append((ViolationCode.FUTURE_TIMESTAMP, ()))
+        
+        # 5. 价格范围
+        if rules.price_check and price is not None:
+            if price < 0.000001:
+                violations.append((ViolationCode.PRICE_TOO_LOW, (price,)))
+            elif price > 1000000:
+                violations.append((ViolationCode.PRICE_TOO_HIGH, (price,)))
+        
+        # 6. 符号格式
+        symbol = getattr(market_data, 'symbol', None)
+        if rules.symbol_check and symbol is not None:
+            if market_type == 'spot':
+                if not symbol.endswith(SPOT_SYMBOL_SUFFIXES):
+                    violations.append((ViolationCode.SPOT_SYMBOL_FORMAT, (symbol,)))
+            elif market_type == 'futures':
+                if '-' not in symbol:
+                    violations.append((ViolationCode.FUTURES_SYMBOL_FORMAT, (symbol,)))
+        
+        # 7. 交易所一致性
+        if rules.exchange_check:
+            if not rules.exchange_known:
+                violations.append((ViolationCode.UNKNOWN_EXCHANGE, (exchange,)))
+            if not rules.market_supported:
+                violations.append((ViolationCode.UNSUPPORTED_MARKET, (exchange, market_type)))
+        
+        return violations
+    
+    def _get_stream_sampling(self, exchange: str, market_type: str) -> _StreamSampling:
+        """获取数据流的抽样状态"""
+        key = (exchange, market_type)
+        sampling = self.stream_sampling.get(key)
+        if sampling is None:
+            sampling = _StreamSampling(self.sampling_overrides.get(key, self.default_sample_every))
+            self.stream_sampling[key] = sampling
+        return sampling
+    
+    def _update_escalation(self, sampling: _StreamSampling, market_data: MarketData, has_violations: bool):
+        """发现违规时切换为完整验证，连续无违规后恢复抽样"""
+        if has_violations:
+            if not sampling.escalated:
+                self.sampling_stats['escalations'] += 1
+                logger.warning(f"发现数据违规，切换为完整验证: {market_data.exchange} {market_data.market_type}")
+            sampling.escalated = True
+            sampling.clean_ticks = 0
+        elif sampling.escalated:
+            sampling.clean_ticks += 1
+            if sampling.clean_ticks >= self.escalation_clean_ticks:
+                sampling.escalated = False
+                sampling.clean_ticks = 0
+                logger.info(f"数据恢复正常，恢复抽样验证: {market_data.exchange} {market_data.market_type}")
+    
     async def validate_market_data_isolation(
         self, 
         market_data: MarketData, 
         expected_market_type: str
     ) -> ValidationResult:
-        """验证市场数据隔离"""
-        validation_start = time.time()
-        violations = []
+        """
+        验证市场数据隔离
+        
+        抽样模式下未被抽中的行情不做检查，直接返回 VALID；
+        抽中的行情无违规时只更新统计，不生成验证记录和数据哈希
+        """
+        validation_start = time.perf_counter()
         
         try:
-            # 1. 检查市场类型一致性
-            if market_data.market_type != expected_market_type:
-                violations.append(f"市场类型不匹配: 期望 {expected_market_type}, 实际 {market_data.market_type}")
-            
-            # 2. 检查缓存命名空间隔离
-            await self._validate_cache_isolation(market_data, violations)
-            
-            # 3. 检查数据完整性
-            await self._validate_data_integrity(market_data, violations)
-            
-            # 4. 检查时间戳有效性
-            await self._validate_timestamp(market_data, violations)
-            
-            # 5. 检查价格合理性
-            await self._validate_price_reasonableness(market_data, violations)
-            
-            # 6. 检查符号格式
-            await self._validate_symbol_format(market_data, violations)
-            
-            # 7. 检查交易所一致性
-            await self._validate_exchange_consistency(market_data, violations)
-            
-            # 生成数据哈希
-            data_hash = self._generate_data_hash(market_data)
-            
-            # 记录验证结果
-            validation_time = (time.time() - validation_start) * 1000
-            record = DataValidationRecord(
-                symbol=market_data.symbol,
-                exchange=market_data.exchange,
-                market_type=market_data.market_type,
-                timestamp=datetime.now(timezone.utc),
-                data_hash=data_hash,
-                validation_result=self._determine_validation_result(violations),
-                violations=violations,
-                processing_time_ms=validation_time
-            )
-            
-            # 存储验证记录
-            key = f"{market_data.exchange}_{market_data.market_type}_{market_data.symbol}"
-            self.validation_cache[key].append(record)
+            sampling = None
+            if self.validation_mode == ValidationMode.SAMPLED:
+                sampling = self._get_stream_sampling(market_data.exchange, market_data.market_type)
+                if not sampling.escalated:
+                    sampling.ticks += 1
+                    if sampling.ticks % sampling.sample_every:
+                        self.sampling_stats['skipped_ticks'] += 1
+                        return ValidationResult.VALID
+            
+            violations = self.check_market_data(market_data, expected_market_type)
+            result = self._determine_validation_result(violations)
             
             # 更新统计
             self.total_validations += 1
-            if record.validation_result == ValidationResult.VALID:
+            if result == ValidationResult.VALID:
                 self.valid_count += 1
-            elif record.validation_result == ValidationResult.WARNING:
+            elif result == ValidationResult.WARNING:
                 self.warning_count += 1
             else:
                 self.invalid_count += 1
             
-            # 处理违规情况
-            if violations:
-                await self._handle_validation_violations(market_data, violations)
-            
-            logger.debug(f"数据验证完成: {market_data.symbol} {market_data.market_type} - {record.validation_result.value}")
+            if sampling is not None:
+                self._update_escalation(sampling, market_data, bool(violations))
+            
+            # 完整验证或存在违规时记录验证结果
+            if violations or sampling is None or sampling.escalated:
+                messages = [format_violation(violation) for violation in violations]
+                record = DataValidationRecord(
+                    symbol=market_data.symbol,
+                    exchange=market_data.exchange,
+                    market_type=market_data.market_type,
+                    timestamp=datetime.now(timezone.utc),
+                    data_hash=self._generate_data_hash(market_data),
+                    validation_result=result,
+                    violations=messages,
+                    processing_time_ms=(time.perf_counter() - validation_start) * 1000,
+                    violation_codes=[code for code, _ in violations]
+                )
+                
+                # 存储验证记录
+                key = f"{market_data.exchange}_{market_data.market_type}_{market_data.symbol}"
+                self.validation_cache[key].append(record)
+                
+                # 处理违规情况
+                if violations:
+                    await self._handle_validation_violations(market_data, messages, record.violation_codes)
+                
+                logger.debug(f"数据验证完成: {market_data.symbol} {market_data.market_type} - {result.value}")
             
-            return record.validation_result
+            self.sampling_stats['validation_seconds'] += time.perf_counter() - validation_start
+            return result
             
         except Exception as e:
             logger.error(f"数据验证异常: {e}")
@@ -231,125 +491,22 @@ class DataIsolationValidator:
             
             # 记录验证错误
             error_record = DataValidationRecord(
-                symbol=market_data.symbol,
-                exchange=market_data.exchange,
-                market_type=market_data.market_type,
+                symbol=getattr(market_data, 'symbol', None),
+                exchange=getattr(market_data, 'exchange', None),
+                market_type=getattr(market_data, 'market_type', None),
                 timestamp=datetime.now(timezone.utc),
                 data_hash="",
                 validation_result=ValidationResult.ERROR,
-                violations=[f"验证异常: {str(e)}"],
-                processing_time_ms=(time.time() - validation_start) * 1000
+                violations=[format_violation((ViolationCode.VALIDATION_EXCEPTION, (e,)))],
+                processing_time_ms=(time.perf_counter() - validation_start) * 1000,
+                violation_codes=[ViolationCode.VALIDATION_EXCEPTION]
             )
             
-            key = f"{market_data.exchange}_{market_data.market_type}_{market_data.symbol}"
+            key = f"{error_record.exchange}_{error_record.market_type}_{error_record.symbol}"
             self.validation_cache[key].append(error_record)
             
             return ValidationResult.ERROR
     
-    async def _validate_cache_isolation(self, market_data: MarketData, violations: List[str]):
-        """验证缓存隔离"""
-        if not self.isolation_rules['cache_isolation']['enabled']:
-            return
-        
-        try:
-            # 检查缓存键是否符合命名空间要求
-            expected_namespace = self.cache_namespaces.get(market_data.market_type)
-            if not expected_namespace:
-                violations.append(f"未知市场类型的缓存命名空间: {market_data.market_type}")
-                return
-            
-            # 模拟检查缓存键格式
-            cache_key_pattern = f"{expected_namespace}:{market_data.exchange}:{market_data.symbol}"
-            
-            # 检查是否与期货数据冲突（如果这是现货数据）
-            if market_data.market_type == 'spot':
-                futures_namespace = self.cache_namespaces['futures']
-                futures_key_pattern = f"{futures_namespace}:{market_data.exchange}:{market_data.symbol}"
-                
-                # 这里应该检查实际缓存实现是否正确隔离
-                # 目前只是验证逻辑
-                
-            logger.debug(f"缓存隔离验证: {cache_key_pattern}")
-            
-        except Exception as e:
-            violations.append(f"缓存隔离验证失败: {e}")
-    
-    async def _validate_data_integrity(self, market_data: MarketData, violations: List[str]):
-        """验证数据完整性"""
-        required_fields = [
-            'symbol', 'current_price', 'volume_24h', 'timestamp', 'exchange', 'market_type'
-        ]
-        
-        for field in required_fields:
-            if not hasattr(market_data, field) or getattr(market_data, field) is None:
-                violations.append(f"缺失必需字段: {field}")
-        
-        # 检查数值合理性
-        if hasattr(market_data, 'current_price') and market_data.current_price <= 0:
-            violations.append(f"价格不合理: {market_data.current_price}")
-        
-        if hasattr(market_data, 'volume_24h') and market_data.volume_24h < 0:
-            violations.append(f"交易量不合理: {market_data.volume_24h}")
-    
-    async def _validate_timestamp(self, market_data: MarketData, violations: List[str]):
-        """验证时间戳"""
-        if not hasattr(market_data, 'timestamp'):
-            violations.append("缺失时间戳")
-            return
-        
-        now = datetime.now(timezone.utc)
-        time_diff = abs((now - market_data.timestamp).total_seconds())
-        
-        if time_diff > self.max_data_age_seconds:
-            violations.append(f"数据过于陈旧: 相差 {time_diff:.1f} 秒")
-        
-        if market_data.timestamp > now:
-            violations.append("时间戳在未来")
-    
-    async def _validate_price_reasonableness(self, market_data: MarketData, violations: List[str]):
-        """验证价格合理性"""
-        if not hasattr(market_data, 'current_price'):
-            return
-        
-        # 检查价格是否在合理范围内
-        if market_data.current_price < 0.000001:  # 小于最小单位
-            violations.append(f"价格过低: {market_data.current_price}")
-        elif market_data.current_price > 1000000:  # 大于100万
-            violations.append(f"价格过高: {market_data.current_price}")
-    
-    async def _validate_symbol_format(self, market_data: MarketData, violations: List[str]):
-        """验证符号格式"""
-        symbol = market_data.symbol
-        
-        if market_data.market_type == 'spot':
-            # 现货符号格式：BTCUSDT, ETHUSDT 等
-            if not symbol.endswith('USDT') and not symbol.endswith('BTC') and not symbol.endswith('ETH'):
-                violations.append(f"现货符号格式不正确: {symbol}")
-        elif market_data.market_type == 'futures':
-            # 期货符号格式：BTCUSDT-PERP, BTC230929 等
-            if not ('-PERP' in symbol or '-' in symbol):
-                violations.append(f"期货符号格式不正确: {symbol}")
-    
-    async def _validate_exchange_consistency(self, market_data: MarketData, violations: List[str]):
-        """验证交易所一致性"""
-        # 检查交易所名称是否在预期范围内
-        valid_exchanges = ['binance', 'okx', 'bybit', 'huobi']
-        
-        if market_data.exchange not in valid_exchanges:
-            violations.append(f"未知的交易所: {market_data.exchange}")
-        
-        # 检查市场类型与交易所的兼容性
-        exchange_support = {
-            'binance': ['spot', 'futures'],
-            'okx': ['spot', 'futures'],
-            'bybit': ['spot', 'futures'],
-            'huobi': ['spot']
-        }
-        
-        supported_markets = exchange_support.get(market_data.exchange, [])
-        if market_data.market_type not in supported_markets:
-            violations.append(f"{market_data.exchange} 不支持 {market_data.market_type} 市场")
-    
     def _generate_data_hash(self, market_data: MarketData) -> str:
         """生成数据哈希"""
         # 创建数据的字符串表示
@@ -358,23 +515,26 @@ class DataIsolationValidator:
         # 生成MD5哈希
         return hashlib.md5(data_str.encode()).hexdigest()
     
-    def _determine_validation_result(self, violations: List[str]) -> ValidationResult:
+    def _determine_validation_result(self, violations: List[Violation]) -> ValidationResult:
         """确定验证结果"""
         if not violations:
             return ValidationResult.VALID
         
-        # 根据违规数量和严重程度决定结果
-        critical_violations = [v for v in violations if '缺失' in v or '异常' in v]
-        warning_violations = [v for v in violations if '过于' in v or '格式' in v]
-        
-        if critical_violations:
+        # 根据违规严重程度决定结果
+        codes = {code for code, _ in violations}
+        if codes & CRITICAL_VIOLATIONS:
             return ValidationResult.INVALID
-        elif warning_violations:
+        elif codes & WARNING_VIOLATIONS:
             return ValidationResult.WARNING
         else:
             return ValidationResult.INVALID
     
-    async def _handle_validation_violations(self, market_data: MarketData, violations: List[str]):
+    async def _handle_validation_violations(
+        self,
+        market_data: MarketData,
+        violations: List[str],
+        codes: List[ViolationCode]
+    ):
         """处理验证违规"""
         # 创建违规记录
         violation = IsolationViolation(
@@ -382,7 +542,7 @@ class DataIsolationValidator:
             violation_type="data_validation",
             symbol=market_data.symbol,
             description=f"数据验证违规: {violations}",
-            severity="high" if any('缺失' in v or '异常' in v for v in violations) else "medium",
+            severity="high" if CRITICAL_VIOLATIONS.intersection(codes) else "medium",
             timestamp=datetime.now(timezone.utc)
         )
         
@@ -483,6 +643,10 @@ class DataIsolationValidator:
     def get_validation_statistics(self) -> Dict[str, Any]:
         """获取验证统计信息"""
         success_rate = (self.valid_count / self.total_validations * 100) if self.total_validations > 0 else 0
+        avg_validation_us = (
+            self.sampling_stats['validation_seconds'] / self.total_validations * 1e6
+            if self.total_validations > 0 else 0
+        )
         
         return {
             "total_validations": self.total_validations,
@@ -491,6 +655,11 @@ class DataIsolationValidator:
             "warning_count": self.warning_count,
             "success_rate": success_rate,
             "isolation_level": self.isolation_level.value,
+            "validation_mode": self.validation_mode.value,
+            "skipped_ticks": self.sampling_stats['skipped_ticks'],
+            "escalations": self.sampling_stats['escalations'],
+            "escalated_streams": sum(1 for sampling in self.stream_sampling.values() if sampling.escalated),
+            "avg_validation_us": avg_validation_us,
             "active_violations": len(self.get_isolation_violations(1)),  # 过去1小时的违规
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
@@ -4,10 +4,11 @@
 """
 
 import asyncio
+import heapq
 import json
 import time
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Any, Set, Callable
+from typing import Dict, List, Optional, Any, Set, Callable, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 from collections import defaultdict, deque
@@ -18,6 +19,7 @@ import structlog
 from ..adapters.base import BaseExchangeAdapter
 from ..core.market_analyzer import HealthStatus, HealthCheckResult, PerformanceMetrics, AlertEvent, AlertLevel
 from ..storage.redis_cache import get_market_cache
+from .ws_client_manager import get_ws_client_manager
 
 logger = structlog.get_logger(__name__)
 
@@ -80,14 +82,33 @@ class ExchangeStatusManager:
         self.status_subscribers: Set[Callable] = set()
         
         # 状态监控配置
-        self.heartbeat_interval = 30  # 秒
-        self.status_check_interval = 10  # 秒
+        self.status_check_interval = 10  # 秒，新连接的初始探测间隔
+        self.min_probe_interval = 5  # 秒，探测失败后的间隔
+        self.max_probe_interval = 120  # 秒，持续健康时的最长间隔
+        self.probe_timeout = 5  # 秒，单次健康探测超时
         self.connection_timeout = 30  # 秒
         self.reconnect_delay = 5  # 秒
         
-        # 统计信息
+        # 健康探测调度：(到期时间, 连接) 小顶堆，单一调度任务并发执行到期探测
+        self.adapters: Dict[str, BaseExchangeAdapter] = {}
+        self.probe_schedule: List[Tuple[float, str]] = []
+        self.next_probe_at: Dict[str, float] = {}
+        self.probe_intervals: Dict[str, float] = {}
+        self.probe_tasks: Dict[str, asyncio.Task] = {}
+        self.last_traffic: Dict[str, float] = {}
+        self._probe_wakeup = asyncio.Event()
+        
+        # 统计信息（随状态变化增量维护）
         self.total_connection_time = defaultdict(float)
         self.uptime_statistics = defaultdict(lambda: {'total_time': 0, 'up_time': 0})
+        self.status_counts: Dict[ConnectionStatus, int] = defaultdict(int)
+        self.total_errors = 0
+        self.probe_stats = {
+            'probes': 0,
+            'probe_failures': 0,
+            'probe_timeouts': 0,
+            'implicit_heartbeats': 0
+        }
         
         # 缓存管理器
         self.cache_manager = get_market_cache()
@@ -105,17 +126,22 @@ class ExchangeStatusManager:
         
         self.monitoring_active = True
         
-        # 初始化连接状态
-        for adapter_key, adapter in adapters.items():
-            exchange, market_type = adapter_key.split('_', 1)
-            await self._initialize_connection(exchange, market_type, adapter)
+        # WebSocket消息作为隐式心跳
+        ws_manager = await get_ws_client_manager()
+        ws_manager.set_traffic_callback(self.record_traffic)
         
-        # 启动监控任务
-        heartbeat_task = asyncio.create_task(self._heartbeat_loop())
-        status_task = asyncio.create_task(self._status_check_loop())
+        # 并发初始化连接状态
+        self.adapters.update(adapters)
+        await asyncio.gather(*(
+            self._initialize_connection(*adapter_key.split('_', 1), adapter)
+            for adapter_key, adapter in adapters.items()
+        ))
         
-        self.monitor_tasks['heartbeat'] = heartbeat_task
-        self.monitor_tasks['status'] = status_task
+        for connection_key in self.connections:
+            self._schedule_probe(connection_key, self.status_check_interval)
+        
+        # 启动监控任务
+        self.monitor_tasks['scheduler'] = asyncio.create_task(self._probe_scheduler_loop())
         
         logger.info("交易所状态监控已启动")
     
@@ -126,8 +152,12 @@ class ExchangeStatusManager:
         
         self.monitoring_active = False
         
-        # 取消监控任务
-        for task in self.monitor_tasks.values():
+        ws_manager = await get_ws_client_manager()
+        if ws_manager.traffic_callback == self.record_traffic:
+            ws_manager.set_traffic_callback(None)
+        
+        # 取消监控任务和进行中的探测
+        for task in [*self.monitor_tasks.values(), *self.probe_tasks.values()]:
             task.cancel()
             try:
                 await task
@@ -135,6 +165,9 @@ class ExchangeStatusManager:
                 pass
         
         self.monitor_tasks.clear()
+        self.probe_tasks.clear()
+        self.probe_schedule.clear()
+        self.next_probe_at.clear()
         
         logger.info("交易所状态监控已停止")
     
@@ -146,7 +179,7 @@ class ExchangeStatusManager:
         try:
             connection_status = ConnectionStatus.CONNECTING
             
-            if await adapter.is_healthy():
+            if await asyncio.wait_for(adapter.is_healthy(), self.probe_timeout):
                 connection_status = ConnectionStatus.CONNECTED
             else:
                 connection_status = ConnectionStatus.DISCONNECTED
@@ -164,7 +197,7 @@ class ExchangeStatusManager:
                 last_heartbeat=datetime.now(timezone.utc)
             )
             
-            self.connections[connection_key] = connection_info
+            self._set_connection(connection_key, connection_info)
             
             # 记录连接状态历史
             self._record_status_change(connection_key, connection_status)
@@ -178,78 +211,135 @@ class ExchangeStatusManager:
                 exchange=exchange,
                 market_type=market_type,
                 connection_status=ConnectionStatus.FAILED,
-                api_status={'error': str(e)},
+                api_status={'error': str(e) or type(e).__name__},
                 connection_time=datetime.now(timezone.utc)
             )
             
-            self.connections[connection_key] = connection_info
+            self._set_connection(connection_key, connection_info)
+    
+    def _set_connection(self, connection_key: str, connection_info: ExchangeConnectionInfo):
+        """登记连接信息并维护状态计数"""
+        previous = self.connections.get(connection_key)
+        if previous is not None:
+            self.status_counts[previous.connection_status] -= 1
+            self.total_errors -= previous.error_count
+        
+        self.connections[connection_key] = connection_info
+        self.status_counts[connection_info.connection_status] += 1
+        self.total_errors += connection_info.error_count
+        self.uptime_statistics[connection_key]['last_update_time'] = time.time()
     
-    async def _heartbeat_loop(self):
-        """心跳循环"""
+    def record_traffic(self, exchange: str, market_type: str):
+        """
+        记录连接上的WebSocket流量
+        
+        流量视为隐式心跳：探测到期时如果本周期内已有流量，健康连接无需额外探测
+        """
+        self.last_traffic[f"{exchange}_{market_type}"] = time.monotonic()
+    
+    def _schedule_probe(self, connection_key: str, interval: float):
+        """安排下一次健康探测"""
+        due_at = time.monotonic() + interval
+        self.probe_intervals[connection_key] = interval
+        self.next_probe_at[connection_key] = due_at
+        heapq.heappush(self.probe_schedule, (due_at, connection_key))
+        self._probe_wakeup.set()
+    
+    async def _probe_scheduler_loop(self):
+        """健康探测调度循环"""
         try:
             while self.monitoring_active:
-                await self._send_heartbeats()
-                await asyncio.sleep(self.heartbeat_interval)
+                self._probe_wakeup.clear()
+                now = time.monotonic()
+                
+                while self.probe_schedule and self.probe_schedule[0][0] <= now:
+                    due_at, connection_key = heapq.heappop(self.probe_schedule)
+                    # 被重新安排过的旧条目直接丢弃
+                    if self.next_probe_at.get(connection_key) != due_at:
+                        continue
+                    del self.next_probe_at[connection_key]
+                    self._dispatch_probe(connection_key, now)
+                
+                delay = self.probe_schedule[0][0] - now if self.probe_schedule else self.max_probe_interval
+                try:
+                    await asyncio.wait_for(self._probe_wakeup.wait(), max(delay, 0))
+                except asyncio.TimeoutError:
+                    pass
                 
         except asyncio.CancelledError:
-            logger.info("心跳任务已取消")
+            logger.info("健康探测调度任务已取消")
         except Exception as e:
-            logger.error(f"心跳循环错误: {e}")
+            logger.error(f"健康探测调度错误: {e}")
+    
+    def _dispatch_probe(self, connection_key: str, now: float):
+        """处理到期的连接：有流量的健康连接直接续期，否则启动并发探测"""
+        connection_info = self.connections.get(connection_key)
+        if connection_info is None or connection_key in self.probe_tasks:
+            return
+        
+        interval = self.probe_intervals.get(connection_key, self.status_check_interval)
+        traffic_at = self.last_traffic.get(connection_key)
+        if (connection_info.connection_status == ConnectionStatus.CONNECTED
+                and traffic_at is not None and now - traffic_at <= interval):
+            connection_info.last_heartbeat = datetime.now(timezone.utc)
+            self.probe_stats['implicit_heartbeats'] += 1
+            self._schedule_probe(connection_key, min(interval * 2, self.max_probe_interval))
+            return
+        
+        self.probe_tasks[connection_key] = asyncio.create_task(self._probe_connection(connection_key))
     
-    async def _status_check_loop(self):
-        """状态检查循环"""
+    async def _probe_connection(self, connection_key: str):
+        """执行单个连接的健康探测（带超时）"""
+        started = time.monotonic()
+        reason = "连接健康检查失败"
         try:
-            while self.monitoring_active:
-                await self._check_connection_status()
-                await asyncio.sleep(self.status_check_interval)
-                
-        except asyncio.CancelledError:
-            logger.info("状态检查任务已取消")
+            adapter = self.adapters.get(connection_key)
+            probe = adapter.is_healthy() if adapter is not None else self._check_connection_health(connection_key)
+            healthy = bool(await asyncio.wait_for(probe, self.probe_timeout))
+        except asyncio.TimeoutError:
+            healthy, reason = False, "健康检查超时"
+            self.probe_stats['probe_timeouts'] += 1
         except Exception as e:
-            logger.error(f"状态检查循环错误: {e}")
-    
-    async def _send_heartbeats(self):
-        """发送心跳"""
-        for connection_key, connection_info in self.connections.items():
-            try:
-                # 模拟心跳发送
-                connection_info.last_heartbeat = datetime.now(timezone.utc)
-                
-                # 检查心跳超时
-                heartbeat_age = (datetime.now(timezone.utc) - connection_info.last_heartbeat).total_seconds()
-                if heartbeat_age > self.connection_timeout:
-                    await self._handle_heartbeat_timeout(connection_key, connection_info)
-                
-            except Exception as e:
-                logger.error(f"心跳发送失败 {connection_key}: {e}")
+            healthy, reason = False, f"健康检查异常: {e}"
+        finally:
+            self.probe_tasks.pop(connection_key, None)
+        
+        self.probe_stats['probes'] += 1
+        try:
+            await self._apply_probe_result(connection_key, healthy, reason, (time.monotonic() - started) * 1000)
+        except Exception as e:
+            logger.error(f"连接状态检查失败 {connection_key}: {e}")
     
-    async def _handle_heartbeat_timeout(self, connection_key: str, connection_info: ExchangeConnectionInfo):
-        """处理心跳超时"""
-        if connection_info.connection_status != ConnectionStatus.DISCONNECTED:
-            logger.warning(f"心跳超时: {connection_key}")
-            
-            # 更新连接状态
-            await self._update_connection_status(connection_key, ConnectionStatus.DISCONNECTED, "心跳超时")
-            
-            # 尝试重连
-            if connection_info.reconnect_attempts < 5:
-                asyncio.create_task(self._attempt_reconnection(connection_key))
+    async def _apply_probe_result(self, connection_key: str, healthy: bool, reason: str, latency_ms: float):
+        """根据探测结果更新状态并按结果调整探测间隔"""
+        connection_info = self.connections.get(connection_key)
+        if connection_info is None:
+            return
+        
+        interval = self.probe_intervals.get(connection_key, self.status_check_interval)
+        if healthy:
+            connection_info.last_heartbeat = datetime.now(timezone.utc)
+            connection_info.latency_ms = latency_ms
+            if connection_info.connection_status in (ConnectionStatus.DISCONNECTED, ConnectionStatus.FAILED):
+                await self._update_connection_status(connection_key, ConnectionStatus.CONNECTED, "健康检查恢复")
+            # 持续健康时逐步放慢
+            interval = min(interval * 2, self.max_probe_interval)
+        else:
+            self.probe_stats['probe_failures'] += 1
+            self._add_errors(connection_info, 1)
+            connection_info.last_error = reason
+            if connection_info.connection_status == ConnectionStatus.CONNECTED:
+                await self._update_connection_status(connection_key, ConnectionStatus.DISCONNECTED, reason)
+            # 异常时加快探测
+            interval = self.min_probe_interval
+        
+        if self.monitoring_active:
+            self._schedule_probe(connection_key, interval)
     
-    async def _check_connection_status(self):
-        """检查连接状态"""
-        for connection_key, connection_info in self.connections.items():
-            try:
-                # 检查连接有效性
-                is_healthy = await self._check_connection_health(connection_key)
-                
-                if not is_healthy and connection_info.connection_status == ConnectionStatus.CONNECTED:
-                    await self._update_connection_status(connection_key, ConnectionStatus.DISCONNECTED, "连接健康检查失败")
-                
-                # 更新统计信息
-                self._update_uptime_statistics(connection_key, connection_info.connection_status)
-                
-            except Exception as e:
-                logger.error(f"连接状态检查失败 {connection_key}: {e}")
+    def _add_errors(self, connection_info: ExchangeConnectionInfo, count: int):
+        """调整连接错误次数并同步错误总数"""
+        connection_info.error_count += count
+        self.total_errors += count
     
     async def _check_connection_health(self, connection_key: str) -> bool:
         """检查连接健康状态"""
@@ -299,7 +389,7 @@ class ExchangeStatusManager:
             if connection_success:
                 await self._update_connection_status(connection_key, ConnectionStatus.CONNECTED, "重连成功")
                 connection_info.reconnect_attempts = 0
-                connection_info.error_count = 0
+                self._add_errors(connection_info, -connection_info.error_count)
                 logger.info(f"重连成功: {connection_key}")
             else:
                 await self._update_connection_status(connection_key, ConnectionStatus.FAILED, "重连失败")
@@ -317,6 +407,9 @@ class ExchangeStatusManager:
         
         old_status = connection_info.connection_status
         connection_info.connection_status = status
+        self.status_counts[old_status] -= 1
+        self.status_counts[status] += 1
+        self._accumulate_uptime(connection_key, old_status)
         
         if reason:
             connection_info.last_error = reason
@@ -351,22 +444,32 @@ class ExchangeStatusManager:
             except Exception as e:
                 logger.error(f"状态变化通知失败: {e}")
     
-    def _update_uptime_statistics(self, connection_key: str, status: ConnectionStatus):
-        """更新运行时间统计"""
+    def _accumulate_uptime(self, connection_key: str, old_status: ConnectionStatus):
+        """状态变化时累计上一段状态的持续时间"""
         stats = self.uptime_statistics[connection_key]
         current_time = time.time()
+        elapsed = current_time - stats.get('last_update_time', current_time)
         
-        # 如果状态已连接，记录运行时间
-        if status == ConnectionStatus.CONNECTED:
-            if not hasattr(stats, 'last_update_time'):
-                stats['last_update_time'] = current_time
-            
-            time_delta = current_time - stats['last_update_time']
-            stats['up_time'] += time_delta
-        
-        stats['total_time'] += self.status_check_interval
+        stats['total_time'] += elapsed
+        if old_status == ConnectionStatus.CONNECTED:
+            stats['up_time'] += elapsed
         stats['last_update_time'] = current_time
     
+    def _uptime_percentage(self, connection_key: str) -> Optional[float]:
+        """运行时间百分比，包含当前尚未结束的状态段"""
+        stats = self.uptime_statistics.get(connection_key)
+        if not stats or 'last_update_time' not in stats:
+            return None
+        
+        elapsed = time.time() - stats['last_update_time']
+        total_time = stats['total_time'] + elapsed
+        up_time = stats['up_time']
+        connection_info = self.connections.get(connection_key)
+        if connection_info and connection_info.connection_status == ConnectionStatus.CONNECTED:
+            up_time += elapsed
+        
+        return (up_time / total_time) * 100 if total_time > 0 else None
+    
     async def get_connection_status(self, exchange: str, market_type: str) -> Optional[ExchangeConnectionInfo]:
         """获取连接状态"""
         connection_key = f"{exchange}_{market_type}"
@@ -415,9 +518,8 @@ class ExchangeStatusManager:
         # 计算运行时间百分比
         uptime_percentages = []
         for connection_key in [f"{exchange}_spot", f"{exchange}_futures"]:
-            stats = self.uptime_statistics.get(connection_key)
-            if stats and stats['total_time'] > 0:
-                uptime = (stats['up_time'] / stats['total_time']) * 100
+            uptime = self._uptime_percentage(connection_key)
+            if uptime is not None:
                 uptime_percentages.append(uptime)
         
         avg_uptime = sum(uptime_percentages) / len(uptime_percentages) if uptime_percentages else 0
@@ -441,7 +543,7 @@ class ExchangeStatusManager:
             uptime_percentage=avg_uptime,
             error_count=total_errors,
             performance_score=performance_score,
-            active_connections=sum(1 for conn in self.connections.values() if conn.connection_status == ConnectionStatus.CONNECTED)
+            active_connections=self.status_counts[ConnectionStatus.CONNECTED]
         )
     
     def _calculate_status_score(self, status: ConnectionStatus) -> float:
@@ -512,20 +614,15 @@ class ExchangeStatusManager:
     async def get_connection_statistics(self) -> Dict[str, Any]:
         """获取连接统计信息"""
         total_connections = len(self.connections)
-        connected_count = sum(1 for conn in self.connections.values() if conn.connection_status == ConnectionStatus.CONNECTED)
-        disconnected_count = sum(1 for conn in self.connections.values() if conn.connection_status == ConnectionStatus.DISCONNECTED)
-        failed_count = sum(1 for conn in self.connections.values() if conn.connection_status == ConnectionStatus.FAILED)
-        
-        avg_uptime = 0
-        if self.uptime_statistics:
-            uptimes = []
-            for stats in self.uptime_statistics.values():
-                if stats['total_time'] > 0:
-                    uptime = (stats['up_time'] / stats['total_time']) * 100
-                    uptimes.append(uptime)
-            avg_uptime = sum(uptimes) / len(uptimes) if uptimes else 0
+        connected_count = self.status_counts[ConnectionStatus.CONNECTED]
+        disconnected_count = self.status_counts[ConnectionStatus.DISCONNECTED]
+        failed_count = self.status_counts[ConnectionStatus.FAILED]
         
-        total_errors = sum(conn.error_count for conn in self.connections.values())
+        uptimes = [
+            uptime for uptime in map(self._uptime_percentage, self.connections)
+            if uptime is not None
+        ]
+        avg_uptime = sum(uptimes) / len(uptimes) if uptimes else 0
         
         return {
             "total_connections": total_connections,
@@ -534,8 +631,13 @@ class ExchangeStatusManager:
             "failed_count": failed_count,
             "connection_rate": (connected_count / total_connections * 100) if total_connections > 0 else 0,
             "average_uptime_percentage": avg_uptime,
-            "total_errors": total_errors,
+            "total_errors": self.total_errors,
             "monitoring_active": self.monitoring_active,
+            "probe_statistics": {
+                **self.probe_stats,
+                "scheduled": len(self.next_probe_at),
+                "in_flight": len(self.probe_tasks)
+            },
             "last_update": datetime.now(timezone.utc).isoformat()
         }
     
@@ -13,9 +13,9 @@ from contextlib import asynccontextmanager
 import structlog
 import websockets
 from websockets.client import connect as ws_connect
-from websockets.exceptions import ConnectionClosed, InvalidStatusCode, TimeoutError
+from websockets.exceptions import ConnectionClosed, InvalidStatusCode
 
-from ..adapters.base import MarketData, OrderBook, Trade, Exchange
+from ..adapters.base import MarketData, OrderBook, Trade
 from ..utils.exceptions import WebSocketError
 
 logger = structlog.get_logger(__name__)
@@ -34,6 +34,9 @@ class WebSocketClientManager:
         # 回调函数
         self.data_callbacks: Dict[str, List[Callable]] = {}
         
+        # 连接流量回调 (exchange, market_type)，由交易所状态管理器设置为隐式心跳
+        self.traffic_callback: Optional[Callable[[str, str], None]] = None
+        
         # 期货专用WebSocket管理器
         self.futures_ws_manager = FuturesWebSocketManager(self)
         
@@ -132,7 +135,10 @@ class WebSocketClientManager:
                 subscription_id=subscription_id,
                 ws_url=ws_url,
                 auto_reconnect=subscription.auto_reconnect,
-                data_callbacks=self.data_callbacks.get(subscription_id, [])
+                data_callbacks=self.data_callbacks.get(subscription_id, []),
+                exchange=subscription.exchange,
+                market_type=subscription.market_type,
+                traffic_callback=self.record_traffic
             )
             
             self.connections[subscription_id] = connection
@@ -160,6 +166,20 @@ class WebSocketClientManager:
             self.stats["active_connections"] -= 1
             logger.info(f"连接已关闭: {subscription_id}")
     
+    def set_traffic_callback(self, callback: Optional[Callable[[str, str], None]]):
+        """设置连接流量回调，None表示取消"""
+        self.traffic_callback = callback
+    
+    def record_traffic(self, exchange: str, market_type: str):
+        """把连接上的流量转给流量回调，回调异常只记录日志"""
+        callback = self.traffic_callback
+        if callback is None:
+            return
+        try:
+            callback(exchange, market_type)
+        except Exception as e:
+            logger.debug(f"登记连接流量失败 {exchange}_{market_type}: {e}")
+    
     def _get_websocket_url(
         self, 
         exchange: str, 
@@ -282,12 +302,18 @@ class WebSocketConnection:
         subscription_id: str,
         ws_url: str,
         data_callbacks: List[Callable],
-        auto_reconnect: bool = True
+        auto_reconnect: bool = True,
+        exchange: Optional[str] = None,
+        market_type: Optional[str] = None,
+        traffic_callback: Optional[Callable[[str, str], None]] = None
     ):
         self.subscription_id = subscription_id
         self.ws_url = ws_url
         self.data_callbacks = data_callbacks
         self.auto_reconnect = auto_reconnect
+        self.exchange = exchange
+        self.market_type = market_type
+        self.traffic_callback = traffic_callback
         
         # 连接状态
         self.is_connected = False
@@ -378,6 +404,13 @@ class WebSocketConnection:
     async def _process_message(self, message: str):
         """处理消息"""
         
+        # 收到的每条消息都说明连接存活，回调失败不影响消息处理
+        if self.traffic_callback and self.exchange and self.market_type:
+            try:
+                self.traffic_callback(self.exchange, self.market_type)
+            except Exception as e:
+                logger.debug(f"登记连接流量失败 {self.subscription_id}: {e}")
+        
         try:
             # 解析JSON消息
             data = json.loads(message)
@@ -523,11 +556,6 @@ async def shutdown_ws_client_manager():
         _ws_client_manager = None
 
 
-if __name__ == "__main__":
-    # 测试WebSocket客户端管理器
-    import asyncio
-    
-    async def test_ws_client_manager():
 class FuturesWebSocketManager:
     """期货专用WebSocket管理器 - 专门处理期货市场的实时数据连接"""
     
@@ -708,6 +736,7 @@ class FuturesWebSocketManager:
                 return
             
             async for message in connection.message_stream:
+                self.main_manager.record_traffic(exchange, "futures")
                 try:
                     # 解析期货数据
                     futures_data = self._parse_futures_message(message, exchange)
@@ -972,6 +1001,8 @@ _add_futures_cleanup_to_main_manager()
 # 更新测试代码
 if __name__ == "__main__":
     print("测试WebSocket客户端管理器...")
+    
+    async def test_ws_client_manager():
         
         try:
             manager = await get_ws_client_manager()
@@ -19,8 +19,16 @@ from prometheus_client import Counter, Histogram, generate_latest
 from .config import settings
 from .storage.database import init_database, close_database, get_db_session
 from .storage.redis_cache import init_redis, close_redis
-from .api.routes import market, trading, user, system, order_history, risk_alerts, emergency_stop, reports
-from .utils.logging import setup_logging
+from .storage.write_behind import WriteDurability, start_write_behind_writer, stop_write_behind_writer
+from .notification.channels.connection_pool import close_connection_pools
+from .api.features import (
+    resolve_features,
+    include_feature_routers,
+    set_enabled_features,
+    get_enabled_features,
+    is_feature_enabled
+)
+from .utils.logging import setup_logging, shutdown_logging
 from .utils.exceptions import (
     ExchangeConnectionError,
     InsufficientFundsError,
@@ -56,6 +64,16 @@ async def lifespan(app: FastAPI):
         else:
             logger.warning("⚠️ Redis连接失败，将使用内存缓存")
         
+        # 启动批量写回服务
+        if settings.WRITE_BEHIND_ENABLED:
+            logger.info("🗄️ 启动批量写回服务")
+            await start_write_behind_writer(
+                max_queue_size=settings.WRITE_BEHIND_QUEUE_SIZE,
+                batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+                flush_interval=settings.WRITE_BEHIND_FLUSH_INTERVAL,
+                durability=WriteDurability(settings.WRITE_BEHIND_DURABILITY)
+            )
+        
         # 验证环境配置
         logger.info("🔧 验证环境配置")
         if not settings.validate_environment():
@@ -81,6 +99,10 @@ async def lifespan(app: FastAPI):
     logger.info("🛑 关闭加密货币交易终端后端服务")
     
     try:
+        # 写出缓冲区中剩余的行（需在关闭数据库连接之前）
+        logger.info("🗄️ 停止批量写回服务")
+        await stop_write_behind_writer()
+        
         # 关闭数据库连接
         logger.info("📊 关闭数据库连接")
         close_database()
@@ -89,6 +111,16 @@ async def lifespan(app: FastAPI):
         logger.info("💾 关闭Redis连接")
         await close_redis()
         
+        # 关闭通知渠道连接池
+        logger.info("📨 关闭通知渠道连接池")
+        await close_connection_pools()
+        
+        # 停止报表渲染进程
+        if is_feature_enabled("reports"):
+            logger.info("📄 停止报表渲染进程")
+            from .api.routes.reports import shutdown_report_generator
+            await shutdown_report_generator()
+        
         # 关闭数据服务
         logger.info("📡 关闭市场数据服务")
         # TODO: 关闭市场数据服务
@@ -101,6 +133,9 @@ async def lifespan(app: FastAPI):
         
     except Exception as e:
         logger.error(f"❌ 应用关闭错误: {e}")
+    finally:
+        # 写出队列中剩余的日志
+        shutdown_logging()
 
 
 # 创建FastAPI应用实例
@@ -406,6 +441,7 @@ async def root():
         "docs": "/docs",
         "redoc": "/redoc",
         "health": "/health",
+        "features": get_enabled_features(),
         "status": "running"
     }
 
@@ -417,15 +453,8 @@ async def get_metrics():
     return Response(generate_latest(), media_type="text/plain")
 
 
-# API路由注册
-app.include_router(market.router, prefix="/api/v1/market", tags=["market"])
-app.include_router(trading.router, prefix="/api/v1/trading", tags=["trading"])
-app.include_router(user.router, prefix="/api/v1/user", tags=["user"])
-app.include_router(system.router, prefix="/api/v1/system", tags=["system"])
-app.include_router(order_history.router, prefix="/api/v1/order-history", tags=["order-history"])
-app.include_router(risk_alerts.router, prefix="/api/v1/risk-alerts", tags=["risk-alerts"])
-app.include_router(emergency_stop.router, prefix="/api/v1/emergency-stop", tags=["emergency-stop"])
-app.include_router(reports.router, prefix="/api/v1/reports", tags=["reports"])
+# API路由注册（只导入启用功能的路由模块）
+set_enabled_features(include_feature_routers(app, resolve_features(settings.ENABLED_FEATURES)))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,317 @@
+"""
+通知渠道连接池
+为HTTP类渠道提供共享的长连接会话，为邮件渠道提供复用的SMTP连接
+"""
+
+import asyncio
+import smtplib
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+
+
+class HTTPSessionPool:
+    """共享的HTTP会话池
+
+    所有HTTP类通知渠道（Telegram、Webhook、Slack、Discord）共用一个
+    ``aiohttp.ClientSession``，底层连接器开启keep-alive，
+    避免每条消息都重新建立TCP/TLS连接。
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+
+        # 连接器配置
+        self.limit = self.config.get("limit", 100)  # 总连接数上限
+        self.limit_per_host = self.config.get("limit_per_host", 20)  # 单主机连接数上限
+        self.keepalive_timeout = self.config.get("keepalive_timeout", 60)  # 秒
+        self.dns_cache_ttl = self.config.get("dns_cache_ttl", 300)  # 秒
+        self.timeout = self.config.get("timeout", 30)  # 秒
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # 统计数据
+        self.stats = {
+            "sessions_created": 0,
+            "sessions_closed": 0,
+            "last_created": None
+        }
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """获取共享会话，首次使用或会话失效时创建"""
+        loop = asyncio.get_running_loop()
+
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._loop = loop
+            self.stats["sessions_created"] += 1
+            self.stats["last_created"] = time.time()
+
+        return self._session
+
+    async def close(self):
+        """关闭共享会话"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            self.stats["sessions_closed"] += 1
+        self._session = None
+        self._loop = None
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取统计数据"""
+        return {
+            "active": self._session is not None and not self._session.closed,
+            "stats": self.stats.copy(),
+            "config": {
+                "limit": self.limit,
+                "limit_per_host": self.limit_per_host,
+                "keepalive_timeout": self.keepalive_timeout
+            }
+        }
+
+
+class SMTPConnectionPool:
+    """复用的SMTP连接
+
+    smtplib是阻塞库，所有网络操作都放在专用的单线程执行器中完成，
+    事件循环只等待结果。连接在多次发送之间保持打开，空闲超过
+    ``idle_timeout`` 后用NOOP探测，断开时自动重连。
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = True,
+        use_ssl: bool = False,
+        timeout: float = 30.0,
+        idle_timeout: float = 60.0
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+
+        # 单线程执行器保证同一连接上的命令串行执行
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="smtp")
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+        # 统计数据
+        self.stats = {
+            "connections_opened": 0,
+            "reconnects": 0,
+            "messages_sent": 0,
+            "messages_failed": 0
+        }
+
+    # 以下方法只在执行器线程中调用
+
+    def _connect(self):
+        """建立SMTP连接并登录"""
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(
+                self.host, self.port,
+                context=ssl.create_default_context(),
+                timeout=self.timeout
+            )
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            server.ehlo()
+            if self.use_tls:
+                server.starttls(context=ssl.create_default_context())
+                server.ehlo()
+
+        if self.username and self.password:
+            server.login(self.username, self.password)
+
+        self._server = server
+        self.stats["connections_opened"] += 1
+
+    def _disconnect(self):
+        """关闭SMTP连接"""
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                try:
+                    self._server.close()
+                except Exception:
+                    pass
+        self._server = None
+
+    def _ensure_connected(self):
+        """确保连接可用"""
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            # 空闲过久，服务器可能已断开
+            try:
+                code, _ = self._server.noop()
+                if code != 250:
+                    raise smtplib.SMTPServerDisconnected(f"NOOP返回 {code}")
+            except (smtplib.SMTPException, OSError):
+                self._disconnect()
+                self.stats["reconnects"] += 1
+
+        if self._server is None:
+            self._connect()
+
+    def _send_messages_sync(self, messages: List[Message]) -> List[bool]:
+        """在同一连接上依次发送多封邮件"""
+        results = []
+
+        for msg in messages:
+            sent = False
+            for attempt in range(2):  # 连接断开时重连一次
+                try:
+                    self._ensure_connected()
+                    self._server.send_message(msg)
+                    sent = True
+                    break
+                except (smtplib.SMTPServerDisconnected, ConnectionError):
+                    self._disconnect()
+                    self.stats["reconnects"] += 1
+                except (smtplib.SMTPException, OSError) as e:
+                    print(f"SMTP发送失败: {str(e)}")
+                    break
+
+            self._last_used = time.monotonic()
+            if sent:
+                self.stats["messages_sent"] += 1
+            else:
+                self.stats["messages_failed"] += 1
+            results.append(sent)
+
+        return results
+
+    # 异步接口
+
+    async def send_messages(self, messages: List[Message]) -> List[bool]:
+        """异步批量发送邮件，返回每封邮件的发送结果"""
+        if not messages:
+            return []
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._send_messages_sync, list(messages))
+
+    async def send_message(self, msg: Message) -> bool:
+        """异步发送单封邮件"""
+        results = await self.send_messages([msg])
+        return results[0]
+
+    async def close(self):
+        """关闭连接并释放执行器"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._disconnect)
+        self._executor.shutdown(wait=False)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取统计数据"""
+        return {
+            "connected": self._server is not None,
+            "stats": self.stats.copy(),
+            "config": {
+                "host": self.host,
+                "port": self.port,
+                "use_tls": self.use_tls,
+                "use_ssl": self.use_ssl,
+                "idle_timeout": self.idle_timeout
+            }
+        }
+
+
+# 全局连接池实例
+_global_http_pool: Optional[HTTPSessionPool] = None
+# 同一服务器、账号、密码和传输方式的渠道共享一个SMTP连接，按引用计数释放
+_SMTPPoolKey = Tuple[str, int, Optional[str], Optional[str], bool, bool]
+_smtp_pools: Dict[_SMTPPoolKey, SMTPConnectionPool] = {}
+_smtp_pool_refs: Dict[_SMTPPoolKey, int] = {}
+
+
+def get_http_session_pool() -> HTTPSessionPool:
+    """获取全局HTTP会话池"""
+    global _global_http_pool
+    if _global_http_pool is None:
+        _global_http_pool = HTTPSessionPool()
+    return _global_http_pool
+
+
+def get_smtp_connection_pool(
+    host: str,
+    port: int = 587,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    use_tls: bool = True,
+    use_ssl: bool = False,
+    timeout: float = 30.0
+) -> SMTPConnectionPool:
+    """
+    获取共享的SMTP连接并增加一次引用
+
+    每次获取都需要对应一次release_smtp_connection_pool调用，
+    最后一个使用者释放后连接才会关闭
+    """
+    key = (host, port, username, password, use_tls, use_ssl)
+    pool = _smtp_pools.get(key)
+    if pool is None:
+        pool = SMTPConnectionPool(
+            host=host,
+            port=port,
+            username=username,
+            password=password,
+            use_tls=use_tls,
+            use_ssl=use_ssl,
+            timeout=timeout
+        )
+        _smtp_pools[key] = pool
+    _smtp_pool_refs[key] = _smtp_pool_refs.get(key, 0) + 1
+    return pool
+
+
+async def release_smtp_connection_pool(pool: SMTPConnectionPool):
+    """释放一次对SMTP连接的引用，引用归零时关闭连接"""
+    key = (pool.host, pool.port, pool.username, pool.password, pool.use_tls, pool.use_ssl)
+    if _smtp_pools.get(key) is not pool:
+        # 已被close_connection_pools关闭
+        return
+
+    refs = _smtp_pool_refs.get(key, 0) - 1
+    if refs > 0:
+        _smtp_pool_refs[key] = refs
+        return
+
+    _smtp_pool_refs.pop(key, None)
+    _smtp_pools.pop(key, None)
+    await pool.close()
+
+
+async def close_connection_pools():
+    """关闭所有共享连接（应用关闭时调用）"""
+    global _global_http_pool
+    if _global_http_pool is not None:
+        await _global_http_pool.close()
+        _global_http_pool = None
+
+    pools = list(_smtp_pools.values())
+    _smtp_pools.clear()
+    _smtp_pool_refs.clear()
+    for pool in pools:
+        await pool.close()
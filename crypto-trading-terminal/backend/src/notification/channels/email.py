@@ -4,8 +4,6 @@
 """
 
 import asyncio
-import smtplib
-import ssl
 import json
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -15,6 +13,7 @@ from datetime import datetime
 from pathlib import Path
 
 from ..notify_manager import NotificationMessage, DeliveryStatus, DeliveryRecord
+from .connection_pool import SMTPConnectionPool, get_smtp_connection_pool, release_smtp_connection_pool
 
 
 class EmailNotificationChannel:
@@ -45,6 +44,10 @@ class EmailNotificationChannel:
         self.include_text = self.config.get("include_text", True)
         self.max_content_length = self.config.get("max_content_length", 10000)
         
+        # 复用的SMTP连接（首次发送时创建）
+        self.timeout = self.config.get("timeout", 30)  # 秒
+        self._smtp_pool: Optional[SMTPConnectionPool] = None
+        
         # 统计数据
         self.stats = {
             "total_sent": 0,
@@ -130,6 +133,38 @@ class EmailNotificationChannel:
             print(f"邮件通知异常: {str(e)}")
             return False
     
+    async def send_batch(self, messages: List[NotificationMessage]) -> Dict[str, bool]:
+        """批量发送邮件通知，所有邮件复用同一个SMTP连接"""
+        if not messages or not self.enabled or not self.config_valid:
+            return {message.message_id: False for message in messages}
+        
+        self.stats["total_sent"] += len(messages)
+        self.stats["last_used"] = datetime.now()
+        
+        mime_messages = []
+        sizes = []
+        for message in messages:
+            subject = self._build_subject(message)
+            html_body, text_body = self._build_email_body(message)
+            html_body, text_body = self._limit_content_length(html_body, text_body)
+            mime_messages.append(self._build_mime_message(subject, html_body, text_body))
+            sizes.append(len(html_body.encode('utf-8')))
+        
+        try:
+            results = await self._get_smtp_pool().send_messages(mime_messages)
+        except Exception as e:
+            print(f"批量邮件发送异常: {str(e)}")
+            results = [False] * len(messages)
+        
+        for result, size in zip(results, sizes):
+            if result:
+                self.stats["successful"] += 1
+                self.stats["bytes_sent"] += size
+            else:
+                self.stats["failed"] += 1
+        
+        return {message.message_id: result for message, result in zip(messages, results)}
+    
     def _build_subject(self, message: NotificationMessage) -> str:
         """构建邮件主题"""
         # 根据优先级调整主题前缀
@@ -368,51 +403,52 @@ class EmailNotificationChannel:
         
         return html_body, text_body
     
+    def _build_mime_message(self, subject: str, html_body: str, text_body: str) -> MIMEMultipart:
+        """构建MIME邮件对象"""
+        msg = MIMEMultipart('alternative')
+        
+        # 设置邮件头
+        msg['From'] = formataddr((self.from_name, self.from_email))
+        msg['To'] = ', '.join(self.recipients)
+        msg['Subject'] = subject
+        msg['Date'] = format_datetime(datetime.now())
+        msg['X-Mailer'] = 'Crypto Trading Terminal'
+        
+        # 添加回复地址
+        if self.reply_to:
+            msg['Reply-To'] = self.reply_to
+        
+        # 添加纯文本版本
+        if self.include_text:
+            text_part = MIMEText(text_body, 'plain', 'utf-8')
+            msg.attach(text_part)
+        
+        # 添加HTML版本
+        if self.include_html:
+            html_part = MIMEText(html_body, 'html', 'utf-8')
+            msg.attach(html_part)
+        
+        return msg
+    
+    def _get_smtp_pool(self) -> SMTPConnectionPool:
+        """获取复用的SMTP连接"""
+        if self._smtp_pool is None:
+            self._smtp_pool = get_smtp_connection_pool(
+                host=self.smtp_server,
+                port=self.smtp_port,
+                username=self.username,
+                password=self.password,
+                use_tls=self.use_tls,
+                use_ssl=self.use_ssl,
+                timeout=self.timeout
+            )
+        return self._smtp_pool
+    
     async def _send_email(self, subject: str, html_body: str, text_body: str) -> bool:
-        """发送邮件"""
+        """发送邮件（SMTP操作在后台线程执行，不阻塞事件循环）"""
         try:
-            # 创建邮件对象
-            msg = MIMEMultipart('alternative')
-            
-            # 设置邮件头
-            msg['From'] = formataddr((self.from_name, self.from_email))
-            msg['To'] = ', '.join(self.recipients)
-            msg['Subject'] = subject
-            msg['Date'] = format_datetime(datetime.now())
-            msg['X-Mailer'] = 'Crypto Trading Terminal'
-            
-            # 添加回复地址
-            if self.reply_to:
-                msg['Reply-To'] = self.reply_to
-            
-            # 添加纯文本版本
-            if self.include_text:
-                text_part = MIMEText(text_body, 'plain', 'utf-8')
-                msg.attach(text_part)
-            
-            # 添加HTML版本
-            if self.include_html:
-                html_part = MIMEText(html_body, 'html', 'utf-8')
-                msg.attach(html_part)
-            
-            # 发送邮件
-            if self.use_ssl:
-                # SSL连接 (端口 465)
-                context = ssl.create_default_context()
-                with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, context=context) as server:
-                    server.login(self.username, self.password)
-                    server.send_message(msg)
-            else:
-                # TLS连接 (端口 587)
-                with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                    server.ehlo()
-                    if self.use_tls:
-                        server.starttls(context=ssl.create_default_context())
-                        server.ehlo()
-                    server.login(self.username, self.password)
-                    server.send_message(msg)
-            
-            return True
+            msg = self._build_mime_message(subject, html_body, text_body)
+            return await self._get_smtp_pool().send_message(msg)
             
         except Exception as e:
             print(f"邮件发送失败: {str(e)}")
@@ -523,8 +559,21 @@ class EmailNotificationChannel:
         self.from_email = config.get("from_email", self.from_email)
         self.recipients = config.get("recipients", self.recipients)
         self.subject_prefix = config.get("subject_prefix", self.subject_prefix)
+        self.timeout = config.get("timeout", self.timeout)
         self.enabled = config.get("enabled", self.enabled)
         
+        # 服务器或账号变更后需要重新建立SMTP连接
+        if self._smtp_pool is not None:
+            old_pool = self._smtp_pool
+            self._smtp_pool = None
+            try:
+                asyncio.get_running_loop().create_task(
+                    release_smtp_connection_pool(old_pool)
+                )
+            except RuntimeError:
+                # 没有运行中的事件循环时同步释放，避免引用计数泄漏
+                asyncio.run(release_smtp_connection_pool(old_pool))
+        
         # 重新验证配置
         self._validate_config()
         
@@ -541,6 +590,13 @@ class EmailNotificationChannel:
         }
         print("邮件通知渠道已清理")
     
+    async def close(self):
+        """关闭复用的SMTP连接"""
+        if self._smtp_pool is not None:
+            pool = self._smtp_pool
+            self._smtp_pool = None
+            await release_smtp_connection_pool(pool)
+    
     def get_smtp_config_examples(self) -> Dict[str, Dict[str, Any]]:
         """获取常用SMTP配置示例"""
         return {
@@ -11,12 +11,17 @@ from datetime import datetime
 from urllib.parse import urlencode
 
 from ..notify_manager import NotificationMessage, DeliveryStatus, DeliveryRecord
+from .connection_pool import HTTPSessionPool, get_http_session_pool
 
 
 class TelegramNotificationChannel:
     """Telegram通知渠道处理器"""
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        http_pool: Optional[HTTPSessionPool] = None
+    ):
         self.config = config or {}
         self.name = "telegram"
         self.enabled = self.config.get("enabled", False)  # 默认禁用，需要配置
@@ -33,6 +38,10 @@ class TelegramNotificationChannel:
         self.timeout = self.config.get("timeout", 30)  # 秒
         self.max_retries = self.config.get("max_retries", 3)
         self.retry_delay = self.config.get("retry_delay", 5)  # 秒
+        self.batch_concurrency = self.config.get("batch_concurrency", 5)  # 批量发送并发数
+        
+        # 共享HTTP连接池
+        self.http_pool = http_pool or get_http_session_pool()
         
         # 统计数据
         self.stats = {
@@ -115,6 +124,24 @@ class TelegramNotificationChannel:
             print(f"Telegram通知异常: {str(e)}")
             return False
     
+    async def send_batch(self, messages: List[NotificationMessage]) -> Dict[str, bool]:
+        """批量发送Telegram通知
+        
+        Bot API没有批量发送接口，这里在共享连接池上并发发送，
+        并发数由 batch_concurrency 限制以避免触发速率限制。
+        """
+        if not messages:
+            return {}
+        
+        semaphore = asyncio.Semaphore(max(1, self.batch_concurrency))
+        
+        async def send_one(message: NotificationMessage) -> bool:
+            async with semaphore:
+                return await self.send_notification(message)
+        
+        results = await asyncio.gather(*(send_one(message) for message in messages))
+        return {message.message_id: result for message, result in zip(messages, results)}
+    
     def _format_message(self, message: NotificationMessage) -> str:
         """格式化Telegram消息"""
         # 根据优先级选择模板
@@ -205,17 +232,17 @@ class TelegramNotificationChannel:
             }
             
             timeout = aiohttp.ClientTimeout(total=self.timeout)
+            session = await self.http_pool.get_session()
             
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(url, json=data) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result.get("ok", False)
-                    else:
-                        response_text = await response.text()
-                        print(f"Telegram API错误: {response.status} - {response_text}")
-                        return False
-                        
+            async with session.post(url, json=data, timeout=timeout) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    return result.get("ok", False)
+                else:
+                    response_text = await response.text()
+                    print(f"Telegram API错误: {response.status} - {response_text}")
+                    return False
+                    
         except Exception as e:
             print(f"Telegram发送异常: {str(e)}")
             return False
@@ -273,14 +300,14 @@ class TelegramNotificationChannel:
         
         try:
             url = f"{self.api_base_url}/bot{self.bot_token}/getMe"
+            session = await self.http_pool.get_session()
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        return {"error": f"API错误: {response.status}"}
-                        
+            async with session.get(url) as response:
+                if response.status == 200:
+                    return await response.json()
+                else:
+                    return {"error": f"API错误: {response.status}"}
+                    
         except Exception as e:
             return {"error": str(e)}
     
@@ -336,6 +363,7 @@ class TelegramNotificationChannel:
         self.disable_web_page_preview = config.get("disable_web_page_preview", self.disable_web_page_preview)
         self.timeout = config.get("timeout", self.timeout)
         self.max_retries = config.get("max_retries", self.max_retries)
+        self.batch_concurrency = config.get("batch_concurrency", self.batch_concurrency)
         self.enabled = config.get("enabled", self.enabled)
         
         # 重新验证配置
@@ -382,9 +410,12 @@ Telegram通知渠道设置步骤：
 
 
 # 工具函数
-def create_telegram_channel(config: Optional[Dict[str, Any]] = None) -> TelegramNotificationChannel:
+def create_telegram_channel(
+    config: Optional[Dict[str, Any]] = None,
+    http_pool: Optional[HTTPSessionPool] = None
+) -> TelegramNotificationChannel:
     """创建Telegram通知渠道实例"""
-    return TelegramNotificationChannel(config)
+    return TelegramNotificationChannel(config, http_pool)
 
 
 def get_telegram_templates() -> Dict[str, Dict[str, Any]]:
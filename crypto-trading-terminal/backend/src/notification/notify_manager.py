@@ -5,7 +5,6 @@
 
 import asyncio
 import json
-import smtplib
 import ssl
 import tempfile
 import threading
@@ -13,7 +12,7 @@ import time
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Any, Dict, List, Optional, Callable, Union
+from typing import Any, Dict, List, Optional, Callable, Tuple, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
 from pathlib import Path
@@ -24,6 +23,12 @@ from concurrent.futures import ThreadPoolExecutor
 import ssl as ssl_module
 
 from ..conditions.condition_engine import TriggerEvent
+from .channels.connection_pool import (
+    SMTPConnectionPool,
+    get_http_session_pool,
+    get_smtp_connection_pool,
+    release_smtp_connection_pool
+)
 
 
 class NotificationChannel(Enum):
@@ -189,6 +194,9 @@ class NotificationManager:
         # 速率限制
         self.rate_limiters: Dict[NotificationChannel, List[datetime]] = {}
         
+        # 邮件渠道持有的共享SMTP连接引用
+        self._smtp_pool: Optional[SMTPConnectionPool] = None
+        
         # 初始化默认配置
         self._initialize_default_configs()
     
@@ -682,13 +690,13 @@ class NotificationManager:
                 "parse_mode": "Markdown"
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=data) as response:
-                    if response.status == 200:
-                        return True
-                    else:
-                        print(f"Telegram API错误: {response.status}")
-                        return False
+            session = await get_http_session_pool().get_session()
+            async with session.post(url, json=data) as response:
+                if response.status == 200:
+                    return True
+                else:
+                    print(f"Telegram API错误: {response.status}")
+                    return False
             
         except Exception as e:
             print(f"Telegram通知失败: {str(e)}")
@@ -717,19 +725,40 @@ class NotificationManager:
             
             msg.attach(MIMEText(message.content, 'plain'))
             
-            # 发送邮件
-            server = smtplib.SMTP(smtp_server, smtp_port)
-            server.starttls()
-            server.login(username, password)
-            server.send_message(msg)
-            server.quit()
-            
-            return True
+            # 发送邮件（复用SMTP连接，阻塞操作在后台线程执行）
+            smtp_pool = await self._get_smtp_pool(smtp_server, smtp_port, username, password, config.timeout)
+            return await smtp_pool.send_message(msg)
             
         except Exception as e:
             print(f"邮件通知失败: {str(e)}")
             return False
     
+    async def _get_smtp_pool(
+        self, host: str, port: int, username: str, password: str, timeout: float
+    ) -> SMTPConnectionPool:
+        """获取当前邮件配置对应的SMTP连接，配置变更时释放旧连接的引用"""
+        pool = self._smtp_pool
+        if pool is not None and (pool.host, pool.port, pool.username, pool.password) == (host, port, username, password):
+            return pool
+        
+        self._smtp_pool = get_smtp_connection_pool(
+            host=host,
+            port=port,
+            username=username,
+            password=password,
+            timeout=timeout
+        )
+        if pool is not None:
+            await release_smtp_connection_pool(pool)
+        return self._smtp_pool
+    
+    async def close(self):
+        """释放持有的共享连接"""
+        if self._smtp_pool is not None:
+            pool = self._smtp_pool
+            self._smtp_pool = None
+            await release_smtp_connection_pool(pool)
+    
     async def _handle_webhook_notification(self, message: NotificationMessage) -> bool:
         """处理Webhook通知"""
         try:
@@ -759,9 +788,9 @@ class NotificationManager:
                 }
             
             # 发送Webhook
-            async with aiohttp.ClientSession() as session:
-                async with session.post(webhook_url, json=payload) as response:
-                    return response.status == 200
+            session = await get_http_session_pool().get_session()
+            async with session.post(webhook_url, json=payload) as response:
+                return response.status == 200
             
         except Exception as e:
             print(f"Webhook通知失败: {str(e)}")
@@ -821,9 +850,9 @@ class NotificationManager:
                 "icon_emoji": ":bell:"
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(webhook_url, json=payload) as response:
-                    return response.status == 200
+            session = await get_http_session_pool().get_session()
+            async with session.post(webhook_url, json=payload) as response:
+                return response.status == 200
             
         except Exception as e:
             print(f"Slack通知失败: {str(e)}")
@@ -846,9 +875,9 @@ class NotificationManager:
                 "avatar_url": "https://example.com/bot-avatar.png"
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(webhook_url, json=payload) as response:
-                    return response.status == 200
+            session = await get_http_session_pool().get_session()
+            async with session.post(webhook_url, json=payload) as response:
+                return response.status == 200
             
         except Exception as e:
             print(f"Discord通知失败: {str(e)}")
@@ -879,6 +908,16 @@ class NotificationTemplateEngine:
         renderer = self.templates.get(template, self._render_custom)
         return renderer(trigger_event, channel)
     
+    def render_batch(
+        self,
+        template: NotificationTemplate,
+        trigger_events: List[TriggerEvent],
+        channel: NotificationChannel
+    ) -> List[tuple[str, str]]:
+        """批量渲染同一模板的多个触发事件"""
+        renderer = self.templates.get(template, self._render_custom)
+        return [renderer(trigger_event, channel) for trigger_event in trigger_events]
+    
     def _render_price_alert(self, trigger_event: TriggerEvent, channel: NotificationChannel) -> tuple[str, str]:
         """渲染价格预警模板"""
         if not trigger_event.result.value:
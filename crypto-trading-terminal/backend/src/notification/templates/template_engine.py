@@ -5,7 +5,7 @@
 
 import json
 import re
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from datetime import datetime
 from string import Template
 import logging
@@ -14,15 +14,114 @@ from ...conditions.condition_engine import TriggerEvent
 
 logger = logging.getLogger(__name__)
 
+# 编译后模板的片段类型
+_SEGMENT_LITERAL = 0
+_SEGMENT_VARIABLE = 1
+_SEGMENT_FORMATTER = 2
+
+_FORMATTER_CALL_PATTERN = re.compile(r'\|(\w+)(?:\(([^)]*)\))?')
+_FORMATTER_PLACEHOLDER_PATTERN = re.compile(r'__formatter_result_(\w+?)__')
+_OPEN_PLACEHOLDER_TAIL = re.compile(r'\{?\w*', re.ASCII)
+_DATETIME_SUFFIXES = (
+    ('_datetime', '%Y-%m-%d %H:%M:%S'),
+    ('_short', '%m-%d %H:%M'),
+    ('_time', '%H:%M:%S'),
+    ('_date', '%Y-%m-%d'),
+)
+_FORMAT_OBJECT_KEYS = ('price', 'value', 'current_value', 'details_value', 'result_value')
+
+
+class CompiledTemplate:
+    """编译后的模板
+    
+    模板字符串只在编译时解析一次：格式化器调用和 $变量 占位符被拆分为
+    片段列表，渲染时按顺序拼接，不再重复执行正则匹配。
+    
+    格式化器结果紧跟在 $变量 之后、或结果本身含有 $ 时，逐次渲染的输出
+    取决于结果文本，此时退回到预处理好的 string.Template 上做替换，
+    保证与逐次解析的渲染结果完全一致。
+    """
+    
+    __slots__ = ('template_id', 'version', 'template_type', 'source', 'segments',
+                 'formatter_specs', 'prepared', 'fast_path', 'static_result', 'variable_names')
+    
+    def __init__(self, template_id: Optional[str], version: int, template_type: str, source: str,
+                 segments: List[Tuple], formatter_specs: Optional[Dict[str, Optional[Tuple[str, ...]]]] = None,
+                 prepared: Optional[str] = None, fast_path: bool = True,
+                 static_result: Optional[str] = None):
+        self.template_id = template_id
+        self.version = version
+        self.template_type = template_type
+        self.source = source
+        self.segments = segments
+        self.formatter_specs = formatter_specs or {}
+        self.prepared = Template(prepared) if prepared is not None else None
+        self.fast_path = fast_path
+        self.static_result = static_result
+        
+        # 快速路径只需要预处理模板实际引用的变量
+        names = set()
+        for kind, value, extra in segments:
+            if kind == _SEGMENT_VARIABLE:
+                names.add(value)
+            elif kind == _SEGMENT_FORMATTER:
+                names.update(extra if extra is not None else _FORMAT_OBJECT_KEYS)
+        self.variable_names = frozenset(names)
+    
+    def render(self, engine: 'TemplateEngine', raw_variables: Dict[str, Any]) -> str:
+        """渲染模板"""
+        if self.static_result is not None:
+            return self.static_result
+        if not self.fast_path:
+            return self._render_prepared(engine, engine._preprocess_variables(raw_variables))
+        
+        variables = engine._preprocess_variables(raw_variables, self.variable_names)
+        parts = []
+        for kind, value, extra in self.segments:
+            if kind == _SEGMENT_LITERAL:
+                parts.append(value)
+            elif kind == _SEGMENT_VARIABLE:
+                if value in variables:
+                    parts.append(str(variables[value]))
+                else:
+                    parts.append(extra)
+            else:
+                result = engine._apply_formatter(value, extra, variables)
+                if '$' in result:
+                    return self._render_prepared(engine, engine._preprocess_variables(raw_variables))
+                parts.append(result)
+        
+        return ''.join(parts)
+    
+    def _render_prepared(self, engine: 'TemplateEngine', variables: Dict[str, Any]) -> str:
+        """先代入格式化器结果再做变量替换（与逐次渲染的顺序相同）"""
+        text = self.prepared.template
+        for formatter_name, params in self.formatter_specs.items():
+            text = text.replace(
+                f"__formatter_result_{formatter_name}__",
+                engine._apply_formatter(formatter_name, params, variables)
+            )
+        return Template(text).safe_substitute(variables)
+
 
 class TemplateEngine:
     """模板引擎核心类"""
     
-    def __init__(self):
+    def __init__(self, max_cache_size: int = 1024):
         self.custom_templates: Dict[str, str] = {}
+        self.template_versions: Dict[str, int] = {}
         self.template_variables: Dict[str, Any] = {}
         self.formatters: Dict[str, callable] = {}
         
+        # 编译缓存，键为 (模板ID, 版本, 渠道类型, 模板类型)
+        self.max_cache_size = max_cache_size
+        self._compiled_cache: Dict[Tuple, CompiledTemplate] = {}
+        self.cache_stats = {
+            'hits': 0,
+            'misses': 0,
+            'invalidations': 0
+        }
+        
         # 注册内置格式化器
         self._register_builtin_formatters()
     
@@ -47,65 +146,272 @@ class TemplateEngine:
         })
     
     def register_template(self, name: str, template: str):
-        """注册自定义模板"""
+        """注册自定义模板（重复注册视为编辑，版本号递增）"""
         self.custom_templates[name] = template
+        self.template_versions[name] = self.template_versions.get(name, 0) + 1
+        self.invalidate_template(name)
         logger.info(f"已注册模板: {name}")
     
     def unregister_template(self, name: str):
         """注销模板"""
         if name in self.custom_templates:
             del self.custom_templates[name]
+            self.template_versions[name] = self.template_versions.get(name, 0) + 1
+            self.invalidate_template(name)
             logger.info(f"已注销模板: {name}")
     
     def register_formatter(self, name: str, formatter: callable):
         """注册自定义格式化器"""
         self.formatters[name] = formatter
+        # 格式化器集合变化会影响模板的编译结果
+        self.clear_template_cache()
         logger.info(f"已注册格式化器: {name}")
     
     def render_template(self, template: str, variables: Dict[str, Any], 
                        template_type: str = 'default') -> str:
         """渲染模板"""
         try:
-            # 预处理变量
-            processed_vars = self._preprocess_variables(variables)
-            
-            # 渲染模板
-            if template_type == 'python_template':
-                return self._render_python_template(template, processed_vars)
-            elif template_type == 'json_template':
-                return self._render_json_template(template, processed_vars)
-            else:
-                return self._render_simple_template(template, processed_vars)
+            compiled = self.compile_template(template, template_type)
+            return compiled.render(self, variables)
                 
         except Exception as e:
             logger.error(f"模板渲染失败: {e}")
             return f"模板渲染错误: {template}"
     
+    def render_batch(self, template: str, contexts: List[Dict[str, Any]],
+                     template_type: str = 'default', template_id: Optional[str] = None) -> List[str]:
+        """使用同一个编译模板批量渲染多组变量"""
+        try:
+            compiled = self.compile_template(template, template_type, template_id)
+        except Exception as e:
+            logger.error(f"模板编译失败: {e}")
+            return [f"模板渲染错误: {template}"] * len(contexts)
+        
+        results = []
+        for variables in contexts:
+            try:
+                results.append(compiled.render(self, variables))
+            except Exception as e:
+                logger.error(f"模板渲染失败: {e}")
+                results.append(f"模板渲染错误: {template}")
+        return results
+    
     def render_trigger_event(self, template_name: str, trigger_event: TriggerEvent,
                            channel_type: str = 'default') -> str:
         """渲染触发事件"""
-        # 获取模板
+        return self.render_trigger_events(template_name, [trigger_event], channel_type)[0]
+    
+    def render_trigger_events(self, template_name: str, trigger_events: List[TriggerEvent],
+                              channel_type: str = 'default') -> List[str]:
+        """批量渲染触发事件，模板只查找和编译一次"""
+        compiled = self._get_compiled_named_template(template_name, channel_type, 'python_template')
+        
+        results = []
+        for trigger_event in trigger_events:
+            variables = self._prepare_trigger_variables(trigger_event)
+            try:
+                results.append(compiled.render(self, variables))
+            except Exception as e:
+                logger.error(f"模板渲染失败: {e}")
+                results.append(f"模板渲染错误: {compiled.source}")
+        return results
+    
+    def compile_template(self, template: str, template_type: str = 'default',
+                         template_id: Optional[str] = None) -> CompiledTemplate:
+        """编译模板并缓存
+        
+        未指定 template_id 时以模板内容本身作为缓存键；
+        指定时使用注册模板的当前版本号。
+        """
+        if template_id is None:
+            key = (None, template, None, template_type)
+            version = 0
+        else:
+            version = self.template_versions.get(template_id, 0)
+            key = (template_id, version, None, template_type)
+        
+        compiled = self._compiled_cache.get(key)
+        if compiled is not None and compiled.source == template:
+            self.cache_stats['hits'] += 1
+            return compiled
+        
+        self.cache_stats['misses'] += 1
+        compiled = self._compile(template, template_type, template_id, version)
+        self._store_compiled(key, compiled)
+        return compiled
+    
+    def invalidate_template(self, name: str):
+        """使指定模板的所有编译结果失效"""
+        stale_keys = [key for key in self._compiled_cache if key[0] == name]
+        for key in stale_keys:
+            del self._compiled_cache[key]
+        if stale_keys:
+            self.cache_stats['invalidations'] += len(stale_keys)
+    
+    def clear_template_cache(self):
+        """清空编译缓存"""
+        self.cache_stats['invalidations'] += len(self._compiled_cache)
+        self._compiled_cache.clear()
+    
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """获取编译缓存统计"""
+        total = self.cache_stats['hits'] + self.cache_stats['misses']
+        return {
+            'cached_templates': len(self._compiled_cache),
+            'max_cache_size': self.max_cache_size,
+            'hit_rate': round(self.cache_stats['hits'] / total * 100, 2) if total else 0.0,
+            **self.cache_stats
+        }
+    
+    def _get_compiled_named_template(self, template_name: str, channel_type: str,
+                                     template_type: str) -> CompiledTemplate:
+        """获取命名模板的编译结果"""
+        version = self.template_versions.get(template_name, 0)
+        key = (template_name, version, channel_type, template_type)
+        
+        compiled = self._compiled_cache.get(key)
+        if compiled is not None:
+            self.cache_stats['hits'] += 1
+            return compiled
+        
+        self.cache_stats['misses'] += 1
         template = self._get_template_by_name(template_name, channel_type)
+        compiled = self._compile(template, template_type, template_name, version)
+        self._store_compiled(key, compiled)
+        return compiled
+    
+    def _store_compiled(self, key: Tuple, compiled: CompiledTemplate):
+        """写入编译缓存，超过上限时淘汰最早的条目"""
+        if len(self._compiled_cache) >= self.max_cache_size:
+            oldest_key = next(iter(self._compiled_cache))
+            del self._compiled_cache[oldest_key]
+        self._compiled_cache[key] = compiled
+    
+    def _compile(self, template: str, template_type: str, template_id: Optional[str],
+                 version: int) -> CompiledTemplate:
+        """把模板字符串编译为片段列表"""
+        if template_type == 'json_template':
+            # JSON模板不使用变量，编译时直接得到结果
+            return CompiledTemplate(template_id, version, template_type, template, [],
+                                    static_result=self._render_json_template(template, {}))
+        
+        if template_type != 'python_template':
+            segments: List[Tuple] = []
+            self._compile_substitutions(template, segments)
+            return CompiledTemplate(template_id, version, template_type, template, segments)
         
-        # 准备变量
-        variables = self._prepare_trigger_variables(trigger_event)
+        # 与逐次渲染相同的规则：先把格式化器调用替换为占位符，
+        # 同名格式化器以第一次出现的参数为准
+        formatter_specs: Dict[str, Optional[Tuple[str, ...]]] = {}
+        prepared = template
+        for formatter_name, params in _FORMATTER_CALL_PATTERN.findall(template):
+            if formatter_name not in self.formatters:
+                continue
+            call = f"|{formatter_name}({params})" if params else f"|{formatter_name}"
+            prepared = prepared.replace(call, f"__formatter_result_{formatter_name}__")
+            if formatter_name not in formatter_specs:
+                formatter_specs[formatter_name] = (
+                    tuple(p.strip() for p in params.split(',')) if params else None
+                )
         
-        # 渲染模板
-        return self.render_template(template, variables, template_type='python_template')
+        segments = []
+        fast_path = True
+        position = 0
+        for match in _FORMATTER_PLACEHOLDER_PATTERN.finditer(prepared):
+            formatter_name = match.group(1)
+            if formatter_name not in formatter_specs:
+                continue
+            chunk = prepared[position:match.start()]
+            if self._ends_with_open_placeholder(chunk):
+                fast_path = False
+            self._compile_substitutions(chunk, segments)
+            segments.append((_SEGMENT_FORMATTER, formatter_name, formatter_specs[formatter_name]))
+            position = match.end()
+        self._compile_substitutions(prepared[position:], segments)
+        
+        return CompiledTemplate(template_id, version, template_type, template, segments,
+                                formatter_specs=formatter_specs, prepared=prepared,
+                                fast_path=fast_path)
+    
+    @staticmethod
+    def _ends_with_open_placeholder(text: str) -> bool:
+        """判断文本末尾的 $占位符 是否会和后面拼接的内容连成一体"""
+        last_match = None
+        for last_match in Template.pattern.finditer(text):
+            pass
+        if last_match is None:
+            return False
+        if last_match.group('named') is not None:
+            return last_match.end() == len(text)
+        if last_match.group('invalid') is not None:
+            return _OPEN_PLACEHOLDER_TAIL.fullmatch(text, last_match.end()) is not None
+        return False
+    
+    def _apply_formatter(self, formatter_name: str, params: Optional[Tuple[str, ...]],
+                         variables: Dict[str, Any]) -> str:
+        """执行格式化器，失败时返回 N/A"""
+        try:
+            formatter = self.formatters[formatter_name]
+            if params is not None:
+                result = formatter(*[variables.get(name) for name in params])
+            else:
+                result = formatter(self._get_format_object(variables))
+            return str(result)
+        except Exception as e:
+            logger.warning(f"格式化器 {formatter_name} 执行失败: {e}")
+            return "N/A"
     
-    def _preprocess_variables(self, variables: Dict[str, Any]) -> Dict[str, Any]:
-        """预处理变量"""
+    def _compile_substitutions(self, text: str, segments: List[Tuple]):
+        """按 string.Template 的规则拆分 $变量 占位符"""
+        position = 0
+        for match in Template.pattern.finditer(text):
+            if match.start() > position:
+                segments.append((_SEGMENT_LITERAL, text[position:match.start()], None))
+            
+            name = match.group('named') or match.group('braced')
+            if name is not None:
+                segments.append((_SEGMENT_VARIABLE, name, match.group()))
+            elif match.group('escaped') is not None:
+                segments.append((_SEGMENT_LITERAL, '$', None))
+            else:
+                segments.append((_SEGMENT_LITERAL, match.group(), None))
+            position = match.end()
+        
+        if position < len(text):
+            segments.append((_SEGMENT_LITERAL, text[position:], None))
+    
+    def _preprocess_variables(self, variables: Dict[str, Any],
+                              names: Optional[frozenset] = None) -> Dict[str, Any]:
+        """预处理变量
+        
+        names 不为空时只生成其中列出的变量，其余派生变量跳过计算。
+        """
         processed = {}
         
+        if names is None:
+            for key, value in variables.items():
+                if isinstance(value, datetime):
+                    processed[f"{key}_datetime"] = value.strftime('%Y-%m-%d %H:%M:%S')
+                    processed[f"{key}_short"] = value.strftime('%m-%d %H:%M')
+                    processed[f"{key}_time"] = value.strftime('%H:%M:%S')
+                    processed[f"{key}_date"] = value.strftime('%Y-%m-%d')
+                elif isinstance(value, (int, float)):
+                    processed[f"{key}_formatted"] = self._format_number(value)
+                else:
+                    processed[key] = value
+            return processed
+        
         for key, value in variables.items():
             if isinstance(value, datetime):
-                processed[f"{key}_datetime"] = value.strftime('%Y-%m-%d %H:%M:%S')
-                processed[f"{key}_short"] = value.strftime('%m-%d %H:%M')
-                processed[f"{key}_time"] = value.strftime('%H:%M:%S')
-                processed[f"{key}_date"] = value.strftime('%Y-%m-%d')
+                for suffix, fmt in _DATETIME_SUFFIXES:
+                    name = key + suffix
+                    if name in names:
+                        processed[name] = value.strftime(fmt)
             elif isinstance(value, (int, float)):
-                processed[f"{key}_formatted"] = self._format_number(value)
-            else:
+                name = key + '_formatted'
+                if name in names:
+                    processed[name] = self._format_number(value)
+            elif key in names:
                 processed[key] = value
         
         return processed
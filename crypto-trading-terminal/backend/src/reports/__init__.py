@@ -3,23 +3,44 @@ Reports module for generating PDF and CSV export reports
 Supports comprehensive account management and PnL analysis reporting
 """
 
-from .report_generator import ReportGenerator
-from .pdf_generator import PDFReportGenerator
-from .csv_generator import CSVReportGenerator
-from .report_templates import ReportTemplateManager
-from .report_types import (
-    AccountReport, 
-    PositionReport, 
-    PnLReport, 
-    PerformanceReport,
-    RiskReport
-)
+import importlib
+
+# 子模块按需导入，避免仅使用报表类型时加载reportlab
+_LAZY_IMPORTS = {
+    'ReportGenerator': '.report_generator',
+    'PDFReportGenerator': '.pdf_generator',
+    'CSVReportGenerator': '.csv_generator',
+    'ReportTemplateManager': '.report_templates',
+    'ReportIndex': '.report_index',
+    'ReportJobManager': '.report_jobs',
+    'DatabaseTradeSource': '.report_sources',
+    'StaticTradeSource': '.report_sources',
+    'AccountReport': '.report_types',
+    'PositionReport': '.report_types',
+    'PnLReport': '.report_types',
+    'PerformanceReport': '.report_types',
+    'RiskReport': '.report_types',
+}
+
+
+def __getattr__(name):
+    module_path = _LAZY_IMPORTS.get(name)
+    if module_path is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_path, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     'ReportGenerator',
     'PDFReportGenerator', 
     'CSVReportGenerator',
     'ReportTemplateManager',
+    'ReportIndex',
+    'ReportJobManager',
+    'DatabaseTradeSource',
+    'StaticTradeSource',
     'AccountReport',
     'PositionReport', 
     'PnLReport',
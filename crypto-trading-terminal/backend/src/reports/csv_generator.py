@@ -7,33 +7,50 @@ import csv
 import asyncio
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, Iterable, List, Optional
 from pathlib import Path
 
+from .report_sources import TradeTotals
+from .report_types import TradeRecord
+
 
 class CSVReportGenerator:
     """Generates CSV reports from trading data"""
     
-    async def generate(self, report_data: Dict[str, Any], template, file_path: str):
-        """Generate CSV report"""
+    async def generate(self, report_data: Dict[str, Any], template, file_path: str,
+                       trade_chunks: Optional[Iterable[List[TradeRecord]]] = None,
+                       progress: Optional[Callable[[int], None]] = None) -> str:
+        """Generate CSV report on a worker thread so file writes never block the event loop"""
+        return await asyncio.to_thread(self.render, report_data, template, file_path, trade_chunks, progress)
+    
+    def render(self, report_data: Dict[str, Any], template, file_path: str,
+               trade_chunks: Optional[Iterable[List[TradeRecord]]] = None,
+               progress: Optional[Callable[[int], None]] = None) -> str:
+        """
+        Write the CSV report synchronously.
+        
+        Trade rows are taken from ``trade_chunks`` one chunk at a time and written
+        straight to the file; ``progress`` receives the number of rows written so far.
+        """
         try:
             with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
                 writer = csv.writer(csvfile)
                 
                 # Write header information
-                await self._write_report_header(writer, report_data, template)
+                self._write_report_header(writer, report_data, template)
                 
                 # Write main content sections
-                await self._write_main_content(writer, report_data, template)
+                self._write_main_content(writer, report_data, template, trade_chunks, progress)
                 
                 # Write summary data
-                await self._write_summary(writer, report_data, template)
+                self._write_summary(writer, report_data, template)
                 
         except Exception as e:
             # Fallback: write basic CSV with error info
-            await self._write_fallback_csv(file_path, report_data, str(e))
+            self._write_fallback_csv(file_path, report_data, str(e))
+        return file_path
     
-    async def _write_report_header(self, writer, report_data: Dict[str, Any], template):
+    def _write_report_header(self, writer, report_data: Dict[str, Any], template):
         """Write report header information"""
         # Report metadata
         writer.writerow(['Report Information'])
@@ -53,34 +70,38 @@ class CSVReportGenerator:
         writer.writerow([title])
         writer.writerow([])
     
-    async def _write_main_content(self, writer, report_data: Dict[str, Any], template):
+    def _write_main_content(self, writer, report_data: Dict[str, Any], template,
+                            trade_chunks: Optional[Iterable[List[TradeRecord]]] = None,
+                            progress: Optional[Callable[[int], None]] = None):
         """Write main content sections"""
         
         # Account balances section
         if 'accounts' in report_data:
-            await self._write_account_section(writer, report_data)
+            self._write_account_section(writer, report_data)
         
         # Positions section
         if 'positions' in report_data:
-            await self._write_positions_section(writer, report_data)
+            self._write_positions_section(writer, report_data)
         
         # P&L breakdown section
         if 'pnl_by_exchange' in report_data or 'pnl_by_asset' in report_data:
-            await self._write_pnl_section(writer, report_data)
+            self._write_pnl_section(writer, report_data)
         
         # Risk assessment section
         if 'risk_metrics' in report_data:
-            await self._write_risk_section(writer, report_data)
+            self._write_risk_section(writer, report_data)
         
         # Trade history section
-        if 'trade_history' in report_data:
-            await self._write_trade_section(writer, report_data)
+        if trade_chunks is None and 'trade_history' in report_data:
+            trade_chunks = [report_data['trade_history']]
+        if trade_chunks is not None:
+            self._write_trade_section(writer, trade_chunks, progress)
         
         # Performance metrics section
         if 'period_performance' in report_data:
-            await self._write_performance_section(writer, report_data)
+            self._write_performance_section(writer, report_data)
     
-    async def _write_account_section(self, writer, report_data: Dict[str, Any]):
+    def _write_account_section(self, writer, report_data: Dict[str, Any]):
         """Write account balances section"""
         accounts = report_data['accounts']
         
@@ -120,7 +141,7 @@ class CSVReportGenerator:
             
             writer.writerow([])
     
-    async def _write_positions_section(self, writer, report_data: Dict[str, Any]):
+    def _write_positions_section(self, writer, report_data: Dict[str, Any]):
         """Write positions section"""
         positions = report_data['positions']
         
@@ -158,7 +179,7 @@ class CSVReportGenerator:
             writer.writerow(['Total Unrealized P&L', str(report_data.get('total_unrealized_pnl', 0))])
             writer.writerow([])
     
-    async def _write_pnl_section(self, writer, report_data: Dict[str, Any]):
+    def _write_pnl_section(self, writer, report_data: Dict[str, Any]):
         """Write P&L section"""
         writer.writerow(['P&L Analysis'])
         
@@ -198,7 +219,7 @@ class CSVReportGenerator:
             
             writer.writerow([])
     
-    async def _write_risk_section(self, writer, report_data: Dict[str, Any]):
+    def _write_risk_section(self, writer, report_data: Dict[str, Any]):
         """Write risk assessment section"""
         risk_metrics = report_data['risk_metrics']
         
@@ -230,42 +251,42 @@ class CSVReportGenerator:
                 writer.writerow([f"Recommendation {i}", recommendation])
             writer.writerow([])
     
-    async def _write_trade_section(self, writer, report_data: Dict[str, Any]):
-        """Write trade history section"""
-        trades = report_data['trade_history']
-        
+    def _write_trade_section(self, writer, trade_chunks: Iterable[List[TradeRecord]],
+                             progress: Optional[Callable[[int], None]] = None):
+        """Write trade history section, one chunk of rows at a time"""
         writer.writerow(['Trade History'])
         writer.writerow([
             'Trade ID', 'Symbol', 'Exchange', 'Side', 'Quantity', 'Price', 
             'Total Value', 'Fee', 'Realized P&L', 'Timestamp'
         ])
         
-        for trade in trades:
-            total_value = trade.quantity * trade.price
-            
-            writer.writerow([
+        totals = TradeTotals()
+        for trades in trade_chunks:
+            writer.writerows([
                 trade.id,
                 trade.symbol,
                 trade.exchange,
                 trade.side,
                 str(trade.quantity),
                 str(trade.price),
-                str(total_value),
+                str(trade.quantity * trade.price),
                 str(trade.fee),
                 str(trade.realized_pnl) if trade.realized_pnl else '',
                 trade.timestamp.strftime('%Y-%m-%d %H:%M:%S')
-            ])
+            ] for trade in trades)
+            totals.add(trades)
+            if progress is not None:
+                progress(totals.total_trades)
         
         # Trade summary
-        if 'total_trades' in report_data:
-            writer.writerow([])
-            writer.writerow(['Trade Summary'])
-            writer.writerow(['Total Trades', report_data['total_trades']])
-            writer.writerow(['Total Volume', str(report_data.get('total_volume', 0))])
-            writer.writerow(['Total Fees', str(report_data.get('total_fees', 0))])
-            writer.writerow([])
+        writer.writerow([])
+        writer.writerow(['Trade Summary'])
+        writer.writerow(['Total Trades', totals.total_trades])
+        writer.writerow(['Total Volume', str(totals.total_volume)])
+        writer.writerow(['Total Fees', str(totals.total_fees)])
+        writer.writerow([])
     
-    async def _write_performance_section(self, writer, report_data: Dict[str, Any]):
+    def _write_performance_section(self, writer, report_data: Dict[str, Any]):
         """Write performance metrics section"""
         period_performance = report_data['period_performance']
         
@@ -282,7 +303,7 @@ class CSVReportGenerator:
         
         writer.writerow([])
     
-    async def _write_summary(self, writer, report_data: Dict[str, Any], template):
+    def _write_summary(self, writer, report_data: Dict[str, Any], template):
         """Write summary section"""
         writer.writerow(['Report Summary'])
         
@@ -312,7 +333,7 @@ class CSVReportGenerator:
         writer.writerow(['Generation Time', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
         writer.writerow(['Template', template.template_id])
     
-    async def _write_fallback_csv(self, file_path: str, report_data: Dict[str, Any], error_msg: str):
+    def _write_fallback_csv(self, file_path: str, report_data: Dict[str, Any], error_msg: str):
         """Write fallback CSV with basic information"""
         with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
             writer = csv.writer(csvfile)
@@ -6,9 +6,12 @@ Creates professional PDF reports with charts and formatting
 import asyncio
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
 from pathlib import Path
 
+from .report_sources import TradeTotals
+from .report_types import TradeRecord
+
 try:
     from reportlab.lib.pagesizes import letter, A4
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -25,6 +28,11 @@ try:
 except ImportError:
     REPORTLAB_AVAILABLE = False
 
+# Trade tables are split so each fits on a page; rows past the limit are only
+# totalled, the full listing belongs in the CSV export
+PDF_TRADE_ROWS_PER_TABLE = 40
+PDF_TRADE_ROW_LIMIT = 2000
+
 
 class PDFReportGenerator:
     """Generates PDF reports with professional formatting"""
@@ -38,12 +46,27 @@ class PDFReportGenerator:
             self.margin = None
         self.styles = self._create_styles() if REPORTLAB_AVAILABLE else None
     
-    async def generate(self, report_data: Dict[str, Any], template, file_path: str):
-        """Generate PDF report"""
+    async def generate(self, report_data: Dict[str, Any], template, file_path: str,
+                       trade_chunks: Optional[Iterable[List[TradeRecord]]] = None,
+                       progress: Optional[Callable[[int], None]] = None) -> str:
+        """Generate PDF report on a worker thread so layout never blocks the event loop"""
+        return await asyncio.to_thread(self.render, report_data, template, file_path, trade_chunks, progress)
+    
+    def render(self, report_data: Dict[str, Any], template, file_path: str,
+               trade_chunks: Optional[Iterable[List[TradeRecord]]] = None,
+               progress: Optional[Callable[[int], None]] = None) -> str:
+        """
+        Lay out the PDF report synchronously and return the path actually written.
+        
+        Trades are consumed chunk by chunk into page-sized tables, so at most
+        PDF_TRADE_ROW_LIMIT rows are held as flowables however long the history is.
+        """
+        if trade_chunks is None and "trade_history" in report_data:
+            trade_chunks = [report_data["trade_history"]]
+        
         if not REPORTLAB_AVAILABLE or not self.styles:
             # Fallback: create a simple text-based PDF
-            await self._generate_simple_pdf(report_data, file_path)
-            return
+            return self._generate_simple_pdf(report_data, file_path, trade_chunks, progress)
         
         try:
             doc = SimpleDocTemplate(
@@ -55,33 +78,42 @@ class PDFReportGenerator:
                 bottomMargin=self.margin
             )
             
+            # Trades are streamed first so the summary can show their totals
+            trade_story = []
+            if trade_chunks is not None:
+                trade_story, totals = self._add_trade_history(trade_chunks, progress)
+                report_data = dict(report_data, total_trades=totals.total_trades,
+                                   total_volume=totals.total_volume)
+            
             # Build report content
             story = []
             
             # Add header
-            story.extend(await self._add_header(report_data, template))
+            story.extend(self._add_header(report_data, template))
             
             # Add summary section
             if self._should_include_section(template, "summary"):
-                story.extend(await self._add_summary_section(report_data, template))
+                story.extend(self._add_summary_section(report_data, template))
             
             # Add detailed sections based on report type
-            story.extend(await self._add_detailed_sections(report_data, template))
+            story.extend(self._add_detailed_sections(report_data, template))
+            story.extend(trade_story)
             
             # Add charts if requested
-            if report_data.get("request", {}).get("include_charts", True):
-                story.extend(await self._add_charts_section(report_data, template))
+            if getattr(report_data.get("request"), "include_charts", True):
+                story.extend(self._add_charts_section(report_data, template))
             
             # Add footer
             story.append(PageBreak())
-            story.extend(await self._add_footer(report_data))
+            story.extend(self._add_footer(report_data))
             
             # Build PDF
             doc.build(story)
+            return file_path
             
         except Exception as e:
             # Fallback to simple PDF if reportlab fails
-            await self._generate_simple_pdf(report_data, file_path)
+            return self._generate_simple_pdf(report_data, file_path)
     
     def _create_styles(self):
         """Create custom paragraph styles"""
@@ -141,7 +173,7 @@ class PDFReportGenerator:
         except Exception:
             return None
     
-    async def _add_header(self, report_data: Dict[str, Any], template) -> List:
+    def _add_header(self, report_data: Dict[str, Any], template) -> List:
         """Add report header"""
         story = []
         
@@ -160,7 +192,7 @@ class PDFReportGenerator:
             ['Generated:', datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
             ['Report Period:', f"{report_data['report_period']['start_date'].strftime('%Y-%m-%d')} to {report_data['report_period']['end_date'].strftime('%Y-%m-%d')}"],
             ['Generated by:', 'Crypto Trading Terminal'],
-            ['Report ID:', report_data.get('request', {}).get('report_id', 'N/A')]
+            ['Report ID:', report_data.get('report_id', 'N/A')]
         ]
         
         metadata_table = Table(metadata_data, colWidths=[1.5*inch, 3*inch])
@@ -176,7 +208,7 @@ class PDFReportGenerator:
         
         return story
     
-    async def _add_summary_section(self, report_data: Dict[str, Any], template) -> List:
+    def _add_summary_section(self, report_data: Dict[str, Any], template) -> List:
         """Add summary section"""
         story = []
         
@@ -221,33 +253,29 @@ class PDFReportGenerator:
         
         return story
     
-    async def _add_detailed_sections(self, report_data: Dict[str, Any], template) -> List:
+    def _add_detailed_sections(self, report_data: Dict[str, Any], template) -> List:
         """Add detailed sections based on report data"""
         story = []
         
         # Account breakdown
         if "accounts" in report_data:
-            story.extend(await self._add_account_details(report_data))
+            story.extend(self._add_account_details(report_data))
         
         # Position details
         if "positions" in report_data:
-            story.extend(await self._add_position_details(report_data))
+            story.extend(self._add_position_details(report_data))
         
         # P&L breakdown
         if "pnl_by_exchange" in report_data or "pnl_by_asset" in report_data:
-            story.extend(await self._add_pnl_breakdown(report_data))
+            story.extend(self._add_pnl_breakdown(report_data))
         
         # Risk assessment
         if "risk_metrics" in report_data:
-            story.extend(await self._add_risk_details(report_data))
-        
-        # Trade history
-        if "trade_history" in report_data:
-            story.extend(await self._add_trade_history(report_data))
+            story.extend(self._add_risk_details(report_data))
         
         return story
     
-    async def _add_account_details(self, report_data: Dict[str, Any]) -> List:
+    def _add_account_details(self, report_data: Dict[str, Any]) -> List:
         """Add account balance details"""
         story = []
         
@@ -288,7 +316,7 @@ class PDFReportGenerator:
         
         return story
     
-    async def _add_position_details(self, report_data: Dict[str, Any]) -> List:
+    def _add_position_details(self, report_data: Dict[str, Any]) -> List:
         """Add position details"""
         story = []
         
@@ -333,7 +361,7 @@ class PDFReportGenerator:
         
         return story
     
-    async def _add_pnl_breakdown(self, report_data: Dict[str, Any]) -> List:
+    def _add_pnl_breakdown(self, report_data: Dict[str, Any]) -> List:
         """Add P&L breakdown details"""
         story = []
         
@@ -367,7 +395,7 @@ class PDFReportGenerator:
         
         return story
     
-    async def _add_risk_details(self, report_data: Dict[str, Any]) -> List:
+    def _add_risk_details(self, report_data: Dict[str, Any]) -> List:
         """Add risk assessment details"""
         story = []
         
@@ -421,30 +449,55 @@ class PDFReportGenerator:
         
         return story
     
-    async def _add_trade_history(self, report_data: Dict[str, Any]) -> List:
-        """Add trade history details"""
+    def _add_trade_history(self, trade_chunks: Iterable[List[TradeRecord]],
+                           progress: Optional[Callable[[int], None]] = None) -> Tuple[List, TradeTotals]:
+        """Add trade history as page-sized tables, totalling rows beyond the display limit"""
         story = []
         
-        story.append(Paragraph("Recent Trade History", self.styles['CustomHeading1']))
+        story.append(Paragraph("Trade History", self.styles['CustomHeading1']))
         story.append(Spacer(1, 0.1 * inch))
         
-        trades = report_data["trade_history"][:20]  # Show last 20 trades
-        
-        trade_data = [['Time', 'Symbol', 'Side', 'Quantity', 'Price', 'P&L', 'Fee']]
+        header = ['Time', 'Symbol', 'Side', 'Quantity', 'Price', 'P&L', 'Fee']
+        rows = []
+        totals = TradeTotals()
+        
+        for trades in trade_chunks:
+            for trade in trades[:max(PDF_TRADE_ROW_LIMIT - totals.total_trades, 0)]:
+                pnl_str = f"${trade.realized_pnl:,.2f}" if trade.realized_pnl else "N/A"
+                rows.append([
+                    trade.timestamp.strftime("%m-%d %H:%M"),
+                    trade.symbol,
+                    trade.side.upper(),
+                    f"{trade.quantity:.4f}",
+                    f"${trade.price:,.2f}",
+                    pnl_str,
+                    f"${trade.fee:.2f}"
+                ])
+                if len(rows) == PDF_TRADE_ROWS_PER_TABLE:
+                    story.append(self._trade_table([header] + rows))
+                    rows = []
+            totals.add(trades)
+            if progress is not None:
+                progress(totals.total_trades)
+        
+        if rows or totals.total_trades == 0:
+            story.append(self._trade_table([header] + rows))
+        
+        if totals.total_trades > PDF_TRADE_ROW_LIMIT:
+            story.append(Spacer(1, 0.1 * inch))
+            story.append(Paragraph(
+                f"Showing the first {PDF_TRADE_ROW_LIMIT:,} of {totals.total_trades:,} trades. "
+                f"Export the report as CSV for the full trade history.",
+                self.styles['CustomBody']
+            ))
         
-        for trade in trades:
-            pnl_str = f"${trade.realized_pnl:,.2f}" if trade.realized_pnl else "N/A"
-            trade_data.append([
-                trade.timestamp.strftime("%m-%d %H:%M"),
-                trade.symbol,
-                trade.side.upper(),
-                f"{trade.quantity:.4f}",
-                f"${trade.price:,.2f}",
-                pnl_str,
-                f"${trade.fee:.2f}"
-            ])
+        story.append(Spacer(1, 0.3 * inch))
         
-        trade_table = Table(trade_data, colWidths=[1*inch, 1*inch, 0.7*inch, 1*inch, 1*inch, 1*inch, 0.7*inch])
+        return story, totals
+    
+    def _trade_table(self, trade_data: List[List[str]]):
+        trade_table = Table(trade_data, colWidths=[1*inch, 1*inch, 0.7*inch, 1*inch, 1*inch, 1*inch, 0.7*inch],
+                            repeatRows=1)
         trade_table.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
@@ -456,13 +509,9 @@ class PDFReportGenerator:
             ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
             ('GRID', (0, 0), (-1, -1), 1, colors.black)
         ]))
-        
-        story.append(trade_table)
-        story.append(Spacer(1, 0.3 * inch))
-        
-        return story
+        return trade_table
     
-    async def _add_charts_section(self, report_data: Dict[str, Any], template) -> List:
+    def _add_charts_section(self, report_data: Dict[str, Any], template) -> List:
         """Add charts and visualizations"""
         story = []
         
@@ -489,7 +538,7 @@ class PDFReportGenerator:
         
         return story
     
-    async def _add_footer(self, report_data: Dict[str, Any]) -> List:
+    def _add_footer(self, report_data: Dict[str, Any]) -> List:
         """Add report footer"""
         story = []
         
@@ -511,12 +560,28 @@ class PDFReportGenerator:
         """Check if section should be included based on template"""
         return template.sections.get(section_name, {})
     
-    async def _generate_simple_pdf(self, report_data: Dict[str, Any], file_path: str):
+    def _drain_trades(self, trade_chunks: Optional[Iterable[List[TradeRecord]]],
+                      progress: Optional[Callable[[int], None]]) -> Optional[TradeTotals]:
+        """Total the trades without laying them out (simple fallback formats)"""
+        if trade_chunks is None:
+            return None
+        totals = TradeTotals()
+        for trades in trade_chunks:
+            totals.add(trades)
+            if progress is not None:
+                progress(totals.total_trades)
+        return totals
+    
+    def _generate_simple_pdf(self, report_data: Dict[str, Any], file_path: str,
+                             trade_chunks: Optional[Iterable[List[TradeRecord]]] = None,
+                             progress: Optional[Callable[[int], None]] = None) -> str:
         """Generate simple text-based PDF as fallback"""
+        totals = self._drain_trades(trade_chunks, progress)
         if not REPORTLAB_AVAILABLE:
             # If reportlab is not available, create a simple text file instead
-            await self._generate_simple_text_file(report_data, file_path.replace('.pdf', '.txt'))
-            return
+            text_path = file_path.replace('.pdf', '.txt')
+            self._generate_simple_text_file(report_data, text_path, totals)
+            return text_path
         
         from reportlab.pdfgen import canvas
         
@@ -525,8 +590,9 @@ class PDFReportGenerator:
             width, height = A4
         except Exception:
             # If A4 is not available, fall back to text file
-            await self._generate_simple_text_file(report_data, file_path.replace('.pdf', '.txt'))
-            return
+            text_path = file_path.replace('.pdf', '.txt')
+            self._generate_simple_text_file(report_data, text_path, totals)
+            return text_path
         
         # Title
         c.setFont("Helvetica-Bold", 16)
@@ -550,9 +616,15 @@ class PDFReportGenerator:
             c.drawString(100, y_position, f"Win Rate: {pnl.win_rate:.1f}%")
             y_position -= 20
         
+        if totals is not None:
+            c.drawString(100, y_position, f"Trades: {totals.total_trades:,}  Volume: ${totals.total_volume:,.2f}")
+            y_position -= 20
+        
         c.save()
+        return file_path
     
-    async def _generate_simple_text_file(self, report_data: Dict[str, Any], file_path: str):
+    def _generate_simple_text_file(self, report_data: Dict[str, Any], file_path: str,
+                                   totals: Optional[TradeTotals] = None):
         """Generate simple text file as fallback when PDF libraries are not available"""
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write("CRYPTO TRADING TERMINAL - TRADING REPORT\n")
@@ -575,5 +647,12 @@ class PDFReportGenerator:
                 for account in report_data["accounts"]:
                     f.write(f"{account.asset}: {account.total_balance} (${account.usd_value})\n")
             
+            # Trade history totals
+            if totals is not None:
+                f.write("\nTrade History:\n")
+                f.write(f"Total Trades: {totals.total_trades}\n")
+                f.write(f"Total Volume: ${totals.total_volume:,.2f}\n")
+                f.write(f"Total Fees: ${totals.total_fees:,.2f}\n")
+            
             f.write(f"\nReport generated by Crypto Trading Terminal\n")
             f.write(f"File format: Text (PDF generation not available)\n")
\ No newline at end of file
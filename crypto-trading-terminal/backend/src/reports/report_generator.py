@@ -12,24 +12,34 @@ from typing import List, Dict, Optional, Any, Union
 from pathlib import Path
 
 from .report_types import (
-    ReportRequest, ReportResponse, ReportType, ExportFormat,
+    ReportRequest, ReportResponse, ReportType, ExportFormat, ReportJob,
     AccountReport, PositionReport, PnLReport, PerformanceReport, RiskReport,
     AccountBalance, Position, TradeRecord, PnLSummary, PerformanceMetrics, RiskMetrics
 )
-from .pdf_generator import PDFReportGenerator
-from .csv_generator import CSVReportGenerator
+from .report_index import ReportIndex
+from .report_jobs import RenderSpec, ReportJobManager
+from .report_sources import DEFAULT_CHUNK_SIZE, StaticTradeSource, TradeSource
 from .report_templates import ReportTemplateManager
 
 
 class ReportGenerator:
     """Main report generation coordinator"""
     
-    def __init__(self, output_directory: str = "reports"):
+    def __init__(self, output_directory: str = "reports", index: Optional[ReportIndex] = None,
+                 max_workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
         self.output_directory = Path(output_directory)
         self.output_directory.mkdir(exist_ok=True)
         
-        self.pdf_generator = PDFReportGenerator()
-        self.csv_generator = CSVReportGenerator()
+        # Report index lives next to the files; files from before the index are picked up once
+        if index is None:
+            index = ReportIndex(self.output_directory / "report_index.db")
+            if index.count() == 0:
+                index.backfill(self.output_directory)
+        self.index = index
+        
+        # Files are rendered in worker processes; trade rows stream in chunks of chunk_size
+        self.jobs = ReportJobManager(index, max_workers=max_workers)
+        self.chunk_size = chunk_size
         self.template_manager = ReportTemplateManager()
         
         # Mock data services (replace with actual services)
@@ -38,6 +48,7 @@ class ReportGenerator:
         self.trade_service = None
         self.pnl_service = None
         self.risk_service = None
+        self.trade_source: Optional[TradeSource] = None
     
     def set_data_services(self, account_service, position_service, 
                          trade_service, pnl_service, risk_service):
@@ -48,54 +59,43 @@ class ReportGenerator:
         self.pnl_service = pnl_service
         self.risk_service = risk_service
     
-    async def generate_report(self, request: ReportRequest) -> ReportResponse:
-        """Generate report based on request"""
-        start_time = datetime.now()
-        report_id = str(uuid.uuid4())
+    def set_trade_source(self, trade_source: TradeSource):
+        """Set the chunked trade source; it is pickled into the worker that renders the report"""
+        self.trade_source = trade_source
+    
+    async def submit_report(self, request: ReportRequest) -> ReportJob:
+        """Queue a report for rendering in a worker process and return its job for polling"""
+        if request.export_format not in (ExportFormat.PDF, ExportFormat.CSV):
+            raise ValueError(f"Unsupported export format: {request.export_format}")
+        
+        submitted_at = datetime.now()
+        
+        # Collect data based on report type
+        report_data = await self._collect_report_data(request)
+        
+        # Select template
+        template = self.template_manager.get_template(
+            request.template_id or self._get_default_template_id(request.report_type)
+        )
         
+        return self.jobs.submit(RenderSpec(
+            job_id=str(uuid.uuid4()),
+            report_id=str(uuid.uuid4()),
+            request=request,
+            report_data=report_data,
+            template=template,
+            output_directory=str(self.output_directory),
+            index_path=self.index.database_path,
+            submitted_at=submitted_at,
+            trade_source=self._get_trade_source(request),
+            chunk_size=self.chunk_size
+        ))
+    
+    async def generate_report(self, request: ReportRequest) -> ReportResponse:
+        """Generate report based on request, waiting for the worker to finish the file"""
         try:
-            # Collect data based on report type
-            report_data = await self._collect_report_data(request)
-            
-            # Select template
-            template = self.template_manager.get_template(
-                request.template_id or self._get_default_template_id(request.report_type)
-            )
-            
-            # Generate report file
-            if request.export_format == ExportFormat.PDF:
-                file_path = await self._generate_pdf_report(
-                    report_data, template, report_id, request
-                )
-            elif request.export_format == ExportFormat.CSV:
-                file_path = await self._generate_csv_report(
-                    report_data, template, report_id, request
-                )
-            else:
-                raise ValueError(f"Unsupported export format: {request.export_format}")
-            
-            # Get file info
-            file_size = os.path.getsize(file_path)
-            
-            # Calculate generation time
-            generation_time = (datetime.now() - start_time).total_seconds()
-            
-            # Set expiration (7 days from now)
-            expires_at = datetime.now() + timedelta(days=7)
-            
-            # Generate download URL (in real implementation, this would be a proper URL)
-            download_url = f"/api/reports/download/{report_id}"
-            
-            return ReportResponse(
-                report_id=report_id,
-                file_path=str(file_path),
-                file_size=file_size,
-                download_url=download_url,
-                expires_at=expires_at,
-                generation_time=generation_time,
-                format=request.export_format,
-                report_type=request.report_type
-            )
+            job = await self.submit_report(request)
+            return await self.jobs.wait(job.job_id)
             
         except Exception as e:
             raise Exception(f"Failed to generate report: {str(e)}")
@@ -127,11 +127,18 @@ class ReportGenerator:
         if request.report_type in [ReportType.RISK_ASSESSMENT]:
             report_data.update(await self._collect_risk_data(request))
         
-        if request.report_type == ReportType.TRADE_HISTORY:
-            report_data.update(await self._collect_trade_data(request))
+        # Trade history is not collected here; the worker streams it from the trade source
         
         return report_data
     
+    def _get_trade_source(self, request: ReportRequest) -> Optional[TradeSource]:
+        """Trade source for reports that list trades"""
+        if request.report_type != ReportType.TRADE_HISTORY:
+            return None
+        if self.trade_source is not None:
+            return self.trade_source
+        return StaticTradeSource(self._sample_trades())
+    
     async def _collect_account_data(self, request: ReportRequest) -> Dict[str, Any]:
         """Collect account and balance data"""
         # Mock data - replace with actual service calls
@@ -322,9 +329,9 @@ class ReportGenerator:
             ]
         }
     
-    async def _collect_trade_data(self, request: ReportRequest) -> Dict[str, Any]:
-        """Collect trade history data"""
-        trades = [
+    def _sample_trades(self) -> List[TradeRecord]:
+        """Sample trade history used until a trade source is configured"""
+        return [
             TradeRecord(
                 id="trade_001",
                 symbol="BTCUSDT",
@@ -348,13 +355,6 @@ class ReportGenerator:
                 realized_pnl=Decimal("200")
             )
         ]
-        
-        return {
-            "trade_history": trades,
-            "total_trades": len(trades),
-            "total_volume": sum(t.quantity * t.price for t in trades),
-            "total_fees": sum(t.fee for t in trades)
-        }
     
     def _get_default_template_id(self, report_type: ReportType) -> str:
         """Get default template ID for report type"""
@@ -368,26 +368,3 @@ class ReportGenerator:
             ReportType.PORTFOLIO_SUMMARY: "account_summary_default"
         }
         return template_mapping.get(report_type, "account_summary_default")
-    
-    async def _generate_pdf_report(self, report_data: Dict[str, Any], 
-                                 template, report_id: str, request: ReportRequest) -> str:
-        """Generate PDF report"""
-        file_path = self.output_directory / f"{report_id}.pdf"
-        await self.pdf_generator.generate(report_data, template, str(file_path))
-        
-        # Check if the actual file was created (it might be a .txt file if reportlab is not available)
-        actual_file_path = file_path
-        if not file_path.exists():
-            # Try text file fallback
-            text_file_path = self.output_directory / f"{report_id}.txt"
-            if text_file_path.exists():
-                actual_file_path = text_file_path
-        
-        return str(actual_file_path)
-    
-    async def _generate_csv_report(self, report_data: Dict[str, Any],
-                                 template, report_id: str, request: ReportRequest) -> str:
-        """Generate CSV report"""
-        file_path = self.output_directory / f"{report_id}.csv"
-        await self.csv_generator.generate(report_data, template, str(file_path))
-        return str(file_path)
\ No newline at end of file
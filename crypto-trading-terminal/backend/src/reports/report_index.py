@@ -0,0 +1,342 @@
+"""
+Persistent report index
+Keeps one SQLite row per generated report file so listing, filtering and
+retention run as indexed queries instead of directory scans
+"""
+
+import base64
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+from .report_types import ExportFormat, ReportJob, ReportJobStatus, ReportType
+
+REPORT_RETENTION = timedelta(days=7)
+REPORT_SUFFIXES = ('.pdf', '.csv', '.txt')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    report_id TEXT PRIMARY KEY,
+    file_path TEXT NOT NULL,
+    file_size INTEGER NOT NULL,
+    report_type TEXT,
+    export_format TEXT NOT NULL,
+    user_id INTEGER,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    generation_time REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_reports_created ON reports (created_at, report_id);
+CREATE INDEX IF NOT EXISTS idx_reports_type ON reports (report_type, created_at, report_id);
+CREATE INDEX IF NOT EXISTS idx_reports_user ON reports (user_id, created_at, report_id);
+CREATE INDEX IF NOT EXISTS idx_reports_expires ON reports (expires_at);
+CREATE TABLE IF NOT EXISTS report_jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    report_type TEXT NOT NULL,
+    export_format TEXT NOT NULL,
+    user_id INTEGER,
+    rows_written INTEGER NOT NULL DEFAULT 0,
+    total_rows INTEGER,
+    report_id TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    owner TEXT,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_report_jobs_updated ON report_jobs (updated_at);
+"""
+
+_COLUMNS = ("report_id, file_path, file_size, report_type, export_format, "
+            "user_id, created_at, expires_at, generation_time")
+_JOB_COLUMNS = ("job_id, status, report_type, export_format, user_id, rows_written, "
+                "total_rows, report_id, error, created_at, updated_at")
+_JOB_FIELDS = {"status", "rows_written", "total_rows", "report_id", "error"}
+# Columns added to report_jobs after the table was first created
+_JOB_MIGRATIONS = (("owner", "TEXT"), ("heartbeat_at", "REAL"))
+
+
+@dataclass
+class ReportRecord:
+    """Index entry for one generated report file"""
+    report_id: str
+    file_path: str
+    file_size: int
+    export_format: str
+    created_at: datetime
+    expires_at: datetime
+    report_type: Optional[str] = None
+    user_id: Optional[int] = None
+    generation_time: float = 0.0
+
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        return (now or datetime.now()) >= self.expires_at
+
+    def _row(self) -> tuple:
+        return (self.report_id, self.file_path, self.file_size, self.report_type,
+                self.export_format, self.user_id, self.created_at.timestamp(),
+                self.expires_at.timestamp(), self.generation_time)
+
+    @classmethod
+    def _from_row(cls, row: tuple) -> "ReportRecord":
+        return cls(
+            report_id=row[0],
+            file_path=row[1],
+            file_size=row[2],
+            report_type=row[3],
+            export_format=row[4],
+            user_id=row[5],
+            created_at=datetime.fromtimestamp(row[6]),
+            expires_at=datetime.fromtimestamp(row[7]),
+            generation_time=row[8]
+        )
+
+
+def encode_cursor(record: ReportRecord) -> str:
+    """Opaque keyset cursor pointing just past the given record"""
+    payload = json.dumps([record.created_at.timestamp(), record.report_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        created_at, report_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(created_at), str(report_id)
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid report cursor: {cursor!r}")
+
+
+class ReportIndex:
+    """SQLite-backed index of generated reports, newest first"""
+
+    def __init__(self, database_path: Union[str, Path] = ":memory:"):
+        self.database_path = str(database_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.database_path, check_same_thread=False)
+        if self.database_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(report_jobs)")}
+        for name, column_type in _JOB_MIGRATIONS:
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE report_jobs ADD COLUMN {name} {column_type}")
+        self._conn.commit()
+
+    def add(self, record: ReportRecord):
+        """Insert or replace the entry for a report file"""
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO reports ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                record._row()
+            )
+            self._conn.commit()
+
+    def get(self, report_id: str) -> Optional[ReportRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM reports WHERE report_id = ?", (report_id,)
+            ).fetchone()
+        return ReportRecord._from_row(row) if row else None
+
+    def remove(self, report_id: str) -> Optional[ReportRecord]:
+        """Drop an entry and return it, or None if it was not indexed"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM reports WHERE report_id = ?", (report_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("DELETE FROM reports WHERE report_id = ?", (report_id,))
+            self._conn.commit()
+        return ReportRecord._from_row(row)
+
+    def list(self, limit: int = 50, cursor: Optional[str] = None,
+             report_type: Optional[str] = None, user_id: Optional[int] = None,
+             start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+             now: Optional[datetime] = None) -> Tuple[List[ReportRecord], Optional[str]]:
+        """
+        One page of unexpired reports, newest first.
+
+        Returns the records and the cursor for the next page (None on the last page).
+        """
+        where, params = self._filters(report_type, user_id, start_date, end_date, now)
+        if cursor:
+            where.append("(created_at, report_id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+
+        sql = f"SELECT {_COLUMNS} FROM reports WHERE {' AND '.join(where)} " \
+              f"ORDER BY created_at DESC, report_id DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, limit + 1)).fetchall()
+
+        records = [ReportRecord._from_row(row) for row in rows[:limit]]
+        next_cursor = encode_cursor(records[-1]) if len(rows) > limit else None
+        return records, next_cursor
+
+    def count(self, report_type: Optional[str] = None, user_id: Optional[int] = None,
+              start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+              now: Optional[datetime] = None) -> int:
+        where, params = self._filters(report_type, user_id, start_date, end_date, now)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM reports WHERE {' AND '.join(where)}", params
+            ).fetchone()[0]
+
+    def purge_expired(self, now: Optional[datetime] = None) -> List[ReportRecord]:
+        """Remove expired entries and return them so their files can be deleted"""
+        cutoff = (now or datetime.now()).timestamp()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM reports WHERE expires_at <= ?", (cutoff,)
+            ).fetchall()
+            if rows:
+                self._conn.execute("DELETE FROM reports WHERE expires_at <= ?", (cutoff,))
+                self._conn.commit()
+        return [ReportRecord._from_row(row) for row in rows]
+
+    def backfill(self, directory: Union[str, Path], retention: timedelta = REPORT_RETENTION) -> int:
+        """Index report files written before the index existed; returns the number added"""
+        directory = Path(directory)
+        if not directory.exists():
+            return 0
+
+        with self._lock:
+            known = {row[0] for row in self._conn.execute("SELECT report_id FROM reports")}
+
+        added = 0
+        for file_path in directory.iterdir():
+            if file_path.suffix not in REPORT_SUFFIXES or file_path.stem in known or not file_path.is_file():
+                continue
+            stat = file_path.stat()
+            created_at = datetime.fromtimestamp(stat.st_mtime)
+            self.add(ReportRecord(
+                report_id=file_path.stem,
+                file_path=str(file_path),
+                file_size=stat.st_size,
+                export_format='csv' if file_path.suffix == '.csv' else 'pdf',
+                created_at=created_at,
+                expires_at=created_at + retention
+            ))
+            added += 1
+        return added
+
+    def save_job(self, job: ReportJob, owner: Optional[str] = None):
+        """Insert or replace a job; owner identifies the process that will finish it"""
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO report_jobs ({_JOB_COLUMNS}, owner, heartbeat_at) "
+                f"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job.job_id, job.status.value, job.report_type.value, job.export_format.value,
+                 job.user_id, job.rows_written, job.total_rows, job.report_id, job.error,
+                 job.created_at.timestamp(), job.updated_at.timestamp(),
+                 owner, datetime.now().timestamp())
+            )
+            self._conn.commit()
+
+    def update_job(self, job_id: str, **fields):
+        """Update progress fields of a job; callable from the worker process that renders it"""
+        unknown = set(fields) - _JOB_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown job fields: {sorted(unknown)}")
+        if isinstance(fields.get("status"), ReportJobStatus):
+            fields["status"] = fields["status"].value
+
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE report_jobs SET {assignments}, updated_at = ? WHERE job_id = ?",
+                (*fields.values(), datetime.now().timestamp(), job_id)
+            )
+            self._conn.commit()
+
+    def get_job(self, job_id: str) -> Optional[ReportJob]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_JOB_COLUMNS} FROM report_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return ReportJob(
+            job_id=row[0],
+            status=ReportJobStatus(row[1]),
+            report_type=ReportType(row[2]),
+            export_format=ExportFormat(row[3]),
+            user_id=row[4],
+            rows_written=row[5],
+            total_rows=row[6],
+            report_id=row[7],
+            error=row[8],
+            created_at=datetime.fromtimestamp(row[9]),
+            updated_at=datetime.fromtimestamp(row[10])
+        )
+
+    def heartbeat_jobs(self, owner: str) -> int:
+        """Refresh the heartbeat of the owner's unfinished jobs"""
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE report_jobs SET heartbeat_at = ? WHERE owner = ? AND status IN (?, ?)",
+                (datetime.now().timestamp(), owner,
+                 ReportJobStatus.QUEUED.value, ReportJobStatus.RUNNING.value)
+            ).rowcount
+            self._conn.commit()
+        return updated
+
+    def fail_orphaned_jobs(self, error: str, owner_alive: Callable[[str], bool], stale_before: datetime) -> int:
+        """
+        Mark queued and running jobs failed when no process can still finish them.
+
+        A job is orphaned when it has no owner, owner_alive() says its owner is gone,
+        or its heartbeat is older than stale_before.
+        """
+        unfinished = (ReportJobStatus.QUEUED.value, ReportJobStatus.RUNNING.value)
+        with self._lock:
+            owners = [row[0] for row in self._conn.execute(
+                "SELECT DISTINCT owner FROM report_jobs WHERE status IN (?, ?) AND owner IS NOT NULL", unfinished
+            )]
+            gone = [owner for owner in owners if not owner_alive(owner)]
+            failed = self._conn.execute(
+                "UPDATE report_jobs SET status = ?, error = ?, updated_at = ? "
+                "WHERE status IN (?, ?) AND (owner IS NULL OR heartbeat_at IS NULL OR heartbeat_at < ? "
+                f"OR owner IN ({', '.join('?' for _ in gone) or 'NULL'}))",
+                (ReportJobStatus.FAILED.value, error, datetime.now().timestamp(),
+                 *unfinished, stale_before.timestamp(), *gone)
+            ).rowcount
+            self._conn.commit()
+        return failed
+
+    def purge_jobs(self, before: datetime) -> int:
+        """Forget finished jobs last updated before the cutoff"""
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM report_jobs WHERE updated_at < ? AND status IN (?, ?)",
+                (before.timestamp(), ReportJobStatus.COMPLETED.value, ReportJobStatus.FAILED.value)
+            ).rowcount
+            self._conn.commit()
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _filters(report_type, user_id, start_date, end_date, now) -> Tuple[List[str], list]:
+        where = ["expires_at > ?"]
+        params: list = [(now or datetime.now()).timestamp()]
+        if report_type is not None:
+            where.append("report_type = ?")
+            params.append(report_type)
+        if user_id is not None:
+            where.append("user_id = ?")
+            params.append(user_id)
+        if start_date is not None:
+            where.append("created_at >= ?")
+            params.append(start_date.timestamp())
+        if end_date is not None:
+            where.append("created_at < ?")
+            params.append(end_date.timestamp())
+        return where, params
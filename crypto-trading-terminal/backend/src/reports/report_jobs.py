@@ -0,0 +1,292 @@
+"""
+Off-loop report rendering
+Report files are laid out in a worker process pool while the API keeps serving;
+job progress is written to the report index so clients can poll for it
+"""
+
+import asyncio
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .csv_generator import CSVReportGenerator
+from .report_index import REPORT_RETENTION, ReportIndex, ReportRecord
+from .report_sources import DEFAULT_CHUNK_SIZE, TradeSource
+from .report_templates import ReportTemplate
+from .report_types import ExportFormat, ReportJob, ReportJobStatus, ReportRequest, ReportResponse
+
+# Owner recorded on job rows: host, pid and a token that tells this process apart from
+# an earlier one that had the same pid
+_HOST = socket.gethostname()
+_PROCESS_TOKEN = uuid.uuid4().hex[:12]
+INTERRUPTED_ERROR = "Interrupted by service restart"
+
+
+def process_owner() -> str:
+    return f"{_HOST}:{os.getpid()}:{_PROCESS_TOKEN}"
+
+
+def owner_alive(owner: str) -> bool:
+    """Whether the process that owns a job can still be running; other hosts rely on the heartbeat"""
+    try:
+        host, pid, token = owner.rsplit(":", 2)
+        pid = int(pid)
+    except ValueError:
+        return False
+    if host != _HOST:
+        return True
+    if pid == os.getpid():
+        return token == _PROCESS_TOKEN
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@dataclass
+class RenderSpec:
+    """Everything a worker needs to render one report; must be picklable"""
+    job_id: str
+    report_id: str
+    request: ReportRequest
+    report_data: Dict[str, Any]
+    template: ReportTemplate
+    output_directory: str
+    index_path: str
+    submitted_at: datetime
+    trade_source: Optional[TradeSource] = None
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+
+
+class _JobProgress:
+    """Progress callback that writes the row count to the index at most once per interval"""
+
+    def __init__(self, index: ReportIndex, job_id: str, interval: float = 0.5):
+        self.index = index
+        self.job_id = job_id
+        self.interval = interval
+        self.rows = 0
+        self._last_write = time.monotonic()
+
+    def __call__(self, rows: int):
+        self.rows = rows
+        now = time.monotonic()
+        if now - self._last_write >= self.interval:
+            self.index.update_job(self.job_id, rows_written=rows)
+            self._last_write = now
+
+
+def render_report(spec: RenderSpec, index: Optional[ReportIndex] = None) -> ReportResponse:
+    """Render one report file and record it in the index; runs in a worker process"""
+    owns_index = index is None
+    if owns_index:
+        index = ReportIndex(spec.index_path)
+
+    try:
+        request = spec.request
+        total_rows = spec.trade_source.count(request) if spec.trade_source is not None else None
+        index.update_job(spec.job_id, status=ReportJobStatus.RUNNING, total_rows=total_rows)
+
+        progress = _JobProgress(index, spec.job_id)
+        trade_chunks = None
+        if spec.trade_source is not None:
+            trade_chunks = spec.trade_source.iter_chunks(request, spec.chunk_size)
+        report_data = dict(spec.report_data, report_id=spec.report_id)
+
+        # Generate report file
+        output_directory = Path(spec.output_directory)
+        if request.export_format == ExportFormat.PDF:
+            from .pdf_generator import PDFReportGenerator
+            file_path = PDFReportGenerator().render(
+                report_data, spec.template, str(output_directory / f"{spec.report_id}.pdf"),
+                trade_chunks, progress
+            )
+        elif request.export_format == ExportFormat.CSV:
+            file_path = CSVReportGenerator().render(
+                report_data, spec.template, str(output_directory / f"{spec.report_id}.csv"),
+                trade_chunks, progress
+            )
+        else:
+            raise ValueError(f"Unsupported export format: {request.export_format}")
+
+        file_size = os.path.getsize(file_path)
+        created_at = datetime.now()
+        expires_at = created_at + REPORT_RETENTION
+        generation_time = (created_at - spec.submitted_at).total_seconds()
+
+        index.add(ReportRecord(
+            report_id=spec.report_id,
+            file_path=str(file_path),
+            file_size=file_size,
+            export_format=request.export_format.value,
+            created_at=created_at,
+            expires_at=expires_at,
+            report_type=request.report_type.value,
+            user_id=request.user_id,
+            generation_time=generation_time
+        ))
+        index.update_job(spec.job_id, status=ReportJobStatus.COMPLETED,
+                         rows_written=progress.rows, report_id=spec.report_id)
+
+        return ReportResponse(
+            report_id=spec.report_id,
+            file_path=str(file_path),
+            file_size=file_size,
+            download_url=f"/api/reports/download/{spec.report_id}",
+            expires_at=expires_at,
+            generation_time=generation_time,
+            format=request.export_format,
+            report_type=request.report_type
+        )
+
+    except Exception as e:
+        index.update_job(spec.job_id, status=ReportJobStatus.FAILED, error=str(e))
+        raise
+    finally:
+        if owns_index:
+            index.close()
+
+
+class ReportJobManager:
+    """Submits render jobs to a process pool and tracks them until they finish"""
+
+    def __init__(self, index: ReportIndex, max_workers: Optional[int] = None,
+                 heartbeat_interval: float = 10.0):
+        self.index = index
+        # 0 renders on a thread of the event loop's default executor instead of a process
+        self.max_workers = max_workers if max_workers is not None else min(2, os.cpu_count() or 1)
+        self.owner = process_owner()
+        self.heartbeat_interval = heartbeat_interval
+        # A job whose owner missed this many heartbeats is treated as abandoned
+        self.stale_after = heartbeat_interval * 3
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._heartbeat_thread: Optional[threading.Thread] = None
+        self._heartbeat_stop = threading.Event()
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'interrupted': 0
+        }
+        # Jobs left by a process that is gone will never finish; other live processes keep theirs
+        self.fail_orphaned_jobs()
+
+    def fail_orphaned_jobs(self) -> int:
+        """Fail unfinished jobs whose owner has exited or stopped sending heartbeats"""
+        stale_before = datetime.now() - timedelta(seconds=self.stale_after)
+        interrupted = self.index.fail_orphaned_jobs(INTERRUPTED_ERROR, owner_alive, stale_before)
+        self.stats['interrupted'] += interrupted
+        return interrupted
+
+    def _start_heartbeat(self):
+        if self._heartbeat_thread is not None and self._heartbeat_thread.is_alive():
+            return
+        self._heartbeat_stop.clear()
+        self._heartbeat_thread = threading.Thread(
+            target=self._heartbeat_loop, name="report-job-heartbeat", daemon=True
+        )
+        self._heartbeat_thread.start()
+
+    def _heartbeat_loop(self):
+        while not self._heartbeat_stop.wait(self.heartbeat_interval):
+            try:
+                self.index.heartbeat_jobs(self.owner)
+                self.fail_orphaned_jobs()
+            except sqlite3.ProgrammingError:
+                # Index closed underneath us
+                return
+            except sqlite3.Error:
+                # Locked or busy database; try again on the next beat
+                continue
+
+    @property
+    def uses_processes(self) -> bool:
+        # Worker processes reach the index through its file; an in-memory index stays on threads
+        return self.max_workers > 0 and self.index.database_path != ":memory:"
+
+    def submit(self, spec: RenderSpec) -> ReportJob:
+        """Queue a report for rendering and return its job record; must be called from the event loop"""
+        now = datetime.now()
+        job = ReportJob(
+            job_id=spec.job_id,
+            status=ReportJobStatus.QUEUED,
+            report_type=spec.request.report_type,
+            export_format=spec.request.export_format,
+            created_at=now,
+            updated_at=now,
+            user_id=spec.request.user_id
+        )
+        self.index.save_job(job, owner=self.owner)
+        self._start_heartbeat()
+
+        loop = asyncio.get_running_loop()
+        if self.uses_processes:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            future = loop.run_in_executor(self._executor, render_report, spec)
+        else:
+            future = loop.run_in_executor(None, render_report, spec, self.index)
+
+        self._futures[job.job_id] = future
+        future.add_done_callback(partial(self._on_done, job.job_id))
+        self.stats['submitted'] += 1
+        return job
+
+    def _on_done(self, job_id: str, future: asyncio.Future):
+        self._futures.pop(job_id, None)
+        error = None if future.cancelled() else future.exception()
+        if not future.cancelled() and error is None:
+            self.stats['completed'] += 1
+            return
+
+        self.stats['failed'] += 1
+        if isinstance(error, BrokenProcessPool):
+            # A crashed worker takes the pool with it; the next job starts a fresh one
+            self._executor = None
+        # Worker crashes and cancellations never reach render_report's own error handling
+        job = self.index.get_job(job_id)
+        if job is not None and job.status != ReportJobStatus.FAILED:
+            self.index.update_job(job_id, status=ReportJobStatus.FAILED,
+                                  error=str(error) if error else "cancelled")
+
+    async def wait(self, job_id: str) -> ReportResponse:
+        """Wait for a job submitted by this manager; cancelling the waiter does not cancel the job"""
+        future = self._futures.get(job_id)
+        if future is None:
+            raise KeyError(f"No running report job {job_id}")
+        return await asyncio.shield(future)
+
+    def get_job(self, job_id: str) -> Optional[ReportJob]:
+        return self.index.get_job(job_id)
+
+    def shutdown(self, wait: bool = True):
+        self._heartbeat_stop.set()
+        if self._heartbeat_thread is not None:
+            if wait:
+                self._heartbeat_thread.join()
+            self._heartbeat_thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'running': len(self._futures),
+            'max_workers': self.max_workers,
+            'uses_processes': self.uses_processes
+        }
@@ -0,0 +1,138 @@
+"""
+Chunked row sources for report rendering
+Sources are picklable so a worker process can stream rows itself instead of
+receiving the whole trade history from the API process
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterator, List, Optional
+
+from .report_types import ReportRequest, TradeRecord
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+class TradeSource(ABC):
+    """Yields the trades of a report period in bounded chunks"""
+
+    def count(self, request: ReportRequest) -> Optional[int]:
+        """Number of rows the report will contain, or None if unknown"""
+        return None
+
+    @abstractmethod
+    def iter_chunks(self, request: ReportRequest,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[TradeRecord]]:
+        """Trades of the report period in time order, at most chunk_size per list"""
+
+
+class StaticTradeSource(TradeSource):
+    """Trades already held in memory (small reports and sample data)"""
+
+    def __init__(self, trades: List[TradeRecord]):
+        self.trades = list(trades)
+
+    def count(self, request: ReportRequest) -> Optional[int]:
+        return len(self.trades)
+
+    def iter_chunks(self, request: ReportRequest,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[TradeRecord]]:
+        for start in range(0, len(self.trades), chunk_size):
+            yield self.trades[start:start + chunk_size]
+
+
+class DatabaseTradeSource(TradeSource):
+    """
+    Filled orders read from the trading database with a server-side cursor.
+
+    Only the database URL is pickled; each worker process opens its own engine.
+    """
+
+    _BASE_QUERY = """
+        FROM orders o JOIN accounts a ON a.id = o.account_id
+        WHERE o.quantity_filled > 0
+          AND o.order_time >= :start_date AND o.order_time < :end_date
+    """
+
+    def __init__(self, database_url: str):
+        self.database_url = database_url
+        self._engine = None
+
+    def __getstate__(self):
+        return {"database_url": self.database_url, "_engine": None}
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from sqlalchemy import create_engine
+            self._engine = create_engine(self.database_url)
+        return self._engine
+
+    def _where(self, request: ReportRequest):
+        clause, params = self._BASE_QUERY, {"start_date": request.start_date, "end_date": request.end_date}
+        if request.user_id is not None:
+            clause += " AND a.user_id = :user_id"
+            params["user_id"] = request.user_id
+        if request.exchanges:
+            names = [f"exchange_{i}" for i in range(len(request.exchanges))]
+            clause += f" AND a.exchange IN ({', '.join(':' + name for name in names)})"
+            params.update(zip(names, request.exchanges))
+        if request.assets:
+            names = [f"asset_{i}" for i in range(len(request.assets))]
+            clause += " AND (" + " OR ".join(f"o.symbol LIKE :{name}" for name in names) + ")"
+            params.update((name, f"{asset}%") for name, asset in zip(names, request.assets))
+        return clause, params
+
+    @staticmethod
+    def _query(sql: str):
+        from sqlalchemy import DateTime, bindparam, text
+        return text(sql).bindparams(bindparam("start_date", type_=DateTime),
+                                    bindparam("end_date", type_=DateTime))
+
+    def count(self, request: ReportRequest) -> Optional[int]:
+        clause, params = self._where(request)
+        with self.engine.connect() as conn:
+            return conn.execute(self._query(f"SELECT COUNT(*) {clause}"), params).scalar()
+
+    def iter_chunks(self, request: ReportRequest,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[TradeRecord]]:
+        from sqlalchemy import DateTime
+        clause, params = self._where(request)
+        query = self._query(
+            "SELECT o.id, o.symbol, a.exchange, o.order_side, o.quantity_filled, "
+            "o.average_price, o.price, o.commission, o.order_time, o.exchange_order_id "
+            f"{clause} ORDER BY o.order_time, o.id"
+        ).columns(order_time=DateTime)
+
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(query, params)
+            for rows in result.partitions(chunk_size):
+                yield [
+                    TradeRecord(
+                        id=str(row.id),
+                        symbol=row.symbol,
+                        exchange=row.exchange,
+                        side=row.order_side,
+                        quantity=Decimal(str(row.quantity_filled)),
+                        price=Decimal(str(row.average_price if row.average_price is not None else row.price or 0)),
+                        fee=Decimal(str(row.commission or 0)),
+                        timestamp=row.order_time,
+                        exchange_order_id=row.exchange_order_id
+                    )
+                    for row in rows
+                ]
+
+
+@dataclass
+class TradeTotals:
+    """Running totals kept while trades stream past"""
+    total_trades: int = 0
+    total_volume: Decimal = Decimal("0")
+    total_fees: Decimal = Decimal("0")
+
+    def add(self, trades: List[TradeRecord]):
+        self.total_trades += len(trades)
+        for trade in trades:
+            self.total_volume += trade.quantity * trade.price
+            self.total_fees += trade.fee
@@ -191,6 +191,7 @@ class ReportRequest:
     include_charts: bool = True
     template_id: Optional[str] = None
     custom_parameters: Optional[Dict[str, str]] = None
+    user_id: Optional[int] = None
 
 
 @dataclass
@@ -203,4 +204,37 @@ class ReportResponse:
     expires_at: datetime
     generation_time: float
     format: ExportFormat
-    report_type: ReportType
\ No newline at end of file
+    report_type: ReportType
+
+
+class ReportJobStatus(Enum):
+    """Lifecycle of an off-loop report generation job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+@dataclass
+class ReportJob:
+    """Progress of a report being rendered in a worker process"""
+    job_id: str
+    status: ReportJobStatus
+    report_type: ReportType
+    export_format: ExportFormat
+    created_at: datetime
+    updated_at: datetime
+    user_id: Optional[int] = None
+    rows_written: int = 0
+    total_rows: Optional[int] = None
+    report_id: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def progress(self) -> float:
+        """Fraction of rows rendered; 1.0 only once the file is complete"""
+        if self.status == ReportJobStatus.COMPLETED:
+            return 1.0
+        if not self.total_rows:
+            return 0.0
+        return min(self.rows_written / self.total_rows, 0.99)
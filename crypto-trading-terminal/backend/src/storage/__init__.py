@@ -4,6 +4,13 @@
 
 from .database import get_db_session, init_database, close_database, get_engine
 from .redis_cache import init_redis, close_redis, get_cache_manager, get_market_cache
+from .write_behind import (
+    WriteBehindWriter,
+    WriteDurability,
+    get_write_behind_writer,
+    start_write_behind_writer,
+    stop_write_behind_writer
+)
 from .models import (
     Base,
     User, 
@@ -33,6 +40,13 @@ __all__ = [
     "get_cache_manager",
     "get_market_cache",
     
+    # Write-behind
+    "WriteBehindWriter",
+    "WriteDurability",
+    "get_write_behind_writer",
+    "start_write_behind_writer",
+    "stop_write_behind_writer",
+    
     # Models
     "Base",
     "User",
@@ -0,0 +1,344 @@
+"""
+异步批量写回服务
+热路径只把行字典放入有界缓冲区，后台任务按数量或时间批量插入，
+避免市场数据、系统日志、订单执行记录等只追加数据逐行 add + flush
+"""
+
+import asyncio
+import time
+from collections import deque
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import Float, Table, event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.orm import Session
+
+logger = structlog.get_logger()
+
+Row = Tuple[Table, Dict[str, Any]]
+
+# 会话info中等待事务提交的行
+_AFTER_COMMIT_ROWS = "write_behind_rows"
+
+
+class WriteDurability(Enum):
+    """批量写入的持久化级别"""
+    RELAXED = "relaxed"  # SQLite synchronous=OFF / PostgreSQL synchronous_commit=off，崩溃可能丢失最近几批
+    COMMIT = "commit"    # 每批一个事务，沿用数据库默认同步级别
+    FSYNC = "fsync"      # SQLite synchronous=FULL / PostgreSQL synchronous_commit=on，每批提交都落盘
+
+
+_SQLITE_SYNCHRONOUS = {
+    WriteDurability.RELAXED: "OFF",
+    WriteDurability.FSYNC: "FULL"
+}
+
+_POSTGRES_SYNCHRONOUS_COMMIT = {
+    WriteDurability.RELAXED: "off",
+    WriteDurability.FSYNC: "on"
+}
+
+
+class WriteBehindWriter:
+    """后台批量写回
+
+    - enqueue() 不阻塞：缓冲区已满时拒绝并计数；put() 则等待缓冲区腾出空间（背压）
+    - 缓冲行数达到 batch_size 或距上次写入超过 flush_interval 秒时写出
+    - 同一张表、同一组列的行合并为一次 executemany：SQLite 为 cursor.executemany，
+      PostgreSQL 由 SQLAlchemy 渲染为多行 VALUES
+    - 至少一次：失败的批次按 retry_backoff 退避重试 max_retries 次，仍失败时逐行写入，
+      只有单独写入也失败的行进入 dead_letters；stop() 会写完缓冲区后再退出
+
+    写回使用独立连接，看不到其他会话未提交的行。引用这类行（如刚flush的订单）的记录
+    用 enqueue_after_commit() 放入，会话提交后才进入缓冲区，回滚时丢弃。
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        max_queue_size: int = 50000,
+        batch_size: int = 500,
+        flush_interval: float = 0.2,
+        durability: WriteDurability = WriteDurability.COMMIT,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        max_dead_letters: int = 1000
+    ):
+        self.engine = engine
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.durability = WriteDurability(durability)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self._pending: Deque[Row] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        # 单独写入仍失败的行
+        self.dead_letters: Deque[Tuple[str, Dict[str, Any], str]] = deque(maxlen=max_dead_letters)
+
+        # 统计数据
+        self.stats = {
+            "rows_enqueued": 0,
+            "rows_rejected": 0,
+            "rows_written": 0,
+            "rows_failed": 0,
+            "batches": 0,
+            "batch_failures": 0,
+            "retries": 0,
+            "producer_waits": 0,
+            "largest_batch": 0,
+            "write_time": 0.0
+        }
+
+    def start(self):
+        """启动后台写回任务"""
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._flush_lock = asyncio.Lock()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0):
+        """写出缓冲区中的全部行后停止"""
+        task = self._task
+        if task is None:
+            return
+
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            task.cancel()
+            logger.error("写回服务停止超时，缓冲区中的行未写出", pending_rows=len(self._pending))
+        finally:
+            self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def enqueue(self, model: Any, row: Dict[str, Any]) -> bool:
+        """放入一行（ORM模型类或Table），缓冲区已满时拒绝并返回False"""
+        if len(self._pending) >= self.max_queue_size:
+            self.stats["rows_rejected"] += 1
+            if self._wakeup is not None:
+                self._wakeup.set()
+            return False
+
+        self._append(getattr(model, "__table__", model), row)
+        return True
+
+    def enqueue_after_commit(self, session: Any, model: Any, row: Dict[str, Any]):
+        """放入一行，等会话（AsyncSession或Session）当前事务提交后再进入缓冲区
+
+        已提交的行不受 max_queue_size 限制，事务回滚时这些行一并丢弃。
+        """
+        sync_session: Session = getattr(session, "sync_session", session)
+        rows = sync_session.info.get(_AFTER_COMMIT_ROWS)
+        if rows is None:
+            rows = sync_session.info[_AFTER_COMMIT_ROWS] = []
+            if not event.contains(sync_session, "after_commit", _release_committed_rows):
+                event.listen(sync_session, "after_commit", _release_committed_rows)
+                event.listen(sync_session, "after_rollback", _discard_uncommitted_rows)
+        rows.append((self, getattr(model, "__table__", model), row))
+
+    def _append(self, table: Table, row: Dict[str, Any]):
+        self._pending.append((table, row))
+        self.stats["rows_enqueued"] += 1
+
+        if len(self._pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+        if len(self._pending) >= self.max_queue_size and self._space is not None:
+            self._space.clear()
+
+    async def put(self, model: Any, row: Dict[str, Any]):
+        """放入一行，缓冲区已满时等待后台写出腾出空间"""
+        while len(self._pending) >= self.max_queue_size and self.running:
+            self.stats["producer_waits"] += 1
+            self._space.clear()
+            self._wakeup.set()
+            await self._space.wait()
+        self.enqueue(model, row)
+
+    async def flush(self):
+        """立即写出缓冲区中的全部行"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            while self._pending:
+                count = min(self.batch_size, len(self._pending))
+                batch = [self._pending.popleft() for _ in range(count)]
+                if self._space is not None and len(self._pending) < self.max_queue_size:
+                    self._space.set()
+                await self._write_with_retry(batch)
+
+    async def _run(self):
+        """后台任务主循环"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("写回批次处理异常", error=str(e))
+
+            if self._stopping and not self._pending:
+                return
+
+    async def _write_with_retry(self, batch: List[Row]):
+        """写出一批，失败时退避重试，最终逐行隔离失败的行"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._write_batch(batch)
+                return
+            except Exception as e:
+                self.stats["batch_failures"] += 1
+                if attempt == self.max_retries:
+                    logger.warning("批量写回失败，改为逐行写入", rows=len(batch), error=str(e))
+                    break
+                self.stats["retries"] += 1
+                await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+
+        for table, row in batch:
+            try:
+                await self._write_batch([(table, row)])
+            except Exception as e:
+                self.stats["rows_failed"] += 1
+                self.dead_letters.append((table.name, row, str(e)))
+                logger.error("写回行失败", table=table.name, error=str(e))
+
+    async def _write_batch(self, batch: List[Row]):
+        """按表和列分组，每组一次executemany，整批一个事务"""
+        started = time.perf_counter()
+
+        groups: Dict[Tuple[Table, Tuple[str, ...]], List[Dict[str, Any]]] = {}
+        for table, row in batch:
+            groups.setdefault((table, tuple(row)), []).append(row)
+
+        async with self.engine.connect() as conn:
+            restore = await self._apply_durability(conn)
+            try:
+                for (table, columns), rows in groups.items():
+                    await conn.execute(table.insert(), self._prepare_rows(table, columns, rows))
+                await conn.commit()
+            finally:
+                if restore is not None:
+                    await conn.rollback()
+                    await conn.exec_driver_sql(f"PRAGMA synchronous = {restore}")
+                    await conn.commit()
+
+        self.stats["rows_written"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+        self.stats["write_time"] += time.perf_counter() - started
+
+    async def _apply_durability(self, conn: AsyncConnection) -> Optional[int]:
+        """设置本批事务的同步级别，返回需要恢复的SQLite设置"""
+        dialect = conn.dialect.name
+        if dialect == "sqlite" and self.durability in _SQLITE_SYNCHRONOUS:
+            # synchronous是连接级设置，写完后恢复，避免影响连接池中的其他使用者
+            previous = (await conn.exec_driver_sql("PRAGMA synchronous")).scalar()
+            await conn.exec_driver_sql(f"PRAGMA synchronous = {_SQLITE_SYNCHRONOUS[self.durability]}")
+            return previous
+        if dialect == "postgresql" and self.durability in _POSTGRES_SYNCHRONOUS_COMMIT:
+            await conn.exec_driver_sql(
+                f"SET LOCAL synchronous_commit = {_POSTGRES_SYNCHRONOUS_COMMIT[self.durability]}"
+            )
+        return None
+
+    @staticmethod
+    def _prepare_rows(table: Table, columns: Tuple[str, ...],
+                      rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """枚举转为值，Float列中的Decimal转为float（驱动不接受Decimal）"""
+        float_columns = {
+            name for name in columns
+            if name in table.c and isinstance(table.c[name].type, Float)
+        }
+        prepared = []
+        for row in rows:
+            values = {}
+            for name, value in row.items():
+                if isinstance(value, Enum):
+                    value = value.value
+                elif name in float_columns and isinstance(value, Decimal):
+                    value = float(value)
+                values[name] = value
+            prepared.append(values)
+        return prepared
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取统计数据"""
+        write_time = self.stats["write_time"]
+        return {
+            "running": self.running,
+            "queue_size": len(self._pending),
+            "max_queue_size": self.max_queue_size,
+            "durability": self.durability.value,
+            "rows_per_second": self.stats["rows_written"] / write_time if write_time else 0.0,
+            "dead_letters": len(self.dead_letters),
+            "stats": self.stats.copy()
+        }
+
+
+def _release_committed_rows(session: Session):
+    """会话事务提交后，把等待提交的行放入各自写回服务的缓冲区"""
+    for writer, table, row in session.info.pop(_AFTER_COMMIT_ROWS, ()):
+        writer._append(table, row)
+
+
+def _discard_uncommitted_rows(session: Session):
+    """会话事务回滚后丢弃等待提交的行"""
+    rows = session.info.pop(_AFTER_COMMIT_ROWS, None)
+    if rows:
+        logger.debug("事务回滚，丢弃未写回的行", rows=len(rows))
+
+
+# 全局写回服务
+_global_writer: Optional[WriteBehindWriter] = None
+
+
+def get_write_behind_writer() -> Optional[WriteBehindWriter]:
+    """获取当前的全局写回服务（未启动时为None）"""
+    return _global_writer
+
+
+async def start_write_behind_writer(engine: Optional[AsyncEngine] = None, **kwargs) -> Optional[WriteBehindWriter]:
+    """创建并启动全局写回服务（已存在时先停止旧服务）"""
+    global _global_writer
+    if engine is None:
+        from .database import get_async_engine
+        engine = get_async_engine()
+    if engine is None:
+        logger.warning("异步数据库引擎不可用，写回服务未启动")
+        return None
+
+    if _global_writer is not None:
+        await _global_writer.stop()
+    _global_writer = WriteBehindWriter(engine, **kwargs)
+    _global_writer.start()
+    return _global_writer
+
+
+async def stop_write_behind_writer(timeout: float = 10.0):
+    """写出剩余行并停止全局写回服务"""
+    global _global_writer
+    if _global_writer is not None:
+        await _global_writer.stop(timeout)
+        _global_writer = None
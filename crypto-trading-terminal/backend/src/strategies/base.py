@@ -490,7 +490,7 @@ class SpotStrategyInterface(ABC):
 class BaseSpotStrategy(SpotStrategyInterface):
     """现货策略基类"""
     
-    def __init__(self, config: StrategyConfig, order_manager: Optional[OrderManager] = None):
+    def __init__(self, config: StrategyConfig, order_manager: Optional['OrderManager'] = None):
         super().__init__(config)
         self.order_manager = order_manager
         self.logger = logging.getLogger(f"strategy.{config.strategy_type}.{config.strategy_id}")
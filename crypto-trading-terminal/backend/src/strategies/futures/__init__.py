@@ -10,11 +10,14 @@ from .base_futures_strategy import (
     ValidationException, RiskManagementException
 )
 from .trend import TrendFollowingStrategy
-from .swing import SwingStrategy
+from .swing import SwingTradingStrategy
+
+# 兼容旧名称
+SwingStrategy = SwingTradingStrategy
 from .funding_rate_arbitrage import FundingRateArbitrageStrategy
 from .leverage_manager import (
     LeverageManager, DynamicLeverageManager, LeverageConfig, 
-    PositionMetrics
+    PositionMetrics, LeverageMonitorScheduler
 )
 
 __all__ = [
@@ -32,9 +35,11 @@ __all__ = [
     'RiskManagementException',
     'TrendFollowingStrategy',
     'SwingStrategy',
+    'SwingTradingStrategy',
     'FundingRateArbitrageStrategy',
     'LeverageManager',
     'DynamicLeverageManager',
     'LeverageConfig',
-    'PositionMetrics'
+    'PositionMetrics',
+    'LeverageMonitorScheduler'
 ]
\ No newline at end of file
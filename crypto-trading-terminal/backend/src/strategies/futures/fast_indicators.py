@@ -0,0 +1,317 @@
+"""
+技术指标快速计算
+使用float64和增量状态计算趋势策略所需的指标，每个新价格O(1)更新；
+同一交易对和周期的策略实例共享一份指标状态
+"""
+
+import math
+import weakref
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+
+class _RunningEMA:
+    """递推指数移动平均，前period个值的SMA作为种子"""
+
+    __slots__ = ("period", "alpha", "value", "_seed_sum", "_seed_count")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.value: Optional[float] = None
+        self._seed_sum = 0.0
+        self._seed_count = 0
+
+    def update(self, x: float) -> Optional[float]:
+        if self.value is None:
+            self._seed_sum += x
+            self._seed_count += 1
+            if self._seed_count == self.period:
+                self.value = self._seed_sum / self.period
+            return self.value
+        self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class IncrementalIndicators:
+    """增量技术指标
+
+    与 ``TechnicalIndicators``（Decimal参考实现）的计算口径一致：
+    - sma_short/sma_long：最近period个价格的简单平均
+    - ema_fast/ema_slow：当前价格与上一窗口SMA的单步指数加权
+    - rsi：最近period个涨跌幅的简单平均
+    - bollinger：最近period个价格的均值和总体标准差
+    - macd：递推EMA差值，信号线为MACD的递推EMA
+    """
+
+    # 每隔多少次更新重新求和，抵消滚动求和的浮点误差
+    RESYNC_INTERVAL = 1024
+
+    def __init__(
+        self,
+        ma_short_period: int = 10,
+        ma_long_period: int = 20,
+        ema_fast_period: int = 12,
+        ema_slow_period: int = 26,
+        rsi_period: int = 14,
+        bollinger_period: int = 20,
+        bollinger_std: float = 2.0,
+        macd_fast_period: int = 12,
+        macd_slow_period: int = 26,
+        macd_signal_period: int = 9
+    ):
+        self.ma_short_period = ma_short_period
+        self.ma_long_period = ma_long_period
+        self.ema_fast_period = ema_fast_period
+        self.ema_slow_period = ema_slow_period
+        self.rsi_period = rsi_period
+        self.bollinger_period = bollinger_period
+        self.bollinger_std = bollinger_std
+        self.macd_fast_period = macd_fast_period
+        self.macd_slow_period = macd_slow_period
+        self.macd_signal_period = macd_signal_period
+
+        # 滚动窗口的周期，每个周期维护一个窗口和
+        self._window_periods = sorted({ma_short_period, ma_long_period, ema_fast_period,
+                                       ema_slow_period, bollinger_period})
+        window = max(self._window_periods + [rsi_period + 1])
+        self._prices: deque = deque(maxlen=window + 1)
+        self._sums: Dict[int, float] = {period: 0.0 for period in self._window_periods}
+
+        # 布林带平方和以首个价格为基准，减小大数相减的精度损失
+        self._anchor: Optional[float] = None
+        self._sq_sum = 0.0
+
+        # RSI 涨跌滚动和
+        self._changes: deque = deque(maxlen=rsi_period)
+        self._gain_sum = 0.0
+        self._loss_sum = 0.0
+        self._loss_count = 0  # 窗口内下跌次数，为0时平均跌幅精确为0
+
+        # MACD
+        self._macd_fast = _RunningEMA(macd_fast_period)
+        self._macd_slow = _RunningEMA(macd_slow_period)
+        self._macd_signal = _RunningEMA(macd_signal_period)
+
+        self.count = 0
+        self.last_timestamp: Optional[datetime] = None
+        self._snapshot: Dict[str, Any] = self._empty_snapshot()
+
+    @staticmethod
+    def _empty_snapshot() -> Dict[str, Any]:
+        return {
+            'sma_short': None,
+            'sma_long': None,
+            'ema_fast': None,
+            'ema_slow': None,
+            'rsi': None,
+            'macd': {},
+            'bollinger': {}
+        }
+
+    def update(self, price: float, timestamp: Optional[datetime] = None) -> Dict[str, Any]:
+        """加入一个新价格并返回最新指标
+
+        共享实例被多个策略调用时，同一时间戳只计入一次。
+        """
+        if timestamp is not None and timestamp == self.last_timestamp:
+            return self._snapshot
+        self.last_timestamp = timestamp
+
+        price = float(price)
+        prices = self._prices
+        n_before = len(prices)
+
+        # 上一窗口的SMA（单步EMA使用）
+        prev_sma = {
+            period: self._sums[period] / period
+            for period in (self.ema_fast_period, self.ema_slow_period)
+            if n_before >= period
+        }
+
+        # RSI 涨跌幅
+        if n_before:
+            change = price - prices[-1]
+            if len(self._changes) == self.rsi_period:
+                old = self._changes[0]
+                if old > 0:
+                    self._gain_sum -= old
+                elif old < 0:
+                    self._loss_sum += old
+                    self._loss_count -= 1
+            self._changes.append(change)
+            if change > 0:
+                self._gain_sum += change
+            elif change < 0:
+                self._loss_sum -= change
+                self._loss_count += 1
+
+        # 窗口和
+        if self._anchor is None:
+            self._anchor = price
+        shifted = price - self._anchor
+        for period in self._window_periods:
+            self._sums[period] += price
+            if n_before >= period:
+                self._sums[period] -= prices[-period]
+        self._sq_sum += shifted * shifted
+        if n_before >= self.bollinger_period:
+            old = prices[-self.bollinger_period] - self._anchor
+            self._sq_sum -= old * old
+
+        prices.append(price)
+        self.count += 1
+        if self.count % self.RESYNC_INTERVAL == 0:
+            self._resync()
+
+        self._snapshot = self._compute(price, prev_sma)
+        return self._snapshot
+
+    def _resync(self):
+        """从窗口重新求和"""
+        prices = list(self._prices)
+        for period in self._window_periods:
+            self._sums[period] = math.fsum(prices[-period:])
+        window = prices[-self.bollinger_period:]
+        self._sq_sum = math.fsum((p - self._anchor) ** 2 for p in window)
+        self._gain_sum = math.fsum(c for c in self._changes if c > 0)
+        self._loss_sum = -math.fsum(c for c in self._changes if c < 0)
+
+    def _compute(self, price: float, prev_sma: Dict[int, float]) -> Dict[str, Any]:
+        n = len(self._prices)
+        snapshot = self._empty_snapshot()
+
+        if n >= self.ma_short_period:
+            snapshot['sma_short'] = self._sums[self.ma_short_period] / self.ma_short_period
+        if n >= self.ma_long_period:
+            snapshot['sma_long'] = self._sums[self.ma_long_period] / self.ma_long_period
+
+        for key, period in (('ema_fast', self.ema_fast_period), ('ema_slow', self.ema_slow_period)):
+            if period in prev_sma:
+                alpha = 2.0 / (period + 1)
+                snapshot[key] = price * alpha + prev_sma[period] * (1.0 - alpha)
+            elif n >= period:
+                snapshot[key] = self._sums[period] / period
+
+        if len(self._changes) == self.rsi_period:
+            if self._loss_count == 0:
+                snapshot['rsi'] = 100.0
+            else:
+                rs = max(self._gain_sum, 0.0) / self._loss_sum
+                snapshot['rsi'] = 100.0 - 100.0 / (1.0 + rs)
+
+        if n >= self.bollinger_period:
+            period = self.bollinger_period
+            mean = self._sums[period] / period
+            shifted_mean = mean - self._anchor
+            variance = max(self._sq_sum / period - shifted_mean * shifted_mean, 0.0)
+            std = math.sqrt(variance)
+            snapshot['bollinger'] = {
+                'upper': mean + std * self.bollinger_std,
+                'middle': mean,
+                'lower': mean - std * self.bollinger_std
+            }
+
+        fast = self._macd_fast.update(price)
+        slow = self._macd_slow.update(price)
+        if fast is not None and slow is not None:
+            macd_line = fast - slow
+            signal_line = self._macd_signal.update(macd_line)
+            if signal_line is not None:
+                snapshot['macd'] = {
+                    'macd': macd_line,
+                    'signal': signal_line,
+                    'histogram': macd_line - signal_line
+                }
+
+        return snapshot
+
+    def snapshot(self) -> Dict[str, Any]:
+        """最近一次更新后的指标"""
+        return self._snapshot
+
+    def warm_up(self, prices: Iterable[float]) -> Dict[str, Any]:
+        """用历史价格初始化状态"""
+        for price in prices:
+            self.update(price)
+        return self._snapshot
+
+    def params_key(self) -> Tuple:
+        return (self.ma_short_period, self.ma_long_period, self.ema_fast_period,
+                self.ema_slow_period, self.rsi_period, self.bollinger_period,
+                self.bollinger_std, self.macd_fast_period, self.macd_slow_period,
+                self.macd_signal_period)
+
+
+def compute_indicator_series(
+    prices: Iterable[float],
+    ma_short_period: int = 10,
+    ma_long_period: int = 20,
+    rsi_period: int = 14,
+    bollinger_period: int = 20,
+    bollinger_std: float = 2.0
+) -> Dict[str, np.ndarray]:
+    """向量化计算整段价格的SMA、RSI和布林带序列（用于回测和预热）
+
+    数据不足的位置为NaN，口径与 ``IncrementalIndicators`` 一致。
+    """
+    p = np.asarray(prices, dtype=np.float64)
+    n = len(p)
+    result: Dict[str, np.ndarray] = {}
+
+    def rolling_mean(values: np.ndarray, period: int) -> np.ndarray:
+        out = np.full(len(values), np.nan)
+        if len(values) >= period:
+            csum = np.cumsum(np.concatenate(([0.0], values)))
+            out[period - 1:] = (csum[period:] - csum[:-period]) / period
+        return out
+
+    result['sma_short'] = rolling_mean(p, ma_short_period)
+    result['sma_long'] = rolling_mean(p, ma_long_period)
+
+    # RSI
+    rsi = np.full(n, np.nan)
+    if n > rsi_period:
+        changes = np.diff(p)
+        avg_gain = rolling_mean(np.clip(changes, 0.0, None), rsi_period)[rsi_period - 1:]
+        avg_loss = rolling_mean(np.clip(-changes, 0.0, None), rsi_period)[rsi_period - 1:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        values[avg_loss == 0] = 100.0
+        rsi[rsi_period:] = values
+    result['rsi'] = rsi
+
+    # 布林带
+    middle = rolling_mean(p, bollinger_period)
+    if n:
+        shifted = p - p[0]
+        variance = rolling_mean(shifted * shifted, bollinger_period) - (middle - p[0]) ** 2
+        std = np.sqrt(np.clip(variance, 0.0, None))
+    else:
+        std = middle
+    result['bollinger_middle'] = middle
+    result['bollinger_upper'] = middle + std * bollinger_std
+    result['bollinger_lower'] = middle - std * bollinger_std
+
+    return result
+
+
+# 共享指标状态：(交易对, 周期, 参数) -> 指标实例
+_shared_indicators: "weakref.WeakValueDictionary" = weakref.WeakValueDictionary()
+
+
+def get_shared_indicators(symbol: str, timeframe: str = "tick", **params) -> IncrementalIndicators:
+    """获取同一交易对和周期共享的指标实例
+
+    实例只在仍有策略引用时保留。
+    """
+    template = IncrementalIndicators(**params)
+    key = (symbol.upper(), timeframe, template.params_key())
+    indicators = _shared_indicators.get(key)
+    if indicators is None:
+        indicators = template
+        _shared_indicators[key] = indicators
+    return indicators
@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import List, Dict, Any, Optional, Tuple
 
+import numpy as np
+
 from .base_futures_strategy import (
     BaseFuturesStrategy, FuturesMarketData, FuturesOrderRequest, 
     FuturesOrderResult, FuturesPosition, OrderType, OrderSide,
@@ -17,11 +19,137 @@ from .base_futures_strategy import (
 )
 
 
+FUNDING_PATTERNS = ['high_positive', 'high_negative', 'volatile', 'mostly_positive', 'mostly_negative']
+
+
+class FundingRateBuffer:
+    """单个交易对的资金费率滚动缓冲，按时间窗口保留，浮点数组存放"""
+    
+    def __init__(self, retention: timedelta, max_points: int, capacity: int = 64):
+        self.retention_seconds = retention.total_seconds()
+        self.max_points = max_points
+        self.times = np.empty(capacity)
+        self.rates = np.empty(capacity)
+        self.start = 0
+        self.end = 0
+    
+    def __len__(self) -> int:
+        return self.end - self.start
+    
+    def append(self, timestamp: float, rate: float):
+        """追加一个数据点，先丢弃超出时间窗口的旧数据"""
+        cutoff = timestamp - self.retention_seconds
+        if self.end > self.start and self.times[self.start] < cutoff:
+            self.start += int(np.searchsorted(self.times[self.start:self.end], cutoff))
+        if self.end - self.start >= self.max_points:
+            self.start = self.end - self.max_points + 1
+        
+        if self.end == len(self.rates):
+            count = self.end - self.start
+            if count * 2 > len(self.rates):
+                # 有效数据超过一半时扩容，否则前移复用空间
+                capacity = len(self.rates) * 2
+                times, rates = np.empty(capacity), np.empty(capacity)
+                times[:count] = self.times[self.start:self.end]
+                rates[:count] = self.rates[self.start:self.end]
+                self.times, self.rates = times, rates
+            else:
+                self.times[:count] = self.times[self.start:self.end]
+                self.rates[:count] = self.rates[self.start:self.end]
+            self.start, self.end = 0, count
+        
+        self.times[self.end] = timestamp
+        self.rates[self.end] = rate
+        self.end += 1
+    
+    def window(self, periods: int) -> np.ndarray:
+        """最近 periods 个费率（按时间顺序）"""
+        return self.rates[max(self.start, self.end - periods):self.end]
+    
+    def latest(self) -> Optional[float]:
+        return float(self.rates[self.end - 1]) if self.end > self.start else None
+
+
+def funding_pattern_statistics(windows: List[np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    一次计算多组资金费率窗口的统计量
+    
+    窗口右对齐填入矩阵，按行同时得到均值、波动性（样本标准差）、正负费率均值、
+    线性回归预测的下一期费率、模式分类和预测置信度
+    """
+    count = len(windows)
+    width = max((len(window) for window in windows), default=0)
+    rates = np.zeros((count, width))
+    valid = np.zeros((count, width), dtype=bool)
+    for row, window in enumerate(windows):
+        if len(window):
+            rates[row, width - len(window):] = window
+            valid[row, width - len(window):] = True
+    
+    n = valid.sum(axis=1).astype(float)
+    safe_n = np.maximum(n, 1)
+    sum_y = rates.sum(axis=1)
+    mean = sum_y / safe_n
+    
+    deviation = np.where(valid, rates - mean[:, None], 0.0)
+    volatility = np.sqrt((deviation ** 2).sum(axis=1) / np.maximum(n - 1, 1))
+    volatility[n < 2] = 0.0
+    
+    positive = rates > 0
+    negative = rates < 0
+    positive_count = positive.sum(axis=1)
+    negative_count = negative.sum(axis=1)
+    positive_avg = np.where(positive, rates, 0.0).sum(axis=1) / np.maximum(positive_count, 1)
+    negative_avg = np.where(negative, rates, 0.0).sum(axis=1) / np.maximum(negative_count, 1)
+    
+    # 线性回归：x 为窗口内序号
+    x = np.where(valid, np.arange(width) - (width - n)[:, None], 0.0)
+    sum_x = x.sum(axis=1)
+    sum_xy = (x * rates).sum(axis=1)
+    sum_x2 = (x * x).sum(axis=1)
+    denominator = n * sum_x2 - sum_x * sum_x
+    slope = np.divide(n * sum_xy - sum_x * sum_y, denominator,
+                      out=np.zeros(count), where=denominator != 0)
+    intercept = (sum_y - slope * sum_x) / safe_n
+    prediction = np.where(n >= 3, slope * n + intercept, mean)
+    
+    positive_ratio = positive_count / safe_n
+    negative_ratio = negative_count / safe_n
+    pattern = np.select(
+        [mean > 0.0005, mean < -0.0005, volatility > 0.001, positive_ratio > 0.7, negative_ratio > 0.7],
+        FUNDING_PATTERNS,
+        'balanced'
+    )
+    
+    confidence = np.where(
+        n < 5,
+        0.1,
+        np.minimum(0.5 * np.minimum(n / 50, 1) * np.maximum(0.3, 1 - volatility * 100), 1)
+    )
+    
+    return {
+        'data_points': n.astype(int),
+        'current_avg': mean,
+        'volatility': volatility,
+        'positive_avg': positive_avg,
+        'negative_avg': negative_avg,
+        'prediction': prediction,
+        'pattern': pattern,
+        'confidence': confidence
+    }
+
+
 class FundingRateAnalysis:
     """资金费率分析器"""
     
-    def __init__(self):
-        self.funding_rate_history: List[Dict[str, Any]] = []
+    MIN_DATA_POINTS = 10
+    
+    def __init__(self, retention: timedelta = timedelta(days=3), max_points_per_symbol: int = 20000):
+        # 每个交易对独立的费率缓冲，按时间窗口保留
+        self.retention = retention
+        self.max_points_per_symbol = max_points_per_symbol
+        self.rate_buffers: Dict[str, FundingRateBuffer] = {}
+        self.latest_data: Dict[str, Dict[str, Any]] = {}
         self.predictions: List[Dict[str, Any]] = []
         
     def add_funding_rate_data(
@@ -32,10 +160,17 @@ class FundingRateAnalysis:
         settlement_time: datetime,
         market_price: Decimal,
         spot_price: Optional[Decimal] = None,
+        timestamp: Optional[datetime] = None,
     ):
         """添加资金费率数据"""
-        data_point = {
-            'timestamp': datetime.now(),
+        timestamp = timestamp or datetime.now()
+        buffer = self.rate_buffers.get(symbol)
+        if buffer is None:
+            buffer = self.rate_buffers[symbol] = FundingRateBuffer(self.retention, self.max_points_per_symbol)
+        buffer.append(timestamp.timestamp(), float(funding_rate))
+        
+        self.latest_data[symbol] = {
+            'timestamp': timestamp,
             'symbol': symbol,
             'funding_rate': funding_rate,
             'predicted_rate': predicted_rate,
@@ -45,56 +180,85 @@ class FundingRateAnalysis:
             'is_positive': funding_rate > 0,
             'abs_rate': abs(funding_rate)
         }
-        
-        self.funding_rate_history.append(data_point)
-        
-        # 保持历史数据在合理范围内
-        if len(self.funding_rate_history) > 200:
-            self.funding_rate_history = self.funding_rate_history[-100:]
+    
+    def get_rate_history(self, symbol: str, lookback_periods: Optional[int] = None) -> np.ndarray:
+        """获取交易对保留窗口内的费率（按时间顺序）"""
+        buffer = self.rate_buffers.get(symbol)
+        if buffer is None:
+            return np.empty(0)
+        return buffer.window(lookback_periods or len(buffer)).copy()
     
     def analyze_funding_pattern(self, symbol: str, lookback_periods: int = 50) -> Dict[str, Any]:
         """分析资金费率模式"""
-        if not self.funding_rate_history:
+        if not self.rate_buffers:
             return {'pattern': 'no_data', 'prediction': Decimal('0')}
         
         # 获取指定币种的历史数据
-        symbol_data = [
-            data for data in self.funding_rate_history[-lookback_periods:]
-            if data['symbol'] == symbol
-        ]
-        
-        if len(symbol_data) < 10:
+        buffer = self.rate_buffers.get(symbol)
+        if buffer is None or len(buffer) < self.MIN_DATA_POINTS:
             return {'pattern': 'insufficient_data', 'prediction': Decimal('0')}
         
-        # 分析费率趋势
-        rates = [data['funding_rate'] for data in symbol_data]
-        avg_rate = sum(rates) / Decimal(str(len(rates)))
-        rate_volatility = self._calculate_volatility(rates)
-        
-        # 分析极值
-        positive_rates = [r for r in rates if r > 0]
-        negative_rates = [r for r in rates if r < 0]
-        
-        avg_positive = sum(positive_rates) / Decimal(str(len(positive_rates))) if positive_rates else Decimal('0')
-        avg_negative = sum(negative_rates) / Decimal(str(len(negative_rates))) if negative_rates else Decimal('0')
-        
-        # 预测下一期费率
-        prediction = self._predict_next_rate(rates)
-        
-        # 判断模式
-        pattern = self._classify_funding_pattern(rates, avg_rate, rate_volatility)
-        
+        stats = funding_pattern_statistics([buffer.window(lookback_periods)])
         return {
-            'pattern': pattern,
-            'current_avg': avg_rate,
-            'volatility': rate_volatility,
-            'positive_avg': avg_positive,
-            'negative_avg': avg_negative,
-            'prediction': prediction,
-            'confidence': self._calculate_prediction_confidence(symbol_data),
-            'data_points': len(symbol_data)
+            'pattern': str(stats['pattern'][0]),
+            'current_avg': Decimal(str(stats['current_avg'][0])),
+            'volatility': Decimal(str(stats['volatility'][0])),
+            'positive_avg': Decimal(str(stats['positive_avg'][0])),
+            'negative_avg': Decimal(str(stats['negative_avg'][0])),
+            'prediction': Decimal(str(stats['prediction'][0])),
+            'confidence': Decimal(str(stats['confidence'][0])),
+            'data_points': int(stats['data_points'][0])
         }
     
+    def rank_opportunities(
+        self,
+        current_rates: Optional[Dict[str, Decimal]] = None,
+        lookback_periods: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """
+        一次评估所有永续合约的资金费率套利机会，按机会评分从高到低排序
+        
+        Args:
+            current_rates: 各交易对的当前费率，未提供时使用最新一条记录
+            lookback_periods: 每个交易对参与统计的最近数据点数
+        """
+        symbols = [
+            symbol for symbol, buffer in self.rate_buffers.items()
+            if len(buffer) >= self.MIN_DATA_POINTS
+            and (current_rates is None or symbol in current_rates)
+        ]
+        if not symbols:
+            return []
+        
+        stats = funding_pattern_statistics([self.rate_buffers[s].window(lookback_periods) for s in symbols])
+        if current_rates is None:
+            current = np.array([self.rate_buffers[s].latest() for s in symbols])
+        else:
+            current = np.array([float(current_rates[s]) for s in symbols])
+        
+        # 与 _calculate_opportunity_score / _assess_arbitrage_risk 相同的评分规则
+        volatility_factor = np.minimum(stats['volatility'] * 1000, 1)
+        score = np.minimum((np.abs(stats['prediction'] - current) * 10 + volatility_factor) / 2, 1)
+        total_risk = (np.minimum(np.abs(current) * 100, 1) + volatility_factor + (1 - stats['confidence'])) / 3
+        risk_level = np.select([total_risk < 0.3, total_risk < 0.6, total_risk < 0.8],
+                               ['LOW', 'MEDIUM', 'HIGH'], 'CRITICAL')
+        
+        ranking = []
+        for row in np.argsort(-score, kind='stable').tolist():
+            ranking.append({
+                'symbol': symbols[row],
+                'current_rate': float(current[row]),
+                'prediction': float(stats['prediction'][row]),
+                'volatility': float(stats['volatility'][row]),
+                'pattern': str(stats['pattern'][row]),
+                'confidence': float(stats['confidence'][row]),
+                'opportunity_score': float(score[row]),
+                'risk_score': float(total_risk[row]),
+                'risk_level': str(risk_level[row]),
+                'data_points': int(stats['data_points'][row])
+            })
+        return ranking
+    
     def calculate_arbitrage_opportunity(
         self,
         symbol: str,
@@ -176,90 +340,6 @@ class FundingRateAnalysis:
                 'risk_level': 'unknown'
             }
     
-    def _calculate_volatility(self, rates: List[Decimal]) -> Decimal:
-        """计算费率波动性"""
-        if len(rates) < 2:
-            return Decimal('0')
-        
-        mean_rate = sum(rates) / Decimal(str(len(rates)))
-        variance = sum((rate - mean_rate) ** 2 for rate in rates) / Decimal(str(len(rates) - 1))
-        
-        return variance.sqrt()
-    
-    def _predict_next_rate(self, rates: List[Decimal]) -> Decimal:
-        """预测下一期资金费率"""
-        if len(rates) < 3:
-            return sum(rates) / Decimal(str(len(rates))) if rates else Decimal('0')
-        
-        # 简单的线性回归预测
-        n = len(rates)
-        x_values = list(range(n))
-        
-        # 计算斜率和截距
-        sum_x = sum(x_values)
-        sum_y = sum(float(rate) for rate in rates)
-        sum_xy = sum(x * float(rate) for x, rate in zip(x_values, rates))
-        sum_x2 = sum(x * x for x in x_values)
-        
-        try:
-            slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
-            intercept = (sum_y - slope * sum_x) / n
-            
-            # 预测下一期
-            next_x = n
-            predicted = Decimal(str(slope * next_x + intercept))
-            
-            return predicted
-        except ZeroDivisionError:
-            # 如果无法计算线性回归，使用移动平均
-            return sum(rates[-3:]) / Decimal('3')
-    
-    def _classify_funding_pattern(self, rates: List[Decimal], avg_rate: Decimal, volatility: Decimal) -> str:
-        """分类资金费率模式"""
-        if not rates:
-            return 'no_data'
-        
-        # 分析费率分布
-        positive_rates = [r for r in rates if r > 0]
-        negative_rates = [r for r in rates if r < 0]
-        
-        positive_ratio = len(positive_rates) / len(rates)
-        negative_ratio = len(negative_rates) / len(rates)
-        
-        # 判断模式
-        if avg_rate > Decimal('0.0005'):  # 0.05%
-            return 'high_positive'  # 持续正费率
-        elif avg_rate < Decimal('-0.0005'):  # -0.05%
-            return 'high_negative'  # 持续负费率
-        elif volatility > Decimal('0.001'):  # 0.1%
-            return 'volatile'  # 波动较大
-        elif positive_ratio > 0.7:
-            return 'mostly_positive'  # 多为正费率
-        elif negative_ratio > 0.7:
-            return 'mostly_negative'  # 多为负费率
-        else:
-            return 'balanced'  # 平衡模式
-    
-    def _calculate_prediction_confidence(self, symbol_data: List[Dict[str, Any]]) -> Decimal:
-        """计算预测置信度"""
-        if len(symbol_data) < 5:
-            return Decimal('0.1')  # 数据不足，置信度低
-        
-        # 基于历史预测准确性计算置信度
-        accuracy_score = Decimal('0.5')  # 基础分数
-        
-        # 数据越多，置信度越高
-        data_factor = min(len(symbol_data) / 50, Decimal('1'))  # 最多50个数据点
-        
-        # 波动性越低，置信度越高
-        rates = [data['funding_rate'] for data in symbol_data]
-        volatility = self._calculate_volatility(rates)
-        volatility_factor = max(Decimal('0.3'), Decimal('1') - volatility * 100)
-        
-        confidence = accuracy_score * data_factor * volatility_factor
-        
-        return min(confidence, Decimal('1'))
-    
     def _calculate_opportunity_score(
         self,
         current_rate: Decimal,
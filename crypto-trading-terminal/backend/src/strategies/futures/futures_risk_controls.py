@@ -5,16 +5,22 @@
 
 import asyncio
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import List, Dict, Any, Optional, Tuple, Callable
 
+import numpy as np
+
 from .base_futures_strategy import (
     FuturesMarketData, FuturesPosition, FuturesRiskLevel,
     ValidationException, RiskManagementException
 )
 from .leverage_manager import PositionMetrics
 
+# 强平保护行动等级对应的综合风险等级
+LIQUIDATION_RISK_LEVELS = {'normal': 'LOW', 'high': 'HIGH', 'critical': 'CRITICAL'}
+
 
 class LiquidationProtection:
     """强平保护机制"""
@@ -685,20 +691,23 @@ class FuturesRiskController:
                 'UNKNOWN': 0
             }
             
+            # 强平评估的等级是保护行动（normal/high/critical），换算到同一权重表
+            liquidation_level = liquidation_assessment.get('risk_level', 'LOW')
+            liquidation_level = LIQUIDATION_RISK_LEVELS.get(liquidation_level, liquidation_level)
+            
             # 计算加权风险分数
             total_weight = 0
             risk_score = 0
             
-            assessments = [
-                liquidation_assessment,
-                margin_assessment,
-                leverage_assessment,
-                volatility_assessment,
-                funding_rate_assessment
+            risk_levels = [
+                liquidation_level,
+                margin_assessment.get('risk_level', 'LOW'),
+                leverage_assessment.get('risk_level', 'LOW'),
+                volatility_assessment.get('risk_level', 'LOW'),
+                funding_rate_assessment.get('risk_level', 'LOW')
             ]
             
-            for assessment in assessments:
-                risk_level = assessment.get('risk_level', 'LOW')
+            for risk_level in risk_levels:
                 weight = risk_weights.get(risk_level, 0)
                 risk_score += weight
                 total_weight += 1
@@ -725,7 +734,7 @@ class FuturesRiskController:
                 'score': normalized_score,
                 'recommendations': recommendations,
                 'component_scores': {
-                    'liquidation': risk_weights.get(liquidation_assessment.get('risk_level', 'LOW'), 0),
+                    'liquidation': risk_weights.get(liquidation_level, 0),
                     'margin': risk_weights.get(margin_assessment.get('risk_level', 'LOW'), 0),
                     'leverage': risk_weights.get(leverage_assessment.get('risk_level', 'LOW'), 0),
                     'volatility': risk_weights.get(volatility_assessment.get('risk_level', 'LOW'), 0),
@@ -871,6 +880,260 @@ class FuturesRiskController:
         self.logger.info("风险状态已重置")
 
 
+# 批量评估使用的风险等级编码，与 _calculate_comprehensive_risk 的权重一致
+RISK_LEVEL_NAMES = ('LOW', 'MEDIUM', 'HIGH', 'CRITICAL')
+_RISK_WEIGHTS = np.array([1.0, 4.0, 7.0, 10.0])
+LIQUIDATION_ACTIONS = ('normal', 'high', 'critical')
+# LIQUIDATION_ACTIONS 编号对应的 RISK_LEVEL_NAMES 编号
+_LIQUIDATION_LEVELS = np.array([RISK_LEVEL_NAMES.index(LIQUIDATION_RISK_LEVELS[action])
+                                for action in LIQUIDATION_ACTIONS])
+
+
+@dataclass
+class RiskBook:
+    """列式仓位簿：每个仓位一行，全部为float64数组"""
+    keys: List[str]                  # 仓位键 user_account_symbol
+    user_keys: List[str]             # 余额所属的用户键
+    symbols: List[str]
+    quantity: np.ndarray
+    average_price: np.ndarray        # 开仓均价
+    mark_price: np.ndarray
+    leverage: np.ndarray
+    margin_used: np.ndarray
+    unrealized_pnl: np.ndarray
+    liquidation_price: np.ndarray    # 缺失时为0
+    wallet_balance: np.ndarray
+    implied_volatility: np.ndarray
+    price_change_24h: np.ndarray
+    funding_rate: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    @classmethod
+    def from_positions(
+        cls,
+        user_positions: Dict[str, List[FuturesPosition]],
+        market_data: Dict[str, FuturesMarketData],
+        user_balances: Dict[str, Dict[str, Decimal]],
+        account_id: int = 1
+    ) -> 'RiskBook':
+        """打包仓位，缺少行情或余额的仓位不参与评估"""
+        keys, user_keys, symbols = [], [], []
+        rows = []
+        wallets = []
+        for user_key, positions in user_positions.items():
+            balance_info = user_balances.get(user_key)
+            if not balance_info:
+                continue
+            wallet = float(balance_info.get('wallet_balance', Decimal('0')))
+            user_id = user_key.split('_')[0]
+            for position in positions:
+                if position.symbol not in market_data:
+                    continue
+                keys.append(f"{user_id}_{account_id}_{position.symbol}")
+                user_keys.append(user_key)
+                symbols.append(position.symbol)
+                wallets.append(wallet)
+                rows.append((
+                    float(position.quantity),
+                    float(position.average_price),
+                    float(position.leverage),
+                    float(position.margin_used or 0),
+                    float(position.unrealized_pnl),
+                    float(position.liquidation_price or 0)
+                ))
+        
+        # 行情字段每个合约只转换一次，再按合约编号展开
+        symbol_codes: Dict[str, int] = {}
+        codes = np.fromiter((symbol_codes.setdefault(symbol, len(symbol_codes)) for symbol in symbols),
+                            dtype=np.intp, count=len(symbols))
+        market = np.array([
+            (
+                float(market_data[symbol].mark_price or market_data[symbol].current_price),
+                float(market_data[symbol].implied_volatility or 0),
+                float(market_data[symbol].price_change_24h),
+                float(market_data[symbol].funding_rate)
+            )
+            for symbol in symbol_codes
+        ], dtype=np.float64).reshape(-1, 4)[codes]
+        columns = np.array(rows, dtype=np.float64).reshape(-1, 6)
+        
+        return cls(
+            keys=keys,
+            user_keys=user_keys,
+            symbols=symbols,
+            quantity=columns[:, 0],
+            average_price=columns[:, 1],
+            mark_price=market[:, 0],
+            leverage=columns[:, 2],
+            margin_used=columns[:, 3],
+            unrealized_pnl=columns[:, 4],
+            liquidation_price=columns[:, 5],
+            wallet_balance=np.array(wallets, dtype=np.float64),
+            implied_volatility=market[:, 1],
+            price_change_24h=market[:, 2],
+            funding_rate=market[:, 3]
+        )
+
+
+@dataclass
+class BatchRiskResult:
+    """批量风险评估结果，各数组与 RiskBook 的行一一对应"""
+    book: RiskBook
+    notional: np.ndarray
+    margin_ratio: np.ndarray
+    effective_leverage: np.ndarray
+    liquidation_action: np.ndarray   # LIQUIDATION_ACTIONS 的编号
+    margin_level: np.ndarray         # RISK_LEVEL_NAMES 的编号，下同
+    leverage_level: np.ndarray
+    volatility_level: np.ndarray
+    funding_level: np.ndarray
+    score: np.ndarray
+    risk_level: np.ndarray
+    margin_call: np.ndarray
+    margin_call_critical: np.ndarray
+    additional_margin: np.ndarray
+    
+    def risk_level_name(self, index: int) -> str:
+        return RISK_LEVEL_NAMES[self.risk_level[index]]
+    
+    def rows_at_least(self, level: str) -> np.ndarray:
+        """综合风险不低于level的行号"""
+        return np.flatnonzero(self.risk_level >= RISK_LEVEL_NAMES.index(level))
+    
+    def summary(self) -> Dict[str, Any]:
+        """与 execute_global_risk_check 相同格式的汇总"""
+        total = len(self.book)
+        high = int(np.count_nonzero(self.risk_level == 2))
+        critical = int(np.count_nonzero(self.risk_level == 3))
+        margin_calls = int(np.count_nonzero(self.margin_call))
+        
+        result = {
+            'timestamp': datetime.now(),
+            'total_users': len(set(self.book.user_keys)),
+            'total_positions': total,
+            'high_risk_positions': high,
+            'critical_risk_positions': critical,
+            'margin_calls': margin_calls,
+            'overall_risk_score': Decimal('0'),
+            'recommendations': []
+        }
+        if total > 0:
+            risk_score = (high * 5 + critical * 10 + margin_calls * 8) / total
+            result['overall_risk_score'] = Decimal(str(risk_score))
+            if risk_score > 7:
+                result['recommendations'].append('全局风险过高，建议暂停新交易')
+            elif risk_score > 4:
+                result['recommendations'].append('风险较高，建议加强监控')
+            result['recommendations'].append(f'当前监控 {total} 个仓位')
+        return result
+
+
+class BatchRiskEvaluator:
+    """向量化的全局风险评估
+    
+    判定规则与 FuturesRiskController.assess_position_risk 相同（保证金、杠杆、波动性、资金费率和
+    强平五项加权），但对整本仓位簿一次计算，不再逐仓位创建控制器和Decimal中间对象。
+    追加保证金按 check_margin_call_conditions 的规则使用真实的已用保证金计算。
+    强平保护阈值用标记价格判断（缺失时回退到最新价），控制器用最新价；两者跨越阈值时强平等级可能不同。
+    """
+    
+    def __init__(
+        self,
+        margin_manager: Optional[MarginManager] = None,
+        liquidation_protection: Optional[LiquidationProtection] = None
+    ):
+        self.margin_manager = margin_manager or MarginManager()
+        self.liquidation_protection = liquidation_protection or LiquidationProtection()
+        self.margin_call_threshold = 1.1
+        self.margin_call_critical = 1.05
+    
+    def evaluate(self, book: RiskBook) -> BatchRiskResult:
+        """一次计算整本仓位簿"""
+        thresholds = {name: float(value) for name, value in self.margin_manager.margin_thresholds.items()}
+        protection = {name: float(value) for name, value in self.liquidation_protection.protection_levels.items()}
+        
+        quantity = book.quantity
+        margin_used = book.margin_used
+        upnl = book.unrealized_pnl
+        wallet = book.wallet_balance
+        notional = np.abs(quantity) * book.average_price
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            has_margin = margin_used != 0
+            safe_margin = np.where(has_margin, margin_used, 1.0)
+            # PositionMetrics: total_balance = 钱包余额 + 未实现盈亏，有效余额再加一次未实现盈亏
+            total_balance = wallet + upnl
+            margin_ratio = np.where(has_margin, (total_balance + upnl) / safe_margin, 999.0)
+            effective_leverage = np.where(has_margin, notional / safe_margin, 0.0)
+            leverage_ratio = np.where(book.leverage > 0, effective_leverage / np.where(book.leverage > 0, book.leverage, 1.0), 0.0)
+        
+        # 保证金风险
+        margin_level = np.select(
+            [margin_ratio < thresholds['critical_margin'],
+             margin_ratio < thresholds['danger_margin'],
+             margin_ratio < thresholds['warning_margin']],
+            [3, 2, 1], 0
+        )
+        heavy_loss = upnl < -wallet * 0.2
+        margin_level = np.where(heavy_loss & (margin_level < 2), 2, margin_level)
+        
+        # 杠杆风险
+        leverage_level = np.select(
+            [leverage_ratio > 1.5, leverage_ratio > 1.2, leverage_ratio > 1.1],
+            [3, 2, 1], 0
+        )
+        
+        # 波动性与资金费率风险
+        volatility_level = np.select(
+            [book.implied_volatility > 0.1, book.implied_volatility > 0.05],
+            [2, 1], 0
+        )
+        volatility_level = np.where((volatility_level == 0) & (np.abs(book.price_change_24h) > 0.2), 1, volatility_level)
+        funding_level = np.where(np.abs(book.funding_rate) > 0.001, 1, 0)
+        
+        # 强平保护：多头价格低于阈值、空头价格高于阈值
+        has_liquidation = (book.liquidation_price != 0) & (quantity != 0)
+        is_long = quantity > 0
+        direction = np.where(is_long, 1.0, -1.0)
+        emergency = book.liquidation_price * (1 + direction * protection['emergency_ratio'])
+        early_warning = book.liquidation_price * (1 + direction * protection['early_warning_ratio'])
+        beyond_emergency = np.where(is_long, book.mark_price <= emergency, book.mark_price >= emergency)
+        beyond_warning = np.where(is_long, book.mark_price <= early_warning, book.mark_price >= early_warning)
+        liquidation_action = np.where(has_liquidation, np.select([beyond_emergency, beyond_warning], [2, 1], 0), 0)
+        # normal/high/critical 按 LOW/HIGH/CRITICAL 计分；无强平价格时为LOW
+        score = (
+            _RISK_WEIGHTS[_LIQUIDATION_LEVELS[liquidation_action]]
+            + _RISK_WEIGHTS[margin_level]
+            + _RISK_WEIGHTS[leverage_level]
+            + _RISK_WEIGHTS[volatility_level]
+            + _RISK_WEIGHTS[funding_level]
+        ) / 5
+        risk_level = np.select([score >= 8, score >= 5, score >= 3], [3, 2, 1], 0)
+        
+        # 追加保证金
+        additional_margin = margin_used - total_balance
+        margin_call = (margin_ratio < self.margin_call_threshold) & (additional_margin > 0)
+        
+        return BatchRiskResult(
+            book=book,
+            notional=notional,
+            margin_ratio=margin_ratio,
+            effective_leverage=effective_leverage,
+            liquidation_action=liquidation_action,
+            margin_level=margin_level,
+            leverage_level=leverage_level,
+            volatility_level=volatility_level,
+            funding_level=funding_level,
+            score=score,
+            risk_level=risk_level,
+            margin_call=margin_call,
+            margin_call_critical=margin_call & (margin_ratio < self.margin_call_critical),
+            additional_margin=np.where(margin_call, additional_margin, 0.0)
+        )
+
+
 class RiskMonitoringService:
     """风险监控服务"""
     
@@ -880,6 +1143,13 @@ class RiskMonitoringService:
         self.monitor_task: Optional[asyncio.Task] = None
         self.monitoring_interval = 30  # 秒
         
+        # 全局批量评估
+        self.batch_evaluator = BatchRiskEvaluator()
+        self.snapshot_provider: Optional[Callable] = None  # 返回 (user_positions, market_data, user_balances)
+        self.assessment_callback: Optional[Callable] = None
+        self.last_assessment: Optional[Dict[str, Any]] = None
+        self.last_result: Optional[BatchRiskResult] = None
+        
         self.logger = logging.getLogger("risk_monitoring_service")
     
     def register_controller(self, controller: FuturesRiskController):
@@ -917,19 +1187,42 @@ class RiskMonitoringService:
         
         self.logger.info("停止风险监控服务")
     
+    def set_snapshot_provider(self, provider: Callable):
+        """设置全局检查的数据来源，可为同步或异步函数"""
+        self.snapshot_provider = provider
+    
+    def set_assessment_callback(self, callback: Callable):
+        """设置每轮全局检查完成后的回调"""
+        self.assessment_callback = callback
+    
     async def _monitoring_loop(self):
-        """监控循环"""
+        """监控循环：按间隔对全部仓位执行一次批量风险检查"""
         while self.monitoring_active:
             try:
-                await asyncio.sleep(self.monitoring_interval)
+                if self.snapshot_provider is not None:
+                    snapshot = self.snapshot_provider()
+                    if asyncio.iscoroutine(snapshot):
+                        snapshot = await snapshot
+                    
+                    assessment = await self.execute_global_risk_check(*snapshot)
+                    if assessment.get('critical_risk_positions'):
+                        self.logger.warning(
+                            f"全局风险检查: {assessment['critical_risk_positions']} 个仓位处于临界风险, "
+                            f"{assessment['margin_calls']} 个追加保证金"
+                        )
+                    if self.assessment_callback:
+                        if asyncio.iscoroutinefunction(self.assessment_callback):
+                            await self.assessment_callback(assessment)
+                        else:
+                            self.assessment_callback(assessment)
                 
-                # 这里可以添加自动风险检查逻辑
-                # 例如：定期检查所有注册的控制器
+                await asyncio.sleep(self.monitoring_interval)
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 self.logger.error(f"风险监控循环错误: {e}")
+                await asyncio.sleep(self.monitoring_interval)
     
     async def execute_global_risk_check(
         self,
@@ -937,91 +1230,17 @@ class RiskMonitoringService:
         market_data: Dict[str, FuturesMarketData],
         user_balances: Dict[str, Dict[str, Decimal]],
     ) -> Dict[str, Any]:
-        """执行全局风险检查"""
+        """执行全局风险检查（全部仓位打包后一次向量化评估）"""
         try:
-            total_risk_assessment = {
-                'timestamp': datetime.now(),
-                'total_users': len(user_positions),
-                'total_positions': 0,
-                'high_risk_positions': 0,
-                'critical_risk_positions': 0,
-                'margin_calls': 0,
-                'overall_risk_score': Decimal('0'),
-                'recommendations': []
-            }
+            # 打包和计算都是CPU密集操作，放到线程中执行
+            result = await asyncio.to_thread(self._evaluate_snapshot, user_positions, market_data, user_balances)
+            self.last_result = result
             
-            for user_id_str, positions in user_positions.items():
-                user_id = int(user_id_str.split('_')[0])
-                
-                for position in positions:
-                    symbol = position.symbol
-                    account_id = 1  # 简化处理
-                    
-                    # 获取市场数据和余额
-                    market_info = market_data.get(symbol)
-                    balance_info = user_balances.get(user_id_str, {})
-                    
-                    if market_info and balance_info:
-                        # 创建风险控制器（如果不存在）
-                        controller_key = f"{user_id}_{account_id}_{symbol}"
-                        if controller_key not in self.controllers:
-                            controller = FuturesRiskController(
-                                symbol=symbol,
-                                user_id=user_id,
-                                account_id=account_id
-                            )
-                            self.register_controller(controller)
-                        
-                        # 执行风险评估
-                        controller = self.controllers[controller_key]
-                        risk_assessment = await controller.assess_position_risk(
-                            position,
-                            market_info,
-                            balance_info.get('wallet_balance', Decimal('0')),
-                            balance_info.get('available_balance', Decimal('0'))
-                        )
-                        
-                        # 更新统计
-                        total_risk_assessment['total_positions'] += 1
-                        
-                        risk_level = risk_assessment['risk_level']
-                        if risk_level == 'HIGH':
-                            total_risk_assessment['high_risk_positions'] += 1
-                        elif risk_level == 'CRITICAL':
-                            total_risk_assessment['critical_risk_positions'] += 1
-                        
-                        # 检查保证金调用
-                        position_metrics = type('obj', (object,), {
-                            'margin_ratio': Decimal(str(risk_assessment['position_metrics']['margin_ratio'])),
-                            'total_balance': balance_info.get('wallet_balance', Decimal('0')),
-                            'margin_used': Decimal('0')  # 简化处理
-                        })()
-                        
-                        margin_call = await controller.check_margin_call_conditions(
-                            position_metrics, market_info
-                        )
-                        
-                        if margin_call:
-                            total_risk_assessment['margin_calls'] += 1
-            
-            # 计算整体风险评分
-            if total_risk_assessment['total_positions'] > 0:
-                risk_score = (
-                    total_risk_assessment['high_risk_positions'] * 5 +
-                    total_risk_assessment['critical_risk_positions'] * 10 +
-                    total_risk_assessment['margin_calls'] * 8
-                ) / total_risk_assessment['total_positions']
-                
-                total_risk_assessment['overall_risk_score'] = Decimal(str(risk_score))
-                
-                # 生成建议
-                if risk_score > 7:
-                    total_risk_assessment['recommendations'].append('全局风险过高，建议暂停新交易')
-                elif risk_score > 4:
-                    total_risk_assessment['recommendations'].append('风险较高，建议加强监控')
-                
-                total_risk_assessment['recommendations'].append(f'当前监控 {total_risk_assessment["total_positions"]} 个仓位')
+            total_risk_assessment = result.summary()
+            total_risk_assessment['total_users'] = len(user_positions)
+            self._update_controllers(result)
             
+            self.last_assessment = total_risk_assessment
             return total_risk_assessment
             
         except Exception as e:
@@ -1033,10 +1252,49 @@ class RiskMonitoringService:
                 'overall_risk_score': Decimal('0')
             }
     
+    def _evaluate_snapshot(
+        self,
+        user_positions: Dict[str, List[FuturesPosition]],
+        market_data: Dict[str, FuturesMarketData],
+        user_balances: Dict[str, Dict[str, Decimal]],
+    ) -> BatchRiskResult:
+        book = RiskBook.from_positions(user_positions, market_data, user_balances)
+        return self.batch_evaluator.evaluate(book)
+    
+    def _update_controllers(self, result: BatchRiskResult):
+        """把高风险和追加保证金结果同步到已注册的控制器"""
+        if not self.controllers:
+            return
+        
+        book = result.book
+        rows = np.flatnonzero((result.risk_level >= 2) | result.margin_call)
+        for row in rows:
+            controller = self.controllers.get(book.keys[row])
+            if controller is None:
+                continue
+            
+            risk_level = RISK_LEVEL_NAMES[result.risk_level[row]]
+            controller._update_risk_state({'risk_level': risk_level, 'score': float(result.score[row])})
+            
+            if result.margin_call[row]:
+                controller.risk_state['margin_calls'].append({
+                    'symbol': book.symbols[row],
+                    'type': 'margin_call',
+                    'severity': 'critical' if result.margin_call_critical[row] else 'high',
+                    'margin_ratio': float(result.margin_ratio[row]),
+                    'additional_margin_required': float(result.additional_margin[row]),
+                    'timestamp': datetime.now(),
+                    'liquidation_price': float(book.liquidation_price[row]),
+                    'current_price': float(book.mark_price[row]),
+                })
+                if len(controller.risk_state['margin_calls']) > 50:
+                    controller.risk_state['margin_calls'] = controller.risk_state['margin_calls'][-25:]
+    
     def get_monitoring_statistics(self) -> Dict[str, Any]:
         """获取监控统计"""
         return {
             'active_controllers': len(self.controllers),
             'monitoring_active': self.monitoring_active,
-            'controllers': list(self.controllers.keys())
+            'controllers': list(self.controllers.keys()),
+            'last_assessment': self.last_assessment
         }
\ No newline at end of file
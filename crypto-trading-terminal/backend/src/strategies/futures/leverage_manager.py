@@ -5,9 +5,12 @@
 
 import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable
+
+import numpy as np
 
 from .base_futures_strategy import (
     FuturesMarketData, FuturesPosition, OrderSide, OrderType,
@@ -15,6 +18,16 @@ from .base_futures_strategy import (
 )
 
 
+def estimate_volatility(market_data: FuturesMarketData) -> Decimal:
+    """估算波动性"""
+    # 简化的波动性估算：基于24小时价格变化
+    if market_data.previous_close and market_data.previous_close > 0:
+        return abs(market_data.price_change_24h) / market_data.previous_close
+    
+    # 如果没有历史数据，返回默认值
+    return Decimal('0.02')  # 2%
+
+
 class LeverageConfig:
     """杠杆配置"""
     def __init__(
@@ -141,9 +154,8 @@ class LeverageManager:
         self.leverage_history: List[Dict[str, Any]] = []
         self.risk_events: List[Dict[str, Any]] = []
         
-        # 监控参数
-        self.check_interval = 30  # 秒
-        self.risk_monitor_task: Optional[asyncio.Task] = None
+        # 监控参数（由共享的 LeverageMonitorScheduler 统一调度）
+        self.monitor: Optional['LeverageMonitorScheduler'] = None
         self.is_monitoring = False
         
         # 回调函数
@@ -156,20 +168,14 @@ class LeverageManager:
             return
         
         self.is_monitoring = True
-        self.risk_monitor_task = asyncio.create_task(self._risk_monitoring_loop())
+        if self.monitor:
+            await self.monitor.start()
         self.logger.info(f"启动杠杆监控: {self.config.symbol}")
     
     async def stop_monitoring(self):
         """停止风险监控"""
+        # 共享调度器跳过未监控的管理器，不影响其他策略
         self.is_monitoring = False
-        
-        if self.risk_monitor_task and not self.risk_monitor_task.done():
-            self.risk_monitor_task.cancel()
-            try:
-                await self.risk_monitor_task
-            except asyncio.CancelledError:
-                pass
-        
         self.logger.info(f"停止杠杆监控: {self.config.symbol}")
     
     async def calculate_optimal_leverage(
@@ -184,10 +190,9 @@ class LeverageManager:
             base_leverage = self.config.min_leverage
             
             # 根据市场波动性调整
-            if volatility:
-                volatility_adjustment = self._calculate_volatility_adjustment(volatility)
-            else:
-                volatility_adjustment = self._estimate_volatility(market_data)
+            if not volatility:
+                volatility = self._estimate_volatility(market_data)
+            volatility_adjustment = self._calculate_volatility_adjustment(volatility)
             
             # 根据保证金比例调整
             margin_adjustment = self._calculate_margin_adjustment(position_metrics)
@@ -249,30 +254,11 @@ class LeverageManager:
                 }
             
             # 记录杠杆变更
-            leverage_change = {
-                'timestamp': datetime.now(),
-                'old_leverage': current_leverage,
-                'new_leverage': target_leverage,
-                'reason': adjustment_check.get('reason', '优化调整'),
-                'position_metrics': {
-                    'margin_ratio': float(position_metrics.margin_ratio),
-                    'unrealized_pnl_pct': float(position_metrics.unrealized_pnl_pct),
-                    'liquidation_distance': float(position_metrics.liquidation_distance),
-                    'risk_level': position_metrics.get_risk_level().value
-                },
-                'market_data': {
-                    'price': float(market_data.current_price),
-                    'funding_rate': float(market_data.funding_rate),
-                    'volatility': float(market_data.implied_volatility or Decimal('0'))
-                }
-            }
-            
-            self.leverage_history.append(leverage_change)
-            self.current_leverage = target_leverage
-            
-            # 保持历史记录在合理范围内
-            if len(self.leverage_history) > 100:
-                self.leverage_history = self.leverage_history[-50:]
+            leverage_change = self._record_leverage_change(
+                current_leverage, target_leverage,
+                adjustment_check.get('reason', '优化调整'),
+                position_metrics, market_data
+            )
             
             # 触发回调
             if self.leverage_change_callback:
@@ -303,6 +289,42 @@ class LeverageManager:
                 'new_leverage': current_leverage
             }
     
+    def _record_leverage_change(
+        self,
+        current_leverage: Decimal,
+        target_leverage: Decimal,
+        reason: str,
+        position_metrics: PositionMetrics,
+        market_data: FuturesMarketData,
+    ) -> Dict[str, Any]:
+        """记录杠杆变更并更新当前杠杆"""
+        leverage_change = {
+            'timestamp': datetime.now(),
+            'old_leverage': current_leverage,
+            'new_leverage': target_leverage,
+            'reason': reason,
+            'position_metrics': {
+                'margin_ratio': float(position_metrics.margin_ratio),
+                'unrealized_pnl_pct': float(position_metrics.unrealized_pnl_pct),
+                'liquidation_distance': float(position_metrics.liquidation_distance),
+                'risk_level': position_metrics.get_risk_level().value
+            },
+            'market_data': {
+                'price': float(market_data.current_price),
+                'funding_rate': float(market_data.funding_rate),
+                'volatility': float(market_data.implied_volatility or Decimal('0'))
+            }
+        }
+        
+        self.leverage_history.append(leverage_change)
+        self.current_leverage = target_leverage
+        
+        # 保持历史记录在合理范围内
+        if len(self.leverage_history) > 100:
+            self.leverage_history = self.leverage_history[-50:]
+        
+        return leverage_change
+    
     async def check_risk_and_recommend_action(
         self,
         position_metrics: PositionMetrics,
@@ -429,10 +451,10 @@ class LeverageManager:
         """计算波动性调整"""
         if volatility > self.config.volatility_threshold:
             # 波动性过高，降低杠杆
-            return -min((volatility / self.config.volatility_threshold - 1) * 0.3, 0.5)
+            return -min((volatility / self.config.volatility_threshold - 1) * Decimal('0.3'), Decimal('0.5'))
         else:
             # 波动性适中，可以适当增加杠杆
-            return min((self.config.volatility_threshold - volatility) / self.config.volatility_threshold * 0.2, 0.1)
+            return min((self.config.volatility_threshold - volatility) / self.config.volatility_threshold * Decimal('0.2'), Decimal('0.1'))
     
     def _calculate_margin_adjustment(self, position_metrics: PositionMetrics) -> Decimal:
         """计算保证金调整"""
@@ -440,16 +462,16 @@ class LeverageManager:
         
         if margin_ratio < Decimal('1.15'):  # 115%
             # 保证金比例很低，大幅降低杠杆
-            return -0.4
+            return Decimal('-0.4')
         elif margin_ratio < Decimal('1.3'):  # 130%
             # 保证金比例偏低，降低杠杆
-            return -0.2
+            return Decimal('-0.2')
         elif margin_ratio > Decimal('2.0'):  # 200%
             # 保证金比例很充足，可以增加杠杆
-            return 0.1
+            return Decimal('0.1')
         else:
             # 保证金比例正常
-            return 0
+            return Decimal('0')
     
     def _calculate_pnl_adjustment(self, position_metrics: PositionMetrics) -> Decimal:
         """计算盈亏调整"""
@@ -457,26 +479,20 @@ class LeverageManager:
         
         if unrealized_pnl_pct < Decimal('-0.1'):  # 亏损10%
             # 大幅亏损，降低杠杆
-            return -0.3
+            return Decimal('-0.3')
         elif unrealized_pnl_pct < Decimal('-0.05'):  # 亏损5%
             # 小幅亏损，适度降低杠杆
-            return -0.1
+            return Decimal('-0.1')
         elif unrealized_pnl_pct > Decimal('0.1'):  # 盈利10%
             # 大幅盈利，可以适当增加杠杆
-            return 0.1
+            return Decimal('0.1')
         else:
             # 盈亏正常
-            return 0
+            return Decimal('0')
     
     def _estimate_volatility(self, market_data: FuturesMarketData) -> Decimal:
         """估算波动性"""
-        # 简化的波动性估算：基于24小时价格变化
-        if market_data.previous_close and market_data.previous_close > 0:
-            price_change = abs(market_data.price_change_24h) / market_data.previous_close
-            return price_change
-        
-        # 如果没有历史数据，返回默认值
-        return Decimal('0.02')  # 2%
+        return estimate_volatility(market_data)
     
     def _round_to_step(self, leverage: Decimal) -> Decimal:
         """按步长调整杠杆"""
@@ -512,20 +528,6 @@ class LeverageManager:
         
         return {'allowed': True, 'reason': '杠杆调整通过检查'}
     
-    async def _risk_monitoring_loop(self):
-        """风险监控循环"""
-        while self.is_monitoring:
-            try:
-                await asyncio.sleep(self.check_interval)
-                
-                # 这里可以添加自动风险检查和杠杆调整逻辑
-                # 实际实现中需要获取当前仓位和市场数据
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                self.logger.error(f"风险监控错误: {e}")
-    
     async def _safe_callback(self, callback: callable, *args):
         """安全执行回调函数"""
         try:
@@ -553,18 +555,346 @@ class LeverageManager:
         return self.risk_events[-limit:] if self.risk_events else []
 
 
+LEVERAGE_RISK_LEVELS = ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL']
+
+
+class _SymbolLeverageGroup:
+    """同一交易对的杠杆管理器，按列保存配置和最新仓位指标"""
+    
+    FIELDS = (
+        'min_leverage', 'max_leverage', 'leverage_cap', 'leverage_step', 'volatility_threshold',
+        'margin_ratio', 'unrealized_pnl_pct', 'leverage_effective', 'position_value'
+    )
+    
+    def __init__(self, symbol: str, capacity: int = 16):
+        self.symbol = symbol
+        self.keys: List[str] = []
+        self.managers: List[LeverageManager] = []
+        self.metrics: List[Optional[PositionMetrics]] = []
+        self.rows: Dict[str, int] = {}
+        self.columns = {name: np.zeros(capacity) for name in self.FIELDS}
+        self.has_metrics = np.zeros(capacity, dtype=bool)
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def add(self, key: str, manager: LeverageManager):
+        """加入管理器，配置只在注册时转换一次"""
+        if key in self.rows:
+            self.remove(key)
+        
+        row = len(self.keys)
+        if row == len(self.has_metrics):
+            for name, column in self.columns.items():
+                self.columns[name] = np.concatenate([column, np.zeros(row)])
+            self.has_metrics = np.concatenate([self.has_metrics, np.zeros(row, dtype=bool)])
+        
+        config = manager.config
+        self.columns['min_leverage'][row] = float(config.min_leverage)
+        self.columns['max_leverage'][row] = float(config.max_leverage)
+        self.columns['leverage_cap'][row] = float(min(config.max_leverage, config.max_position_leverage))
+        self.columns['leverage_step'][row] = float(config.leverage_step)
+        self.columns['volatility_threshold'][row] = float(config.volatility_threshold)
+        self.has_metrics[row] = False
+        
+        self.rows[key] = row
+        self.keys.append(key)
+        self.managers.append(manager)
+        self.metrics.append(None)
+    
+    def remove(self, key: str) -> Optional[LeverageManager]:
+        """移除管理器，末行补位"""
+        row = self.rows.pop(key, None)
+        if row is None:
+            return None
+        
+        manager = self.managers[row]
+        last = len(self.keys) - 1
+        if row != last:
+            for column in self.columns.values():
+                column[row] = column[last]
+            self.has_metrics[row] = self.has_metrics[last]
+            self.keys[row] = self.keys[last]
+            self.managers[row] = self.managers[last]
+            self.metrics[row] = self.metrics[last]
+            self.rows[self.keys[row]] = row
+        
+        self.keys.pop()
+        self.managers.pop()
+        self.metrics.pop()
+        return manager
+    
+    def update_metrics(self, key: str, metrics: PositionMetrics) -> bool:
+        """更新仓位指标"""
+        row = self.rows.get(key)
+        if row is None:
+            return False
+        
+        self.metrics[row] = metrics
+        self.columns['margin_ratio'][row] = float(metrics.margin_ratio)
+        self.columns['unrealized_pnl_pct'][row] = float(metrics.unrealized_pnl_pct)
+        self.columns['leverage_effective'][row] = float(metrics.leverage_effective)
+        self.columns['position_value'][row] = float(metrics.position_value)
+        self.has_metrics[row] = True
+        return True
+    
+    def risk_levels(self) -> np.ndarray:
+        """按保证金比例批量定级，与 PositionMetrics.get_risk_level 一致（无指标按低风险计）"""
+        count = len(self.keys)
+        margin_ratio = self.columns['margin_ratio'][:count]
+        levels = np.select([margin_ratio < 1.05, margin_ratio < 1.1, margin_ratio < 1.2], [3, 2, 1], 0)
+        return np.where(self.has_metrics[:count], levels, 0)
+    
+    def evaluate(self, volatility: float) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        批量计算目标杠杆，规则与 calculate_optimal_leverage 和 adjust_leverage 一致
+        
+        Returns:
+            (需要调整的行, 目标杠杆的步数, 被拒绝的调整数)
+        """
+        count = len(self.keys)
+        columns = {name: column[:count] for name, column in self.columns.items()}
+        current = np.fromiter((float(m.current_leverage) for m in self.managers), dtype=float, count=count)
+        active = self.has_metrics[:count] & np.fromiter(
+            (m.is_monitoring for m in self.managers), dtype=bool, count=count
+        )
+        
+        threshold = columns['volatility_threshold']
+        volatility_adjustment = np.where(
+            volatility > threshold,
+            -np.minimum((volatility / threshold - 1) * 0.3, 0.5),
+            np.minimum((threshold - volatility) / threshold * 0.2, 0.1)
+        )
+        margin_ratio = columns['margin_ratio']
+        margin_adjustment = np.select(
+            [margin_ratio < 1.15, margin_ratio < 1.3, margin_ratio > 2.0], [-0.4, -0.2, 0.1], 0.0
+        )
+        pnl_pct = columns['unrealized_pnl_pct']
+        pnl_adjustment = np.select(
+            [pnl_pct < -0.1, pnl_pct < -0.05, pnl_pct > 0.1], [-0.3, -0.1, 0.1], 0.0
+        )
+        
+        min_leverage = columns['min_leverage']
+        step = columns['leverage_step']
+        target = min_leverage * (1 + volatility_adjustment + margin_adjustment + pnl_adjustment)
+        target = np.maximum(min_leverage, np.minimum(target, columns['leverage_cap']))
+        steps = np.floor(target / step + 1e-9)
+        target = steps * step
+        
+        effective = columns['leverage_effective']
+        moved = active & (np.abs(target - current) >= step - 1e-9)
+        allowed = (
+            (target >= min_leverage - 1e-9) & (target <= columns['max_leverage'] + 1e-9)
+            & ~((effective > 1.5) & (target > effective))
+            & ~((margin_ratio < 1.2) & (target > current))
+        )
+        changed = np.flatnonzero(moved & allowed)
+        rejected = int(np.count_nonzero(moved & ~allowed))
+        return changed, steps[changed].astype(np.int64), rejected
+
+
+class LeverageMonitorScheduler:
+    """
+    共享杠杆监控调度器
+    所有策略的杠杆管理器按交易对分组，由一个监控任务统一检查：
+    每个交易对每轮只估算一次波动性，批量计算目标杠杆，只输出发生变化的调整
+    """
+    
+    def __init__(self, check_interval: float = 30):
+        self.check_interval = check_interval  # 秒
+        self.groups: Dict[str, _SymbolLeverageGroup] = {}
+        self.locations: Dict[str, str] = {}
+        self.market_data: Dict[str, FuturesMarketData] = {}
+        self.volatility: Dict[str, Decimal] = {}
+        
+        self.monitor_task: Optional[asyncio.Task] = None
+        self.is_running = False
+        self.paused = False
+        self.change_callback: Optional[Callable] = None
+        
+        self.stats = {
+            'passes': 0,
+            'managers_evaluated': 0,
+            'volatility_estimates': 0,
+            'adjustments': 0,
+            'rejected_adjustments': 0,
+            'last_pass_ms': 0.0
+        }
+        self.logger = logging.getLogger("leverage_monitor_scheduler")
+    
+    def add(self, symbol: str, key: str, manager: LeverageManager):
+        """注册杠杆管理器"""
+        if key in self.locations:
+            self.remove(key)
+        
+        group = self.groups.get(symbol)
+        if group is None:
+            group = self.groups[symbol] = _SymbolLeverageGroup(symbol)
+        group.add(key, manager)
+        self.locations[key] = symbol
+        manager.monitor = self
+    
+    def remove(self, key: str) -> bool:
+        """注销杠杆管理器"""
+        symbol = self.locations.pop(key, None)
+        if symbol is None:
+            return False
+        
+        group = self.groups[symbol]
+        manager = group.remove(key)
+        if manager is not None and manager.monitor is self:
+            manager.monitor = None
+        if not group:
+            del self.groups[symbol]
+        return True
+    
+    def update_market_data(self, market_data: FuturesMarketData):
+        """更新交易对行情，下一轮检查时使用"""
+        self.market_data[market_data.symbol] = market_data
+    
+    def update_position_metrics(self, key: str, metrics: PositionMetrics) -> bool:
+        """更新策略的最新仓位指标"""
+        symbol = self.locations.get(key)
+        if symbol is None:
+            return False
+        return self.groups[symbol].update_metrics(key, metrics)
+    
+    def get_volatility(self, symbol: str) -> Optional[Decimal]:
+        """获取最近一轮检查使用的波动性估算"""
+        return self.volatility.get(symbol)
+    
+    def set_change_callback(self, callback: Callable):
+        """设置杠杆变更回调，每轮以变更列表调用一次"""
+        self.change_callback = callback
+    
+    async def start(self):
+        """启动监控任务"""
+        if self.is_running:
+            return
+        
+        self.is_running = True
+        self.monitor_task = asyncio.create_task(self._monitoring_loop())
+        self.logger.info("启动共享杠杆监控")
+    
+    async def stop(self):
+        """停止监控任务"""
+        self.is_running = False
+        
+        if self.monitor_task and not self.monitor_task.done():
+            self.monitor_task.cancel()
+            try:
+                await self.monitor_task
+            except asyncio.CancelledError:
+                pass
+        
+        self.logger.info("停止共享杠杆监控")
+    
+    async def run_once(self) -> List[Dict[str, Any]]:
+        """执行一轮检查，返回本轮的杠杆变更"""
+        started = time.perf_counter()
+        changes = []
+        
+        for symbol, group in self.groups.items():
+            market_data = self.market_data.get(symbol)
+            if market_data is None or not len(group):
+                continue
+            
+            volatility = estimate_volatility(market_data)
+            self.volatility[symbol] = volatility
+            self.stats['volatility_estimates'] += 1
+            
+            rows, steps, rejected = group.evaluate(float(volatility))
+            self.stats['managers_evaluated'] += len(group)
+            self.stats['rejected_adjustments'] += rejected
+            
+            for row, step_count in zip(rows.tolist(), steps.tolist()):
+                manager = group.managers[row]
+                leverage_change = manager._record_leverage_change(
+                    manager.current_leverage,
+                    manager.config.leverage_step * step_count,
+                    '杠杆调整通过检查',
+                    group.metrics[row],
+                    market_data
+                )
+                changes.append({'symbol': symbol, 'strategy_key': group.keys[row], **leverage_change})
+                
+                if manager.leverage_change_callback:
+                    await manager._safe_callback(manager.leverage_change_callback, leverage_change)
+        
+        self.stats['passes'] += 1
+        self.stats['adjustments'] += len(changes)
+        self.stats['last_pass_ms'] = (time.perf_counter() - started) * 1000
+        
+        if changes and self.change_callback:
+            try:
+                if asyncio.iscoroutinefunction(self.change_callback):
+                    await self.change_callback(changes)
+                else:
+                    self.change_callback(changes)
+            except Exception as e:
+                self.logger.error(f"杠杆变更回调失败: {e}")
+        
+        return changes
+    
+    async def _monitoring_loop(self):
+        """监控循环"""
+        while self.is_running:
+            try:
+                await asyncio.sleep(self.check_interval)
+                if not self.paused:
+                    await self.run_once()
+                
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.logger.error(f"杠杆监控错误: {e}")
+    
+    def assess(self) -> Dict[str, Any]:
+        """按最新仓位指标汇总风险分布和总敞口"""
+        risk_distribution = dict.fromkeys(LEVERAGE_RISK_LEVELS, 0)
+        total_exposure = 0.0
+        
+        for group in self.groups.values():
+            counts = np.bincount(group.risk_levels(), minlength=len(LEVERAGE_RISK_LEVELS))
+            for level, count in zip(LEVERAGE_RISK_LEVELS, counts.tolist()):
+                risk_distribution[level] += count
+            count = len(group)
+            total_exposure += float(group.columns['position_value'][:count][group.has_metrics[:count]].sum())
+        
+        return {
+            'total_strategies': len(self.locations),
+            'total_exposure': total_exposure,
+            'risk_distribution': risk_distribution
+        }
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取调度统计"""
+        return {
+            **self.stats,
+            'is_running': self.is_running,
+            'symbols': len(self.groups),
+            'managers': len(self.locations)
+        }
+
+
 class DynamicLeverageManager:
     """动态杠杆管理器（支持多策略）"""
     
-    def __init__(self):
-        self.leverage_managers: Dict[str, LeverageManager] = {}
+    def __init__(self, check_interval: float = 30):
+        self.leverage_managers: Dict[str, Dict[str, LeverageManager]] = {}
         self.global_settings = {
             'max_total_exposure': Decimal('1.0'),  # 最大总敞口
             'correlation_check': True,  # 相关性检查
             'emergency_stop': False,   # 紧急停止
         }
+        # 所有策略共用一个监控任务
+        self.monitor = LeverageMonitorScheduler(check_interval)
         self.logger = logging.getLogger("dynamic_leverage_manager")
     
+    @staticmethod
+    def _strategy_key(symbol: str, strategy_id: str) -> str:
+        return f"{symbol}/{strategy_id}"
+    
     async def register_strategy(
         self,
         symbol: str,
@@ -583,8 +913,10 @@ class DynamicLeverageManager:
             manager = LeverageManager(leverage_config)
             if current_leverage:
                 manager.current_leverage = current_leverage
+            manager.is_monitoring = not self.global_settings['emergency_stop']
             
             self.leverage_managers[symbol][strategy_id] = manager
+            self.monitor.add(symbol, self._strategy_key(symbol, strategy_id), manager)
             
             self.logger.info(f"注册策略杠杆管理: {symbol}/{strategy_id}")
             return True
@@ -599,6 +931,7 @@ class DynamicLeverageManager:
             if symbol in self.leverage_managers and strategy_id in self.leverage_managers[symbol]:
                 manager = self.leverage_managers[symbol][strategy_id]
                 await manager.stop_monitoring()
+                self.monitor.remove(self._strategy_key(symbol, strategy_id))
                 del self.leverage_managers[symbol][strategy_id]
                 
                 if not self.leverage_managers[symbol]:
@@ -613,32 +946,40 @@ class DynamicLeverageManager:
             self.logger.error(f"注销策略失败: {e}")
             return False
     
+    def update_market_data(self, market_data: FuturesMarketData):
+        """更新交易对行情"""
+        self.monitor.update_market_data(market_data)
+    
+    def update_position_metrics(self, symbol: str, strategy_id: str, metrics: PositionMetrics) -> bool:
+        """更新策略的仓位指标"""
+        return self.monitor.update_position_metrics(self._strategy_key(symbol, strategy_id), metrics)
+    
+    async def start_monitoring(self):
+        """启动共享杠杆监控"""
+        await self.monitor.start()
+    
+    async def stop_monitoring(self):
+        """停止共享杠杆监控"""
+        await self.monitor.stop()
+    
+    async def run_leverage_check(self) -> List[Dict[str, Any]]:
+        """立即执行一轮杠杆检查，返回发生的杠杆变更"""
+        return await self.monitor.run_once()
+    
     async def get_global_risk_assessment(self) -> Dict[str, Any]:
         """获取全局风险评估"""
         try:
-            total_exposure = Decimal('0')
-            total_strategies = 0
-            high_risk_strategies = 0
-            risk_distributions = {'LOW': 0, 'MEDIUM': 0, 'HIGH': 0, 'CRITICAL': 0}
-            
-            # 汇总各策略的风险
-            for symbol, strategies in self.leverage_managers.items():
-                for strategy_id, manager in strategies.items():
-                    total_strategies += 1
-                    
-                    # 简化的风险评估（实际需要具体数据）
-                    risk_level = 'LOW'  # 这里应该从实际PositionMetrics获取
-                    risk_distributions[risk_level] += 1
-                    
-                    if risk_level in ['HIGH', 'CRITICAL']:
-                        high_risk_strategies += 1
+            assessment = self.monitor.assess()
+            total_strategies = assessment['total_strategies']
+            risk_distributions = assessment['risk_distribution']
+            high_risk_strategies = risk_distributions['HIGH'] + risk_distributions['CRITICAL']
             
             # 计算风险指标
             high_risk_ratio = Decimal(str(high_risk_strategies)) / Decimal(str(total_strategies)) if total_strategies > 0 else Decimal('0')
             
             return {
                 'total_strategies': total_strategies,
-                'total_exposure': float(total_exposure),
+                'total_exposure': assessment['total_exposure'],
                 'high_risk_strategies': high_risk_strategies,
                 'high_risk_ratio': float(high_risk_ratio),
                 'risk_distribution': risk_distributions,
@@ -661,8 +1002,9 @@ class DynamicLeverageManager:
             self.global_settings['emergency_stop'] = True
             
             for symbol, strategies in self.leverage_managers.items():
-                for strategy_id, manager in strategies:
+                for strategy_id, manager in strategies.items():
                     await manager.stop_monitoring()
+            self.monitor.paused = True
             
             self.logger.warning("执行紧急停止：所有策略已停止")
             
@@ -673,12 +1015,13 @@ class DynamicLeverageManager:
         """恢复所有策略"""
         try:
             self.global_settings['emergency_stop'] = False
+            self.monitor.paused = False
             
             for symbol, strategies in self.leverage_managers.items():
-                for strategy_id, manager in strategies:
+                for strategy_id, manager in strategies.items():
                     await manager.start_monitoring()
             
             self.logger.info("恢复所有策略监控")
             
         except Exception as e:
-            self.logger.error(f"恢复策略失败: {e}")
\ No newline at end of file
+            self.logger.error(f"恢复策略失败: {e}")
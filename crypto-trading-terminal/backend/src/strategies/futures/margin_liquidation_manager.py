@@ -4,10 +4,12 @@
 """
 
 import asyncio
+import bisect
 import logging
+import time
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from dataclasses import dataclass
 
 from .base_futures_strategy import (
@@ -44,6 +46,41 @@ class LiquidationRisk:
     time_to_liquidation: Optional[int] = None  # 预计多少时间步会清算
 
 
+# 风险等级由低到高，liquidation 表示标记价格已越过清算价格
+RISK_LEVELS = ('low', 'medium', 'high', 'critical', 'liquidation')
+
+
+@dataclass
+class RiskLevelChange:
+    """标记价格触发的清算风险等级变化"""
+    position_key: str
+    position: FuturesPosition
+    previous_level: str
+    risk_level: str
+    mark_price: Decimal
+    timestamp: datetime
+    
+    @property
+    def is_escalation(self) -> bool:
+        return RISK_LEVELS.index(self.risk_level) > RISK_LEVELS.index(self.previous_level)
+    
+    @property
+    def liquidation_risk(self) -> LiquidationRisk:
+        """按变化时的标记价格计算的清算风险详情"""
+        liquidation_price = self.position.liquidation_price
+        if self.position.quantity > 0:
+            distance = liquidation_price - self.mark_price
+        else:
+            distance = self.mark_price - liquidation_price
+        return LiquidationRisk(
+            position=self.position,
+            liquidation_price=liquidation_price,
+            distance_to_liquidation=distance,
+            distance_percentage=abs(distance / liquidation_price * 100),
+            risk_level=self.risk_level
+        )
+
+
 class MarginCalculator:
     """保证金计算器"""
     
@@ -399,16 +436,7 @@ class MarginMonitor:
             
             # 存储预警并发送回调
             for alert in alerts:
-                self.alerts.append(alert)
-                
-                # 发送用户回调
-                if alert.user_id in self.user_alert_callbacks:
-                    try:
-                        asyncio.create_task(
-                            self.user_alert_callbacks[alert.user_id](alert)
-                        )
-                    except Exception as e:
-                        self.logger.error(f"发送预警回调失败: {e}")
+                self.dispatch_alert(alert)
             
             return alerts
             
@@ -416,6 +444,18 @@ class MarginMonitor:
             self.logger.error(f"检查保证金条件失败: {e}")
             return []
     
+    def dispatch_alert(self, alert: MarginAlert):
+        """存储预警并发送用户回调"""
+        self.alerts.append(alert)
+        
+        if alert.user_id in self.user_alert_callbacks:
+            try:
+                asyncio.create_task(
+                    self.user_alert_callbacks[alert.user_id](alert)
+                )
+            except Exception as e:
+                self.logger.error(f"发送预警回调失败: {e}")
+    
     def get_active_alerts(self, user_id: Optional[int] = None) -> List[MarginAlert]:
         """获取活跃预警"""
         try:
@@ -458,6 +498,258 @@ class MarginMonitor:
             self.logger.error(f"清除已解决预警失败: {e}")
 
 
+class _TriggerList:
+    """按触发价格排序的仓位键，新增先进入待合并缓冲区，查询前批量合并"""
+    
+    __slots__ = ("prices", "keys", "_pending")
+    
+    MERGE_THRESHOLD = 32  # 待合并数量超过该值时整体重排，否则逐个插入
+    
+    def __init__(self):
+        self.prices: List[float] = []
+        self.keys: List[str] = []
+        self._pending: List[Tuple[float, str]] = []
+    
+    def add(self, price: float, key: str):
+        self._pending.append((price, key))
+    
+    def remove(self, price: float, key: str):
+        try:
+            self._pending.remove((price, key))
+            return
+        except ValueError:
+            pass
+        index = bisect.bisect_left(self.prices, price)
+        while index < len(self.prices) and self.prices[index] == price:
+            if self.keys[index] == key:
+                del self.prices[index]
+                del self.keys[index]
+                return
+            index += 1
+    
+    def between(self, low: float, high: float, include_low: bool) -> List[str]:
+        """触发价格位于 [low, high)（include_low）或 (low, high] 区间的仓位"""
+        self._merge()
+        search = bisect.bisect_left if include_low else bisect.bisect_right
+        return self.keys[search(self.prices, low):search(self.prices, high)]
+    
+    def __len__(self) -> int:
+        return len(self.prices) + len(self._pending)
+    
+    def _merge(self):
+        if not self._pending:
+            return
+        if len(self._pending) <= self.MERGE_THRESHOLD:
+            for price, key in self._pending:
+                index = bisect.bisect_right(self.prices, price)
+                self.prices.insert(index, price)
+                self.keys.insert(index, key)
+        else:
+            entries = sorted(list(zip(self.prices, self.keys)) + self._pending, key=lambda entry: entry[0])
+            self.prices = [price for price, _ in entries]
+            self.keys = [key for _, key in entries]
+        self._pending = []
+
+
+@dataclass
+class _TrackedPosition:
+    """被监控的仓位及其各风险带的触发价格"""
+    position: FuturesPosition
+    symbol: str
+    is_long: bool
+    liquidation_price: float
+    triggers: Tuple[float, ...]  # 依次为 medium、high、critical、liquidation 的触发价格
+    level: int = 0
+
+
+class _SymbolBook:
+    """单个合约的仓位触发价格索引"""
+    
+    def __init__(self, bands: int):
+        self.long_bands = [_TriggerList() for _ in range(bands)]
+        self.short_bands = [_TriggerList() for _ in range(bands)]
+        self.positions: Dict[str, _TrackedPosition] = {}
+        self.last_price: Optional[float] = None
+
+
+class LiquidationWatcher:
+    """由标记价格驱动的清算风险监控
+    
+    每个仓位按清算价格换算出各风险带（medium/high/critical 对应 LiquidationManager 的距离阈值，
+    再加上清算价格本身）的触发价格，多头和空头分别按触发价格排序。价格从 p0 变到 p1 时，
+    只有触发价格落在两者之间的仓位跨越了风险带，二分查找即可定位，无需遍历全部仓位。
+    """
+    
+    def __init__(self, liquidation_manager: Optional[LiquidationManager] = None):
+        self.liquidation_manager = liquidation_manager or LiquidationManager()
+        thresholds = self.liquidation_manager.liquidation_thresholds
+        # 距清算价格的百分比，由宽到窄
+        self.band_percentages: Tuple[float, ...] = (
+            float(thresholds['low_risk']),
+            float(thresholds['medium_risk']),
+            float(thresholds['high_risk']),
+            0.0
+        )
+        
+        self._books: Dict[str, _SymbolBook] = {}
+        self._symbols: Dict[str, str] = {}  # 仓位键 -> 合约
+        self.level_counts = [0] * len(RISK_LEVELS)
+        
+        self.stats = {
+            "ticks": 0,
+            "positions_visited": 0,
+            "level_changes": 0,
+            "total_tick_time": 0.0,
+            "max_tick_time": 0.0
+        }
+        self.logger = logging.getLogger(__name__)
+    
+    def track(self, position_key: str, position: FuturesPosition) -> str:
+        """开始或更新监控仓位，返回当前风险等级（无清算价格时为unknown）"""
+        self.untrack(position_key)
+        
+        if not position.liquidation_price or position.quantity == 0:
+            return 'unknown'
+        
+        liquidation_price = float(position.liquidation_price)
+        is_long = position.quantity > 0
+        if is_long:
+            triggers = tuple(liquidation_price * (1 + pct / 100) for pct in self.band_percentages)
+        else:
+            triggers = tuple(liquidation_price * (1 - pct / 100) for pct in self.band_percentages)
+        
+        book = self._books.get(position.symbol)
+        if book is None:
+            book = self._books[position.symbol] = _SymbolBook(len(self.band_percentages))
+        bands = book.long_bands if is_long else book.short_bands
+        for band, trigger in zip(bands, triggers):
+            band.add(trigger, position_key)
+        
+        tracked = _TrackedPosition(position, position.symbol, is_long, liquidation_price, triggers)
+        if book.last_price is not None:
+            tracked.level = self._level_at(tracked, book.last_price)
+        book.positions[position_key] = tracked
+        self._symbols[position_key] = position.symbol
+        self.level_counts[tracked.level] += 1
+        return RISK_LEVELS[tracked.level]
+    
+    def untrack(self, position_key: str) -> bool:
+        """停止监控仓位"""
+        symbol = self._symbols.pop(position_key, None)
+        if symbol is None:
+            return False
+        
+        book = self._books[symbol]
+        tracked = book.positions.pop(position_key)
+        bands = book.long_bands if tracked.is_long else book.short_bands
+        for band, trigger in zip(bands, tracked.triggers):
+            band.remove(trigger, position_key)
+        self.level_counts[tracked.level] -= 1
+        
+        if not book.positions:
+            del self._books[symbol]
+        return True
+    
+    def on_mark_price(self, symbol: str, mark_price: Any) -> List[RiskLevelChange]:
+        """处理一笔标记价格，返回风险等级发生变化的仓位"""
+        book = self._books.get(symbol)
+        if book is None:
+            return []
+        
+        started = time.perf_counter()
+        price = float(mark_price)
+        previous = book.last_price
+        book.last_price = price
+        
+        if previous is None:
+            # 首笔价格：全部仓位定级一次
+            visited = book.positions.keys()
+        elif price == previous:
+            visited = ()
+        else:
+            low, high = min(price, previous), max(price, previous)
+            visited = set()
+            # 多头在价格 <= 触发价格时处于该风险带，空头在价格 >= 触发价格时处于该风险带
+            for band in book.long_bands:
+                visited.update(band.between(low, high, include_low=True))
+            for band in book.short_bands:
+                visited.update(band.between(low, high, include_low=False))
+        
+        changes = []
+        if visited:
+            now = datetime.now()
+            decimal_price = mark_price if isinstance(mark_price, Decimal) else Decimal(str(mark_price))
+        for position_key in visited:
+            tracked = book.positions[position_key]
+            level = self._level_at(tracked, price)
+            if level != tracked.level:
+                changes.append(RiskLevelChange(
+                    position_key,
+                    tracked.position,
+                    RISK_LEVELS[tracked.level],
+                    RISK_LEVELS[level],
+                    decimal_price,
+                    now
+                ))
+                self.level_counts[tracked.level] -= 1
+                self.level_counts[level] += 1
+                tracked.level = level
+        
+        elapsed = time.perf_counter() - started
+        self.stats["ticks"] += 1
+        self.stats["positions_visited"] += len(visited)
+        self.stats["level_changes"] += len(changes)
+        self.stats["total_tick_time"] += elapsed
+        self.stats["max_tick_time"] = max(self.stats["max_tick_time"], elapsed)
+        return changes
+    
+    def get_level(self, position_key: str) -> str:
+        """获取仓位当前风险等级"""
+        symbol = self._symbols.get(position_key)
+        if symbol is None:
+            return 'unknown'
+        return RISK_LEVELS[self._books[symbol].positions[position_key].level]
+    
+    def positions_at_risk(self, symbol: Optional[str] = None, min_level: str = 'high') -> List[str]:
+        """获取风险等级不低于min_level的仓位键"""
+        threshold = RISK_LEVELS.index(min_level)
+        books = [self._books[symbol]] if symbol in self._books else ([] if symbol else self._books.values())
+        return [
+            position_key
+            for book in books
+            for position_key, tracked in book.positions.items()
+            if tracked.level >= threshold
+        ]
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        ticks = self.stats["ticks"]
+        return {
+            "symbols": len(self._books),
+            "positions": len(self._symbols),
+            "positions_by_level": dict(zip(RISK_LEVELS, self.level_counts)),
+            "avg_tick_time_us": self.stats["total_tick_time"] / ticks * 1e6 if ticks else 0.0,
+            "avg_positions_visited": self.stats["positions_visited"] / ticks if ticks else 0.0,
+            "stats": self.stats.copy()
+        }
+    
+    @staticmethod
+    def _level_at(tracked: _TrackedPosition, price: float) -> int:
+        # 触发价格由宽到窄排列，处于某风险带时必然也处于更宽的风险带
+        level = 0
+        if tracked.is_long:
+            for trigger in tracked.triggers:
+                if price > trigger:
+                    break
+                level += 1
+        else:
+            for trigger in tracked.triggers:
+                if price < trigger:
+                    break
+                level += 1
+        return level
+
+
 class MarginLiquidationManager:
     """保证金和清算统一管理器"""
     
@@ -466,10 +758,16 @@ class MarginLiquidationManager:
         self.liquidation_manager = LiquidationManager(self.margin_calculator)
         self.margin_monitor = MarginMonitor(self.margin_calculator, self.liquidation_manager)
         
+        # 标记价格驱动的清算风险监控
+        self.liquidation_watcher = LiquidationWatcher(self.liquidation_manager)
+        
         self.active_positions: Dict[str, FuturesPosition] = {}
         self.user_accounts: Dict[int, FuturesAccountBalance] = {}
         
         self.monitoring_tasks: Dict[str, asyncio.Task] = {}
+        self.mark_price_subscriptions: Dict[str, str] = {}  # 合约 -> 订阅ID
+        self._ws_manager = None
+        self._exchange = 'binance'
         self.logger = logging.getLogger(__name__)
     
     def register_position(self, position: FuturesPosition):
@@ -477,8 +775,16 @@ class MarginLiquidationManager:
         try:
             position_key = f"{position.user_id}_{position.account_id}_{position.symbol}"
             self.active_positions[position_key] = position
+            self._track_position(position_key, position)
             self.logger.info(f"注册仓位: {position_key}")
             
+            # 监控运行中出现新合约时补充订阅标记价格
+            if self._ws_manager is not None and position.symbol not in self.mark_price_subscriptions \
+                    and position.symbol not in self.monitoring_tasks:
+                self.monitoring_tasks[position.symbol] = asyncio.create_task(
+                    self._subscribe_mark_price(position.symbol)
+                )
+            
         except Exception as e:
             self.logger.error(f"注册仓位失败: {e}")
     
@@ -488,11 +794,27 @@ class MarginLiquidationManager:
             position_key = f"{user_id}_{account_id}_{symbol}"
             if position_key in self.active_positions:
                 del self.active_positions[position_key]
+                self.liquidation_watcher.untrack(position_key)
                 self.logger.info(f"注销仓位: {position_key}")
             
         except Exception as e:
             self.logger.error(f"注销仓位失败: {e}")
     
+    def _track_position(self, position_key: str, position: FuturesPosition):
+        """计算缺失的清算价格并加入标记价格监控"""
+        if not position.liquidation_price:
+            account = self.user_accounts.get(f"{position.user_id}_{position.account_id}")
+            if account is not None:
+                liquidation_price = self.margin_calculator.calculate_liquidation_price(
+                    entry_price=position.entry_price or position.average_price,
+                    quantity=position.quantity,
+                    margin_balance=account.wallet_balance,
+                    leverage=position.leverage
+                )
+                if liquidation_price:
+                    position.liquidation_price = liquidation_price
+        self.liquidation_watcher.track(position_key, position)
+    
     def update_account_balance(self, account: FuturesAccountBalance):
         """更新账户余额"""
         try:
@@ -500,6 +822,11 @@ class MarginLiquidationManager:
             self.user_accounts[account_key] = account
             self.logger.info(f"更新账户余额: {account_key}")
             
+            # 之前缺少账户而无法计算清算价格的仓位
+            for position_key, position in self.active_positions.items():
+                if not position.liquidation_price and f"{position.user_id}_{position.account_id}" == account_key:
+                    self._track_position(position_key, position)
+            
         except Exception as e:
             self.logger.error(f"更新账户余额失败: {e}")
     
@@ -586,68 +913,135 @@ class MarginLiquidationManager:
         except Exception as e:
             self.logger.error(f"紧急清算处理失败: {e}")
     
-    async def start_global_monitoring(self):
-        """启动全局监控"""
+    def on_mark_price(self, symbol: str, mark_price: Any) -> List[RiskLevelChange]:
+        """处理标记价格：只检查跨越风险带的仓位，风险升级时发出预警"""
+        changes = self.liquidation_watcher.on_mark_price(symbol, mark_price)
+        
+        for change in changes:
+            if not change.is_escalation or change.risk_level in ('low', 'medium'):
+                continue
+            
+            position = change.position
+            liquidation_risk = change.liquidation_risk
+            margin_ratio = self._margin_ratio(position, change.mark_price)
+            
+            if change.risk_level == 'high':
+                alert_type = 'danger'
+                message = f"清算风险较高，距离清算价格 {liquidation_risk.distance_percentage:.2f}%"
+            elif change.risk_level == 'critical':
+                alert_type = 'critical'
+                message = f"清算风险极高！距离清算价格仅 {liquidation_risk.distance_percentage:.2f}%"
+            else:
+                alert_type = 'critical'
+                message = f"标记价格 {change.mark_price} 已越过清算价格 {liquidation_risk.liquidation_price}"
+            
+            self.margin_monitor.dispatch_alert(MarginAlert(
+                alert_id=f"liquidation_{change.risk_level}_{change.position_key}_{change.timestamp.timestamp()}",
+                user_id=position.user_id,
+                account_id=position.account_id,
+                symbol=symbol,
+                alert_type=alert_type,
+                margin_ratio=margin_ratio,
+                threshold=Decimal('0'),
+                message=message,
+                timestamp=change.timestamp
+            ))
+            
+            if change.risk_level in ('critical', 'liquidation'):
+                try:
+                    asyncio.get_running_loop().create_task(
+                        self._handle_emergency_liquidation(change.position_key, liquidation_risk, margin_ratio)
+                    )
+                except RuntimeError:
+                    self.logger.critical(f"检测到紧急清算风险（无事件循环）: {change.position_key}")
+        
+        return changes
+    
+    def on_futures_ticker(self, data: Dict[str, Any]):
+        """期货行情订阅回调"""
+        try:
+            mark_price = data.get('mark_price') or data.get('price')
+            if mark_price:
+                self.on_mark_price(data['symbol'], mark_price)
+        except Exception as e:
+            self.logger.error(f"处理标记价格失败: {e}")
+    
+    def _margin_ratio(self, position: FuturesPosition, mark_price: Decimal) -> Decimal:
+        account = self.user_accounts.get(f"{position.user_id}_{position.account_id}")
+        if account is None:
+            return Decimal('0')
+        return self.margin_calculator.calculate_margin_ratio(
+            account.wallet_balance,
+            abs(position.quantity * mark_price),
+            position.unrealized_pnl
+        )
+    
+    async def _subscribe_mark_price(self, symbol: str):
+        """订阅合约的标记价格"""
+        try:
+            subscription_id = await self._ws_manager.subscribe_futures_market_data(
+                self._exchange, symbol, self.on_futures_ticker, ["ticker"]
+            )
+            self.mark_price_subscriptions[symbol] = subscription_id
+        except Exception as e:
+            self.logger.error(f"订阅标记价格失败: {symbol}, {e}")
+        finally:
+            self.monitoring_tasks.pop(symbol, None)
+    
+    async def start_global_monitoring(self, ws_manager: Any = None, exchange: str = 'binance'):
+        """启动全局监控
+        
+        通过ws_manager订阅所有持仓合约的标记价格，清算风险随行情实时评估；
+        未提供ws_manager时由调用方把标记价格推送给 on_mark_price。
+        """
         try:
             self.logger.info("启动全局保证金监控")
+            self._ws_manager = ws_manager
+            self._exchange = exchange
+            
+            if ws_manager is not None:
+                symbols = {position.symbol for position in self.active_positions.values()}
+                await asyncio.gather(*(
+                    self._subscribe_mark_price(symbol)
+                    for symbol in symbols
+                    if symbol not in self.mark_price_subscriptions
+                ))
             
             while True:
                 # 清理已解决的预警
                 self.margin_monitor.clear_resolved_alerts()
-                
-                # 监控所有注册仓位
-                monitoring_tasks = []
-                for position_key, position in self.active_positions.items():
-                    user_id = position.user_id
-                    account_id = position.account_id
-                    symbol = position.symbol
-                    
-                    # 获取账户和市场数据（这里应该从实际数据源获取）
-                    # 简化处理：使用模拟数据
-                    
-                    account_key = f"{user_id}_{account_id}"
-                    if account_key in self.user_accounts:
-                        account = self.user_accounts[account_key]
-                        
-                        # 模拟市场数据
-                        market_data = FuturesMarketData(
-                            symbol=symbol,
-                            current_price=Decimal('50000'),  # 模拟价格
-                            bid_price=Decimal('49999'),
-                            ask_price=Decimal('50001'),
-                            volume_24h=Decimal('1000000'),
-                            price_change_24h=Decimal('0.02'),
-                            timestamp=datetime.now()
-                        )
-                        
-                        task = asyncio.create_task(
-                            self.monitor_position(user_id, account_id, symbol, position, account, market_data)
-                        )
-                        monitoring_tasks.append(task)
-                
-                # 并发执行监控任务
-                if monitoring_tasks:
-                    results = await asyncio.gather(*monitoring_tasks, return_exceptions=True)
-                    
-                    for result in results:
-                        if isinstance(result, Exception):
-                            self.logger.error(f"监控任务异常: {result}")
-                
-                # 监控间隔
-                await asyncio.sleep(60)  # 60秒检查一次
+                await asyncio.sleep(60)
                 
         except asyncio.CancelledError:
             self.logger.info("全局监控任务取消")
         except Exception as e:
             self.logger.error(f"全局监控异常: {e}")
+        finally:
+            await self._unsubscribe_mark_prices()
     
-    def stop_global_monitoring(self):
+    async def _unsubscribe_mark_prices(self):
+        """取消所有标记价格订阅，避免订阅和行情回调在监控停止后泄漏"""
+        ws_manager = self._ws_manager
+        self._ws_manager = None
+        symbols = list(self.mark_price_subscriptions)
+        self.mark_price_subscriptions.clear()
+        if ws_manager is None:
+            return
+        
+        for symbol in symbols:
+            try:
+                await ws_manager.unsubscribe_futures_data(self._exchange, symbol)
+            except Exception as e:
+                self.logger.error(f"取消标记价格订阅失败: {symbol}, {e}")
+    
+    async def stop_global_monitoring(self):
         """停止全局监控"""
         try:
             for task in self.monitoring_tasks.values():
                 if not task.done():
                     task.cancel()
             self.monitoring_tasks.clear()
+            await self._unsubscribe_mark_prices()
             self.logger.info("停止全局监控")
             
         except Exception as e:
@@ -657,16 +1051,9 @@ class MarginLiquidationManager:
         """获取风险摘要"""
         try:
             total_positions = len(self.active_positions)
-            high_risk_positions = 0
-            critical_risk_positions = 0
-            
-            for position in self.active_positions.values():
-                # 简化风险评估
-                if hasattr(position, 'liquidation_distance'):
-                    if position.liquidation_distance < Decimal('10'):
-                        critical_risk_positions += 1
-                    elif position.liquidation_distance < Decimal('25'):
-                        high_risk_positions += 1
+            positions_by_level = self.liquidation_watcher.get_statistics()["positions_by_level"]
+            high_risk_positions = positions_by_level['high']
+            critical_risk_positions = positions_by_level['critical'] + positions_by_level['liquidation']
             
             active_alerts = self.margin_monitor.get_active_alerts()
             
@@ -676,7 +1063,8 @@ class MarginLiquidationManager:
                 'high_risk_positions': high_risk_positions,
                 'critical_risk_positions': critical_risk_positions,
                 'active_alerts': len(active_alerts),
-                'monitoring_active': len(self.monitoring_tasks) > 0
+                'monitoring_active': len(self.monitoring_tasks) > 0 or len(self.mark_price_subscriptions) > 0,
+                'liquidation_watcher': self.liquidation_watcher.get_statistics()
             }
             
         except Exception as e:
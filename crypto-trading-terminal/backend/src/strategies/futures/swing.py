@@ -5,9 +5,11 @@
 
 import asyncio
 import logging
+from bisect import bisect_left, bisect_right
+from collections import deque
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Deque
 
 from .base_futures_strategy import (
     BaseFuturesStrategy, FuturesMarketData, FuturesOrderRequest, 
@@ -17,24 +19,204 @@ from .base_futures_strategy import (
 )
 
 
+class _SlidingExtreme:
+    """单调队列滑动窗口最大/最小值，每次更新均摊O(1)"""
+
+    __slots__ = ("size", "is_max", "_items")
+
+    def __init__(self, size: int, is_max: bool):
+        self.size = size
+        self.is_max = is_max
+        self._items: Deque[Tuple[int, Decimal]] = deque()
+
+    def push(self, index: int, value: Decimal):
+        items = self._items
+        if self.is_max:
+            while items and items[-1][1] <= value:
+                items.pop()
+        else:
+            while items and items[-1][1] >= value:
+                items.pop()
+        items.append((index, value))
+        while items[0][0] <= index - self.size:
+            items.popleft()
+
+    @property
+    def value(self) -> Decimal:
+        return self._items[0][1]
+
+
+class _SwingPointTracker:
+    """增量识别摆动点
+
+    价格严格高于（低于）左右各 ``window`` 个价格即为摆动高点（低点）。
+    第 i 个价格在第 i + window 个价格到达时确认：左侧比较值是截至 i-1 的
+    滑动最大值，右侧比较值是截至最新价格的滑动最大值，均由单调队列维护。
+    摆动点按全局序号存放在有序列表中，查询回看区间用二分查找。
+    """
+
+    def __init__(self, window: int = 2, retention: int = 1000):
+        self.window = window
+        self.retention = retention
+        self.count = 0
+        self._recent: Deque[Decimal] = deque(maxlen=2 * window + 1)
+        self._trailing_max = _SlidingExtreme(window, is_max=True)
+        self._trailing_min = _SlidingExtreme(window, is_max=False)
+        # 最近 window+2 个价格处的滑动极值，[-1] 对应最新价格
+        self._max_history: Deque[Decimal] = deque(maxlen=window + 2)
+        self._min_history: Deque[Decimal] = deque(maxlen=window + 2)
+        self.high_indices: List[int] = []
+        self.high_prices: List[Decimal] = []
+        self.low_indices: List[int] = []
+        self.low_prices: List[Decimal] = []
+
+    def push(self, price: Decimal):
+        index = self.count
+        self.count += 1
+        window = self.window
+        self._recent.append(price)
+        self._trailing_max.push(index, price)
+        self._trailing_min.push(index, price)
+        self._max_history.append(self._trailing_max.value)
+        self._min_history.append(self._trailing_min.value)
+
+        candidate = index - window
+        if candidate < window:
+            return
+        value = self._recent[window]
+        if value > self._max_history[0] and value > self._max_history[-1]:
+            self.high_indices.append(candidate)
+            self.high_prices.append(value)
+        if value < self._min_history[0] and value < self._min_history[-1]:
+            self.low_indices.append(candidate)
+            self.low_prices.append(value)
+
+        if index % self.retention == 0:
+            self._prune(index - self.retention)
+
+    def _prune(self, min_index: int):
+        for indices, prices in ((self.high_indices, self.high_prices),
+                                (self.low_indices, self.low_prices)):
+            stale = bisect_left(indices, min_index)
+            if stale:
+                del indices[:stale]
+                del prices[:stale]
+
+    def span(self, lookback: int) -> Tuple[int, int, int, int]:
+        """最近 lookback 个价格内（两端各留 window 个确认点）的高点、低点起止位置"""
+        start = self.count - lookback + self.window
+        return (bisect_left(self.high_indices, start), len(self.high_indices),
+                bisect_left(self.low_indices, start), len(self.low_indices))
+
+    def points(self, lookback: int) -> Tuple[List[Tuple[int, Decimal]], List[Tuple[int, Decimal]]]:
+        """回看区间内的摆动高点和低点，序号相对区间起点"""
+        base = self.count - lookback
+        high_start, high_end, low_start, low_end = self.span(lookback)
+        highs = [(self.high_indices[i] - base, self.high_prices[i]) for i in range(high_start, high_end)]
+        lows = [(self.low_indices[i] - base, self.low_prices[i]) for i in range(low_start, low_end)]
+        return highs, lows
+
+
+class _RollingPriceStats:
+    """固定窗口的最高价、最低价、价格和，以及相邻价格变化率的和与平方和"""
+
+    RESYNC_INTERVAL = 4096  # 定期重算累计和，避免Decimal加减的舍入误差累积
+
+    def __init__(self, size: int):
+        self.size = size
+        self.count = 0
+        self._prices: Deque[Decimal] = deque()
+        self._changes: Deque[Decimal] = deque()
+        self._max = _SlidingExtreme(size, is_max=True)
+        self._min = _SlidingExtreme(size, is_max=False)
+        self.price_sum = Decimal('0')
+        self.change_sum = Decimal('0')
+        self.change_square_sum = Decimal('0')
+
+    def push(self, price: Decimal):
+        prices = self._prices
+        if prices:
+            previous = prices[-1]
+            change = abs(price - previous) / previous if previous else Decimal('0')
+            self._changes.append(change)
+            self.change_sum += change
+            self.change_square_sum += change * change
+            if len(self._changes) >= self.size:
+                old = self._changes.popleft()
+                self.change_sum -= old
+                self.change_square_sum -= old * old
+
+        prices.append(price)
+        self.price_sum += price
+        if len(prices) > self.size:
+            self.price_sum -= prices.popleft()
+        self._max.push(self.count, price)
+        self._min.push(self.count, price)
+        self.count += 1
+
+        if self.count % self.RESYNC_INTERVAL == 0:
+            self.price_sum = sum(prices, Decimal('0'))
+            self.change_sum = sum(self._changes, Decimal('0'))
+            self.change_square_sum = sum((change * change for change in self._changes), Decimal('0'))
+
+    @property
+    def full(self) -> bool:
+        return len(self._prices) == self.size
+
+    @property
+    def high(self) -> Decimal:
+        return self._max.value
+
+    @property
+    def low(self) -> Decimal:
+        return self._min.value
+
+    def volatility(self) -> Decimal:
+        """价格变化率的总体标准差，与 ``_calculate_volatility`` 相同"""
+        count = len(self._changes)
+        if not count:
+            return Decimal('0')
+        n = Decimal(str(count))
+        mean = self.change_sum / n
+        variance = (self.change_square_sum - self.change_sum * mean) / n
+        return max(variance, Decimal('0')).sqrt()
+
+
 class PricePatternAnalyzer:
-    """价格模式分析器"""
-    
-    def __init__(self):
+    """价格模式分析器
+
+    摆动点、支撑阻力位和摆动统计量在每个数据点到达时增量维护：
+    摆动点由单调队列确认，回看区间用二分查找定位，区间内的摆动点集合
+    不变时直接复用上次聚类的支撑阻力位。使用默认回看周期以外的参数时
+    退回到按区间重新计算。
+    """
+
+    SWING_WINDOW = 2         # 左右各2个点确认
+    HISTORY_LIMIT = 1000
+
+    def __init__(self, swing_lookback: int = 30, level_tolerance: Decimal = Decimal('0.02')):
         self.price_history: List[Decimal] = []
         self.volume_history: List[Decimal] = []
         self.timestamp_history: List[datetime] = []
         self.support_levels: List[Decimal] = []
         self.resistance_levels: List[Decimal] = []
+
+        self.swing_lookback = swing_lookback
+        self.level_tolerance = level_tolerance
+        self._swings = _SwingPointTracker(self.SWING_WINDOW, retention=self.HISTORY_LIMIT)
+        self._swing_stats = _RollingPriceStats(swing_lookback)
+        self._levels_cache: Optional[Tuple[Tuple[Any, ...], Dict[str, List[Decimal]]]] = None
     
     def add_data_point(self, price: Decimal, volume: Decimal, timestamp: datetime):
         """添加数据点"""
         self.price_history.append(price)
         self.volume_history.append(volume)
         self.timestamp_history.append(timestamp)
+        self._swings.push(price)
+        self._swing_stats.push(price)
         
         # 保持历史数据在合理范围内
-        if len(self.price_history) > 1000:
+        if len(self.price_history) > self.HISTORY_LIMIT:
             self.price_history = self.price_history[-500:]
             self.volume_history = self.volume_history[-500:]
             self.timestamp_history = self.timestamp_history[-500:]
@@ -43,62 +225,82 @@ class PricePatternAnalyzer:
         """识别支撑和阻力位"""
         if len(self.price_history) < lookback_period:
             return {'support': [], 'resistance': []}
-        
-        recent_prices = self.price_history[-lookback_period:]
-        
-        # 找到局部高点和低点
-        highs = []
-        lows = []
-        
-        for i in range(2, len(recent_prices) - 2):
-            # 局部高点
-            if (recent_prices[i] > recent_prices[i-1] and 
-                recent_prices[i] > recent_prices[i+1] and
-                recent_prices[i] > recent_prices[i-2] and 
-                recent_prices[i] > recent_prices[i+2]):
-                highs.append(recent_prices[i])
-            
-            # 局部低点
-            if (recent_prices[i] < recent_prices[i-1] and 
-                recent_prices[i] < recent_prices[i+1] and
-                recent_prices[i] < recent_prices[i-2] and 
-                recent_prices[i] < recent_prices[i+2]):
-                lows.append(recent_prices[i])
-        
-        # 聚类支撑阻力位
-        support_levels = self._cluster_price_levels(lows, tolerance=0.02)
-        resistance_levels = self._cluster_price_levels(highs, tolerance=0.02)
-        
-        return {
-            'support': sorted(support_levels),
-            'resistance': sorted(resistance_levels, reverse=True)
-        }
+
+        swings = self._swings
+        high_start, high_end, low_start, low_end = swings.span(lookback_period)
+        # 摆动点按序号递增，首个点的序号和点数确定区间内的点集
+        key = (
+            lookback_period,
+            swings.high_indices[high_start] if high_start < high_end else None, high_end - high_start,
+            swings.low_indices[low_start] if low_start < low_end else None, low_end - low_start
+        )
+        if self._levels_cache is None or self._levels_cache[0] != key:
+            support_levels = self._cluster_price_levels(swings.low_prices[low_start:low_end],
+                                                        tolerance=self.level_tolerance)
+            resistance_levels = self._cluster_price_levels(swings.high_prices[high_start:high_end],
+                                                           tolerance=self.level_tolerance)
+            self._levels_cache = (key, {
+                'support': support_levels,
+                'resistance': resistance_levels[::-1]
+            })
+
+        levels = self._levels_cache[1]
+        return {'support': list(levels['support']), 'resistance': list(levels['resistance'])}
     
     def _cluster_price_levels(self, prices: List[Decimal], tolerance: Decimal = Decimal('0.02')) -> List[Decimal]:
-        """聚类价格水平"""
+        """聚类价格水平
+
+        按出现顺序取尚未归类的价格为中心，把与它相差不超过 tolerance 的所有
+        未归类价格归为一类，取平均值。价格排序后用二分查找定位容差区间，
+        已归类的位置用跳转指针跳过，整体 O(n log n)。
+        """
         if not prices:
             return []
-        
+
+        tolerance = Decimal(str(tolerance))
+        count = len(prices)
+        order = sorted(range(count), key=prices.__getitem__)
+        sorted_prices = [prices[i] for i in order]
+        used = [False] * count
+        next_free = list(range(count + 1))  # 排序位置 -> 下一个可能未归类的排序位置
+
+        def find(position: int) -> int:
+            root = position
+            while next_free[root] != root:
+                root = next_free[root]
+            while next_free[position] != root:
+                next_free[position], position = root, next_free[position]
+            return root
+
+        def within(other: Decimal, center: Decimal) -> bool:
+            return abs(other - center) / center <= tolerance
+
         clustered_levels = []
-        used = [False] * len(prices)
-        
         for i, price in enumerate(prices):
             if used[i]:
                 continue
-            
-            # 找到所有接近这个价格的点
-            cluster = [price]
-            used[i] = True
-            
-            for j, other_price in enumerate(prices[i+1:], i+1):
-                if not used[j] and abs(other_price - price) / price <= tolerance:
-                    cluster.append(other_price)
-                    used[j] = True
-            
-            # 计算聚类的平均值
-            if cluster:
-                avg_price = sum(cluster) / Decimal(str(len(cluster)))
-                clustered_levels.append(avg_price)
+
+            # 容差区间按乘法计算，边界外侧再按原除法判断补齐舍入差异
+            band = price * tolerance
+            low = bisect_left(sorted_prices, price - band)
+            high = bisect_right(sorted_prices, price + band)
+            while low > 0 and within(sorted_prices[low - 1], price):
+                low -= 1
+            while high < count and within(sorted_prices[high], price):
+                high += 1
+
+            members = []
+            position = find(low)
+            while position < high:
+                index = order[position]
+                used[index] = True
+                members.append(index)
+                next_free[position] = position + 1
+                position = find(position + 1)
+
+            members.sort()
+            avg_price = sum(prices[index] for index in members) / Decimal(str(len(members)))
+            clustered_levels.append(avg_price)
         
         return sorted(clustered_levels)
     
@@ -107,18 +309,24 @@ class PricePatternAnalyzer:
         if len(self.price_history) < lookback_period:
             return {'pattern': 'insufficient_data', 'direction': 'unknown', 'strength': Decimal('0')}
         
-        recent_prices = self.price_history[-lookback_period:]
-        current_price = recent_prices[-1]
+        current_price = self.price_history[-1]
         
         # 识别摆动高低点
-        swing_highs = self._find_swing_points(recent_prices, 'high')
-        swing_lows = self._find_swing_points(recent_prices, 'low')
+        swing_highs, swing_lows = self._swings.points(lookback_period)
         
         # 分析摆动模式
-        pattern_analysis = self._analyze_swing_pattern(recent_prices, swing_highs, swing_lows)
+        pattern_analysis = self._analyze_swing_pattern(None, swing_highs, swing_lows)
         
-        # 计算摆动强度
-        strength = self._calculate_swing_strength(recent_prices, swing_highs, swing_lows)
+        # 计算摆动强度和波动性
+        stats = self._swing_stats
+        if lookback_period == self.swing_lookback and stats.full:
+            strength = self._strength_from_range(stats.high, stats.low, stats.price_sum, lookback_period,
+                                                 len(swing_highs) + len(swing_lows))
+            volatility = stats.volatility()
+        else:
+            recent_prices = self.price_history[-lookback_period:]
+            strength = self._calculate_swing_strength(recent_prices, swing_highs, swing_lows)
+            volatility = self._calculate_volatility(recent_prices)
         
         # 确定摆动方向
         direction = self._determine_swing_direction(swing_highs, swing_lows, current_price)
@@ -132,16 +340,16 @@ class PricePatternAnalyzer:
             'current_price': current_price,
             'nearest_resistance': self._find_nearest_level(current_price, 'resistance'),
             'nearest_support': self._find_nearest_level(current_price, 'support'),
-            'volatility': self._calculate_volatility(recent_prices)
+            'volatility': volatility
         }
     
     def _find_swing_points(self, prices: List[Decimal], point_type: str) -> List[Tuple[int, Decimal]]:
-        """找到摆动点"""
+        """找到摆动点（逐点比较的参考实现，增量结果与之一致）"""
         if len(prices) < 5:
             return []
         
         swing_points = []
-        window = 2  # 左右各2个点确认
+        window = self.SWING_WINDOW
         
         for i in range(window, len(prices) - window):
             is_swing = True
@@ -164,7 +372,7 @@ class PricePatternAnalyzer:
         
         return swing_points
     
-    def _analyze_swing_pattern(self, prices: List[Decimal], swing_highs: List[Tuple[int, Decimal]], 
+    def _analyze_swing_pattern(self, prices: Optional[List[Decimal]], swing_highs: List[Tuple[int, Decimal]], 
                              swing_lows: List[Tuple[int, Decimal]]) -> Dict[str, str]:
         """分析摆动模式"""
         if not swing_highs or not swing_lows:
@@ -202,9 +410,16 @@ class PricePatternAnalyzer:
         if len(prices) < 2:
             return Decimal('0')
         
+        return self._strength_from_range(max(prices), min(prices), sum(prices), len(prices),
+                                         len(swing_highs) + len(swing_lows))
+    
+    @staticmethod
+    def _strength_from_range(high: Decimal, low: Decimal, total: Decimal, count: int,
+                             swing_count: int) -> Decimal:
+        """由区间最高价、最低价、价格和与摆动点数量计算摆动强度"""
         # 计算价格波动幅度
-        price_range = max(prices) - min(prices)
-        avg_price = sum(prices) / Decimal(str(len(prices)))
+        price_range = high - low
+        avg_price = total / Decimal(str(count))
         
         if avg_price == 0:
             return Decimal('0')
@@ -212,7 +427,7 @@ class PricePatternAnalyzer:
         volatility = price_range / avg_price
         
         # 考虑摆动点的密度和幅度
-        swing_density = Decimal(str(len(swing_highs) + len(swing_lows))) / Decimal(str(len(prices)))
+        swing_density = Decimal(str(swing_count)) / Decimal(str(count))
         
         # 综合强度
         strength = min(volatility * swing_density * Decimal('10'), Decimal('1'))
@@ -15,6 +15,7 @@ from .base_futures_strategy import (
     PositionSide, ValidationException, FuturesStrategyConfig,
     FuturesStrategyType
 )
+from .fast_indicators import get_shared_indicators
 
 
 class TechnicalIndicators:
@@ -97,24 +98,39 @@ class TechnicalIndicators:
             'lower': sma - (std * std_dev)
         }
     
+    @staticmethod
+    def _ema_series(values: List[Decimal], period: int) -> List[Decimal]:
+        """递推EMA序列，前period个值的SMA作为种子，结果与values[period-1:]对齐"""
+        if len(values) < period:
+            return []
+        multiplier = Decimal('2') / Decimal(str(period + 1))
+        ema = sum(values[:period]) / Decimal(str(period))
+        series = [ema]
+        for value in values[period:]:
+            ema = ema + multiplier * (value - ema)
+            series.append(ema)
+        return series
+    
     @staticmethod
     def macd(prices: List[Decimal], fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> Dict[str, Decimal]:
         """MACD指标"""
-        if len(prices) < slow_period:
+        if len(prices) < slow_period + signal_period - 1:
             return {}
         
-        ema_fast = TechnicalIndicators.exponential_moving_average(prices, fast_period)
-        ema_slow = TechnicalIndicators.exponential_moving_average(prices, slow_period)
-        
-        if ema_fast is None or ema_slow is None:
-            return {}
+        ema_fast = TechnicalIndicators._ema_series(prices, fast_period)
+        ema_slow = TechnicalIndicators._ema_series(prices, slow_period)
         
         # 计算MACD线
-        macd_line = ema_fast - ema_slow
+        offset = slow_period - fast_period
+        macd_series = [fast - slow for fast, slow in zip(ema_fast[offset:], ema_slow)]
+        
+        # 信号线为MACD线的指数移动平均
+        signal_series = TechnicalIndicators._ema_series(macd_series, signal_period)
+        if not signal_series:
+            return {}
         
-        # 计算信号线（简化为简单移动平均）
-        # 实际应该使用指数移动平均，这里简化处理
-        signal_line = macd_line  # 简化处理
+        macd_line = macd_series[-1]
+        signal_line = signal_series[-1]
         
         # 计算柱状图
         histogram = macd_line - signal_line
@@ -188,7 +204,7 @@ class TrendAnalysis:
         
         # 计算斜率
         sum_x = sum(x_values)
-        sum_y = sum(prices)
+        sum_y = sum(float(price) for price in prices)
         sum_xy = sum(x * float(price) for x, price in zip(x_values, prices))
         sum_x2 = sum(x * x for x in x_values)
         
@@ -290,6 +306,21 @@ class TrendFollowingStrategy(BaseFuturesStrategy):
         self.rsi_period = 14
         self.bollinger_period = 20
         
+        # 指标计算方式：float为增量快速计算（默认），decimal为参考实现
+        self.indicator_mode = config.metadata.get('indicator_mode', 'float')
+        self.timeframe = config.metadata.get('timeframe', 'tick')
+        self.fast_indicators = None
+        if self.indicator_mode == 'float':
+            # 同一交易对和周期的策略共享指标状态
+            self.fast_indicators = get_shared_indicators(
+                config.symbol,
+                self.timeframe,
+                ma_short_period=self.ma_short_period,
+                ma_long_period=self.ma_long_period,
+                rsi_period=self.rsi_period,
+                bollinger_period=self.bollinger_period
+            )
+        
         self.logger = logging.getLogger(f"futures_trend.{config.strategy_id}")
     
     async def _initialize_specific(self):
@@ -368,6 +399,10 @@ class TrendFollowingStrategy(BaseFuturesStrategy):
     
     def _update_technical_indicators(self, market_data: FuturesMarketData):
         """更新技术指标"""
+        if self.fast_indicators is not None:
+            self._update_fast_indicators(market_data)
+            return
+        
         try:
             prices = self.trend_analyzer.price_history
             
@@ -402,14 +437,31 @@ class TrendFollowingStrategy(BaseFuturesStrategy):
                 prices, self.bollinger_period
             )
             
-            # 保持历史数据在合理范围内
-            for key in ['sma_short', 'sma_long', 'ema_fast', 'ema_slow', 'rsi']:
-                if len(self.technical_indicators[key]) > 100:
-                    self.technical_indicators[key] = self.technical_indicators[key][-50:]
+            self._trim_indicator_history()
             
         except Exception as e:
             self.logger.error(f"更新技术指标失败: {e}")
     
+    def _update_fast_indicators(self, market_data: FuturesMarketData):
+        """使用共享的增量指标更新技术指标"""
+        try:
+            snapshot = self.fast_indicators.update(float(market_data.current_price), market_data.timestamp)
+            
+            for key in ['sma_short', 'sma_long', 'ema_fast', 'ema_slow', 'rsi', 'macd']:
+                self.technical_indicators[key].append(snapshot[key])
+            self.technical_indicators['bollinger'] = snapshot['bollinger']
+            
+            self._trim_indicator_history()
+            
+        except Exception as e:
+            self.logger.error(f"更新技术指标失败: {e}")
+    
+    def _trim_indicator_history(self):
+        """保持历史数据在合理范围内"""
+        for key in ['sma_short', 'sma_long', 'ema_fast', 'ema_slow', 'rsi', 'macd']:
+            if len(self.technical_indicators[key]) > 100:
+                self.technical_indicators[key] = self.technical_indicators[key][-50:]
+    
     def _generate_trading_signal(self, market_data: FuturesMarketData, trend_analysis: Dict[str, Any]) -> Dict[str, Any]:
         """生成交易信号"""
         signal = {
@@ -5,9 +5,11 @@
 
 import asyncio
 import logging
+import time
+from collections import deque
 from decimal import Decimal
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Set, Callable, Type
+from typing import Deque, Dict, List, Optional, Any, Set, Callable, Type
 from enum import Enum
 from dataclasses import dataclass, field
 import uuid
@@ -127,8 +129,17 @@ class StrategyExecutionEngine:
         self.manager = manager
         self.execution_semaphore = asyncio.Semaphore(10)  # 最大10个并发执行
         self.active_tasks: Dict[str, ExecutionTask] = {}
-        self.completed_tasks: List[ExecutionTask] = []
         self.max_task_history = 1000
+        # 执行记录环形缓冲，超出容量时自动丢弃最早的记录
+        self.completed_tasks: Deque[ExecutionTask] = deque(maxlen=self.max_task_history)
+        
+        # 按策略串行执行：正在执行的策略只保留最新一笔待处理行情
+        self._running_strategies: Set[str] = set()
+        self._pending_market_data: Dict[str, MarketData] = {}
+        self.stats = {
+            'executions': 0,
+            'coalesced_ticks': 0
+        }
     
     async def submit_execution(self, strategy_instance: StrategyInstance, market_data: MarketData) -> str:
         """提交策略执行任务"""
@@ -148,6 +159,44 @@ class StrategyExecutionEngine:
         logger.info(f"提交策略执行任务: {task_id}, 策略: {strategy_instance.strategy_id}")
         return task_id
     
+    async def run_serialized(self, strategy_instance: StrategyInstance, market_data: MarketData) -> Optional[ExecutionTask]:
+        """按策略串行执行
+        
+        策略正在执行时不排队，只记录最新行情，由当前执行结束后接着处理，
+        因此同一策略不会并发执行，积压也不会超过一笔。返回最后一次执行的任务，
+        行情被合并时返回None。
+        """
+        strategy_id = strategy_instance.strategy_id
+        if strategy_id in self._running_strategies:
+            if strategy_id in self._pending_market_data:
+                self.stats['coalesced_ticks'] += 1
+            self._pending_market_data[strategy_id] = market_data
+            return None
+        
+        self._running_strategies.add(strategy_id)
+        try:
+            execution_task = None
+            while market_data is not None and strategy_instance.is_active:
+                execution_task = ExecutionTask(
+                    task_id=f"task_{uuid.uuid4().hex[:8]}",
+                    strategy_instance=strategy_instance,
+                    market_data=market_data
+                )
+                self.active_tasks[execution_task.task_id] = execution_task
+                await self._execute_task(execution_task)
+                market_data = self._pending_market_data.pop(strategy_id, None)
+            return execution_task
+        finally:
+            self._running_strategies.discard(strategy_id)
+    
+    def forget_strategy(self, strategy_id: str):
+        """清理策略的待处理行情和执行记录"""
+        self._pending_market_data.pop(strategy_id, None)
+        self.completed_tasks = deque(
+            (task for task in self.completed_tasks if task.strategy_instance.strategy_id != strategy_id),
+            maxlen=self.max_task_history
+        )
+    
     async def _execute_task(self, execution_task: ExecutionTask):
         """执行任务"""
         task_id = execution_task.task_id
@@ -181,14 +230,10 @@ class StrategyExecutionEngine:
             logger.error(f"策略执行失败: {task_id}, 错误: {e}")
         
         finally:
-            # 移动到完成列表
+            # 移动到完成记录
             self.completed_tasks.append(execution_task)
-            if task_id in self.active_tasks:
-                del self.active_tasks[task_id]
-            
-            # 保持历史记录在合理范围
-            if len(self.completed_tasks) > self.max_task_history:
-                self.completed_tasks = self.completed_tasks[-self.max_task_history//2:]
+            self.stats['executions'] += 1
+            self.active_tasks.pop(task_id, None)
     
     async def _execute_strategy(self, strategy_instance: StrategyInstance, market_data: MarketData) -> List[OrderRequest]:
         """执行单个策略"""
@@ -226,7 +271,8 @@ class StrategyExecutionEngine:
         return {
             'active_tasks': active_count,
             'completed_tasks': completed_count,
-            'total_executed': active_count + completed_count,
+            'total_executed': self.stats['executions'] + active_count,
+            'coalesced_ticks': self.stats['coalesced_ticks'],
             'active_task_ids': list(self.active_tasks.keys())
         }
 
@@ -244,12 +290,14 @@ class StrategyManager:
         self.db_session = db_session
         self.order_manager = order_manager
         self.market_data_processor = market_data_processor
-        # 延迟导入紧急停止服务
-        try:
-            from ..auto_trading.emergency_stop import get_emergency_stop_service
-            self.emergency_stop_service = emergency_stop_service or get_emergency_stop_service(db_session)
-        except ImportError:
-            self.emergency_stop_service = emergency_stop_service
+        # 未注入紧急停止服务时才延迟导入
+        if emergency_stop_service is None:
+            try:
+                from ..auto_trading.emergency_stop import get_emergency_stop_service
+                emergency_stop_service = get_emergency_stop_service(db_session)
+            except ImportError:
+                pass
+        self.emergency_stop_service = emergency_stop_service
         
         # 策略实例管理
         self.strategies: Dict[str, StrategyInstance] = {}
@@ -263,9 +311,6 @@ class StrategyManager:
         # 执行引擎
         self.execution_engine = StrategyExecutionEngine(self)
         
-        # 执行引擎
-        self.execution_engine = StrategyExecutionEngine(self)
-        
         # 执行统计
         self.performance_stats = StrategyPerformance()
         self.execution_history: List[Dict[str, Any]] = []
@@ -276,9 +321,20 @@ class StrategyManager:
         self.is_monitoring = False
         self.monitor_task: Optional[asyncio.Task] = None
         
-        # 冲突检测
+        # 冲突检测，同时用于按交易对分发行情
         self.symbol_strategies: Dict[str, Set[str]] = {}  # symbol -> strategy_ids
         
+        # 事件驱动分发
+        self._dispatch_tasks: Set[asyncio.Task] = set()
+        self.dispatch_latencies: Deque[float] = deque(maxlen=1000)
+        self.dispatch_stats = {
+            'ticks_received': 0,
+            'ticks_dispatched': 0,
+            'ticks_unrouted': 0,
+            'blocked_by_emergency_stop': 0,
+            'strategy_executions': 0
+        }
+        
         logger.info("策略管理器初始化完成")
     
     def register_strategy_type(self, strategy_name: str, strategy_class):
@@ -482,20 +538,82 @@ class StrategyManager:
             if instance.state.status == StrategyStatus.RUNNING and instance.is_active
         ]
         
+        if not running_strategies:
+            return task_ids
+        
+        # 紧急停止每轮只检查一次
+        if await self._is_emergency_stop_active():
+            logger.error("紧急停止已激活，无法执行策略")
+            return task_ids
+        
         # 按优先级排序
         running_strategies.sort(key=lambda s: s.priority, reverse=True)
         
         # 并行执行策略
-        tasks = []
         for instance in running_strategies:
             try:
-                task_id = await self.execute_strategy(instance.strategy_id, market_data)
+                task_id = await self.execution_engine.submit_execution(instance, market_data)
                 task_ids.append(task_id)
             except Exception as e:
                 logger.error(f"执行策略 {instance.strategy_id} 失败: {e}")
         
         return task_ids
     
+    async def dispatch_tick(self, market_data: MarketData) -> List[str]:
+        """事件驱动模式：按交易对索引只把行情分发给订阅该交易对的策略
+        
+        订阅同一交易对的策略并发执行，每个策略内部串行；紧急停止每轮分发只检查一次。
+        返回本轮完成的执行任务ID。
+        """
+        started = time.perf_counter()
+        self.dispatch_stats['ticks_received'] += 1
+        
+        strategy_ids = self.symbol_strategies.get(market_data.symbol)
+        if not strategy_ids:
+            self.dispatch_stats['ticks_unrouted'] += 1
+            return []
+        
+        strategies = self.strategies
+        subscribed = [
+            instance for instance in (strategies.get(strategy_id) for strategy_id in strategy_ids)
+            if instance is not None and instance.is_active and instance.state.status == StrategyStatus.RUNNING
+        ]
+        if not subscribed:
+            return []
+        
+        if await self._is_emergency_stop_active():
+            self.dispatch_stats['blocked_by_emergency_stop'] += 1
+            return []
+        
+        if len(subscribed) > 1:
+            subscribed.sort(key=lambda s: s.priority, reverse=True)
+        run = self.execution_engine.run_serialized
+        results = await asyncio.gather(*(run(instance, market_data) for instance in subscribed))
+        
+        self.dispatch_stats['ticks_dispatched'] += 1
+        self.dispatch_stats['strategy_executions'] += len(subscribed)
+        self.dispatch_latencies.append(time.perf_counter() - started)
+        return [task.task_id for task in results if task is not None]
+    
+    def submit_tick(self, market_data: MarketData) -> asyncio.Task:
+        """提交行情并立即返回，不同交易对的分发相互并发"""
+        task = asyncio.create_task(self.dispatch_tick(market_data))
+        self._dispatch_tasks.add(task)
+        task.add_done_callback(self._dispatch_tasks.discard)
+        return task
+    
+    def get_dispatch_latency(self) -> Dict[str, float]:
+        """最近分发延迟（毫秒）"""
+        if not self.dispatch_latencies:
+            return {'samples': 0, 'p50_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+        latencies = sorted(self.dispatch_latencies)
+        return {
+            'samples': len(latencies),
+            'p50_ms': latencies[len(latencies) // 2] * 1000,
+            'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+            'max_ms': latencies[-1] * 1000
+        }
+    
     async def start_monitoring(self):
         """启动监控"""
         if self.is_monitoring:
@@ -569,6 +687,7 @@ class StrategyManager:
             'paused_strategies': sum(1 for s in self.strategies.values() if s.state.status == StrategyStatus.PAUSED),
             'stopped_strategies': sum(1 for s in self.strategies.values() if s.state.status == StrategyStatus.STOPPED),
             'execution_engine': execution_status,
+            'dispatch': {**self.dispatch_stats, 'latency': self.get_dispatch_latency()},
             'is_monitoring': self.is_monitoring,
             'max_concurrent_strategies': self.max_concurrent_strategies,
             'global_execution_timeout': self.global_execution_timeout,
@@ -708,11 +827,8 @@ class StrategyManager:
             if task_id in self.execution_engine.active_tasks:
                 del self.execution_engine.active_tasks[task_id]
         
-        # 清理历史任务
-        self.execution_engine.completed_tasks = [
-            task for task in self.execution_engine.completed_tasks
-            if task.strategy_instance.strategy_id != strategy_id
-        ]
+        # 清理待处理行情和历史任务
+        self.execution_engine.forget_strategy(strategy_id)
     
     async def _monitoring_loop(self):
         """监控循环"""
@@ -785,10 +901,9 @@ class StrategyManager:
         cutoff_time = datetime.now() - timedelta(hours=24)
         
         # 清理过期的任务
-        self.execution_engine.completed_tasks = [
-            task for task in self.execution_engine.completed_tasks
-            if task.created_at > cutoff_time
-        ]
+        completed_tasks = self.execution_engine.completed_tasks
+        while completed_tasks and completed_tasks[0].created_at <= cutoff_time:
+            completed_tasks.popleft()
         
         # 保持执行历史在合理范围
         if len(self.execution_history) > 10000:
@@ -6,6 +6,7 @@
 from .grid import GridStrategy, create_grid_strategy, validate_grid_config
 from .martingale import MartingaleStrategy, create_martingale_strategy, validate_martingale_config
 from .arbitrage import ArbitrageStrategy, create_arbitrage_strategy, validate_arbitrage_config
+from .arbitrage_scanner import ArbitrageScanner, CrossVenueOpportunity, TriangularOpportunity
 
 __all__ = [
     'GridStrategy',
@@ -16,5 +17,8 @@ __all__ = [
     'validate_martingale_config',
     'ArbitrageStrategy',
     'create_arbitrage_strategy',
-    'validate_arbitrage_config'
+    'validate_arbitrage_config',
+    'ArbitrageScanner',
+    'CrossVenueOpportunity',
+    'TriangularOpportunity'
 ]
\ No newline at end of file
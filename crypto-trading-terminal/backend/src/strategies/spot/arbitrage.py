@@ -15,6 +15,7 @@ from ..base import (
     BaseSpotStrategy, MarketData, OrderRequest, OrderResult, OrderType, 
     OrderSide, StrategyType, StrategyStatus, ValidationException
 )
+from .arbitrage_scanner import ArbitrageScanner, CrossVenueOpportunity
 
 
 logger = logging.getLogger(__name__)
@@ -124,7 +125,6 @@ class ArbitrageStrategy(BaseSpotStrategy):
         
         # 套利配置
         self.monitored_exchanges: List[ExchangeName] = []
-        self.price_data: Dict[ExchangeName, ExchangePrice] = {}
         self.arbitrage_opportunities: List[ArbitrageOpportunity] = []
         self.active_arbitrage_orders: List[ArbitrageOrder] = []
         
@@ -157,6 +157,11 @@ class ArbitrageStrategy(BaseSpotStrategy):
         
         # 设置默认监控的交易所
         self.monitored_exchanges = [ExchangeName.BINANCE, ExchangeName.OKX]
+        
+        # 按交易对维护各交易所最优价，价格更新时增量发现机会
+        self.scanner = ArbitrageScanner(min_net_spread=float(self.config.arbitrage_threshold))
+        # 每个交易对只保留各买卖交易所组合的最新机会
+        self._pending_opportunities: Dict[str, Dict[Tuple[ExchangeName, ExchangeName], ArbitrageOpportunity]] = {}
     
     async def _initialize_specific(self):
         """初始化套利策略特定功能"""
@@ -280,23 +285,9 @@ class ArbitrageStrategy(BaseSpotStrategy):
             return False
     
     async def _scan_arbitrage_opportunities(self, symbol: str) -> List[ArbitrageOpportunity]:
-        """扫描套利机会"""
+        """取出价格更新时扫描器发现的套利机会"""
         try:
-            opportunities = []
-            
-            if len(self.price_data) < 2:
-                return opportunities
-            
-            # 获取所有价格数据
-            exchange_prices = [price_data for price_data in self.price_data.values() 
-                             if price_data.symbol == symbol]
-            
-            # 比较不同交易所之间的价格
-            for i, price1 in enumerate(exchange_prices):
-                for price2 in exchange_prices[i+1:]:
-                    opportunity = self._calculate_arbitrage_opportunity(price1, price2)
-                    if opportunity:
-                        opportunities.append(opportunity)
+            opportunities = list(self._pending_opportunities.pop(symbol, {}).values())
             
             self.arbitrage_opportunities.extend(opportunities)
             self.last_market_scan = datetime.now()
@@ -310,98 +301,64 @@ class ArbitrageStrategy(BaseSpotStrategy):
             self.logger.error(f"扫描套利机会失败: {e}")
             return []
     
-    def _calculate_arbitrage_opportunity(self, price1: ExchangePrice, price2: ExchangePrice) -> Optional[ArbitrageOpportunity]:
-        """计算套利机会"""
+    def _build_arbitrage_opportunity(self, signal: CrossVenueOpportunity) -> Optional[ArbitrageOpportunity]:
+        """把扫描器信号转换为套利机会：在卖一较低的交易所买入，在买一较高的交易所卖出"""
         try:
-            # 确保是不同的交易所
-            if price1.exchange == price2.exchange:
-                return None
+            buy_price = Decimal(repr(signal.buy_price))
+            sell_price = Decimal(repr(signal.sell_price))
+            profit = sell_price - buy_price
             
-            # 计算套利机会
-            # 机会1: price1买入, price2卖出
-            if price1.bid_price < price2.ask_price:
-                profit = price2.ask_price - price1.bid_price
-                profit_percentage = profit / price1.bid_price
-                
-                opportunity = ArbitrageOpportunity(
-                    opportunity_id=f"arb_{int(datetime.now().timestamp())}_{price1.exchange.value}_{price2.exchange.value}",
-                    symbol=price1.symbol,
-                    buy_exchange=price1.exchange,
-                    sell_exchange=price2.exchange,
-                    buy_price=price1.bid_price,
-                    sell_price=price2.ask_price,
-                    quantity=self._calculate_optimal_quantity(price1, price2),
-                    potential_profit=profit,
-                    profit_percentage=profit_percentage,
-                    net_profit_after_fees=self._calculate_net_profit(price1, price2),
-                    expires_at=datetime.now() + timedelta(seconds=self.opportunity_lifetime)
-                )
-                
-                return opportunity
-            
-            # 机会2: price2买入, price1卖出
-            if price2.bid_price < price1.ask_price:
-                profit = price1.ask_price - price2.bid_price
-                profit_percentage = profit / price2.bid_price
-                
-                opportunity = ArbitrageOpportunity(
-                    opportunity_id=f"arb_{int(datetime.now().timestamp())}_{price2.exchange.value}_{price1.exchange.value}",
-                    symbol=price1.symbol,
-                    buy_exchange=price2.exchange,
-                    sell_exchange=price1.exchange,
-                    buy_price=price2.bid_price,
-                    sell_price=price1.ask_price,
-                    quantity=self._calculate_optimal_quantity(price2, price1),
-                    potential_profit=profit,
-                    profit_percentage=profit_percentage,
-                    net_profit_after_fees=self._calculate_net_profit(price2, price1),
-                    expires_at=datetime.now() + timedelta(seconds=self.opportunity_lifetime)
-                )
-                
-                return opportunity
-            
-            return None
+            return ArbitrageOpportunity(
+                opportunity_id=f"arb_{int(datetime.now().timestamp())}_{signal.buy_venue.value}_{signal.sell_venue.value}",
+                symbol=signal.symbol,
+                buy_exchange=signal.buy_venue,
+                sell_exchange=signal.sell_venue,
+                buy_price=buy_price,
+                sell_price=sell_price,
+                quantity=self._calculate_optimal_quantity(buy_price, sell_price, signal.quantity),
+                potential_profit=profit,
+                profit_percentage=profit / buy_price,
+                net_profit_after_fees=self._calculate_net_profit(signal),
+                expires_at=datetime.now() + timedelta(seconds=self.opportunity_lifetime)
+            )
             
         except Exception as e:
             self.logger.error(f"计算套利机会失败: {e}")
             return None
     
-    def _calculate_optimal_quantity(self, buy_price: ExchangePrice, sell_price: ExchangePrice) -> Decimal:
+    def _calculate_optimal_quantity(self, buy_price: Decimal, sell_price: Decimal,
+                                    available_quantity: Optional[float] = None) -> Decimal:
         """计算最优套利数量"""
         # 基于最小盈利阈值和账户余额计算最优数量
         # 这里简化处理，使用固定比例
         
-        min_profit_amount = self.min_profit_threshold * buy_price.bid_price * self.config.base_quantity
-        price_diff = sell_price.ask_price - buy_price.bid_price
+        min_profit_amount = self.min_profit_threshold * buy_price * self.config.base_quantity
+        price_diff = sell_price - buy_price
         
         if price_diff > 0:
             optimal_quantity = min_profit_amount / price_diff
         else:
             optimal_quantity = self.config.base_quantity
         
+        # 不超过两边盘口的可成交数量
+        if available_quantity:
+            optimal_quantity = min(optimal_quantity, Decimal(repr(available_quantity)))
+        
         # 确保在限制范围内
         quantity = max(self.config.min_order_size, 
                       min(optimal_quantity, self.config.max_order_size))
         
         return quantity
     
-    def _calculate_net_profit(self, buy_price: ExchangePrice, sell_price: ExchangePrice) -> Decimal:
+    def _calculate_net_profit(self, signal: CrossVenueOpportunity) -> Decimal:
         """计算扣除手续费后的净盈利"""
-        # 计算毛盈利
-        gross_profit = (sell_price.ask_price - buy_price.bid_price) * self.config.base_quantity
-        
-        # 计算手续费
-        buy_fee = buy_price.bid_price * self.config.base_quantity * buy_price.fee_rate
-        sell_fee = sell_price.ask_price * self.config.base_quantity * sell_price.fee_rate
-        total_fees = buy_fee + sell_fee
+        # 扫描器给出的单位价差已扣除双边手续费
+        net_profit = Decimal(repr(signal.net_profit_per_unit)) * self.config.base_quantity
         
         # 扣除转账费用（如果需要）
-        transfer_fee = self.withdrawal_fees.get(buy_price.symbol, Decimal('0'))
+        transfer_fee = self.withdrawal_fees.get(signal.symbol, Decimal('0'))
         
-        # 净盈利
-        net_profit = gross_profit - total_fees - transfer_fee
-        
-        return max(net_profit, Decimal('0'))
+        return max(net_profit - transfer_fee, Decimal('0'))
     
     def _is_profitable_opportunity(self, opportunity: ArbitrageOpportunity) -> bool:
         """检查是否是有利可图的套利机会"""
@@ -538,6 +495,17 @@ class ArbitrageStrategy(BaseSpotStrategy):
             if not opp.expires_at or opp.expires_at > now
         ]
         
+        # 清理未被扫描的交易对上过期的待处理机会
+        for symbol in list(self._pending_opportunities):
+            pending = {
+                venues: opp for venues, opp in self._pending_opportunities[symbol].items()
+                if not opp.expires_at or opp.expires_at > now
+            }
+            if pending:
+                self._pending_opportunities[symbol] = pending
+            else:
+                del self._pending_opportunities[symbol]
+        
         # 清理失败的订单
         self.active_arbitrage_orders = [
             order for order in self.active_arbitrage_orders 
@@ -547,22 +515,44 @@ class ArbitrageStrategy(BaseSpotStrategy):
     def update_exchange_price(self, exchange: ExchangeName, price_data: Dict[str, Any]):
         """更新交易所价格数据"""
         try:
-            exchange_price = ExchangePrice(
-                exchange=exchange,
-                symbol=price_data['symbol'],
-                bid_price=Decimal(str(price_data['bid_price'])),
-                ask_price=Decimal(str(price_data['ask_price'])),
-                bid_quantity=Decimal(str(price_data.get('bid_quantity', '0'))),
-                ask_quantity=Decimal(str(price_data.get('ask_quantity', '0'))),
-                timestamp=datetime.now(),
-                fee_rate=Decimal(str(price_data.get('fee_rate', '0.001')))
+            fee_rate = price_data.get('fee_rate')
+            signals = self.scanner.update(
+                exchange,
+                price_data['symbol'],
+                float(price_data['bid_price']),
+                float(price_data['ask_price']),
+                bid_quantity=float(price_data.get('bid_quantity', 0)),
+                ask_quantity=float(price_data.get('ask_quantity', 0)),
+                fee_rate=float(fee_rate) if fee_rate is not None else None
             )
             
-            self.price_data[exchange] = exchange_price
+            for signal in signals:
+                if not isinstance(signal, CrossVenueOpportunity):
+                    continue
+                opportunity = self._build_arbitrage_opportunity(signal)
+                if opportunity:
+                    pending = self._pending_opportunities.setdefault(signal.symbol, {})
+                    pending[(signal.buy_venue, signal.sell_venue)] = opportunity
             
         except Exception as e:
             self.logger.error(f"更新交易所价格失败 {exchange.value}: {e}")
     
+    def get_exchange_price(self, exchange: ExchangeName, symbol: str) -> Optional[ExchangePrice]:
+        """获取交易所某交易对的最新价格"""
+        quote = self.scanner.quote(exchange, symbol)
+        if quote is None:
+            return None
+        return ExchangePrice(
+            exchange=exchange,
+            symbol=symbol,
+            bid_price=Decimal(repr(quote.bid)),
+            ask_price=Decimal(repr(quote.ask)),
+            bid_quantity=Decimal(repr(quote.bid_quantity)),
+            ask_quantity=Decimal(repr(quote.ask_quantity)),
+            timestamp=quote.timestamp,
+            fee_rate=Decimal(repr(quote.fee_rate))
+        )
+    
     def get_arbitrage_status(self) -> Dict[str, Any]:
         """获取套利策略状态"""
         active_opportunities = len(self.arbitrage_opportunities)
@@ -573,7 +563,8 @@ class ArbitrageStrategy(BaseSpotStrategy):
             'strategy_id': self.config.strategy_id,
             'monitored_exchanges': [ex.value for ex in self.monitored_exchanges],
             'total_exchanges_monitored': len(self.monitored_exchanges),
-            'price_data_count': len(self.price_data),
+            'price_data_count': self.scanner.quote_count,
+            'symbols_tracked': len(self.scanner.symbols),
             'active_opportunities': active_opportunities,
             'active_orders': active_orders,
             'total_arbitrage_cycles': self.total_arbitrage_cycles,
@@ -0,0 +1,403 @@
+"""
+多交易所套利扫描器
+按交易对维护各交易所的买一卖一，以小顶堆记录扣除手续费后的最优买价和卖价，
+只在某个交易所的盘口变化时更新；净价差跨过阈值时发出跨所套利信号。
+同时根据交易对的基础币和计价币预先构建币种图，增量检查单个交易所内的三角套利路径。
+"""
+
+import heapq
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# 按长度从长到短匹配，避免 USDT 被 USD 截断
+DEFAULT_QUOTE_ASSETS = ("FDUSD", "USDT", "USDC", "BUSD", "TUSD", "EUR", "TRY", "BTC", "ETH", "BNB", "USD")
+
+
+def split_symbol(symbol: str, quote_assets: Iterable[str] = DEFAULT_QUOTE_ASSETS) -> Optional[Tuple[str, str]]:
+    """把 BTCUSDT / BTC-USDT / BTC/USDT 拆分为 (基础币, 计价币)"""
+    normalized = symbol.upper()
+    for separator in ("-", "/", "_"):
+        if separator in normalized:
+            base, _, quote = normalized.partition(separator)
+            return (base, quote) if base and quote else None
+    for quote in sorted(quote_assets, key=len, reverse=True):
+        if normalized.endswith(quote) and len(normalized) > len(quote):
+            return normalized[:-len(quote)], quote
+    return None
+
+
+class VenueQuote:
+    """单个交易所某交易对的盘口"""
+
+    __slots__ = ("venue", "symbol", "bid", "ask", "bid_quantity", "ask_quantity",
+                 "fee_rate", "timestamp", "version")
+
+    def __init__(self, venue: Hashable, symbol: str, bid: float, ask: float, bid_quantity: float,
+                 ask_quantity: float, fee_rate: float, timestamp: datetime, version: int):
+        self.venue = venue
+        self.symbol = symbol
+        self.bid = bid
+        self.ask = ask
+        self.bid_quantity = bid_quantity
+        self.ask_quantity = ask_quantity
+        self.fee_rate = fee_rate
+        self.timestamp = timestamp
+        self.version = version
+
+    @property
+    def effective_bid(self) -> float:
+        """卖出到买一扣除手续费后的实得价格"""
+        return self.bid * (1.0 - self.fee_rate)
+
+    @property
+    def effective_ask(self) -> float:
+        """从卖一买入加上手续费后的实付价格"""
+        return self.ask * (1.0 + self.fee_rate)
+
+
+@dataclass
+class CrossVenueOpportunity:
+    """跨交易所套利信号：在 buy_venue 以卖一买入，在 sell_venue 以买一卖出"""
+    symbol: str
+    buy_venue: Hashable
+    sell_venue: Hashable
+    buy_price: float
+    sell_price: float
+    net_spread: float               # 扣除双边手续费后的收益率
+    net_profit_per_unit: float      # 每单位基础币扣费后的价差（计价币）
+    quantity: Optional[float]       # 双边盘口可成交数量，未知时为None
+    timestamp: datetime = field(default_factory=datetime.now)
+
+
+@dataclass
+class TriangularOpportunity:
+    """单交易所三角套利信号，按 legs 顺序依次成交后回到起始币种"""
+    venue: Hashable
+    path: Tuple[str, str, str, str]                    # 例如 USDT -> BTC -> ETH -> USDT
+    legs: Tuple[Tuple[str, str, float], ...]            # (交易对, buy/sell, 价格)
+    net_return: float                                    # 扣除三次手续费后的收益率
+    timestamp: datetime = field(default_factory=datetime.now)
+
+
+Opportunity = Union[CrossVenueOpportunity, TriangularOpportunity]
+
+
+class _SymbolBook:
+    """单个交易对的跨所最优价
+
+    两个堆分别按扣费后价格保存各交易所的买价（取负数）和卖价，盘口变化时压入
+    新条目，旧条目按版本号惰性失效。
+    """
+
+    __slots__ = ("quotes", "bids", "asks", "active_pair")
+
+    def __init__(self):
+        self.quotes: Dict[Hashable, VenueQuote] = {}
+        self.bids: List[Tuple[float, int, Hashable]] = []
+        self.asks: List[Tuple[float, int, Hashable]] = []
+        self.active_pair: Optional[Tuple[Hashable, Hashable]] = None
+
+    def push(self, quote: VenueQuote):
+        heapq.heappush(self.bids, (-quote.effective_bid, quote.version, quote.venue))
+        heapq.heappush(self.asks, (quote.effective_ask, quote.version, quote.venue))
+        if len(self.bids) > 4 * len(self.quotes) + 8:
+            self._compact()
+
+    def top(self, heap: List[Tuple[float, int, Hashable]], count: int) -> List[VenueQuote]:
+        """取堆顶前 count 个有效盘口，顺带丢弃失效条目"""
+        quotes = self.quotes
+        taken = []
+        while heap and len(taken) < count:
+            entry = heapq.heappop(heap)
+            quote = quotes.get(entry[2])
+            if quote is not None and quote.version == entry[1]:
+                taken.append(entry)
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        return [quotes[entry[2]] for entry in taken]
+
+    def _compact(self):
+        self.bids = [(-quote.effective_bid, quote.version, quote.venue) for quote in self.quotes.values()]
+        self.asks = [(quote.effective_ask, quote.version, quote.venue) for quote in self.quotes.values()]
+        heapq.heapify(self.bids)
+        heapq.heapify(self.asks)
+
+
+# 三角路径的一步: (交易对, 方向)，buy 表示用计价币买入基础币
+_Leg = Tuple[str, str]
+_Cycle = Tuple[Tuple[str, str, str, str], Tuple[_Leg, _Leg, _Leg]]
+
+
+class ArbitrageScanner:
+    """套利扫描器
+
+    ``update`` 每次只处理一个交易所的一个交易对：盘口未变化时直接返回；
+    否则更新该交易对的最优价堆并检查跨所价差，再检查包含该交易对的三角路径。
+    信号只在净收益率由低于阈值变为不低于阈值时发出（或最优交易所组合变化时），
+    不会在价差持续期间重复发出。
+    """
+
+    def __init__(self, min_net_spread: float = 0.001, default_fee_rate: float = 0.001,
+                 quote_assets: Iterable[str] = DEFAULT_QUOTE_ASSETS, triangular: bool = True):
+        self.min_net_spread = min_net_spread
+        self.default_fee_rate = default_fee_rate
+        self.quote_assets = tuple(quote_assets)
+        self.triangular = triangular
+
+        self._books: Dict[str, _SymbolBook] = {}
+        self._version = 0
+
+        # 币种图：交易所 -> 交易对 -> (基础币, 计价币)
+        self._markets: Dict[Hashable, Dict[str, Tuple[str, str]]] = {}
+        self._unparsed: Set[str] = set()
+        # 交易所 -> 交易对 -> 包含该交易对的三角路径，注册新交易对后重建
+        self._cycles: Dict[Hashable, Dict[str, List[_Cycle]]] = {}
+        self._active_cycles: Set[Tuple[Hashable, Tuple[_Leg, _Leg, _Leg]]] = set()
+
+        self.stats = {
+            'updates': 0,
+            'unchanged_updates': 0,
+            'cross_checks': 0,
+            'triangle_checks': 0,
+            'cross_opportunities': 0,
+            'triangular_opportunities': 0
+        }
+
+    # ===== 币种图 =====
+
+    def register_market(self, venue: Hashable, symbol: str, base: str, quote: str):
+        """登记交易对的基础币和计价币，用于三角套利路径"""
+        markets = self._markets.setdefault(venue, {})
+        pair = (base.upper(), quote.upper())
+        if markets.get(symbol) != pair:
+            markets[symbol] = pair
+            self._cycles.pop(venue, None)
+
+    def _ensure_market(self, venue: Hashable, symbol: str):
+        markets = self._markets.get(venue)
+        if (markets is not None and symbol in markets) or symbol in self._unparsed:
+            return
+        pair = split_symbol(symbol, self.quote_assets)
+        if pair is None:
+            self._unparsed.add(symbol)
+            return
+        self.register_market(venue, symbol, *pair)
+
+    def _venue_cycles(self, venue: Hashable) -> Dict[str, List[_Cycle]]:
+        cycles = self._cycles.get(venue)
+        if cycles is None:
+            cycles = self._build_cycles(self._markets.get(venue, {}))
+            self._cycles[venue] = cycles
+        return cycles
+
+    @staticmethod
+    def _build_cycles(markets: Dict[str, Tuple[str, str]]) -> Dict[str, List[_Cycle]]:
+        """枚举币种图中的三角形，每个三角形生成正反两个方向的路径"""
+        edges: Dict[str, Dict[str, str]] = {}
+        quote_counts: Dict[str, int] = {}
+        for symbol, (base, quote) in markets.items():
+            edges.setdefault(base, {})[quote] = symbol
+            edges.setdefault(quote, {})[base] = symbol
+            quote_counts[quote] = quote_counts.get(quote, 0) + 1
+
+        def leg(source: str, target: str) -> _Leg:
+            symbol = edges[source][target]
+            return (symbol, "sell" if markets[symbol][0] == source else "buy")
+
+        by_symbol: Dict[str, List[_Cycle]] = {}
+        for a in sorted(edges):
+            neighbours = edges[a]
+            for b in sorted(n for n in neighbours if n > a):
+                for c in sorted(n for n in edges[b] if n > b and n in neighbours):
+                    # 从作为计价币次数最多的币种出发，例如 USDT -> BTC -> ETH -> USDT
+                    start = max((a, b, c), key=lambda currency: (quote_counts.get(currency, 0), currency))
+                    x, y = sorted(currency for currency in (a, b, c) if currency != start)
+                    for path in ((start, x, y, start), (start, y, x, start)):
+                        legs = (leg(path[0], path[1]), leg(path[1], path[2]), leg(path[2], path[3]))
+                        cycle = (path, legs)
+                        for symbol, _ in legs:
+                            by_symbol.setdefault(symbol, []).append(cycle)
+        return by_symbol
+
+    # ===== 行情 =====
+
+    def update(self, venue: Hashable, symbol: str, bid: float, ask: float,
+               bid_quantity: float = 0.0, ask_quantity: float = 0.0,
+               fee_rate: Optional[float] = None, timestamp: Optional[datetime] = None) -> List[Opportunity]:
+        """更新一个交易所的盘口，返回本次新出现的套利信号"""
+        if bid <= 0 or ask <= 0:
+            raise ValueError("价格必须大于0")
+        if bid > ask:
+            raise ValueError("买价不能高于卖价")
+
+        self.stats['updates'] += 1
+        book = self._books.get(symbol)
+        if book is None:
+            book = self._books[symbol] = _SymbolBook()
+        fee_rate = self.default_fee_rate if fee_rate is None else fee_rate
+        timestamp = timestamp or datetime.now()
+
+        quote = book.quotes.get(venue)
+        if quote is not None and quote.bid == bid and quote.ask == ask and quote.fee_rate == fee_rate:
+            quote.bid_quantity = bid_quantity
+            quote.ask_quantity = ask_quantity
+            quote.timestamp = timestamp
+            self.stats['unchanged_updates'] += 1
+            return []
+
+        self._version += 1
+        if quote is None:
+            quote = VenueQuote(venue, symbol, bid, ask, bid_quantity, ask_quantity,
+                               fee_rate, timestamp, self._version)
+            book.quotes[venue] = quote
+        else:
+            quote.bid, quote.ask, quote.fee_rate = bid, ask, fee_rate
+            quote.bid_quantity, quote.ask_quantity = bid_quantity, ask_quantity
+            quote.timestamp, quote.version = timestamp, self._version
+        book.push(quote)
+
+        opportunities: List[Opportunity] = []
+        cross = self._check_cross(symbol, book)
+        if cross is not None:
+            opportunities.append(cross)
+        if self.triangular:
+            self._ensure_market(venue, symbol)
+            opportunities.extend(self._check_triangles(venue, symbol))
+        return opportunities
+
+    def remove_quote(self, venue: Hashable, symbol: str) -> List[Opportunity]:
+        """移除交易所的盘口（断线或行情过期），重新评估该交易对"""
+        book = self._books.get(symbol)
+        if book is None or book.quotes.pop(venue, None) is None:
+            return []
+        self._active_cycles = {key for key in self._active_cycles
+                               if key[0] != venue or all(leg[0] != symbol for leg in key[1])}
+        cross = self._check_cross(symbol, book)
+        return [cross] if cross is not None else []
+
+    def _check_cross(self, symbol: str, book: _SymbolBook) -> Optional[CrossVenueOpportunity]:
+        if len(book.quotes) < 2:
+            book.active_pair = None
+            return None
+        self.stats['cross_checks'] += 1
+
+        bids = book.top(book.bids, 2)
+        asks = book.top(book.asks, 2)
+        best_bid, best_ask = bids[0], asks[0]
+        if best_bid.venue == best_ask.venue:
+            # 最优买卖价在同一交易所时，比较两种次优组合
+            candidates = [(best_bid, asks[1]), (bids[1], best_ask)]
+            best_bid, best_ask = max(candidates, key=lambda pair: pair[0].effective_bid / pair[1].effective_ask)
+
+        net_spread = best_bid.effective_bid / best_ask.effective_ask - 1.0
+        if net_spread < self.min_net_spread:
+            book.active_pair = None
+            return None
+
+        pair = (best_ask.venue, best_bid.venue)
+        if book.active_pair == pair:
+            return None
+        book.active_pair = pair
+
+        quantity = None
+        if best_ask.ask_quantity > 0 and best_bid.bid_quantity > 0:
+            quantity = min(best_ask.ask_quantity, best_bid.bid_quantity)
+        self.stats['cross_opportunities'] += 1
+        return CrossVenueOpportunity(
+            symbol=symbol,
+            buy_venue=best_ask.venue,
+            sell_venue=best_bid.venue,
+            buy_price=best_ask.ask,
+            sell_price=best_bid.bid,
+            net_spread=net_spread,
+            net_profit_per_unit=best_bid.effective_bid - best_ask.effective_ask,
+            quantity=quantity,
+            timestamp=max(best_bid.timestamp, best_ask.timestamp)
+        )
+
+    def _check_triangles(self, venue: Hashable, symbol: str) -> List[TriangularOpportunity]:
+        cycles = self._venue_cycles(venue).get(symbol)
+        if not cycles:
+            return []
+
+        books = self._books
+        threshold = 1.0 + self.min_net_spread
+        opportunities = []
+        for path, legs in cycles:
+            self.stats['triangle_checks'] += 1
+            growth = 1.0
+            prices = []
+            for leg_symbol, side in legs:
+                book = books.get(leg_symbol)
+                quote = book.quotes.get(venue) if book is not None else None
+                if quote is None:
+                    growth = 0.0
+                    break
+                if side == "buy":
+                    growth *= (1.0 - quote.fee_rate) / quote.ask
+                    prices.append(quote.ask)
+                else:
+                    growth *= quote.bid * (1.0 - quote.fee_rate)
+                    prices.append(quote.bid)
+
+            key = (venue, legs)
+            if growth < threshold:
+                self._active_cycles.discard(key)
+                continue
+            if key in self._active_cycles:
+                continue
+            self._active_cycles.add(key)
+            self.stats['triangular_opportunities'] += 1
+            opportunities.append(TriangularOpportunity(
+                venue=venue,
+                path=path,
+                legs=tuple((leg_symbol, side, price) for (leg_symbol, side), price in zip(legs, prices)),
+                net_return=growth - 1.0
+            ))
+        return opportunities
+
+    # ===== 查询 =====
+
+    def quote(self, venue: Hashable, symbol: str) -> Optional[VenueQuote]:
+        book = self._books.get(symbol)
+        return book.quotes.get(venue) if book is not None else None
+
+    def best_bid(self, symbol: str) -> Optional[VenueQuote]:
+        """扣除手续费后买价最高的交易所盘口"""
+        book = self._books.get(symbol)
+        if book is None:
+            return None
+        top = book.top(book.bids, 1)
+        return top[0] if top else None
+
+    def best_ask(self, symbol: str) -> Optional[VenueQuote]:
+        """加上手续费后卖价最低的交易所盘口"""
+        book = self._books.get(symbol)
+        if book is None:
+            return None
+        top = book.top(book.asks, 1)
+        return top[0] if top else None
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._books)
+
+    @property
+    def quote_count(self) -> int:
+        return sum(len(book.quotes) for book in self._books.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'symbols': len(self._books),
+            'quotes': self.quote_count,
+            'triangles': {
+                getattr(venue, 'value', venue): len({cycle[1] for cycles in self._venue_cycles(venue).values()
+                                                     for cycle in cycles})
+                for venue in self._markets
+            }
+        }
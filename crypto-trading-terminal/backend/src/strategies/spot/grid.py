@@ -5,6 +5,7 @@
 
 import asyncio
 import logging
+from bisect import bisect_left, bisect_right
 from decimal import Decimal
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
@@ -40,6 +41,119 @@ class GridLevel:
             raise ValidationException("网格数量必须大于0")
 
 
+class GridLevelBook:
+    """网格层级索引
+
+    当前层级按价格升序存放，并行维护价格数组用于二分定位价格带；订单ID到层级的
+    映射、未下单层级集合以及活跃/已成交计数在每次状态变化时同步更新，
+    成交处理为O(log n)，状态查询为O(1)。本轮循环已成交的层级移出价格索引，
+    单独保存到循环完成时清理。
+    """
+
+    def __init__(self):
+        self.levels: List[GridLevel] = []
+        self._prices: List[Decimal] = []
+        self._by_order_id: Dict[str, GridLevel] = {}
+        self._unassigned: Dict[str, GridLevel] = {}   # 活跃且尚未下单的层级
+        self.filled_levels: List[GridLevel] = []
+        self.active_count = 0
+        self.filled_buy_count = 0
+        self.filled_sell_count = 0
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    @property
+    def filled_count(self) -> int:
+        return len(self.filled_levels)
+
+    @property
+    def total_count(self) -> int:
+        return len(self.levels) + len(self.filled_levels)
+
+    def clear(self):
+        self.levels.clear()
+        self._prices.clear()
+        self._by_order_id.clear()
+        self._unassigned.clear()
+        self.filled_levels.clear()
+        self.active_count = 0
+        self.filled_buy_count = 0
+        self.filled_sell_count = 0
+
+    def add(self, level: GridLevel):
+        position = bisect_right(self._prices, level.price)
+        self._prices.insert(position, level.price)
+        self.levels.insert(position, level)
+        if level.is_active:
+            self.active_count += 1
+            if level.order_id:
+                self._by_order_id[level.order_id] = level
+            else:
+                self._unassigned[level.level_id] = level
+
+    def assign(self, level: GridLevel, order_id: str):
+        """层级已下单"""
+        self._unassigned.pop(level.level_id, None)
+        level.order_id = order_id
+        self._by_order_id[order_id] = level
+
+    def release(self, level: GridLevel):
+        """层级订单已撤销，等待重新下单"""
+        if level.order_id:
+            self._by_order_id.pop(level.order_id, None)
+        level.order_id = None
+        if level.is_active:
+            self._unassigned[level.level_id] = level
+
+    def find_by_order_id(self, order_id: str) -> Optional[GridLevel]:
+        return self._by_order_id.get(order_id)
+
+    def levels_between(self, low: Decimal, high: Decimal) -> List[GridLevel]:
+        """按价格升序返回价格在[low, high]内的当前层级"""
+        return self.levels[bisect_left(self._prices, low):bisect_right(self._prices, high)]
+
+    def unassigned_levels(self, low: Optional[Decimal] = None,
+                          high: Optional[Decimal] = None) -> List[GridLevel]:
+        """按价格升序返回尚未下单的层级，可用[low, high]限定价格带"""
+        if not self._unassigned:
+            return []
+        levels = self.levels if low is None or high is None else self.levels_between(low, high)
+        return [level for level in levels if self._unassigned.get(level.level_id) is level]
+
+    def assigned_levels(self) -> List[GridLevel]:
+        return list(self._by_order_id.values())
+
+    def mark_filled(self, level: GridLevel):
+        """层级成交：移出价格索引并计入本轮成交"""
+        self._remove(level)
+        if level.is_active:
+            self.active_count -= 1
+        level.is_active = False
+        if level.order_id:
+            self._by_order_id.pop(level.order_id, None)
+        self._unassigned.pop(level.level_id, None)
+        self.filled_levels.append(level)
+        if level.order_side == OrderSide.BUY:
+            self.filled_buy_count += 1
+        else:
+            self.filled_sell_count += 1
+
+    def clear_filled(self):
+        self.filled_levels.clear()
+        self.filled_buy_count = 0
+        self.filled_sell_count = 0
+
+    def _remove(self, level: GridLevel):
+        position = bisect_left(self._prices, level.price)
+        end = bisect_right(self._prices, level.price, lo=position)
+        for index in range(position, end):
+            if self.levels[index] is level:
+                del self.levels[index]
+                del self._prices[index]
+                return
+
+
 class GridStrategy(BaseSpotStrategy):
     """网格交易策略"""
     
@@ -50,7 +164,7 @@ class GridStrategy(BaseSpotStrategy):
         self.upper_price: Optional[Decimal] = None
         self.lower_price: Optional[Decimal] = None
         self.grid_size: Decimal = Decimal('0')  # 网格大小
-        self.grid_levels: List[GridLevel] = []
+        self._grid_book = GridLevelBook()
         
         # 策略状态
         self.center_price: Optional[Decimal] = None
@@ -71,6 +185,11 @@ class GridStrategy(BaseSpotStrategy):
         if self.config.strategy_type != StrategyType.GRID:
             raise ValidationException("GridStrategy需要GRID策略类型")
     
+    @property
+    def grid_levels(self) -> List[GridLevel]:
+        """当前网格层级（按价格升序，只读）"""
+        return self._grid_book.levels
+    
     async def _initialize_specific(self):
         """初始化网格策略特定功能"""
         try:
@@ -110,7 +229,7 @@ class GridStrategy(BaseSpotStrategy):
         """停止网格策略特定功能"""
         # 取消所有挂单
         await self._cancel_all_pending_orders()
-        self.grid_levels.clear()
+        self._grid_book.clear()
     
     async def get_next_orders(self, market_data: MarketData) -> List[OrderRequest]:
         """获取下一批网格订单"""
@@ -142,8 +261,7 @@ class GridStrategy(BaseSpotStrategy):
                     }
                 )
                 orders.append(order_request)
-                level.order_id = order_request.order_id
-                self.grid_levels.append(level)
+                self._grid_book.assign(level, order_request.order_id)
             
             return orders
             
@@ -159,6 +277,10 @@ class GridStrategy(BaseSpotStrategy):
             
             if not order_result.success:
                 self.logger.warning(f"网格订单执行失败: {order_result.error_message}")
+                # 释放层级，下一轮重新下单
+                failed_level = self._find_grid_level_by_order_id(order_result.order_id)
+                if failed_level:
+                    self._grid_book.release(failed_level)
                 return False
             
             # 查找对应的网格层级
@@ -169,7 +291,7 @@ class GridStrategy(BaseSpotStrategy):
             
             # 更新网格层级状态
             grid_level.filled_at = datetime.now()
-            grid_level.is_active = False
+            self._grid_book.mark_filled(grid_level)
             
             # 计算盈利
             grid_level.profit = self._calculate_grid_profit(grid_level, order_result)
@@ -181,9 +303,13 @@ class GridStrategy(BaseSpotStrategy):
             if self._is_grid_cycle_complete():
                 await self._complete_grid_cycle()
             
-            # 重新构建网格（如果有新价格区间）
+            # 价格离开网格区间或到达再平衡时间时重新构建网格，否则只补充成交的层级
             if self.last_market_data:
-                await self._rebuild_grid(self.last_market_data)
+                current_price = self.last_market_data.current_price
+                if self._is_grid_valid(current_price):
+                    self._rearm_grid_level(grid_level, current_price)
+                else:
+                    await self._rebuild_grid(self.last_market_data)
             
             self.logger.info(f"网格订单执行成功: {order_result.order_id}, 盈利: {grid_level.profit}")
             return True
@@ -202,7 +328,7 @@ class GridStrategy(BaseSpotStrategy):
             
             # 清空现有网格
             await self._cancel_all_pending_orders()
-            self.grid_levels.clear()
+            self._grid_book.clear()
             
             # 生成新的网格层级
             self._generate_grid_levels(current_price)
@@ -249,32 +375,34 @@ class GridStrategy(BaseSpotStrategy):
             lower_price = prices[i]
             upper_price = prices[i + 1]
             mid_price = (lower_price + upper_price) / 2
-            
-            # 决定订单方向（基于当前价格）
-            if current_price >= mid_price:
-                # 买单在下方
-                order_side = OrderSide.BUY
-                order_price = mid_price
-            else:
-                # 卖单在上方
-                order_side = OrderSide.SELL
-                order_price = mid_price
-            
-            # 计算订单数量（可以基于网格大小或固定数量）
-            quantity = self._calculate_grid_quantity(order_price, order_side)
-            
-            # 创建网格层级
-            level = GridLevel(
-                level_id=f"level_{i}",
-                price=order_price,
-                order_side=order_side,
-                quantity=quantity
-            )
-            
-            self.grid_levels.append(level)
+            self._grid_book.add(self._create_grid_level(f"level_{i}", mid_price, current_price))
         
         self.logger.info(f"生成{len(self.grid_levels)}个网格层级")
     
+    def _create_grid_level(self, level_id: str, order_price: Decimal, current_price: Decimal) -> GridLevel:
+        """在指定价格创建网格层级"""
+        # 决定订单方向（基于当前价格）
+        if current_price >= order_price:
+            # 买单在下方
+            order_side = OrderSide.BUY
+        else:
+            # 卖单在上方
+            order_side = OrderSide.SELL
+        
+        # 计算订单数量（可以基于网格大小或固定数量）
+        quantity = self._calculate_grid_quantity(order_price, order_side)
+        
+        return GridLevel(
+            level_id=level_id,
+            price=order_price,
+            order_side=order_side,
+            quantity=quantity
+        )
+    
+    def _rearm_grid_level(self, filled_level: GridLevel, current_price: Decimal):
+        """在成交层级的价格上按当前价格重新挂出层级"""
+        self._grid_book.add(self._create_grid_level(filled_level.level_id, filled_level.price, current_price))
+    
     def _calculate_grid_quantity(self, price: Decimal, order_side: OrderSide) -> Decimal:
         """计算网格订单数量"""
         # 基于价格和账户余额计算订单数量
@@ -311,21 +439,12 @@ class GridStrategy(BaseSpotStrategy):
         return True
     
     def _get_missing_grid_levels(self, current_price: Decimal) -> List[GridLevel]:
-        """获取缺失的网格层级"""
-        missing_levels = []
-        
-        for level in self.grid_levels:
-            if level.is_active and not level.order_id:
-                missing_levels.append(level)
-        
-        return missing_levels
+        """获取当前网格区间内缺失的网格层级"""
+        return self._grid_book.unassigned_levels(self.lower_price, self.upper_price)
     
     def _find_grid_level_by_order_id(self, order_id: str) -> Optional[GridLevel]:
         """根据订单ID查找网格层级"""
-        for level in self.grid_levels:
-            if level.order_id == order_id:
-                return level
-        return None
+        return self._grid_book.find_by_order_id(order_id)
     
     def _calculate_grid_profit(self, grid_level: GridLevel, order_result: OrderResult) -> Decimal:
         """计算网格层级盈利"""
@@ -386,13 +505,11 @@ class GridStrategy(BaseSpotStrategy):
         """检查是否完成一个网格循环"""
         try:
             # 检查是否有等量的买卖订单完成
-            active_buy_levels = [level for level in self.grid_levels 
-                               if level.order_side == OrderSide.BUY and level.filled_at]
-            active_sell_levels = [level for level in self.grid_levels 
-                                if level.order_side == OrderSide.SELL and level.filled_at]
+            filled_buys = self._grid_book.filled_buy_count
+            filled_sells = self._grid_book.filled_sell_count
             
             # 如果买卖订单数量相等，可能完成一个循环
-            if len(active_buy_levels) == len(active_sell_levels) and len(active_buy_levels) > 0:
+            if filled_buys == filled_sells and filled_buys > 0:
                 return True
             
             return False
@@ -421,7 +538,7 @@ class GridStrategy(BaseSpotStrategy):
             self.avg_sell_price = Decimal('0')
             
             # 清理已完成的层级
-            self.grid_levels = [level for level in self.grid_levels if level.is_active]
+            self._grid_book.clear_filled()
             
         except Exception as e:
             self.logger.error(f"完成网格循环失败: {e}")
@@ -432,12 +549,11 @@ class GridStrategy(BaseSpotStrategy):
             if not self.order_manager:
                 return
             
-            for level in self.grid_levels:
-                if level.order_id and level.is_active:
-                    # 这里应该调用订单管理器取消订单
-                    # await self.order_manager.cancel_order(level.order_id)
-                    level.order_id = None
-                    self.logger.debug(f"取消网格订单: {level.level_id}")
+            for level in self._grid_book.assigned_levels():
+                # 这里应该调用订单管理器取消订单
+                # await self.order_manager.cancel_order(level.order_id)
+                self._grid_book.release(level)
+                self.logger.debug(f"取消网格订单: {level.level_id}")
             
         except Exception as e:
             self.logger.error(f"取消挂单失败: {e}")
@@ -451,9 +567,9 @@ class GridStrategy(BaseSpotStrategy):
             'upper_price': str(self.upper_price) if self.upper_price else None,
             'lower_price': str(self.lower_price) if self.lower_price else None,
             'grid_size': str(self.grid_size),
-            'total_levels': len(self.grid_levels),
-            'active_levels': len([level for level in self.grid_levels if level.is_active]),
-            'completed_levels': len([level for level in self.grid_levels if level.filled_at]),
+            'total_levels': self._grid_book.total_count,
+            'active_levels': self._grid_book.active_count,
+            'completed_levels': self._grid_book.filled_count,
             'completed_cycles': self.completed_cycles,
             'total_profit_from_cycles': str(self.total_profit_from_cycles),
             'avg_buy_price': str(self.avg_buy_price),
@@ -473,7 +589,7 @@ class GridStrategy(BaseSpotStrategy):
             'grid_cycles_completed': self.completed_cycles,
             'total_grid_profit': float(self.total_profit_from_cycles),
             'average_cycle_profit': float(self.total_profit_from_cycles / max(self.completed_cycles, 1)),
-            'grid_efficiency': len([level for level in self.grid_levels if level.filled_at]) / max(len(self.grid_levels), 1),
+            'grid_efficiency': self._grid_book.filled_count / max(self._grid_book.total_count, 1),
             'price_coverage': float((self.upper_price - self.lower_price) / self.center_price) if self.center_price and self.upper_price and self.lower_price else 0,
         }
         
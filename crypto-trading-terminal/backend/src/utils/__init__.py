@@ -20,6 +20,8 @@ __all__ = [
     
     # Logging
     "setup_logging",
+    "shutdown_logging",
+    "get_logging_statistics",
     "get_logger",
     "RequestLogger",
     "DatabaseLogger", 
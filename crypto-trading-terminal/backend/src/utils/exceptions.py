@@ -172,6 +172,13 @@ class RateLimitExceededError(BaseAPIException):
         super().__init__(message, "RATE_LIMIT_EXCEEDED_ERROR")
 
 
+class DataIsolationError(BaseAPIException):
+    """数据隔离错误"""
+    
+    def __init__(self, message: str = "现货与期货数据隔离校验失败"):
+        super().__init__(message, "DATA_ISOLATION_ERROR")
+
+
 # HTTP状态码映射
 HTTP_STATUS_MAPPING = {
     ValidationError: 422,
@@ -193,6 +200,7 @@ HTTP_STATUS_MAPPING = {
     ConfigurationError: 500,
     ServiceUnavailableError: 503,
     RateLimitExceededError: 429,
+    DataIsolationError: 500,
 }
 
 
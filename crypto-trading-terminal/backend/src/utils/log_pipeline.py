@@ -0,0 +1,402 @@
+"""
+异步日志管道
+生产者只把轻量的事件字典放入有界队列，后台线程负责格式化并批量写出，
+避免慢速管道或磁盘阻塞事件循环
+"""
+
+import atexit
+import logging
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+import structlog
+
+_STOP = object()
+
+
+class LogPipeline:
+    """后台日志写出管道
+
+    队列已满时丢弃新日志并计数，不阻塞生产者。
+    后台线程攒够 batch_size 条或等待 flush_interval 秒后一次性写出。
+    停止后仍持有管道的调用方（如标准库handler）改为在调用线程中同步写出。
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        max_queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.05,
+        renderer: Optional[Callable] = None
+    ):
+        self.stream = stream or sys.stdout
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        # 以下处理器在后台线程中执行
+        self.renderer = renderer or structlog.processors.JSONRenderer(ensure_ascii=False)
+        self._exc_formatter = structlog.processors.format_exc_info
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopped = False
+
+        # 统计数据
+        self.stats = {
+            "enqueued": 0,
+            "dropped": 0,
+            "written": 0,
+            "batches": 0,
+            "format_errors": 0,
+            "write_errors": 0
+        }
+
+    def start(self):
+        """启动后台写出线程"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """停止后台线程并写出队列中剩余的日志"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+
+        while True:
+            try:
+                self._queue.put(_STOP, timeout=0.1)
+                break
+            except queue.Full:
+                if not thread.is_alive():
+                    break
+        thread.join(timeout)
+        self._stopped = True
+
+        # 后台线程退出前后入队的日志同步写出
+        remaining = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                remaining.append(item)
+        if remaining:
+            self._write_batch(remaining)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def enqueue(self, method_name: str, event_dict: Dict[str, Any]) -> bool:
+        """放入一条日志，队列已满时丢弃并返回False"""
+        if self._stopped:
+            self._write_batch([(method_name, event_dict)])
+            return True
+        try:
+            self._queue.put_nowait((method_name, event_dict))
+        except queue.Full:
+            self.stats["dropped"] += 1
+            return False
+        self.stats["enqueued"] += 1
+        return True
+
+    def _run(self):
+        """后台线程主循环"""
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch: List[Tuple[str, Dict[str, Any]]] = []
+            stopping = item is _STOP
+            if not stopping:
+                batch.append(item)
+
+            while not stopping and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+
+            if stopping:
+                # 写出停止标记之前已入队的全部日志
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not _STOP:
+                        batch.append(item)
+
+            if batch:
+                self._write_batch(batch)
+            if stopping:
+                return
+
+    def _write_batch(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        """格式化并一次性写出一批日志"""
+        lines = []
+        for method_name, event_dict in batch:
+            try:
+                lines.append(self._format(method_name, event_dict))
+            except Exception:
+                self.stats["format_errors"] += 1
+
+        if not lines:
+            return
+
+        try:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+            self.stats["written"] += len(lines)
+            self.stats["batches"] += 1
+        except Exception:
+            self.stats["write_errors"] += 1
+
+    def _format(self, method_name: str, event_dict: Dict[str, Any]) -> str:
+        """执行延迟到后台线程的处理器"""
+        timestamp = event_dict.get("timestamp")
+        if isinstance(timestamp, float):
+            event_dict["timestamp"] = (
+                datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+            )
+
+        if "exc_info" in event_dict:
+            event_dict = self._exc_formatter(None, method_name, event_dict)
+
+        rendered = self.renderer(None, method_name, event_dict)
+        return rendered if isinstance(rendered, str) else str(rendered)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取统计数据"""
+        return {
+            "running": self.running,
+            "queue_size": self._queue.qsize(),
+            "max_queue_size": self.max_queue_size,
+            "stats": self.stats.copy()
+        }
+
+
+class QueueLogger:
+    """structlog最终输出的logger，只负责把事件放入管道
+
+    未指定管道时在写日志时取当前的全局管道，structlog缓存的logger在
+    日志重新配置后仍写入新管道；日志管道关闭后丢弃。
+    """
+
+    def __init__(self, pipeline: Optional[LogPipeline] = None, name: Optional[str] = None):
+        self._pipeline = pipeline
+        self.name = name
+
+    def _enqueue(self, method_name: str, event_dict: Dict[str, Any]):
+        pipeline = self._pipeline or _global_pipeline
+        if pipeline is not None:
+            pipeline.enqueue(method_name, event_dict)
+
+    def debug(self, **event_dict):
+        self._enqueue("debug", event_dict)
+
+    def info(self, **event_dict):
+        self._enqueue("info", event_dict)
+
+    def warning(self, **event_dict):
+        self._enqueue("warning", event_dict)
+
+    def error(self, **event_dict):
+        self._enqueue("error", event_dict)
+
+    def critical(self, **event_dict):
+        self._enqueue("critical", event_dict)
+
+    def msg(self, **event_dict):
+        self._enqueue("info", event_dict)
+
+    warn = warning
+    exception = error
+    fatal = critical
+    log = msg
+
+
+class QueueLoggerFactory:
+    """为structlog创建QueueLogger，不指定管道时跟随全局管道"""
+
+    def __init__(self, pipeline: Optional[LogPipeline] = None):
+        self.pipeline = pipeline
+
+    def __call__(self, *args) -> QueueLogger:
+        return QueueLogger(self.pipeline, args[0] if args else None)
+
+
+class PipelineHandler(logging.Handler):
+    """把标准库logging的记录转入同一个日志管道"""
+
+    def __init__(self, pipeline: LogPipeline, level: int = logging.NOTSET):
+        super().__init__(level)
+        self.pipeline = pipeline
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            event_dict = {
+                "event": record.getMessage(),
+                "logger": record.name,
+                "level": record.levelname.lower(),
+                "timestamp": record.created
+            }
+            if record.exc_info:
+                event_dict["exc_info"] = record.exc_info
+            self.pipeline.enqueue(record.levelname.lower(), event_dict)
+        except Exception:
+            self.handleError(record)
+
+
+class LogSampler:
+    """按调用点采样和限流的structlog处理器
+
+    - sample_rate < 1 时，sample_levels 中的日志每个调用点每 1/sample_rate 条保留一条
+    - rate_limit > 0 时，rate_limit_levels 中的日志每个调用点每秒最多输出 rate_limit 条，
+      被抑制的条数在下一条输出的日志中以 suppressed 字段给出
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        rate_limit: int = 0,
+        sample_levels: Tuple[str, ...] = ("debug",),
+        rate_limit_levels: Tuple[str, ...] = ("debug", "info"),
+        max_sites: int = 4096
+    ):
+        self.sample_every = max(1, int(round(1.0 / sample_rate))) if sample_rate > 0 else 0
+        self.rate_limit = rate_limit
+        self.sample_levels = frozenset(sample_levels) if self.sample_every != 1 else frozenset()
+        self.rate_limit_levels = frozenset(rate_limit_levels) if rate_limit > 0 else frozenset()
+        self.max_sites = max_sites
+
+        # 调用点 -> [采样计数, 当前窗口起点, 窗口内条数, 已抑制条数]
+        self._sites: Dict[Tuple[str, int], List] = {}
+        self.stats = {
+            "sampled_out": 0,
+            "rate_limited": 0
+        }
+
+    def __call__(self, logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        sampled = method_name in self.sample_levels
+        limited = method_name in self.rate_limit_levels
+        if not (sampled or limited):
+            return event_dict
+
+        if sampled and self.sample_every == 0:
+            self.stats["sampled_out"] += 1
+            raise structlog.DropEvent
+
+        site_key = self._call_site()
+        state = self._sites.get(site_key)
+        if state is None:
+            if len(self._sites) >= self.max_sites:
+                self._sites.clear()
+            state = [0, 0.0, 0, 0]
+            self._sites[site_key] = state
+
+        # 采样
+        if sampled:
+            state[0] += 1
+            if (state[0] - 1) % self.sample_every != 0:
+                self.stats["sampled_out"] += 1
+                raise structlog.DropEvent
+
+        # 限流
+        if limited:
+            now = time.monotonic()
+            if now - state[1] >= 1.0:
+                state[1] = now
+                state[2] = 0
+            if state[2] >= self.rate_limit:
+                state[3] += 1
+                self.stats["rate_limited"] += 1
+                raise structlog.DropEvent
+            state[2] += 1
+            if state[3]:
+                event_dict["suppressed"] = state[3]
+                state[3] = 0
+
+        return event_dict
+
+    @staticmethod
+    def _call_site() -> Tuple[str, int]:
+        """找到structlog和本模块之外的第一个调用帧"""
+        frame = sys._getframe(2)
+        while frame is not None:
+            module_name = frame.f_globals.get("__name__", "")
+            if not (module_name.startswith("structlog") or module_name == __name__):
+                return frame.f_code.co_filename, frame.f_lineno
+            frame = frame.f_back
+        return "", 0
+
+
+def capture_exc_info(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """在调用线程中取出异常信息，后台线程无法再通过sys.exc_info()获取"""
+    exc_info = event_dict.get("exc_info")
+    if exc_info is True:
+        exc_info = sys.exc_info()
+        if exc_info[0] is None:
+            del event_dict["exc_info"]
+        else:
+            event_dict["exc_info"] = exc_info
+    elif isinstance(exc_info, BaseException):
+        event_dict["exc_info"] = (type(exc_info), exc_info, exc_info.__traceback__)
+    elif not exc_info and "exc_info" in event_dict:
+        del event_dict["exc_info"]
+    return event_dict
+
+
+def add_timestamp(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """记录事件时间（浮点数），ISO格式化留给后台线程"""
+    event_dict["timestamp"] = time.time()
+    return event_dict
+
+
+# 全局日志管道
+_global_pipeline: Optional[LogPipeline] = None
+
+
+def get_log_pipeline() -> Optional[LogPipeline]:
+    """获取当前的全局日志管道"""
+    return _global_pipeline
+
+
+def start_log_pipeline(**kwargs) -> LogPipeline:
+    """创建并启动全局日志管道（已存在时先停止旧管道）"""
+    global _global_pipeline
+    if _global_pipeline is not None:
+        _global_pipeline.stop()
+    _global_pipeline = LogPipeline(**kwargs)
+    _global_pipeline.start()
+    return _global_pipeline
+
+
+def stop_log_pipeline(timeout: float = 5.0):
+    """停止全局日志管道并写出剩余日志"""
+    global _global_pipeline
+    if _global_pipeline is not None:
+        _global_pipeline.stop(timeout)
+        _global_pipeline = None
+
+
+atexit.register(stop_log_pipeline)
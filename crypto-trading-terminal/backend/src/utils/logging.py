@@ -11,17 +11,31 @@ from datetime import datetime
 import structlog
 
 from ..config import settings
+from .log_pipeline import (
+    LogSampler,
+    PipelineHandler,
+    QueueLoggerFactory,
+    add_timestamp,
+    capture_exc_info,
+    get_log_pipeline,
+    start_log_pipeline,
+    stop_log_pipeline
+)
 
 
 def setup_logging():
     """配置Structured Logging"""
-    
+
     # 设置日志级别
     if settings.DEBUG:
         log_level = "DEBUG"
     else:
         log_level = "INFO"
-    
+
+    if settings.LOG_ASYNC:
+        _setup_async_logging(log_level)
+        return
+
     # 配置标准库logging
     logging.basicConfig(
         format="%(message)s",
@@ -72,8 +86,8 @@ def setup_logging():
     
     # 配置特定的logger级别
     for logger_name in ["uvicorn", "uvicorn.error", "uvicorn.access"]:
-        structlog.get_logger(logger_name).setLevel(log_level)
-    
+        logging.getLogger(logger_name).setLevel(log_level)
+
     # 开发环境下增加详细日志
     if settings.DEBUG:
         structlog.configure(
@@ -84,6 +98,80 @@ def setup_logging():
         )
 
 
+def _setup_async_logging(log_level: str):
+    """配置后台线程写出的日志管道
+
+    调用方只做级别过滤、采样和入队，时间戳格式化、异常格式化和JSON渲染
+    都在后台线程中完成，慢速stdout不会阻塞事件循环。
+    """
+    level = getattr(logging, log_level)
+
+    if settings.DEBUG:
+        renderer = structlog.dev.ConsoleRenderer(colors=True)
+    else:
+        renderer = structlog.processors.JSONRenderer(ensure_ascii=False)
+
+    pipeline = start_log_pipeline(
+        stream=sys.stdout,
+        max_queue_size=settings.LOG_QUEUE_SIZE,
+        batch_size=settings.LOG_BATCH_SIZE,
+        flush_interval=settings.LOG_FLUSH_INTERVAL,
+        renderer=renderer
+    )
+
+    # 标准库logging（auto_trading、uvicorn等模块）写入同一个管道
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, PipelineHandler):
+            root_logger.removeHandler(handler)
+    root_logger.addHandler(PipelineHandler(pipeline))
+    root_logger.setLevel(level)
+
+    structlog.configure(
+        processors=[
+            # 高频debug日志采样和限流
+            LogSampler(
+                sample_rate=settings.LOG_DEBUG_SAMPLE_RATE,
+                rate_limit=settings.LOG_RATE_LIMIT_PER_SECOND
+            ),
+
+            # 添加logger名称和日志级别
+            structlog.stdlib.add_logger_name,
+            structlog.processors.add_log_level,
+
+            # 记录浮点时间戳，格式化留给后台线程
+            add_timestamp,
+
+            # 异常信息必须在调用线程中取出
+            capture_exc_info,
+        ],
+
+        # 低于配置级别的调用直接返回，不构造事件
+        wrapper_class=structlog.make_filtering_bound_logger(level),
+
+        # 最终logger只负责入队，写日志时取当前管道，缓存的logger不会写入已停止的管道
+        logger_factory=QueueLoggerFactory(),
+
+        cache_logger_on_first_use=True,
+    )
+
+    for logger_name in ["uvicorn", "uvicorn.error", "uvicorn.access"]:
+        logging.getLogger(logger_name).setLevel(log_level)
+
+
+def shutdown_logging(timeout: float = 5.0):
+    """停止日志管道并写出剩余日志（应用关闭时调用）"""
+    stop_log_pipeline(timeout)
+
+
+def get_logging_statistics() -> Dict[str, Any]:
+    """获取日志管道统计数据"""
+    pipeline = get_log_pipeline()
+    if pipeline is None:
+        return {"async": False}
+    return {"async": True, **pipeline.get_statistics()}
+
+
 def get_logger(name: str = None, module: str = None) -> structlog.BoundLogger:
     """获取配置好的logger"""
     if name:
@@ -6,6 +6,7 @@
 import pytest
 import asyncio
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 from unittest.mock import Mock, patch, AsyncMock
 import json
 
@@ -19,6 +20,13 @@ from backend.src.auto_trading.emergency_stop import (
 )
 from backend.src.storage.models import User, Account, AutoOrder, Order, RiskAlert
 from backend.src.notification.risk_alert_integration import RiskAlertNotificationManager
+from backend.src.adapters.base import BaseExchangeAdapter, ExchangeAdapterFactory
+from backend.src.auto_trading import emergency_stop as emergency_stop_module
+
+
+async def confirm_all(symbol, order_ids):
+    """交易所逐单确认撤销"""
+    return [{"order_id": order_id, "success": True, "error": None, "result": {}} for order_id in order_ids]
 
 
 class TestEmergencyStopService:
@@ -496,17 +504,23 @@ class TestEmergencyStopService:
     @pytest.mark.asyncio
     async def test_order_cancellation_integration(self, emergency_service):
         """测试订单取消集成"""
-        # 模拟数据库查询返回的订单
-        mock_orders = []
-        for i in range(3):
-            order = Mock(spec=Order)
-            order.id = i + 1
-            order.status = "new"
-            order.price = 50000.0
-            order.quantity = 0.1
-            mock_orders.append(order)
-        
-        emergency_service.db_session.execute = AsyncMock(return_value=Mock(scalars=Mock(return_value=mock_orders)))
+        # 模拟查询到的挂单
+        open_rows = [
+            SimpleNamespace(id=i + 1, account_id=2001, symbol="BTCUSDT", market_type="spot",
+                            exchange_order_id=f"ex_{i + 1}", price=50000.0, quantity=0.1)
+            for i in range(3)
+        ]
+        adapter = Mock()
+        adapter.cancel_spot_orders = AsyncMock(side_effect=confirm_all)
+        emergency_service.register_exchange_adapter("binance", adapter)
+        emergency_service._get_account_exchanges = AsyncMock(return_value={2001: "binance"})
+        
+        emergency_service.db_session.execute = AsyncMock(side_effect=[
+            Mock(rowcount=2),                            # 暂停自动订单
+            Mock(all=Mock(return_value=open_rows)),      # 查询挂单
+            Mock(all=Mock(return_value=open_rows)),      # 撤销已确认的订单
+            Mock()                                       # 批量写入执行记录
+        ])
         
         # 执行全局停止
         config = EmergencyStopConfig(
@@ -516,16 +530,172 @@ class TestEmergencyStopService:
             cancel_pending_orders=True
         )
         
-        orders_affected, total_amount = await emergency_service._stop_all_trading(config, "test_user")
+        orders_affected, total_amount, failed_order_ids = await emergency_service._stop_all_trading(config, "test_user")
         
         # 验证结果
-        assert orders_affected == 3  # 3个订单被取消
+        assert orders_affected == 5  # 3个订单被取消，2个自动订单被暂停
         assert total_amount == 15000.0  # 3 * 0.1 * 50000 = 15000
+        assert failed_order_ids == []
         
-        # 验证所有订单状态被更新
-        for order in mock_orders:
-            assert order.status == "cancelled"
-
+        # 执行记录一次性批量写入
+        insert_call = emergency_service.db_session.execute.await_args_list[3]
+        assert [row["order_id"] for row in insert_call.args[1]] == [1, 2, 3]
+        # 撤单请求前先提交暂停，撤单后再提交订单状态
+        assert emergency_service.db_session.commit.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_failed_exchange_cancel_keeps_orders_open(self, emergency_service):
+        """测试交易所撤单失败的订单不会被标记为已取消"""
+        open_rows = [
+            SimpleNamespace(id=i + 1, account_id=2001, symbol="BTCUSDT" if i < 2 else "ETHUSDT",
+                            market_type="spot", exchange_order_id=f"ex_{i + 1}", price=100.0, quantity=1.0)
+            for i in range(4)
+        ]
+        
+        async def cancel(symbol, order_ids):
+            if symbol == "ETHUSDT":
+                raise ConnectionError("exchange unavailable")
+            return await confirm_all(symbol, order_ids)
+        
+        adapter = Mock()
+        adapter.cancel_spot_orders = AsyncMock(side_effect=cancel)
+        emergency_service.register_exchange_adapter("binance", adapter)
+        emergency_service._get_account_exchanges = AsyncMock(return_value={2001: "binance"})
+        emergency_service.db_session.execute = AsyncMock(side_effect=[
+            Mock(rowcount=0),
+            Mock(all=Mock(return_value=open_rows)),
+            Mock(all=Mock(return_value=open_rows[:2])),
+            Mock()
+        ])
+        
+        config = EmergencyStopConfig(stop_level=StopLevel.GLOBAL, target_id="global", reason=StopReason.MANUAL)
+        orders_affected, total_amount, failed_order_ids = await emergency_service._stop_all_trading(config, "test_user")
+        
+        assert orders_affected == 2
+        assert total_amount == 200.0
+        assert failed_order_ids == [3, 4]
+        assert emergency_service.stats["exchange_cancel_failures"] == 2
+        
+        # 只对交易所确认的订单更新状态
+        update_call = emergency_service.db_session.execute.await_args_list[2]
+        assert update_call.args[0].compile().params["id_1"] == [1, 2]
+        # 撤单失败的订单写入失败的执行记录
+        records = emergency_service.db_session.execute.await_args_list[3].args[1]
+        assert [(row["order_id"], row["status"].value) for row in records] == [
+            (1, "success"), (2, "success"), (3, "failed"), (4, "failed")
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_only_rejected_orders_in_batch_fail(self, emergency_service):
+        """测试批量撤单中只有被交易所拒绝的订单记为失败"""
+        rows = [
+            SimpleNamespace(id=i, account_id=2001, symbol="BTCUSDT", market_type="spot",
+                            exchange_order_id=f"ex_{i}", price=None, quantity=1.0)
+            for i in range(4)
+        ]
+        
+        async def cancel_spot_order(symbol, order_id):
+            if order_id == "ex_1":
+                raise ValueError("order already filled")
+            if order_id == "ex_2":
+                return {"id": order_id, "info": {"sCode": "51400", "sMsg": "Cancellation failed"}}
+            return {"id": order_id, "status": "canceled"}
+        
+        # 使用基类的默认批量撤单实现
+        adapter = SimpleNamespace(cancel_spot_order=cancel_spot_order)
+        adapter.cancel_spot_orders = lambda symbol, order_ids: BaseExchangeAdapter.cancel_spot_orders(
+            adapter, symbol, order_ids
+        )
+        emergency_service.register_exchange_adapter("binance", adapter)
+        
+        failed = await emergency_service._cancel_on_exchanges(rows, {2001: "binance"})
+        
+        assert failed == {1, 2}
+        assert emergency_service.stats["exchange_cancels_sent"] == 2
+        assert emergency_service.stats["exchange_cancel_failures"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_global_service_cancels_on_exchange(self, mock_db_session, monkeypatch):
+        """测试全局服务创建时注册交易所适配器，挂单经交易所确认后取消"""
+        class FakeSpotAdapter:
+            def __init__(self, api_key=None, secret_key=None, passphrase=None, is_testnet=True):
+                self.api_key = api_key
+                self.cancelled = []
+            
+            async def cancel_spot_order(self, symbol, order_id):
+                self.cancelled.append(order_id)
+                return {"id": order_id, "status": "canceled"}
+            
+            cancel_spot_orders = BaseExchangeAdapter.cancel_spot_orders
+        
+        monkeypatch.setattr(ExchangeAdapterFactory, "_adapters", {"binance": FakeSpotAdapter})
+        monkeypatch.setattr(ExchangeAdapterFactory, "_lazy_adapters", {})
+        monkeypatch.setattr(emergency_stop_module.settings, "BINANCE_API_KEY", "key")
+        monkeypatch.setattr(emergency_stop_module, "_global_emergency_stop_service", None)
+        
+        service = emergency_stop_module.get_emergency_stop_service(mock_db_session)
+        adapter = service.exchange_adapters["binance"]
+        assert adapter.api_key == "key"
+        
+        open_rows = [
+            SimpleNamespace(id=i + 1, account_id=2001, symbol="BTCUSDT", market_type="spot",
+                            exchange_order_id=f"ex_{i + 1}", price=10.0, quantity=1.0)
+            for i in range(3)
+        ]
+        service._get_account_exchanges = AsyncMock(return_value={2001: "binance"})
+        mock_db_session.execute = AsyncMock(side_effect=[
+            Mock(rowcount=0),
+            Mock(all=Mock(return_value=open_rows)),
+            Mock(all=Mock(return_value=open_rows)),
+            Mock()
+        ])
+        
+        config = EmergencyStopConfig(stop_level=StopLevel.GLOBAL, target_id="global", reason=StopReason.MANUAL)
+        orders_affected, total_amount, failed_order_ids = await service._stop_all_trading(config, "test_user")
+        
+        assert sorted(adapter.cancelled) == ["ex_1", "ex_2", "ex_3"]
+        assert failed_order_ids == []
+        assert orders_affected == 3
+        update_call = mock_db_session.execute.await_args_list[2]
+        assert update_call.args[0].compile().params["id_1"] == [1, 2, 3]
+    
+    @pytest.mark.asyncio
+    async def test_exchange_cancels_are_batched(self, emergency_service):
+        """测试交易所撤单按交易对分批并发发送"""
+        cancelled_rows = [
+            SimpleNamespace(id=i, account_id=2001, symbol="BTCUSDT" if i % 2 else "ETHUSDT",
+                            market_type="spot", exchange_order_id=f"ex_{i}", price=None, quantity=1.0)
+            for i in range(50)
+        ]
+        adapter = Mock()
+        adapter.cancel_spot_orders = AsyncMock(side_effect=confirm_all)
+        emergency_service.register_exchange_adapter("binance", adapter)
+        emergency_service.cancel_batch_size = 10
+        
+        await emergency_service._cancel_on_exchanges(cancelled_rows, {2001: "binance"})
+        
+        batches = [call.args for call in adapter.cancel_spot_orders.await_args_list]
+        assert len(batches) == 6  # 每个交易对25个订单，分3批
+        assert all(len(order_ids) <= 10 for _, order_ids in batches)
+        assert sorted(oid for _, order_ids in batches for oid in order_ids) == sorted(r.exchange_order_id for r in cancelled_rows)
+        assert emergency_service.stats["exchange_cancels_sent"] == 50
+    
+    def test_active_stop_index(self, emergency_service):
+        """测试按级别和目标索引的停止检查"""
+        for i in range(1000):
+            emergency_service.active_stops[f"user_{i}"] = StopRecord(
+                stop_id=f"user_{i}", stop_level=StopLevel.USER, target_id=i, reason=StopReason.MANUAL,
+                status=StopStatus.ACTIVE, triggered_at=datetime.now(), triggered_by="test", expires_at=None,
+                cancelled_at=None, cancelled_by=None, orders_affected=0, total_amount=0.0, metadata={}
+            )
+        
+        assert emergency_service.is_trading_stopped(user_id=999)
+        assert not emergency_service.is_trading_stopped(user_id=1000)
+        assert not emergency_service.is_trading_stopped(account_id=999)
+        
+        del emergency_service.active_stops["user_999"]
+        assert not emergency_service.is_trading_stopped(user_id=999)
+        assert len(emergency_service.active_stops) == 999
 
 if __name__ == "__main__":
     # 运行测试
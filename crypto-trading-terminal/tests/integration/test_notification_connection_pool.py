@@ -0,0 +1,328 @@
+"""
+通知渠道连接池集成测试
+使用本地SMTP和HTTP替身服务验证连接复用、批量发送和非阻塞发送
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.notification.notify_manager import (
+    NotificationMessage,
+    NotificationChannel,
+    NotificationPriority
+)
+from backend.src.notification.channels.connection_pool import (
+    HTTPSessionPool,
+    get_smtp_connection_pool,
+    release_smtp_connection_pool
+)
+from backend.src.notification.channels.telegram import TelegramNotificationChannel
+from backend.src.notification.channels.email import EmailNotificationChannel
+
+
+class LocalSMTPServer:
+    """最小化的本地SMTP替身服务"""
+
+    def __init__(self, data_delay: float = 0.0, drop_after_message: bool = False):
+        self.data_delay = data_delay
+        self.drop_after_message = drop_after_message
+        self.connections = 0
+        self.messages = []
+        self.server = None
+        self.port = None
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        writer.write(b"220 localhost ESMTP\r\n")
+        await writer.drain()
+
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            verb = line.decode().strip().split(" ", 1)[0].upper()
+
+            if verb in ("EHLO", "HELO"):
+                writer.write(b"250-localhost\r\n250-8BITMIME\r\n250 AUTH PLAIN\r\n")
+            elif verb == "AUTH":
+                writer.write(b"235 Authentication successful\r\n")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                writer.write(b"250 OK\r\n")
+            elif verb == "DATA":
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                await writer.drain()
+                body = []
+                while True:
+                    data_line = await reader.readline()
+                    if data_line in (b".\r\n", b""):
+                        break
+                    body.append(data_line)
+                if self.data_delay:
+                    await asyncio.sleep(self.data_delay)
+                self.messages.append(b"".join(body))
+                writer.write(b"250 Message accepted\r\n")
+                if self.drop_after_message:
+                    await writer.drain()
+                    writer.close()
+                    return
+            elif verb == "QUIT":
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                writer.close()
+                return
+            else:
+                writer.write(b"502 Command not implemented\r\n")
+            await writer.drain()
+
+        writer.close()
+
+
+class LocalTelegramServer:
+    """本地Telegram Bot API替身服务，记录每个请求使用的客户端连接"""
+
+    def __init__(self, response_delay: float = 0.0):
+        self.response_delay = response_delay
+        self.requests = []
+        self.peers = set()
+        self.server = None
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post("/bot{token}/sendMessage", self._send_message)
+        self.server = TestServer(app, host="127.0.0.1")
+        await self.server.start_server()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.server.close()
+
+    @property
+    def base_url(self) -> str:
+        return str(self.server.make_url("")).rstrip("/")
+
+    async def _send_message(self, request):
+        self.peers.add(request.transport.get_extra_info("peername"))
+        self.requests.append(await request.json())
+        if self.response_delay:
+            await asyncio.sleep(self.response_delay)
+        return web.json_response({"ok": True, "result": {"message_id": len(self.requests)}})
+
+
+def make_message(index: int, channel: NotificationChannel) -> NotificationMessage:
+    return NotificationMessage(
+        message_id=f"msg_{index}",
+        channel=channel,
+        title=f"BTCUSDT alert {index}",
+        content=f"price crossed level {index}",
+        priority=NotificationPriority.NORMAL,
+        timestamp=datetime.now()
+    )
+
+
+def make_email_channel(port: int, password: str = "secret") -> EmailNotificationChannel:
+    return EmailNotificationChannel({
+        "enabled": True,
+        "smtp_server": "127.0.0.1",
+        "smtp_port": port,
+        "username": "bot@example.com",
+        "password": password,
+        "recipients": ["trader@example.com"],
+        "use_tls": False,
+        "timeout": 5
+    })
+
+
+class TestTelegramConnectionPool:
+    """Telegram渠道连接复用测试"""
+
+    @pytest.mark.asyncio
+    async def test_sequential_messages_reuse_one_connection(self):
+        """连续发送的消息应复用同一个keep-alive连接"""
+        async with LocalTelegramServer() as server:
+            pool = HTTPSessionPool()
+            channel = TelegramNotificationChannel({
+                "enabled": True,
+                "bot_token": "TEST_TOKEN",
+                "chat_id": "42",
+                "api_base_url": server.base_url
+            }, http_pool=pool)
+
+            try:
+                for i in range(5):
+                    assert await channel.send_notification(make_message(i, NotificationChannel.TELEGRAM))
+            finally:
+                await pool.close()
+
+            assert len(server.requests) == 5
+            assert len(server.peers) == 1
+            assert pool.stats["sessions_created"] == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_send_is_bounded_and_pooled(self):
+        """批量发送应并发执行，且连接数不超过并发上限"""
+        async with LocalTelegramServer(response_delay=0.05) as server:
+            pool = HTTPSessionPool()
+            channel = TelegramNotificationChannel({
+                "enabled": True,
+                "bot_token": "TEST_TOKEN",
+                "chat_id": "42",
+                "api_base_url": server.base_url,
+                "batch_concurrency": 4
+            }, http_pool=pool)
+
+            messages = [make_message(i, NotificationChannel.TELEGRAM) for i in range(20)]
+            try:
+                start_time = time.perf_counter()
+                results = await channel.send_batch(messages)
+                elapsed = time.perf_counter() - start_time
+            finally:
+                await pool.close()
+
+            assert all(results.values())
+            assert len(results) == 20
+            assert len(server.requests) == 20
+            assert len(server.peers) <= 4
+            # 串行发送至少需要 20 * 0.05 = 1 秒
+            assert elapsed < 0.8
+
+
+class TestEmailConnectionPool:
+    """邮件渠道SMTP连接复用测试"""
+
+    @pytest.mark.asyncio
+    async def test_messages_reuse_smtp_connection(self):
+        """多封邮件应通过同一个SMTP连接发送"""
+        async with LocalSMTPServer() as server:
+            channel = make_email_channel(server.port)
+            try:
+                for i in range(3):
+                    assert await channel.send_notification(make_message(i, NotificationChannel.EMAIL))
+            finally:
+                await channel.close()
+
+            assert len(server.messages) == 3
+            assert server.connections == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_send_uses_single_connection(self):
+        """批量发送的邮件应全部走同一个连接"""
+        async with LocalSMTPServer() as server:
+            channel = make_email_channel(server.port)
+            messages = [make_message(i, NotificationChannel.EMAIL) for i in range(10)]
+            try:
+                results = await channel.send_batch(messages)
+            finally:
+                await channel.close()
+
+            assert all(results.values())
+            assert len(server.messages) == 10
+            assert server.connections == 1
+            assert channel.stats["successful"] == 10
+
+    @pytest.mark.asyncio
+    async def test_reconnects_after_server_drop(self):
+        """服务器断开连接后应自动重连"""
+        async with LocalSMTPServer(drop_after_message=True) as server:
+            channel = make_email_channel(server.port)
+            try:
+                assert await channel.send_notification(make_message(1, NotificationChannel.EMAIL))
+                assert await channel.send_notification(make_message(2, NotificationChannel.EMAIL))
+            finally:
+                await channel.close()
+
+            assert len(server.messages) == 2
+            assert server.connections == 2
+
+    @pytest.mark.asyncio
+    async def test_slow_smtp_does_not_block_event_loop(self):
+        """慢速SMTP服务器不应阻塞事件循环"""
+        async with LocalSMTPServer(data_delay=0.3) as server:
+            channel = make_email_channel(server.port)
+            gaps = []
+            stop = asyncio.Event()
+
+            async def ticker():
+                last = time.perf_counter()
+                while not stop.is_set():
+                    await asyncio.sleep(0.01)
+                    now = time.perf_counter()
+                    gaps.append(now - last)
+                    last = now
+
+            ticker_task = asyncio.create_task(ticker())
+            try:
+                assert await channel.send_notification(make_message(1, NotificationChannel.EMAIL))
+            finally:
+                stop.set()
+                await ticker_task
+                await channel.close()
+
+            assert len(gaps) > 10
+            assert max(gaps) < 0.1
+
+    @pytest.mark.asyncio
+    async def test_closing_one_channel_keeps_shared_connection(self):
+        """共享连接的渠道关闭后，其他渠道仍可继续发送"""
+        async with LocalSMTPServer() as server:
+            first = make_email_channel(server.port)
+            second = make_email_channel(server.port)
+            try:
+                assert await first.send_notification(make_message(1, NotificationChannel.EMAIL))
+                assert await second.send_notification(make_message(2, NotificationChannel.EMAIL))
+                assert first._smtp_pool is second._smtp_pool
+
+                await first.close()
+                assert await second.send_notification(make_message(3, NotificationChannel.EMAIL))
+
+                # 配置更新只释放本渠道的引用
+                first.update_config({"timeout": 5})
+                assert await first.send_notification(make_message(4, NotificationChannel.EMAIL))
+                first.update_config({"subject_prefix": "[BOT]"})
+                await asyncio.sleep(0)
+                assert await second.send_notification(make_message(5, NotificationChannel.EMAIL))
+            finally:
+                await first.close()
+                await second.close()
+
+            assert len(server.messages) == 5
+            assert server.connections == 1
+
+    @pytest.mark.asyncio
+    async def test_pool_key_includes_credentials_and_transport(self):
+        """不同密码或传输方式不应共用同一连接"""
+        base = dict(host="127.0.0.1", port=2525, username="bot@example.com", password="a", use_tls=False)
+        pool = get_smtp_connection_pool(**base)
+        same = get_smtp_connection_pool(**base)
+        other_password = get_smtp_connection_pool(**dict(base, password="b"))
+        other_transport = get_smtp_connection_pool(**dict(base, use_tls=True))
+        try:
+            assert same is pool
+            assert other_password is not pool
+            assert other_transport is not pool
+        finally:
+            for shared in (pool, same, other_password, other_transport):
+                await release_smtp_connection_pool(shared)
+
+        # 最后一个引用释放后连接被关闭，再次获取会新建
+        assert pool._executor._shutdown
+        fresh = get_smtp_connection_pool(**base)
+        assert fresh is not pool
+        await release_smtp_connection_pool(fresh)
@@ -415,5 +415,126 @@ class TestTemplateIntegration:
         assert processing_time < 5.0
 
 
+
+class TestCompiledTemplateCache:
+    """测试模板编译缓存"""
+    
+    @pytest.fixture
+    def template_engine(self):
+        return TemplateEngine()
+    
+    @pytest.mark.parametrize("template_content,template_type", [
+        ("预警: $condition_name - $result_details", 'default'),
+        ("价格: $price_value|upper ($trigger_time|short_datetime)", 'python_template'),
+        ("价格: ${symbol}|upper 变化 $change|percentage 费用 $$5", 'python_template'),
+        ("未知: $missing |unknown $ 结束", 'python_template'),
+        ("取整: $a|round(a, n) 再取整 $b|round(b, n)", 'python_template'),
+    ])
+    def test_compiled_matches_uncompiled_render(self, template_engine, template_content, template_type):
+        """编译渲染结果应与逐次解析的渲染结果一致"""
+        variables = {
+            'condition_name': '价格预警',
+            'result_details': '突破',
+            'price_value': 'btcusdt',
+            'symbol': 'ethusdt',
+            'change': 5.5,
+            'a': '1.2345',
+            'b': '2.5',
+            'n': '1',
+            'trigger_time': datetime(2024, 1, 15, 14, 30, 0)
+        }
+        processed = template_engine._preprocess_variables(variables)
+        if template_type == 'python_template':
+            expected = template_engine._render_python_template(template_content, processed)
+        else:
+            expected = template_engine._render_simple_template(template_content, processed)
+        
+        assert template_engine.render_template(template_content, variables, template_type) == expected
+    
+    def test_prebuilt_templates_match_uncompiled_render(self, template_engine):
+        """所有预构建模板的编译渲染结果应与逐次解析一致"""
+        variables = {
+            'condition_name': '价格预警',
+            'result_value': '51234.5',
+            'result_details': '突破阻力位',
+            'priority_text': '重要',
+            'status_text': '条件满足',
+            'trigger_time': datetime(2024, 1, 15, 14, 30, 0),
+            'priority': 4
+        }
+        processed = template_engine._preprocess_variables(variables)
+        
+        for category in ALL_TEMPLATES.values():
+            for template_config in category.values():
+                for template_content in template_config['templates'].values():
+                    expected = template_engine._render_python_template(template_content, processed)
+                    assert template_engine.render_template(
+                        template_content, variables, 'python_template'
+                    ) == expected
+    
+    def test_template_compiled_once(self, template_engine):
+        """同一模板多次渲染只编译一次"""
+        template_content = "预警: $condition_name|upper"
+        for i in range(10):
+            template_engine.render_template(template_content, {'condition_name': f'c{i}'}, 'python_template')
+        
+        stats = template_engine.get_cache_statistics()
+        assert stats['misses'] == 1
+        assert stats['hits'] == 9
+    
+    def test_edit_invalidates_named_template(self, template_engine):
+        """编辑注册模板后应使用新版本"""
+        mock_context = Mock()
+        mock_context.strategy.value = 'parallel'
+        mock_context.evaluation_id = 'cache_test'
+        trigger_event = Mock(
+            condition_id='cond_1',
+            condition_name='BTC突破',
+            event_id='evt_1',
+            result=Mock(value='BTCUSDT', details='价格突破', satisfied=True),
+            timestamp=datetime(2024, 1, 15, 15, 45, 0),
+            priority=4,
+            context=mock_context,
+            metadata={}
+        )
+        
+        template_engine.register_template('editable', 'v1: $condition_name')
+        assert template_engine.render_trigger_event('editable', trigger_event) == 'v1: BTC突破'
+        
+        template_engine.register_template('editable', 'v2: $condition_name ($priority_text)')
+        assert template_engine.render_trigger_event('editable', trigger_event) == 'v2: BTC突破 (重要)'
+        assert template_engine.template_versions['editable'] == 2
+    
+    def test_register_formatter_invalidates_cache(self, template_engine):
+        """新注册的格式化器应对已缓存的模板生效"""
+        template_content = "值: ${value}|double"
+        variables = {'value': 'x'}
+        assert template_engine.render_template(template_content, variables, 'python_template') == "值: x|double"
+        
+        template_engine.register_formatter('double', lambda x: f"{x}{x}")
+        assert template_engine.render_template(template_content, variables, 'python_template') == "值: xxx"
+    
+    def test_render_batch(self, template_engine):
+        """批量渲染多组变量"""
+        contexts = [
+            {'symbol': f'coin{i}', 'value': f'lot{i}', 'condition_name': f'条件{i}'}
+            for i in range(50)
+        ]
+        results = template_engine.render_batch("$condition_name: ${symbol} ${value}|upper", contexts, 'python_template')
+        
+        assert len(results) == 50
+        assert results[0] == "条件0: coin0 lot0LOT0"
+        assert results[49] == "条件49: coin49 lot49LOT49"
+        assert template_engine.get_cache_statistics()['misses'] == 1
+    
+    def test_cache_size_is_bounded(self):
+        """编译缓存不应无限增长"""
+        engine = TemplateEngine(max_cache_size=8)
+        for i in range(20):
+            engine.render_template(f"模板{i}: $name", {'name': 'x'})
+        
+        assert engine.get_cache_statistics()['cached_templates'] == 8
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
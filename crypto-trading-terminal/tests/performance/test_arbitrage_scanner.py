@@ -0,0 +1,237 @@
+"""
+套利扫描器测试
+验证扣费后的最优价堆、阈值穿越触发、同交易所排除、三角路径和策略接入，并测量数百个交易对下的单次更新开销
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.strategies.base import MarketData, StrategyConfig, StrategyType
+from backend.src.strategies.spot.arbitrage import ArbitrageStrategy, ExchangeName
+from backend.src.strategies.spot.arbitrage_scanner import (
+    ArbitrageScanner,
+    CrossVenueOpportunity,
+    TriangularOpportunity,
+    split_symbol
+)
+
+VENUES = ["v0", "v1", "v2", "v3", "v4", "v5"]
+
+
+def brute_force_best(quotes):
+    """两两比较得到扣费后收益率最高的跨所组合"""
+    best = None
+    for buy in quotes.values():
+        for sell in quotes.values():
+            if buy.venue == sell.venue:
+                continue
+            spread = sell.effective_bid / buy.effective_ask - 1.0
+            if best is None or spread > best[0]:
+                best = (spread, buy.venue, sell.venue)
+    return best
+
+
+class TestCrossVenue:
+    """跨交易所价差"""
+
+    def test_fees_and_threshold(self):
+        scanner = ArbitrageScanner(min_net_spread=0.002, default_fee_rate=0.001)
+        assert scanner.update("a", "BTCUSDT", 100.0, 100.1) == []
+        # 毛价差0.4%，扣除双边0.2%手续费后约0.2%
+        signals = scanner.update("b", "BTCUSDT", 100.5, 100.6, bid_quantity=3, ask_quantity=2)
+        assert signals == []
+        signals = scanner.update("b", "BTCUSDT", 100.6, 100.7, bid_quantity=3, ask_quantity=2)
+        assert len(signals) == 1
+        signal = signals[0]
+        assert (signal.buy_venue, signal.sell_venue) == ("a", "b")
+        assert (signal.buy_price, signal.sell_price) == (100.1, 100.6)
+        assert signal.net_spread == pytest.approx(100.6 * 0.999 / (100.1 * 1.001) - 1)
+        assert signal.quantity is None
+
+    def test_emits_only_on_crossing(self):
+        scanner = ArbitrageScanner(min_net_spread=0.001, default_fee_rate=0.0)
+        scanner.update("a", "ETHUSDT", 10.0, 10.01)
+        assert len(scanner.update("b", "ETHUSDT", 10.2, 10.21)) == 1
+        # 价差持续存在时不重复发出
+        assert scanner.update("b", "ETHUSDT", 10.3, 10.31) == []
+        # 最优组合变化时重新发出
+        assert [(s.buy_venue, s.sell_venue) for s in scanner.update("c", "ETHUSDT", 10.5, 10.51)] == [("a", "c")]
+        # 回落到阈值以下再穿越
+        scanner.update("c", "ETHUSDT", 10.0, 10.01)
+        scanner.update("b", "ETHUSDT", 10.0, 10.01)
+        assert len(scanner.update("b", "ETHUSDT", 10.2, 10.21)) == 1
+
+    def test_unchanged_top_of_book_is_skipped(self):
+        scanner = ArbitrageScanner(default_fee_rate=0.0)
+        scanner.update("a", "BTCUSDT", 100.0, 100.1, bid_quantity=1)
+        scanner.update("a", "BTCUSDT", 100.0, 100.1, bid_quantity=5)
+        assert scanner.stats['unchanged_updates'] == 1
+        assert scanner.quote("a", "BTCUSDT").bid_quantity == 5
+        with pytest.raises(ValueError):
+            scanner.update("a", "BTCUSDT", 101.0, 100.0)
+
+    def test_best_pair_matches_brute_force(self):
+        rng = random.Random(4)
+        scanner = ArbitrageScanner(min_net_spread=0.0005, triangular=False)
+        active = None
+        for _ in range(5000):
+            venue = rng.choice(VENUES)
+            mid = 100 * (1 + rng.gauss(0, 0.002))
+            half = mid * rng.uniform(0.00005, 0.0005)
+            fee = rng.choice([0.0, 0.0005, 0.001])
+            signals = scanner.update(venue, "BTCUSDT", mid - half, mid + half, fee_rate=fee)
+
+            book = scanner._books["BTCUSDT"]
+            quotes = book.quotes
+            assert scanner.best_bid("BTCUSDT").effective_bid == max(q.effective_bid for q in quotes.values())
+            assert scanner.best_ask("BTCUSDT").effective_ask == min(q.effective_ask for q in quotes.values())
+            expected = brute_force_best(quotes) if len(quotes) > 1 else None
+            if expected is None or expected[0] < scanner.min_net_spread:
+                assert signals == []
+                active = None
+                continue
+            pair = expected[1:]
+            if pair != active:
+                assert len(signals) == 1
+                assert signals[0].net_spread == pytest.approx(expected[0])
+                assert (signals[0].buy_venue, signals[0].sell_venue) == pair
+            else:
+                assert signals == []
+            active = pair
+        # 失效条目被定期压缩
+        assert len(book.bids) <= 4 * len(book.quotes) + 8
+
+
+class TestTriangular:
+    """单交易所三角路径"""
+
+    def test_symbol_split(self):
+        assert split_symbol("ETHBTC") == ("ETH", "BTC")
+        assert split_symbol("BTCUSDT") == ("BTC", "USDT")
+        assert split_symbol("SOL-USDC") == ("SOL", "USDC")
+        assert split_symbol("XYZ") is None
+
+    def test_detects_profitable_cycle(self):
+        scanner = ArbitrageScanner(min_net_spread=0.001, default_fee_rate=0.0005)
+        assert scanner.update("a", "BTCUSDT", 30000, 30001) == []
+        assert scanner.update("a", "ETHUSDT", 2000, 2000.2) == []
+        # 隐含汇率 2000/30000 ≈ 0.0667，ETHBTC 报价偏低时 USDT->ETH->BTC 吃亏，反向 USDT->BTC->ETH 获利
+        signals = scanner.update("a", "ETHBTC", 0.0660, 0.0661)
+        triangles = [s for s in signals if isinstance(s, TriangularOpportunity)]
+        assert len(triangles) == 1
+        triangle = triangles[0]
+        assert triangle.path[0] == triangle.path[-1]
+        assert [(leg[0], leg[1]) for leg in triangle.legs] == [
+            ("BTCUSDT", "buy"), ("ETHBTC", "buy"), ("ETHUSDT", "sell")
+        ]
+        expected = (0.9995 / 30001) * (0.9995 / 0.0661) * 2000 * 0.9995 - 1
+        assert triangle.net_return == pytest.approx(expected)
+        # 路径持续获利时不重复发出，另一交易所的行情不影响该交易所的路径
+        assert scanner.update("a", "ETHBTC", 0.0659, 0.0660) == []
+        assert scanner.update("b", "ETHBTC", 0.0659, 0.0660) == []
+        assert scanner.get_stats()['triangles'] == {"a": 2, "b": 0}
+
+
+class TestStrategyIntegration:
+    """策略接入扫描器"""
+
+    @pytest.mark.asyncio
+    async def test_strategy_buys_low_ask_and_sells_high_bid(self):
+        config = StrategyConfig(
+            strategy_id="arb_scan",
+            strategy_type=StrategyType.ARBITRAGE,
+            user_id=1,
+            account_id=1,
+            symbol="BTCUSDT",
+            base_quantity=Decimal('0.01'),
+            arbitrage_threshold=Decimal('0.002')
+        )
+        strategy = ArbitrageStrategy(config)
+        strategy.logger.disabled = True
+        strategy.update_exchange_price(ExchangeName.BINANCE, {
+            'symbol': 'BTCUSDT', 'bid_price': '30000', 'ask_price': '30001', 'ask_quantity': '0.5'
+        })
+        strategy.update_exchange_price(ExchangeName.OKX, {
+            'symbol': 'BTCUSDT', 'bid_price': '30200', 'ask_price': '30201', 'bid_quantity': '0.3'
+        })
+
+        opportunities = await strategy._scan_arbitrage_opportunities("BTCUSDT")
+        assert len(opportunities) == 1
+        opportunity = opportunities[0]
+        assert opportunity.buy_exchange == ExchangeName.BINANCE
+        assert opportunity.sell_exchange == ExchangeName.OKX
+        assert (opportunity.buy_price, opportunity.sell_price) == (Decimal('30001.0'), Decimal('30200.0'))
+        assert opportunity.net_profit_after_fees > 0
+        # 机会只在价差出现时取出一次
+        assert await strategy._scan_arbitrage_opportunities("BTCUSDT") == []
+
+        price = strategy.get_exchange_price(ExchangeName.OKX, "BTCUSDT")
+        assert price.bid_price == Decimal('30200.0')
+        assert strategy.get_arbitrage_status()['price_data_count'] == 2
+
+    @pytest.mark.asyncio
+    async def test_pending_opportunities_stay_bounded(self):
+        config = StrategyConfig(
+            strategy_id="arb_pending",
+            strategy_type=StrategyType.ARBITRAGE,
+            user_id=1,
+            account_id=1,
+            symbol="BTCUSDT",
+            base_quantity=Decimal('0.01'),
+            arbitrage_threshold=Decimal('0.002')
+        )
+        strategy = ArbitrageStrategy(config)
+        strategy.logger.disabled = True
+        strategy.update_exchange_price(ExchangeName.BINANCE, {
+            'symbol': 'ETHUSDT', 'bid_price': '2000', 'ask_price': '2001', 'ask_quantity': '5'
+        })
+        # 未被扫描的交易对上价差反复出现，同一交易所组合只保留最新机会
+        for i in range(200):
+            bid = '2100' if i % 2 == 0 else '2001'
+            strategy.update_exchange_price(ExchangeName.OKX, {
+                'symbol': 'ETHUSDT', 'bid_price': bid, 'ask_price': '2101', 'bid_quantity': '5'
+            })
+        pending = strategy._pending_opportunities['ETHUSDT']
+        assert len(pending) == 1
+        assert pending[(ExchangeName.BINANCE, ExchangeName.OKX)].sell_price == Decimal('2100.0')
+
+        pending[(ExchangeName.BINANCE, ExchangeName.OKX)].expires_at = datetime.now() - timedelta(seconds=1)
+        await strategy._cleanup_expired_opportunities()
+        assert strategy._pending_opportunities == {}
+
+
+class TestScannerThroughput:
+    """数百个交易对下的单次更新开销"""
+
+    def test_update_cost_with_many_symbols(self):
+        rng = random.Random(9)
+        scanner = ArbitrageScanner(min_net_spread=0.002)
+        symbols = [f"C{i}USDT" for i in range(400)]
+        mids = {symbol: rng.uniform(1, 1000) for symbol in symbols}
+        for symbol in symbols:
+            for venue in VENUES:
+                scanner.update(venue, symbol, mids[symbol] * 0.9999, mids[symbol] * 1.0001)
+
+        updates = []
+        for _ in range(60000):
+            symbol = rng.choice(symbols)
+            mid = mids[symbol] * (1 + rng.gauss(0, 0.0015))
+            updates.append((rng.choice(VENUES), symbol, mid * 0.9999, mid * 1.0001))
+
+        started = time.perf_counter()
+        signals = 0
+        for venue, symbol, bid, ask in updates:
+            signals += len(scanner.update(venue, symbol, bid, ask))
+        per_update_us = (time.perf_counter() - started) / len(updates) * 1e6
+
+        print(f"\n{len(symbols)}个交易对x{len(VENUES)}个交易所: 每次更新 {per_update_us:.1f}us, 信号{signals}个")
+        assert signals > 0
+        assert per_update_us < 200
@@ -0,0 +1,295 @@
+"""
+回测引擎测试
+验证模拟撮合规则、虚拟时钟，以及网格、趋势和条件规则策略的回放结果，
+并测量回放吞吐量
+"""
+
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.backtesting import (
+    Bar,
+    BacktestConfig,
+    Backtester,
+    ConditionRule,
+    ConditionRuleStrategy,
+    SimulatedExchange,
+    VirtualClock,
+    bars_from_ticks
+)
+from backend.src.conditions.base_conditions import ConditionOperator
+from backend.src.conditions.condition_engine import ConditionEngine
+from backend.src.conditions.price_conditions import PriceCondition, PriceType
+from backend.src.strategies.base import (
+    BaseSpotStrategy,
+    OrderRequest,
+    OrderSide,
+    OrderType,
+    StrategyConfig,
+    StrategyType
+)
+from backend.src.strategies.spot import grid as grid_module
+from backend.src.strategies.spot.grid import GridStrategy
+from backend.src.strategies.futures.trend import TrendFollowingStrategy
+from backend.src.strategies.futures.base_futures_strategy import (
+    FuturesStrategyConfig,
+    FuturesStrategyType
+)
+
+START = datetime(2023, 1, 1)
+MINUTES_PER_YEAR = 365 * 24 * 60
+
+
+def synthetic_bars(count: int, seed: int = 1, start_price: float = 30000.0, volatility: float = 0.0008):
+    """生成1分钟K线随机游走"""
+    rng = random.Random(seed)
+    bars = []
+    price = start_price
+    for i in range(count):
+        open_price = price
+        price = max(1.0, price * (1 + rng.gauss(0, volatility)))
+        high = max(open_price, price) * (1 + abs(rng.gauss(0, volatility / 3)))
+        low = min(open_price, price) * (1 - abs(rng.gauss(0, volatility / 3)))
+        bars.append(Bar(START + timedelta(minutes=i + 1), open_price, high, low, price, rng.uniform(1, 10)))
+    return bars
+
+
+def order(order_id: str, side: OrderSide, order_type: OrderType = OrderType.LIMIT,
+          quantity: str = "1", price: str = None) -> OrderRequest:
+    return OrderRequest(
+        order_id=order_id,
+        symbol="BTCUSDT",
+        order_type=order_type,
+        order_side=side,
+        quantity=Decimal(quantity),
+        price=Decimal(price) if price else None
+    )
+
+
+def spot_config(strategy_id: str, strategy_type: StrategyType = StrategyType.GRID, **kwargs) -> StrategyConfig:
+    return StrategyConfig(
+        strategy_id=strategy_id,
+        strategy_type=strategy_type,
+        user_id=1,
+        account_id=1,
+        symbol="BTCUSDT",
+        base_quantity=Decimal('0.01'),
+        **kwargs
+    )
+
+
+class IdleStrategy(BaseSpotStrategy):
+    """不下单的策略，用于测量回放引擎本身的开销"""
+
+    async def get_next_orders(self, market_data):
+        return []
+
+    async def process_order_result(self, order_result):
+        return True
+
+
+class TestSimulatedExchange:
+    """模拟撮合规则"""
+
+    def test_limit_order_fills_at_limit_or_better(self):
+        exchange = SimulatedExchange(maker_fee_rate=0.001, taker_fee_rate=0.002)
+        exchange.submit(order("b1", OrderSide.BUY, price="100"), START)
+        exchange.submit(order("b2", OrderSide.BUY, price="90"), START)
+
+        # 最低价未触及90，只有100的买单成交
+        fills = exchange.match(Bar(START + timedelta(minutes=1), 101, 102, 99, 100))
+        assert [fill.order.order_id for fill in fills] == ["b1"]
+        assert fills[0].price == 100
+        assert fills[0].liquidity == "maker"
+        assert fills[0].commission == pytest.approx(0.1)
+
+        # 跳空低开时按开盘价成交
+        fills = exchange.match(Bar(START + timedelta(minutes=2), 85, 86, 84, 85))
+        assert fills[0].price == 85
+
+    def test_market_order_pays_slippage_and_taker_fee(self):
+        exchange = SimulatedExchange(taker_fee_rate=0.002, slippage_bps=10)
+        exchange.submit(order("m1", OrderSide.BUY, OrderType.MARKET), START)
+        fill = exchange.match(Bar(START + timedelta(minutes=1), 100, 101, 99, 100))[0]
+
+        assert fill.price == pytest.approx(100.1)
+        assert fill.commission == pytest.approx(100.1 * 0.002)
+        assert fill.liquidity == "taker"
+
+    def test_latency_delays_activation(self):
+        exchange = SimulatedExchange(latency_ms=90_000)
+        exchange.submit(order("m1", OrderSide.BUY, OrderType.MARKET), START)
+
+        assert exchange.match(Bar(START + timedelta(minutes=1), 100, 100, 100, 100)) == []
+        fills = exchange.match(Bar(START + timedelta(minutes=2), 105, 105, 105, 105))
+        assert fills[0].price == 105
+
+    def test_orders_expire_after_timeout(self):
+        exchange = SimulatedExchange(order_timeout_seconds=120)
+        exchange.submit(order("b1", OrderSide.BUY, price="50"), START)
+        exchange.match(Bar(START + timedelta(minutes=1), 100, 100, 100, 100))
+
+        assert exchange.expire_orders(START + timedelta(minutes=1)) == []
+        expired = exchange.expire_orders(START + timedelta(minutes=2))
+        assert [o.order_id for o in expired] == ["b1"]
+        assert exchange.open_orders() == []
+
+    def test_position_and_realized_pnl(self):
+        exchange = SimulatedExchange(initial_balance=1000, maker_fee_rate=0, taker_fee_rate=0)
+        exchange.submit(order("b1", OrderSide.BUY, price="100", quantity="2"), START)
+        exchange.match(Bar(START + timedelta(minutes=1), 100, 100, 100, 100))
+        exchange.submit(order("s1", OrderSide.SELL, price="110", quantity="3"), START)
+        fill = exchange.match(Bar(START + timedelta(minutes=2), 110, 110, 110, 110))[0]
+
+        # 平掉2个多头盈利20，剩余1个空头，均价110
+        assert fill.realized_pnl == pytest.approx(20)
+        assert exchange.position == pytest.approx(-1)
+        assert exchange.average_price == pytest.approx(110)
+        assert exchange.equity(110) == pytest.approx(1020)
+
+    def test_zero_quantity_fill_leaves_position_unchanged(self):
+        exchange = SimulatedExchange(initial_balance=1000, maker_fee_rate=0, taker_fee_rate=0)
+        # 空仓时数量为0的成交不能除以0
+        assert exchange._update_position(0.0, 100) == 0
+        assert (exchange.position, exchange.average_price) == (0, 0)
+
+        exchange._update_position(2.0, 100)
+        assert exchange._update_position(0.0, 120) == 0
+        assert (exchange.position, exchange.average_price) == (2.0, 100)
+
+
+class TestVirtualClock:
+    """虚拟时钟替换策略模块的datetime"""
+
+    def test_patch_and_restore(self):
+        clock = VirtualClock(START)
+        strategy = GridStrategy(spot_config("clock_grid"))
+        real_datetime = grid_module.datetime
+
+        with clock.patch(VirtualClock.modules_for(strategy)):
+            assert grid_module.datetime.now() == START
+            clock.set(START + timedelta(hours=1))
+            assert grid_module.datetime.now() == START + timedelta(hours=1)
+            assert isinstance(datetime(2020, 1, 1), grid_module.datetime)
+
+        assert grid_module.datetime is real_datetime
+
+
+class TestStrategyReplay:
+    """现有策略回放"""
+
+    @pytest.mark.asyncio
+    async def test_grid_replay(self):
+        bars = synthetic_bars(3000)
+        config = spot_config("bt_grid", grid_levels=10, grid_spacing=Decimal('0.002'))
+        strategy = GridStrategy(config)
+        result = await Backtester(strategy, BacktestConfig(slippage_bps=1, latency_ms=500)).run(bars)
+
+        assert result.bars_processed == len(bars)
+        assert len(result.equity_curve) == len(bars)
+        assert result.trades
+        assert result.end_time == bars[-1].timestamp
+
+        # 订单ID使用虚拟时间
+        first_trade = result.trades[0]
+        order_time = int(first_trade["order_id"].rsplit("_", 1)[1])
+        assert bars[0].timestamp.timestamp() <= order_time <= bars[-1].timestamp.timestamp()
+        assert {"timestamp", "symbol", "side", "quantity", "price", "pnl", "commission", "strategy"} <= first_trade.keys()
+
+        # 权益 = 初始资金 + 已实现盈亏 - 手续费 + 未实现盈亏
+        stats = result.statistics
+        exchange_unrealized = result.final_equity - (
+            result.initial_balance + stats['realized_pnl'] - stats['commission_paid']
+        )
+        expected_unrealized = sum(
+            (1 if t["side"] == "buy" else -1) * t["quantity"] for t in result.trades
+        ) * bars[-1].close - sum(
+            (1 if t["side"] == "buy" else -1) * t["quantity"] * t["price"] for t in result.trades
+        ) - stats['realized_pnl']
+        assert exchange_unrealized == pytest.approx(expected_unrealized, abs=1e-6)
+
+    @pytest.mark.asyncio
+    async def test_trend_replay_runs_without_errors(self):
+        bars = synthetic_bars(1500, seed=4)
+        config = FuturesStrategyConfig(
+            strategy_id="bt_trend",
+            strategy_type=FuturesStrategyType.TREND_FOLLOWING,
+            user_id=1,
+            account_id=1,
+            symbol="BTCUSDT",
+            base_quantity=Decimal('0.01')
+        )
+        strategy = TrendFollowingStrategy(config)
+        result = await Backtester(strategy).run(bars)
+
+        assert result.bars_processed == len(bars)
+        assert strategy.state.error_count == 0
+        assert strategy.trend_analyzer.price_history[-1] == pytest.approx(Decimal(repr(bars[-1].close)))
+
+    @pytest.mark.asyncio
+    async def test_condition_rules_replay(self):
+        ticks = [{"timestamp": START + timedelta(seconds=i), "price": price}
+                 for i, price in enumerate([100, 99, 94, 93, 96, 100, 106, 107, 101, 94])]
+        engine = ConditionEngine()
+        buy_below = PriceCondition("BTCUSDT", PriceType.CURRENT_PRICE, ConditionOperator.LESS_THAN,
+                                   95.0, comparison_price=100.0)
+        sell_above = PriceCondition("BTCUSDT", PriceType.CURRENT_PRICE, ConditionOperator.GREATER_THAN,
+                                    105.0, comparison_price=100.0)
+        engine.register_condition(buy_below)
+        engine.register_condition(sell_above)
+
+        strategy = ConditionRuleStrategy(
+            spot_config("bt_rules", StrategyType.MEAN_REVERSION),
+            engine,
+            [
+                ConditionRule(buy_below.condition_id, OrderSide.BUY, Decimal('1')),
+                ConditionRule(sell_above.condition_id, OrderSide.SELL, Decimal('1'))
+            ]
+        )
+        config = BacktestConfig(maker_fee_rate=0, taker_fee_rate=0)
+        result = await Backtester(strategy, config).run(bars_from_ticks(ticks))
+
+        # 低于95买入（边沿触发只下一单），高于105卖出，最后再次跌破95买入
+        # 跌破95时买入，下一笔行情成交；边沿触发不会重复下单；最后一笔行情的买单尚未成交
+        assert [(t["side"], t["price"]) for t in result.trades] == [("buy", 93.0), ("sell", 107.0)]
+        assert result.statistics['open_orders'] == 1
+        assert result.trades[1]["pnl"] == pytest.approx(14.0)
+
+    @pytest.mark.asyncio
+    async def test_performance_analyzer_accepts_trades(self):
+        pytest.importorskip("sklearn")
+        from backend.src.ai.analyzer.performance_analyzer import PerformanceAnalyzer
+
+        config = spot_config("bt_analyzer", grid_levels=10, grid_spacing=Decimal('0.002'))
+        result = await Backtester(GridStrategy(config)).run(synthetic_bars(2000, seed=2))
+        insight = await PerformanceAnalyzer().analyze_performance(
+            "bt_analyzer", "strategy", result.to_performance_data()
+        )
+        assert insight.entity_id == "bt_analyzer"
+
+
+class TestReplayThroughput:
+    """回放吞吐量"""
+
+    @pytest.mark.asyncio
+    async def test_year_of_minute_bars_replays_in_seconds(self):
+        bars = synthetic_bars(100_000, seed=3)
+
+        idle = await Backtester(IdleStrategy(spot_config("bt_idle"))).run(bars)
+        grid_config = spot_config("bt_grid_speed", grid_levels=10, grid_spacing=Decimal('0.005'))
+        grid = await Backtester(GridStrategy(grid_config)).run(bars[:20_000])
+
+        idle_year = MINUTES_PER_YEAR / idle.statistics['bars_per_second']
+        grid_year = MINUTES_PER_YEAR / grid.statistics['bars_per_second']
+        print(f"回放引擎开销: {idle.statistics['bars_per_second']:,.0f} 根/秒, 一年1分钟K线约 {idle_year:.1f}s")
+        print(f"网格策略: {grid.statistics['bars_per_second']:,.0f} 根/秒, 一年1分钟K线约 {grid_year:.1f}s, "
+              f"{len(grid.trades)} 笔成交")
+
+        assert idle_year < 30
@@ -0,0 +1,178 @@
+"""
+批量推理测试
+验证价格预测与信号评分的批量接口与单条接口结果一致、无效输入逐条报错、推理服务合并并发请求，
+并测量1000个交易对的评分耗时
+"""
+
+import asyncio
+import time
+from decimal import Decimal
+
+import pytest
+
+import sys
+import os
+import types
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+pytest.importorskip("sklearn")
+
+# 绕过 ai/__init__（引用了不存在的 ai_analyzer），直接导入模型子模块
+AI_PACKAGE = Path(__file__).resolve().parents[2] / "backend" / "src" / "ai"
+if "backend.src.ai" not in sys.modules:
+    sys.modules["backend.src.ai"] = types.ModuleType("backend.src.ai")
+    sys.modules["backend.src.ai"].__path__ = [str(AI_PACKAGE)]
+
+from backend.src.ai.models import BatchInferenceServer, PricePredictor, SignalScorer
+
+
+def make_models():
+    predictor = PricePredictor()
+    scorer = SignalScorer()
+    predictor.is_trained = True
+    scorer.is_trained = True
+    return predictor, scorer
+
+
+def price_input(i: int) -> dict:
+    return {
+        "symbol": f"C{i}USDT",
+        "current_price": 100 + i,
+        "price": 100 + i,
+        "volume": 500 + 10 * i,
+        "rsi": 20 + i % 60,
+        "macd": 0.1,
+        "bb_upper": 110 + i,
+        "bb_lower": 90 + i,
+        "volatility": 0.02
+    }
+
+
+def signal_input(i: int) -> dict:
+    return {
+        "symbol": f"C{i}USDT",
+        "rsi": 20 + i % 60,
+        "macd": (i % 7 - 3) / 3,
+        "bb_position": (i % 10) / 10,
+        "volume_sma": 300 + 20 * i,
+        "price_momentum": 0.5,
+        "volatility": 0.02,
+        "atr": 1.5,
+        "stoch_k": 40,
+        "stoch_d": 45,
+        "williams_r": -60
+    }
+
+
+class TestPredictBatch:
+    """批量接口"""
+
+    @pytest.mark.asyncio
+    async def test_batch_matches_single_prediction(self):
+        predictor, scorer = make_models()
+        single = await predictor.predict(price_input(3))
+        batch = await predictor.predict_batch([price_input(i) for i in range(5)])
+        assert len(batch) == 5
+        assert set(batch[3]) == set(single)
+        assert batch[3]["current_price"] == Decimal("103")
+        assert batch[3]["confidence"] == single["confidence"]
+        assert batch[3]["risk_score"] == single["risk_score"]
+        assert batch[0]["model_metadata"]["batch_size"] == 5
+        assert predictor.metadata.prediction_count == 6
+
+        single = await scorer.predict(signal_input(3))
+        batch = await scorer.predict_batch([signal_input(i) for i in range(5)])
+        assert set(batch[3]) == set(single)
+        assert batch[3]["features"]["macd"] == Decimal("0")
+        assert batch[3]["features"]["bb_position"] == Decimal("0.3")
+        assert batch[3]["features"]["volatility"] == Decimal("0.02")
+        for result in batch:
+            assert Decimal("0") <= result["score"] <= Decimal("1")
+
+    @pytest.mark.asyncio
+    async def test_vectorized_score_follows_rules(self):
+        _, scorer = make_models()
+        scorer.FORWARD_PASS_SECONDS = 0
+        strong = {**signal_input(0), "rsi": 25, "macd": 1.0, "bb_position": 1.0, "volume_sma": 3000,
+                  "price_momentum": 0}
+        weak = {**signal_input(1), "rsi": 75, "macd": -1.0, "bb_position": 0.0, "volume_sma": 100,
+                "price_momentum": 0}
+        results = await scorer.predict_batch([strong, weak] * 50)
+        strong_scores = [r["score"] for r in results[0::2]]
+        weak_scores = [r["score"] for r in results[1::2]]
+        # 0.5+0.2+0.1+0.15+0.1 截断到1，0.5-0.2-0.1-0.15-0.1 截断到0，噪声标准差0.05
+        assert sum(strong_scores) / 50 > Decimal("0.9")
+        assert sum(weak_scores) / 50 < Decimal("0.1")
+
+    @pytest.mark.asyncio
+    async def test_invalid_rows_reported_individually(self):
+        predictor, _ = make_models()
+        batch = [price_input(0), {"symbol": "BAD"}, price_input(2)]
+        results = await predictor.predict_batch(batch, return_exceptions=True)
+        assert isinstance(results[1], ValueError)
+        assert results[0]["symbol"] == "C0USDT" and results[2]["symbol"] == "C2USDT"
+
+        with pytest.raises(ValueError):
+            await predictor.predict_batch(batch)
+
+        predictor.is_trained = False
+        with pytest.raises(ValueError):
+            await predictor.predict_batch([price_input(0)], return_exceptions=True)
+
+
+class TestInferenceServer:
+    """推理服务合并请求"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_are_coalesced(self):
+        predictor, _ = make_models()
+        server = BatchInferenceServer(predictor, max_batch_size=64, max_wait_ms=2)
+        results = await asyncio.gather(*(server.predict(price_input(i)) for i in range(200)))
+
+        assert [r["symbol"] for r in results] == [f"C{i}USDT" for i in range(200)]
+        stats = server.get_stats()
+        assert stats["batches"] == 4
+        assert stats["largest_batch"] == 64
+        assert stats["pending_requests"] == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_resolve_each_request(self):
+        predictor, _ = make_models()
+        server = BatchInferenceServer(predictor, max_wait_ms=1)
+        good, bad = await asyncio.gather(
+            server.predict(price_input(1)), server.predict({"symbol": "BAD"}),
+            return_exceptions=True
+        )
+        assert good["symbol"] == "C1USDT"
+        assert isinstance(bad, ValueError)
+
+        predictor.is_trained = False
+        with pytest.raises(ValueError):
+            await server.predict(price_input(1))
+        await server.close()
+        assert server.get_stats()["failed_requests"] == 2
+
+
+class TestBatchThroughput:
+    """1000个交易对的评分耗时"""
+
+    @pytest.mark.asyncio
+    async def test_score_1000_symbols(self):
+        predictor, scorer = make_models()
+        price_server = BatchInferenceServer(predictor, max_batch_size=1000)
+        signal_server = BatchInferenceServer(scorer, max_batch_size=1000)
+
+        started = time.perf_counter()
+        predictions, scores = await asyncio.gather(
+            asyncio.gather(*(price_server.predict(price_input(i)) for i in range(1000))),
+            asyncio.gather(*(signal_server.predict(signal_input(i)) for i in range(1000)))
+        )
+        elapsed = time.perf_counter() - started
+
+        serial = 1000 * (PricePredictor.FORWARD_PASS_SECONDS + SignalScorer.FORWARD_PASS_SECONDS)
+        print(f"\n1000个交易对: 批量评分 {elapsed * 1e3:.0f}ms "
+              f"({price_server.get_stats()['batches']}+{signal_server.get_stats()['batches']}批), "
+              f"逐个串行约 {serial:.0f}s")
+        assert len(predictions) == len(scores) == 1000
+        assert elapsed < 0.5
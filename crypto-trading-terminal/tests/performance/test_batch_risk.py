@@ -0,0 +1,219 @@
+"""
+批量全局风险评估测试
+验证向量化评估的综合风险等级、保证金比例和追加保证金与逐仓位控制器一致，
+监控循环按间隔实际执行检查，并对比逐仓位评估与批量评估的耗时
+"""
+
+import asyncio
+import random
+import time
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.strategies.futures.base_futures_strategy import FuturesMarketData, FuturesPosition
+from backend.src.strategies.futures.futures_risk_controls import (
+    RISK_LEVEL_NAMES,
+    BatchRiskEvaluator,
+    FuturesRiskController,
+    RiskBook,
+    RiskMonitoringService
+)
+from backend.src.strategies.futures.leverage_manager import PositionMetrics
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+
+
+def make_market():
+    return {
+        "BTCUSDT": FuturesMarketData("BTCUSDT", Decimal("50000"), Decimal("49999"), Decimal("50001"),
+                                     Decimal("1000000"), Decimal("0.02"), datetime.now(),
+                                     funding_rate=Decimal("0.0015"), implied_volatility=Decimal("0.06"),
+                                     mark_price=Decimal("50010")),
+        "ETHUSDT": FuturesMarketData("ETHUSDT", Decimal("3000"), Decimal("2999"), Decimal("3001"),
+                                     Decimal("500000"), Decimal("0.25"), datetime.now()),
+        "SOLUSDT": FuturesMarketData("SOLUSDT", Decimal("100"), Decimal("99.9"), Decimal("100.1"),
+                                     Decimal("100000"), Decimal("-0.01"), datetime.now(),
+                                     implied_volatility=Decimal("0.2"), funding_rate=Decimal("-0.0001")),
+    }
+
+
+def make_snapshot(users: int, per_user: int, seed: int = 1):
+    rng = random.Random(seed)
+    market = make_market()
+    positions, balances = {}, {}
+    for user in range(users):
+        key = f"{user}_1"
+        balances[key] = {
+            "wallet_balance": Decimal(str(round(rng.uniform(-500, 20000), 2))),
+            "available_balance": Decimal("1000")
+        }
+        user_positions = []
+        for _ in range(per_user):
+            symbol = rng.choice(SYMBOLS)
+            price = market[symbol].current_price
+            quantity = Decimal(str(round(rng.uniform(0.01, 2), 3))) * rng.choice([1, -1])
+            leverage = Decimal(rng.choice([1, 3, 5, 10, 20, 50]))
+            notional = abs(quantity) * price
+            user_positions.append(FuturesPosition(
+                symbol=symbol,
+                quantity=quantity,
+                average_price=price * Decimal(str(round(rng.uniform(0.9, 1.1), 4))),
+                unrealized_pnl=Decimal(str(round(rng.uniform(-0.5, 0.3) * float(notional) / float(leverage), 2))),
+                margin_used=notional / leverage * Decimal(str(round(rng.uniform(0.5, 2), 3))) if rng.random() > 0.05 else Decimal("0"),
+                liquidation_price=price * Decimal("0.9") if rng.random() > 0.3 else None,
+                leverage=leverage
+            ))
+        positions[key] = user_positions
+    # 没有余额的用户不参与评估
+    positions["999999_1"] = [FuturesPosition(symbol="BTCUSDT", quantity=Decimal("1"), average_price=Decimal("50000"))]
+    return positions, market, balances
+
+
+class TestParity:
+    """与逐仓位控制器一致"""
+
+    def test_matches_controller_assessment(self):
+        positions, market, balances = make_snapshot(60, 8)
+        result = BatchRiskEvaluator().evaluate(RiskBook.from_positions(positions, market, balances))
+        assert len(result.book) == 480
+
+        async def legacy():
+            rows = []
+            for user_key, user_positions in positions.items():
+                if user_key not in balances:
+                    continue
+                wallet = balances[user_key]["wallet_balance"]
+                for position in user_positions:
+                    controller = FuturesRiskController(position.symbol, int(user_key.split("_")[0]), 1)
+                    assessment = await controller.assess_position_risk(
+                        position, market[position.symbol], wallet, balances[user_key]["available_balance"]
+                    )
+                    metrics = PositionMetrics(position.symbol, position, wallet,
+                                              wallet + position.unrealized_pnl, Decimal("1000"))
+                    margin_call = await controller.check_margin_call_conditions(metrics, market[position.symbol])
+                    rows.append((assessment, margin_call))
+            return rows
+
+        expected = asyncio.run(legacy())
+        levels = [RISK_LEVEL_NAMES[level] for level in result.risk_level]
+        assert levels == [assessment["risk_level"] for assessment, _ in expected]
+        assert result.margin_ratio == pytest.approx(
+            [assessment["position_metrics"]["margin_ratio"] for assessment, _ in expected])
+        assert result.score == pytest.approx(
+            [float(assessment["overall_score"]) for assessment, _ in expected])
+
+        assert list(result.margin_call) == [call is not None for _, call in expected]
+        for row, (_, call) in enumerate(expected):
+            if call is not None:
+                assert result.additional_margin[row] == pytest.approx(call["additional_margin_required"])
+                assert bool(result.margin_call_critical[row]) == (call["severity"] == "critical")
+
+        # 样本覆盖多个风险等级和追加保证金
+        assert len(set(levels)) >= 3
+        assert result.margin_call.any()
+
+    def test_liquidation_band_raises_score(self):
+        market = make_market()
+        positions = {"1_1": [
+            FuturesPosition(symbol="ETHUSDT", quantity=Decimal("1"), average_price=Decimal("3000"),
+                            margin_used=Decimal("300"), liquidation_price=liquidation, leverage=Decimal("10"))
+            for liquidation in (Decimal("2700"), None, Decimal("2000"))
+        ]}
+        balances = {"1_1": {"wallet_balance": Decimal("10000"), "available_balance": Decimal("1000")}}
+        result = BatchRiskEvaluator().evaluate(RiskBook.from_positions(positions, market, balances))
+
+        # 价格进入紧急区间时强平项按CRITICAL计分，远离强平价与无强平价格同为LOW
+        assert list(result.liquidation_action) == [2, 0, 0]
+        assert result.score[0] > result.score[1] == result.score[2]
+
+        async def legacy():
+            controller = FuturesRiskController("ETHUSDT", 1, 1)
+            return [
+                await controller.assess_position_risk(position, market["ETHUSDT"], Decimal("10000"), Decimal("1000"))
+                for position in positions["1_1"]
+            ]
+
+        expected = asyncio.run(legacy())
+        assert result.score == pytest.approx([float(assessment["overall_score"]) for assessment in expected])
+
+    def test_empty_book(self):
+        result = BatchRiskEvaluator().evaluate(RiskBook.from_positions({}, {}, {}))
+        summary = result.summary()
+        assert summary["total_positions"] == 0
+        assert summary["overall_risk_score"] == Decimal("0")
+
+
+class TestMonitoringLoop:
+    """监控循环按间隔执行全局检查"""
+
+    def test_loop_runs_global_check(self):
+        positions, market, balances = make_snapshot(20, 5)
+        service = RiskMonitoringService()
+        service.monitoring_interval = 0.01
+        controller = FuturesRiskController("BTCUSDT", 0, 1)
+        service.register_controller(controller)
+
+        calls = []
+
+        async def provider():
+            calls.append(time.perf_counter())
+            return positions, market, balances
+
+        received = []
+
+        async def run():
+            service.set_snapshot_provider(provider)
+            service.set_assessment_callback(received.append)
+            await service.start_monitoring()
+            await asyncio.sleep(0.2)
+            await service.stop_monitoring()
+
+        asyncio.run(run())
+        assert len(calls) >= 3
+        assert len(received) == len(calls)
+        assessment = service.get_monitoring_statistics()["last_assessment"]
+        assert assessment["total_positions"] == 100
+        assert assessment["total_users"] == 21
+        assert assessment["high_risk_positions"] + assessment["critical_risk_positions"] == \
+            int(np.count_nonzero(service.last_result.risk_level >= 2))
+
+
+class TestThroughput:
+    """逐仓位评估与批量评估耗时"""
+
+    def test_book_evaluation_cost(self):
+        positions, market, balances = make_snapshot(10000, 10, seed=3)
+        service = RiskMonitoringService()
+
+        sample = [(key, p) for key, user_positions in list(positions.items())[:200] for p in user_positions]
+
+        async def legacy():
+            started = time.perf_counter()
+            for user_key, position in sample:
+                controller = FuturesRiskController(position.symbol, 1, 1)
+                await controller.assess_position_risk(position, market[position.symbol],
+                                                      balances[user_key]["wallet_balance"], Decimal("0"))
+            return (time.perf_counter() - started) / len(sample)
+
+        per_position = asyncio.run(legacy())
+
+        started = time.perf_counter()
+        book = RiskBook.from_positions(positions, market, balances)
+        packed = time.perf_counter() - started
+        started = time.perf_counter()
+        result = service.batch_evaluator.evaluate(book)
+        evaluated = time.perf_counter() - started
+
+        count = len(book)
+        print(f"\n{count}个仓位: 逐仓位评估约 {per_position * count:.2f}s, "
+              f"批量打包 {packed * 1000:.0f}ms + 向量化评估 {evaluated * 1000:.1f}ms")
+        assert count == 100000
+        assert len(result.risk_level) == count
+        assert packed + evaluated < per_position * count
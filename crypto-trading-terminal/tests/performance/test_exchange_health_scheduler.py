@@ -0,0 +1,235 @@
+"""
+交易所健康探测调度测试
+验证单一调度任务并发执行带超时的健康探测、慢交易所不拖延其他交易所的检测、
+探测间隔随健康状况自适应、WebSocket流量作为隐式心跳免去额外探测，
+以及增量维护的状态计数与逐个扫描结果一致
+"""
+
+import asyncio
+import json
+import random
+import time
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.core import exchange_status, ws_client_manager
+from backend.src.core.exchange_status import ConnectionStatus, ExchangeStatusManager
+from backend.src.core.ws_client_manager import WebSocketConnection
+
+
+class FakeAdapter:
+    """可控制延迟和健康结果的适配器"""
+
+    def __init__(self, delay: float = 0.0, healthy: bool = True):
+        self.delay = delay
+        self.healthy = healthy
+        self.calls = 0
+
+    async def is_healthy(self) -> bool:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.healthy
+
+
+def make_manager() -> ExchangeStatusManager:
+    manager = ExchangeStatusManager()
+    manager.status_check_interval = 0.02
+    manager.min_probe_interval = 0.01
+    manager.max_probe_interval = 0.16
+    manager.probe_timeout = 0.05
+    return manager
+
+
+def scan_counts(manager: ExchangeStatusManager):
+    counts = {}
+    for connection in manager.connections.values():
+        counts[connection.connection_status] = counts.get(connection.connection_status, 0) + 1
+    return counts
+
+
+class TestConcurrentProbes:
+    """并发探测与超时"""
+
+    def test_slow_exchange_does_not_delay_others(self):
+        manager = make_manager()
+        adapters = {f"ex{i}_spot": FakeAdapter() for i in range(30)}
+        slow = FakeAdapter()
+        adapters["slow_futures"] = slow
+        failing = adapters["ex3_spot"]
+
+        async def run():
+            await manager.start_monitoring(adapters)
+            slow.delay = 10  # 初始化之后变慢
+            failing.healthy = False
+            started = time.monotonic()
+            while manager.connections["ex3_spot"].connection_status == ConnectionStatus.CONNECTED:
+                await asyncio.sleep(0.005)
+            detected = time.monotonic() - started
+            await asyncio.sleep(0.2)
+            await manager.stop_monitoring()
+            return detected
+
+        detected = asyncio.run(run())
+        # 慢交易所的探测超时（0.05秒）与其他交易所无关
+        assert detected < 0.1
+        assert manager.connections["slow_futures"].connection_status == ConnectionStatus.DISCONNECTED
+        assert manager.connections["slow_futures"].last_error == "健康检查超时"
+        assert manager.probe_stats["probe_timeouts"] >= 2
+        for key, adapter in adapters.items():
+            if key not in ("slow_futures", "ex3_spot"):
+                assert manager.connections[key].connection_status == ConnectionStatus.CONNECTED
+        assert list(manager.monitor_tasks) == []
+        assert manager.probe_tasks == {}
+
+
+class TestAdaptiveIntervals:
+    """间隔随健康状况调整"""
+
+    def test_healthy_slows_down_and_failure_speeds_up(self):
+        manager = make_manager()
+        healthy = FakeAdapter()
+        flaky = FakeAdapter()
+
+        async def run():
+            await manager.start_monitoring({"good_spot": healthy, "flaky_spot": flaky})
+            await asyncio.sleep(0.4)
+            good_interval = manager.probe_intervals["good_spot"]
+
+            flaky.healthy = False
+            await asyncio.sleep(0.3)
+            failing_interval = manager.probe_intervals["flaky_spot"]
+            failing_status = manager.connections["flaky_spot"].connection_status
+
+            flaky.healthy = True
+            await asyncio.sleep(0.1)
+            await manager.stop_monitoring()
+            return good_interval, failing_interval, failing_status
+
+        good_interval, failing_interval, failing_status = asyncio.run(run())
+        assert good_interval == manager.max_probe_interval
+        assert failing_interval == manager.min_probe_interval
+        assert failing_status == ConnectionStatus.DISCONNECTED
+        assert manager.connections["flaky_spot"].connection_status == ConnectionStatus.CONNECTED
+        # 健康连接的探测次数明显少于异常期间的探测次数
+        assert healthy.calls < flaky.calls
+
+    def test_ws_traffic_replaces_probes(self):
+        manager = make_manager()
+        streaming = FakeAdapter()
+        idle = FakeAdapter()
+
+        async def run():
+            await manager.start_monitoring({"stream_futures": streaming, "idle_futures": idle})
+            initial = streaming.calls
+            for _ in range(60):
+                manager.record_traffic("stream", "futures")
+                await asyncio.sleep(0.005)
+            await manager.stop_monitoring()
+            return initial
+
+        initial = asyncio.run(run())
+        assert streaming.calls == initial
+        assert idle.calls > initial
+        assert manager.probe_stats["implicit_heartbeats"] >= 2
+        assert manager.connections["stream_futures"].last_heartbeat is not None
+
+    def test_ws_messages_record_traffic(self):
+        manager = make_manager()
+        streaming = FakeAdapter()
+        received = []
+        message = json.dumps({"s": "BTCUSDT", "c": "50000", "v": "1"})
+
+        async def run():
+            exchange_status._status_manager = manager
+            try:
+                await manager.start_monitoring({"binance_spot": streaming})
+                ws_manager = await ws_client_manager.get_ws_client_manager()
+                connection = WebSocketConnection(
+                    subscription_id="binance_spot_BTCUSDT_ticker",
+                    ws_url="wss://example.invalid/ws",
+                    data_callbacks=[received.append],
+                    exchange="binance",
+                    market_type="spot",
+                    traffic_callback=ws_manager.record_traffic
+                )
+                initial = streaming.calls
+                # 消息经由WebSocket连接的处理路径登记流量
+                for _ in range(60):
+                    await connection._process_message(message)
+                    await asyncio.sleep(0.005)
+                await manager.stop_monitoring()
+                assert ws_manager.traffic_callback is None
+                return initial
+            finally:
+                exchange_status._status_manager = None
+                ws_client_manager._ws_client_manager = None
+
+        initial = asyncio.run(run())
+        assert len(received) == 60
+        assert streaming.calls == initial
+        assert manager.probe_stats["implicit_heartbeats"] >= 2
+
+    def test_failing_traffic_callback_does_not_drop_messages(self):
+        received = []
+
+        def broken_callback(exchange, market_type):
+            raise RuntimeError("status manager unavailable")
+
+        connection = WebSocketConnection(
+            subscription_id="binance_spot_BTCUSDT_ticker",
+            ws_url="wss://example.invalid/ws",
+            data_callbacks=[received.append],
+            exchange="binance",
+            market_type="spot",
+            traffic_callback=broken_callback
+        )
+        message = json.dumps({"s": "BTCUSDT", "c": "50000", "v": "1"})
+
+        async def run():
+            for _ in range(3):
+                await connection._process_message(message)
+
+        asyncio.run(run())
+        assert len(received) == 3
+
+
+class TestIncrementalCounters:
+    """增量计数与扫描一致"""
+
+    def test_counters_match_scan(self):
+        manager = make_manager()
+        adapters = {f"ex{i}_{market}": FakeAdapter(healthy=i % 4 != 0)
+                    for i in range(20) for market in ("spot", "futures")}
+        rng = random.Random(1)
+        statuses = list(ConnectionStatus)
+
+        async def run():
+            await manager.start_monitoring(adapters)
+            for _ in range(300):
+                key = rng.choice(list(manager.connections))
+                await manager._update_connection_status(key, rng.choice(statuses), "测试")
+                if rng.random() < 0.3:
+                    manager._add_errors(manager.connections[key], rng.randint(1, 3))
+            # 重连成功时清零错误次数
+            manager.reconnect_delay = 0
+            manager._add_errors(manager.connections["ex1_spot"], 5)
+            await manager._attempt_reconnection("ex1_spot")
+            assert manager.connections["ex1_spot"].error_count == 0
+            stats = await manager.get_connection_statistics()
+            await manager.stop_monitoring()
+            return stats
+
+        stats = asyncio.run(run())
+        counts = scan_counts(manager)
+        assert stats["total_connections"] == 40
+        assert stats["connected_count"] == counts.get(ConnectionStatus.CONNECTED, 0)
+        assert stats["disconnected_count"] == counts.get(ConnectionStatus.DISCONNECTED, 0)
+        assert stats["failed_count"] == counts.get(ConnectionStatus.FAILED, 0)
+        assert stats["total_errors"] == sum(c.error_count for c in manager.connections.values())
+        assert 0 <= stats["average_uptime_percentage"] <= 100
+
+        summary = manager.get_exchange_status_summary("ex1")
+        assert summary.active_connections == counts.get(ConnectionStatus.CONNECTED, 0)
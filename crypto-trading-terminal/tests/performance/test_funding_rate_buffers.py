@@ -0,0 +1,177 @@
+"""
+资金费率缓冲测试
+验证按交易对独立保留的费率缓冲按时间窗口淘汰、向量化统计与逐条Decimal计算一致、
+跨交易对排名与单个交易对的机会评分一致，并测量500个永续合约的排名耗时
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.strategies.futures.funding_rate_arbitrage import (
+    FundingRateAnalysis,
+    FundingRateBuffer
+)
+
+START = datetime(2024, 5, 1)
+
+
+def feed(analyzer: FundingRateAnalysis, symbols, points: int, seed: int = 1, step=timedelta(minutes=5)):
+    rng = random.Random(seed)
+    bias = {symbol: rng.uniform(-0.001, 0.001) for symbol in symbols}
+    history = {symbol: [] for symbol in symbols}
+    for i in range(points):
+        for symbol in symbols:
+            rate = Decimal(str(round(bias[symbol] + rng.gauss(0, 0.0008), 6)))
+            analyzer.add_funding_rate_data(symbol, rate, rate, START + timedelta(hours=8), Decimal("100"),
+                                           timestamp=START + step * i)
+            history[symbol].append(rate)
+    return history
+
+
+def reference_pattern(rates):
+    """逐条Decimal计算的统计量"""
+    n = len(rates)
+    mean = sum(rates) / Decimal(n)
+    volatility = (sum((r - mean) ** 2 for r in rates) / Decimal(n - 1)).sqrt()
+    positive = [r for r in rates if r > 0]
+    negative = [r for r in rates if r < 0]
+
+    sum_x = sum(range(n))
+    sum_y = sum(float(r) for r in rates)
+    sum_xy = sum(x * float(r) for x, r in enumerate(rates))
+    sum_x2 = sum(x * x for x in range(n))
+    slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
+    prediction = slope * n + (sum_y - slope * sum_x) / n
+
+    if mean > Decimal("0.0005"):
+        pattern = 'high_positive'
+    elif mean < Decimal("-0.0005"):
+        pattern = 'high_negative'
+    elif volatility > Decimal("0.001"):
+        pattern = 'volatile'
+    elif len(positive) / n > 0.7:
+        pattern = 'mostly_positive'
+    elif len(negative) / n > 0.7:
+        pattern = 'mostly_negative'
+    else:
+        pattern = 'balanced'
+
+    confidence = min(Decimal("0.5") * min(Decimal(n) / 50, Decimal(1)) *
+                     max(Decimal("0.3"), 1 - volatility * 100), Decimal(1))
+    return {
+        'pattern': pattern,
+        'current_avg': mean,
+        'volatility': volatility,
+        'positive_avg': sum(positive) / len(positive) if positive else Decimal(0),
+        'negative_avg': sum(negative) / len(negative) if negative else Decimal(0),
+        'prediction': prediction,
+        'confidence': confidence
+    }
+
+
+class TestRateBuffer:
+    """按交易对和时间窗口保留"""
+
+    def test_symbols_keep_their_own_history(self):
+        analyzer = FundingRateAnalysis()
+        symbols = [f"C{i}USDT" for i in range(40)]
+        history = feed(analyzer, symbols, 120)
+
+        # 每个交易对都保留完整窗口，不受其他交易对挤占
+        for symbol in symbols:
+            assert analyzer.get_rate_history(symbol).tolist() == [float(r) for r in history[symbol]]
+            assert analyzer.analyze_funding_pattern(symbol)['data_points'] == 50
+
+        assert analyzer.analyze_funding_pattern("UNKNOWN")['pattern'] == 'insufficient_data'
+        assert FundingRateAnalysis().analyze_funding_pattern("C0USDT")['pattern'] == 'no_data'
+
+    def test_time_based_retention(self):
+        buffer = FundingRateBuffer(timedelta(hours=1), max_points=1000, capacity=4)
+        base = START.timestamp()
+        for minute in range(600):
+            buffer.append(base + minute * 60, minute)
+            assert len(buffer) == min(minute + 1, 61)
+            assert buffer.window(3).tolist() == [float(m) for m in range(max(0, minute - 2), minute + 1)]
+        assert len(buffer.rates) <= 256
+
+        # 数据点上限
+        capped = FundingRateBuffer(timedelta(days=1), max_points=100)
+        for second in range(1000):
+            capped.append(base + second, second)
+        assert len(capped) == 100
+        assert capped.window(1000)[0] == 900
+
+
+class TestVectorizedStatistics:
+    """向量化统计与逐条计算一致"""
+
+    @pytest.mark.parametrize("lookback", [10, 37, 50])
+    def test_matches_decimal_reference(self, lookback):
+        analyzer = FundingRateAnalysis()
+        symbols = [f"C{i}USDT" for i in range(30)]
+        history = feed(analyzer, symbols, 80, seed=lookback)
+        patterns = set()
+
+        for symbol in symbols:
+            result = analyzer.analyze_funding_pattern(symbol, lookback)
+            expected = reference_pattern(history[symbol][-lookback:])
+            assert result['pattern'] == expected['pattern']
+            patterns.add(result['pattern'])
+            for key in ('current_avg', 'volatility', 'positive_avg', 'negative_avg', 'prediction', 'confidence'):
+                assert float(result[key]) == pytest.approx(float(expected[key]), rel=1e-9, abs=1e-15), key
+        assert len(patterns) >= 3
+
+    def test_ranking_matches_single_symbol_scores(self):
+        analyzer = FundingRateAnalysis()
+        symbols = [f"C{i}USDT" for i in range(60)]
+        feed(analyzer, symbols, 60, seed=4)
+
+        ranking = analyzer.rank_opportunities()
+        assert [r['symbol'] for r in ranking] != symbols
+        assert len(ranking) == len(symbols)
+        assert all(a['opportunity_score'] >= b['opportunity_score'] for a, b in zip(ranking, ranking[1:]))
+
+        for entry in ranking:
+            current = Decimal(str(entry['current_rate']))
+            opportunity = analyzer.calculate_arbitrage_opportunity(
+                entry['symbol'], current, START + timedelta(hours=8), Decimal("100"))
+            analysis = opportunity['analysis']
+            score = analyzer._calculate_opportunity_score(current, analysis['prediction'], analysis['volatility'])
+            risk = analyzer._assess_arbitrage_risk(current, analysis['volatility'], analysis['confidence'])
+            assert entry['opportunity_score'] == pytest.approx(float(score), rel=1e-9)
+            assert entry['risk_level'] == risk['level']
+
+        # 指定当前费率时只评估给定的交易对
+        subset = analyzer.rank_opportunities({"C1USDT": Decimal("0.003"), "C2USDT": Decimal("0")})
+        assert {r['symbol'] for r in subset} == {"C1USDT", "C2USDT"}
+        assert subset[0]['current_rate'] in (0.003, 0.0)
+
+
+class TestRankingThroughput:
+    """500个永续合约的排名耗时"""
+
+    def test_rank_cost(self):
+        analyzer = FundingRateAnalysis()
+        symbols = [f"C{i}USDT" for i in range(500)]
+        history = feed(analyzer, symbols, 100, seed=6)
+
+        started = time.perf_counter()
+        for symbol in symbols:
+            reference_pattern(history[symbol][-50:])
+        per_symbol = time.perf_counter() - started
+
+        started = time.perf_counter()
+        ranking = analyzer.rank_opportunities()
+        ranked = time.perf_counter() - started
+
+        print(f"\n500个永续合约: 逐个Decimal统计 {per_symbol * 1000:.1f}ms, 向量化排名 {ranked * 1000:.1f}ms")
+        assert len(ranking) == 500
+        assert ranked < per_symbol
@@ -0,0 +1,194 @@
+"""
+网格层级索引测试
+验证订单ID映射、价格索引和计数器与层级状态一致，并测量细网格下成交处理的开销
+"""
+
+import time
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.strategies.base import (
+    MarketData,
+    OrderRequest,
+    OrderResult,
+    OrderSide,
+    StrategyConfig,
+    StrategyType
+)
+from backend.src.strategies.spot.grid import GridStrategy
+
+
+def make_strategy(levels: int, spacing: str = "0.002") -> GridStrategy:
+    config = StrategyConfig(
+        strategy_id=f"grid_index_{levels}",
+        strategy_type=StrategyType.GRID,
+        user_id=1,
+        account_id=1,
+        symbol="BTCUSDT",
+        base_quantity=Decimal('0.01'),
+        grid_levels=levels,
+        grid_spacing=Decimal(spacing)
+    )
+    strategy = GridStrategy(config)
+    strategy.logger.disabled = True
+    return strategy
+
+
+def market_data(price: str) -> MarketData:
+    price = Decimal(price)
+    return MarketData(
+        symbol="BTCUSDT",
+        current_price=price,
+        bid_price=price,
+        ask_price=price,
+        volume_24h=Decimal('100'),
+        price_change_24h=Decimal('0'),
+        timestamp=datetime.now()
+    )
+
+
+def fill(order: OrderRequest) -> OrderResult:
+    return OrderResult(
+        success=True,
+        order_id=order.order_id,
+        filled_quantity=order.quantity,
+        average_price=order.price,
+        commission=Decimal('0'),
+        execution_time=datetime.now()
+    )
+
+
+async def start(strategy: GridStrategy, price: str = "30000"):
+    await strategy.initialize()
+    data = market_data(price)
+    strategy.last_market_data = data
+    return await strategy.get_next_orders(data)
+
+
+def assert_book_consistent(strategy: GridStrategy):
+    book = strategy._grid_book
+    levels = strategy.grid_levels
+    assert [level.price for level in levels] == sorted(level.price for level in levels)
+    assert book.active_count == sum(1 for level in levels if level.is_active)
+    assert book.filled_buy_count == sum(1 for level in book.filled_levels if level.order_side == OrderSide.BUY)
+    for level in levels:
+        if level.order_id:
+            assert strategy._find_grid_level_by_order_id(level.order_id) is level
+    assert strategy._get_missing_grid_levels(Decimal('0')) == [
+        level for level in levels if level.is_active and not level.order_id
+    ]
+
+
+class TestGridLevelBook:
+    """索引与层级状态一致"""
+
+    @pytest.mark.asyncio
+    async def test_orders_are_indexed_once(self):
+        strategy = make_strategy(10)
+        orders = await start(strategy)
+
+        assert len(orders) == 10
+        assert len(strategy.grid_levels) == 10
+        assert await strategy.get_next_orders(market_data("30000")) == []
+        status = strategy.get_grid_status()
+        assert (status['total_levels'], status['active_levels'], status['completed_levels']) == (10, 10, 0)
+        assert_book_consistent(strategy)
+
+    @pytest.mark.asyncio
+    async def test_fill_rearms_level_and_completes_cycle(self):
+        strategy = make_strategy(10)
+        orders = await start(strategy)
+        buy = max((o for o in orders if o.order_side == OrderSide.BUY), key=lambda o: o.price)
+        sell = min((o for o in orders if o.order_side == OrderSide.SELL), key=lambda o: o.price)
+
+        # 价格回落到买单层级成交，层级在同一价格重新挂出
+        strategy.last_market_data = market_data(str(buy.price - 1))
+        assert await strategy.process_order_result(fill(buy))
+        assert strategy._find_grid_level_by_order_id(buy.order_id) is None
+        assert strategy.get_grid_status()['completed_levels'] == 1
+        rearmed = strategy._get_missing_grid_levels(buy.price)
+        assert [(level.price, level.order_side) for level in rearmed] == [(buy.price, OrderSide.SELL)]
+        assert_book_consistent(strategy)
+
+        # 卖单成交后买卖成交数相等，完成一个循环
+        strategy.last_market_data = market_data(str(sell.price + 1))
+        assert await strategy.process_order_result(fill(sell))
+        assert strategy.completed_cycles == 1
+        assert strategy.get_grid_status()['completed_levels'] == 0
+        assert strategy.get_grid_status()['total_levels'] == 10
+        assert_book_consistent(strategy)
+
+    @pytest.mark.asyncio
+    async def test_failed_order_releases_level(self):
+        strategy = make_strategy(6)
+        orders = await start(strategy)
+        failed = OrderResult(success=False, order_id=orders[0].order_id, filled_quantity=Decimal('0'),
+                             average_price=Decimal('0'), commission=Decimal('0'),
+                             execution_time=datetime.now(), error_message="expired")
+
+        assert not await strategy.process_order_result(failed)
+        missing = strategy._get_missing_grid_levels(Decimal('30000'))
+        assert [level.price for level in missing] == [orders[0].price]
+        assert_book_consistent(strategy)
+
+    @pytest.mark.asyncio
+    async def test_price_leaving_range_rebuilds(self):
+        strategy = make_strategy(10)
+        orders = await start(strategy)
+        strategy.last_market_data = market_data("40000")
+        assert await strategy.process_order_result(fill(orders[0]))
+
+        assert strategy.center_price == Decimal('40000')
+        assert len(strategy.grid_levels) == 10
+        assert strategy.get_grid_status()['completed_levels'] == 0
+        assert_book_consistent(strategy)
+
+    @pytest.mark.asyncio
+    async def test_levels_between_uses_price_band(self):
+        strategy = make_strategy(20)
+        orders = await start(strategy)
+        book = strategy._grid_book
+        prices = [level.price for level in strategy.grid_levels]
+
+        low, high = prices[5], prices[12]
+        assert book.levels_between(low, high) == strategy.grid_levels[5:13]
+        assert book.levels_between(low + Decimal('0.01'), high - Decimal('0.01')) == strategy.grid_levels[6:12]
+        assert book.levels_between(prices[-1] + 1, prices[-1] + 100) == []
+
+        # 撤销的订单只在所在价格带内重新出现
+        for order in (orders[3], orders[15]):
+            await strategy.process_order_result(OrderResult(
+                success=False, order_id=order.order_id, filled_quantity=Decimal('0'),
+                average_price=Decimal('0'), commission=Decimal('0'),
+                execution_time=datetime.now(), error_message="cancelled"
+            ))
+        assert [level.price for level in book.unassigned_levels(low, high)] == []
+        assert [level.price for level in book.unassigned_levels(prices[0], low)] == [orders[3].price]
+        assert [level.price for level in book.unassigned_levels()] == [orders[3].price, orders[15].price]
+
+
+class TestGridFillThroughput:
+    """细网格下的成交处理开销"""
+
+    @pytest.mark.asyncio
+    async def test_fill_cost_does_not_grow_with_levels(self):
+        timings = {}
+        for levels in (50, 800):
+            strategy = make_strategy(levels, spacing="0.0002")
+            orders = await start(strategy)
+            results = [fill(order) for order in orders if order.order_side == OrderSide.BUY][:40]
+
+            started = time.perf_counter()
+            for result in results:
+                await strategy.process_order_result(result)
+                strategy.get_grid_status()
+            timings[levels] = (time.perf_counter() - started) / len(results)
+
+        print(f"\n每次成交: 50层 {timings[50] * 1e6:.0f}us, 800层 {timings[800] * 1e6:.0f}us")
+        assert timings[800] < timings[50] * 4
@@ -0,0 +1,208 @@
+"""
+共享杠杆监控测试
+验证批量计算的杠杆调整与逐个管理器的计算和调整结果一致、只输出发生变化的调整、
+每个交易对每轮只估算一次波动性、所有策略共用一个监控任务，并测量1000个管理器的单轮检查耗时
+"""
+
+import asyncio
+import random
+import time
+from datetime import datetime
+from decimal import Decimal
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.strategies.futures.base_futures_strategy import FuturesMarketData, FuturesPosition
+from backend.src.strategies.futures.leverage_manager import (
+    DynamicLeverageManager,
+    LeverageConfig,
+    LeverageManager,
+    PositionMetrics
+)
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT", "XRPUSDT"]
+
+
+def make_market(symbol: str, rng: random.Random) -> FuturesMarketData:
+    price = Decimal(str(round(rng.uniform(10, 50000), 2)))
+    return FuturesMarketData(
+        symbol, price, price, price, Decimal("1000000"),
+        price * Decimal(str(round(rng.uniform(-0.12, 0.12), 4))), datetime.now(),
+        previous_close=price, funding_rate=Decimal("0.0002")
+    )
+
+
+def make_config(symbol: str, rng: random.Random) -> LeverageConfig:
+    min_leverage = Decimal(rng.choice(["1", "2", "5", "10", "20"]))
+    return LeverageConfig(
+        symbol,
+        max_leverage=min_leverage * Decimal(rng.choice(["1", "2", "3"])),
+        min_leverage=min_leverage,
+        leverage_step=Decimal(rng.choice(["0.5", "1", "1"])),
+        volatility_threshold=Decimal(rng.choice(["0.03", "0.05", "0.08"])),
+        max_position_leverage=Decimal(rng.choice(["10", "25", "50"]))
+    )
+
+
+def make_metrics(symbol: str, market: FuturesMarketData, rng: random.Random) -> PositionMetrics:
+    quantity = Decimal(str(round(rng.uniform(0.1, 5), 3)))
+    notional = quantity * market.current_price
+    position = FuturesPosition(
+        symbol=symbol,
+        quantity=quantity,
+        average_price=market.current_price,
+        unrealized_pnl=notional * Decimal(str(round(rng.uniform(-0.15, 0.15), 4))),
+        margin_used=notional / Decimal(rng.choice(["1", "2", "5", "10"]))
+    )
+    wallet = notional * Decimal(str(round(rng.uniform(0.1, 2.5), 3)))
+    return PositionMetrics(symbol, position, wallet, wallet, wallet)
+
+
+async def build(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    dynamic = DynamicLeverageManager()
+    markets = {symbol: make_market(symbol, rng) for symbol in SYMBOLS}
+    for market in markets.values():
+        dynamic.update_market_data(market)
+
+    inputs = {}
+    for i in range(count):
+        symbol = SYMBOLS[i % len(SYMBOLS)]
+        config = make_config(symbol, rng)
+        current = config.min_leverage + config.leverage_step * rng.randint(0, 4)
+        metrics = make_metrics(symbol, markets[symbol], rng)
+        await dynamic.register_strategy(symbol, f"s{i}", config, current)
+        dynamic.update_position_metrics(symbol, f"s{i}", metrics)
+        inputs[(symbol, f"s{i}")] = (config, current, metrics)
+    return dynamic, markets, inputs
+
+
+async def legacy_changes(markets, inputs):
+    """逐个管理器计算最优杠杆并尝试调整"""
+    changes = {}
+    for (symbol, strategy_id), (config, current, metrics) in inputs.items():
+        manager = LeverageManager(config)
+        manager.current_leverage = current
+        market = markets[symbol]
+        target = await manager.calculate_optimal_leverage(metrics, market)
+        result = await manager.adjust_leverage(current, target, metrics, market)
+        if result['action'] == 'adjusted':
+            changes[f"{symbol}/{strategy_id}"] = (result['old_leverage'], result['new_leverage'])
+    return changes
+
+
+class TestBatchParity:
+    """批量调整与逐个管理器一致"""
+
+    def test_changes_match_per_manager_path(self):
+        async def run():
+            dynamic, markets, inputs = await build(1000)
+            expected = await legacy_changes(markets, inputs)
+            changes = await dynamic.run_leverage_check()
+            return dynamic, inputs, expected, changes
+
+        dynamic, inputs, expected, changes = asyncio.run(run())
+        assert {c['strategy_key']: (c['old_leverage'], c['new_leverage']) for c in changes} == expected
+        assert 50 < len(changes) < 1000
+
+        # 只输出变化：杠杆已更新，同样的数据再检查一轮没有新的调整
+        for change in changes:
+            symbol, strategy_id = change['strategy_key'].split("/")
+            manager = dynamic.leverage_managers[symbol][strategy_id]
+            assert manager.current_leverage == change['new_leverage']
+            assert manager.get_leverage_history(1)[0]['new_leverage'] == change['new_leverage']
+        assert asyncio.run(dynamic.run_leverage_check()) == []
+
+        stats = dynamic.monitor.get_statistics()
+        assert stats['managers'] == 1000
+        assert stats['volatility_estimates'] == 2 * len(SYMBOLS)
+        assert stats['rejected_adjustments'] > 0
+
+    def test_global_assessment_uses_latest_metrics(self):
+        dynamic, markets, inputs = asyncio.run(build(200, seed=2))
+        assessment = asyncio.run(dynamic.get_global_risk_assessment())
+
+        expected = {'LOW': 0, 'MEDIUM': 0, 'HIGH': 0, 'CRITICAL': 0}
+        for _, _, metrics in inputs.values():
+            expected[metrics.get_risk_level().name] += 1
+        assert assessment['total_strategies'] == 200
+        assert assessment['risk_distribution'] == expected
+        assert assessment['high_risk_strategies'] == expected['HIGH'] + expected['CRITICAL']
+        assert abs(assessment['total_exposure'] - sum(float(m.position_value) for _, _, m in inputs.values())) < 1e-3
+
+    def test_unregister_and_emergency_stop(self):
+        async def run():
+            dynamic, markets, inputs = await build(50, seed=3)
+            for i in range(0, 50, 2):
+                assert await dynamic.unregister_strategy(SYMBOLS[i % len(SYMBOLS)], f"s{i}")
+            assert dynamic.monitor.get_statistics()['managers'] == 25
+
+            await dynamic.emergency_stop_all()
+            stopped = await dynamic.run_leverage_check()
+            await dynamic.resume_all()
+            resumed = await dynamic.run_leverage_check()
+            await dynamic.stop_monitoring()
+            return inputs, stopped, resumed
+
+        inputs, stopped, resumed = asyncio.run(run())
+        assert stopped == []
+        assert resumed
+        assert all(int(c['strategy_key'].split("/s")[1]) % 2 for c in resumed)
+
+
+class TestSharedLoop:
+    """所有策略共用一个监控任务"""
+
+    def test_single_task_for_all_managers(self):
+        received = []
+
+        async def run():
+            dynamic, markets, inputs = await build(1000, seed=4)
+            dynamic.monitor.check_interval = 0.01
+            dynamic.monitor.set_change_callback(received.append)
+            before = len(asyncio.all_tasks())
+            await dynamic.start_monitoring()
+            for strategies in dynamic.leverage_managers.values():
+                for manager in strategies.values():
+                    await manager.start_monitoring()
+            tasks = len(asyncio.all_tasks()) - before
+            await asyncio.sleep(0.1)
+            await dynamic.stop_monitoring()
+            return dynamic, tasks
+
+        dynamic, tasks = asyncio.run(run())
+        assert tasks == 1
+        stats = dynamic.monitor.get_statistics()
+        assert stats['passes'] >= 2
+        # 第一轮输出全部调整，之后数据未变不再重复输出
+        assert len(received) == 1
+        assert len(received[0]) == stats['adjustments']
+
+
+class TestCheckThroughput:
+    """1000个管理器的单轮检查耗时"""
+
+    def test_pass_cost(self):
+        async def run():
+            dynamic, markets, inputs = await build(1000, seed=5)
+
+            started = time.perf_counter()
+            await legacy_changes(markets, inputs)
+            per_manager = time.perf_counter() - started
+
+            started = time.perf_counter()
+            changes = await dynamic.run_leverage_check()
+            first = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for _ in range(20):
+                await dynamic.run_leverage_check()
+            steady = (time.perf_counter() - started) / 20
+            return per_manager, first, steady, len(changes)
+
+        per_manager, first, steady, changed = asyncio.run(run())
+        print(f"\n1000个管理器: 逐个计算 {per_manager * 1000:.1f}ms, 共享批量首轮 {first * 1000:.1f}ms"
+              f"（{changed}个调整）, 无变化轮次 {steady * 1000:.2f}ms")
+        assert steady < per_manager
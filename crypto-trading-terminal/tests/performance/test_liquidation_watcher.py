@@ -0,0 +1,235 @@
+"""
+标记价格清算监控测试
+验证按触发价格索引得到的风险等级与逐仓位计算一致、只访问跨越风险带的仓位、
+管理器在风险升级时发出预警，并测量10万仓位下单笔标记价格的处理耗时
+"""
+
+import asyncio
+import random
+import statistics
+import time
+from decimal import Decimal
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.strategies.futures.base_futures_strategy import FuturesAccountBalance, FuturesPosition
+from backend.src.strategies.futures.margin_liquidation_manager import (
+    RISK_LEVELS,
+    LiquidationWatcher,
+    MarginLiquidationManager
+)
+
+BANDS = (50.0, 25.0, 15.0, 0.0)
+
+
+def make_position(symbol: str, quantity: float, liquidation_price: float, user_id: int = 1) -> FuturesPosition:
+    position = FuturesPosition(
+        symbol=symbol,
+        quantity=Decimal(str(quantity)),
+        average_price=Decimal("50000"),
+        liquidation_price=Decimal(str(liquidation_price)),
+        leverage=Decimal("10")
+    )
+    position.user_id = user_id
+    position.account_id = 1
+    return position
+
+
+def expected_level(position: FuturesPosition, price: float) -> str:
+    """逐仓位按定义计算风险等级"""
+    liquidation_price = float(position.liquidation_price)
+    if position.quantity > 0:
+        level = sum(1 for pct in BANDS if price <= liquidation_price * (1 + pct / 100))
+    else:
+        level = sum(1 for pct in BANDS if price >= liquidation_price * (1 - pct / 100))
+    return RISK_LEVELS[level]
+
+
+def populate(watcher: LiquidationWatcher, count: int, seed: int = 1):
+    rng = random.Random(seed)
+    positions = {}
+    for i in range(count):
+        if i % 2:
+            position = make_position("BTCUSDT", 0.1, rng.uniform(25000, 49000))
+        else:
+            position = make_position("BTCUSDT", -0.1, rng.uniform(51000, 80000))
+        positions[f"p{i}"] = position
+        watcher.track(f"p{i}", position)
+    return positions
+
+
+class TestRiskLevels:
+    """索引定级与逐仓位计算一致"""
+
+    def test_levels_match_brute_force(self):
+        watcher = LiquidationWatcher()
+        positions = populate(watcher, 3000)
+        rng = random.Random(2)
+        price = 50000.0
+
+        for step in range(400):
+            price *= 1 + rng.gauss(0, 0.01)
+            changes = watcher.on_mark_price("BTCUSDT", price)
+            for change in changes:
+                assert change.risk_level == expected_level(positions[change.position_key], price)
+
+            if step % 50 == 0:
+                for key, position in positions.items():
+                    assert watcher.get_level(key) == expected_level(position, price)
+
+                # 中途更新和移除部分仓位
+                for key in list(positions)[:20]:
+                    watcher.untrack(key)
+                    positions.pop(key)
+                key = f"new{step}"
+                positions[key] = make_position("BTCUSDT", 0.2, price * 0.9)
+                assert watcher.track(key, positions[key]) == 'critical'
+
+        stats = watcher.get_statistics()
+        assert stats["positions"] == len(positions)
+        assert sum(stats["positions_by_level"].values()) == len(positions)
+
+    def test_only_crossed_positions_are_visited(self):
+        watcher = LiquidationWatcher()
+        far = make_position("BTCUSDT", 1, 20000)
+        near = make_position("BTCUSDT", 1, 44000)
+        short = make_position("BTCUSDT", -1, 52000)
+        watcher.track("far", far)
+        watcher.track("near", near)
+        watcher.track("short", short)
+
+        watcher.on_mark_price("BTCUSDT", 51000)  # 首笔价格全部定级
+        assert [watcher.get_level(k) for k in ("far", "near", "short")] == ['low', 'high', 'critical']
+
+        visited = watcher.stats["positions_visited"]
+        changes = watcher.on_mark_price("BTCUSDT", 50800)  # 未跨越任何风险带
+        assert changes == []
+        assert watcher.stats["positions_visited"] == visited
+
+        changes = watcher.on_mark_price("BTCUSDT", 43900)
+        assert {(c.position_key, c.previous_level, c.risk_level) for c in changes} == {
+            ("near", 'high', 'liquidation'),
+            ("short", 'critical', 'high')
+        }
+        assert watcher.stats["positions_visited"] == visited + 2
+
+        # 其他合约的价格不影响
+        assert watcher.on_mark_price("ETHUSDT", 1) == []
+
+    def test_positions_without_liquidation_price_are_not_tracked(self):
+        watcher = LiquidationWatcher()
+        position = make_position("BTCUSDT", 1, 40000)
+        position.liquidation_price = None
+        assert watcher.track("p", position) == 'unknown'
+        assert watcher.on_mark_price("BTCUSDT", 30000) == []
+
+
+class TestManagerAlerts:
+    """管理器在风险升级时发出预警"""
+
+    def test_escalation_dispatches_alerts(self):
+        manager = MarginLiquidationManager()
+        manager.update_account_balance(FuturesAccountBalance(1, 1, "BTCUSDT", wallet_balance=Decimal("5000")))
+        position = make_position("BTCUSDT", 1, 45000)
+        manager.register_position(position)
+        unpriced = make_position("BTCUSDT", 1, 0, user_id=2)
+        unpriced.liquidation_price = None
+        unpriced.account_id = 2
+        manager.register_position(unpriced)
+
+        received = []
+
+        async def on_alert(alert):
+            received.append(alert)
+
+        async def run():
+            manager.margin_monitor.add_alert_callback(1, on_alert)
+            manager.on_futures_ticker({"symbol": "BTCUSDT", "price": 60000.0, "mark_price": 60000.0})
+            manager.on_mark_price("BTCUSDT", Decimal("55000"))
+            manager.on_mark_price("BTCUSDT", Decimal("51000"))
+            await asyncio.sleep(0)
+
+        asyncio.run(run())
+        assert [a.alert_type for a in manager.margin_monitor.alerts] == ['danger', 'critical']
+        assert len(received) == 2
+
+        # 账户余额到达后补算清算价格（10倍多头）
+        manager.update_account_balance(FuturesAccountBalance(2, 2, "BTCUSDT", wallet_balance=Decimal("5000")))
+        assert unpriced.liquidation_price == Decimal("50000") * (1 - Decimal("0.1") + Decimal("0.005"))
+        summary = manager.get_risk_summary()
+        assert summary["total_positions"] == 2
+        assert summary["critical_risk_positions"] == 2
+
+        manager.unregister_position(1, 1, "BTCUSDT")
+        assert manager.liquidation_watcher.get_level("1_1_BTCUSDT") == 'unknown'
+
+    def test_stop_unsubscribes_mark_prices(self):
+        class FakeWSManager:
+            def __init__(self):
+                self.subscribed = {}
+
+            async def subscribe_futures_market_data(self, exchange, symbol, callback, data_types):
+                self.subscribed[(exchange, symbol)] = callback
+                return f"futures:{exchange}:{symbol}:ticker"
+
+            async def unsubscribe_futures_data(self, exchange, symbol):
+                del self.subscribed[(exchange, symbol)]
+
+        manager = MarginLiquidationManager()
+        manager.register_position(make_position("BTCUSDT", 1, 45000))
+        manager.register_position(make_position("ETHUSDT", 1, 2000))
+        ws_manager = FakeWSManager()
+
+        async def run():
+            task = asyncio.create_task(manager.start_global_monitoring(ws_manager, exchange="okx"))
+            await asyncio.sleep(0.01)
+            subscribed = set(ws_manager.subscribed)
+            await manager.stop_global_monitoring()
+
+            # 监控任务被取消时同样释放订阅
+            task.cancel()
+            await task
+            restarted = asyncio.create_task(manager.start_global_monitoring(ws_manager))
+            await asyncio.sleep(0.01)
+            resubscribed = len(ws_manager.subscribed)
+            restarted.cancel()
+            await restarted
+            return subscribed, resubscribed
+
+        subscribed, resubscribed = asyncio.run(run())
+        assert subscribed == {("okx", "BTCUSDT"), ("okx", "ETHUSDT")}
+        assert resubscribed == 2
+        assert ws_manager.subscribed == {}
+        assert manager.mark_price_subscriptions == {}
+        assert manager.get_risk_summary()["monitoring_active"] is False
+
+
+class TestTickLatency:
+    """10万仓位下的单笔标记价格处理耗时"""
+
+    def test_reaction_with_100k_positions(self):
+        watcher = LiquidationWatcher()
+        started = time.perf_counter()
+        populate(watcher, 100000, seed=3)
+        watcher.on_mark_price("BTCUSDT", 50000.0)
+        setup = time.perf_counter() - started
+
+        rng = random.Random(4)
+        price = 50000.0
+        latencies = []
+        for _ in range(2000):
+            price *= 1 + rng.gauss(0, 0.0005)
+            started = time.perf_counter()
+            watcher.on_mark_price("BTCUSDT", price)
+            latencies.append(time.perf_counter() - started)
+
+        median = statistics.median(latencies)
+        p99 = sorted(latencies)[int(len(latencies) * 0.99)]
+        stats = watcher.get_statistics()
+        print(f"\n10万仓位: 建立索引 {setup:.2f}s, 单笔标记价格 中位数 {median * 1e6:.0f}us, "
+              f"p99 {p99 * 1e6:.0f}us, 平均访问仓位 {stats['avg_positions_visited']:.1f}")
+        assert median < 0.001
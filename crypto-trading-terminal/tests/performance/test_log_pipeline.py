@@ -0,0 +1,260 @@
+"""
+异步日志管道性能测试
+验证慢速输出流不会阻塞日志调用方，以及批量写出、丢弃计数和采样限流
+"""
+
+import io
+import json
+import logging
+import threading
+import time
+
+import pytest
+import structlog
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.utils.log_pipeline import (
+    LogPipeline,
+    LogSampler,
+    PipelineHandler,
+    QueueLoggerFactory,
+    add_timestamp,
+    capture_exc_info,
+    start_log_pipeline,
+    stop_log_pipeline
+)
+
+
+class SlowStream(io.StringIO):
+    """每次write都阻塞一段时间的输出流，模拟慢速管道或磁盘"""
+
+    def __init__(self, write_delay: float = 0.0):
+        super().__init__()
+        self.write_delay = write_delay
+        self.write_calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def write(self, data):
+        self.write_calls += 1
+        self.release.wait()
+        if self.write_delay:
+            time.sleep(self.write_delay)
+        return super().write(data)
+
+    def lines(self):
+        return [json.loads(line) for line in self.getvalue().splitlines()]
+
+
+def configure_structlog(pipeline: LogPipeline, sampler: LogSampler = None, level: int = logging.DEBUG):
+    processors = [structlog.stdlib.add_logger_name, structlog.processors.add_log_level, add_timestamp, capture_exc_info]
+    if sampler is not None:
+        processors.insert(0, sampler)
+    structlog.configure(
+        processors=processors,
+        wrapper_class=structlog.make_filtering_bound_logger(level),
+        logger_factory=QueueLoggerFactory(pipeline),
+        cache_logger_on_first_use=False
+    )
+
+
+@pytest.fixture(autouse=True)
+def reset_structlog():
+    yield
+    structlog.reset_defaults()
+
+
+class TestLogPipeline:
+    """日志管道测试"""
+
+    def test_slow_stream_does_not_block_producer(self):
+        """输出流很慢时，日志调用仍应在微秒级返回"""
+        stream = SlowStream(write_delay=0.05)
+        pipeline = LogPipeline(stream=stream, batch_size=500, flush_interval=0.01)
+        pipeline.start()
+        configure_structlog(pipeline)
+        logger = structlog.get_logger("tick")
+
+        count = 2000
+        start_time = time.perf_counter()
+        for i in range(count):
+            logger.info("行情更新", symbol="BTCUSDT", price=50000 + i)
+        elapsed = time.perf_counter() - start_time
+        pipeline.stop()
+
+        print(f"日志调用耗时: {elapsed / count * 1e6:.1f} 微秒/条, 写出批次: {pipeline.stats['batches']}")
+
+        lines = stream.lines()
+        assert len(lines) == count
+        assert lines[0]["event"] == "行情更新"
+        assert lines[0]["logger"] == "tick"
+        assert lines[0]["level"] == "info"
+        assert lines[0]["timestamp"].endswith("Z")
+        # 逐条同步写出至少需要 2000 * 0.05 秒
+        assert elapsed < 1.0
+        # 批量写出，每批一次write
+        assert stream.write_calls == pipeline.stats["batches"] < count / 10
+
+    def test_full_queue_drops_and_counts(self):
+        """队列满时丢弃日志并计数，而不是阻塞"""
+        stream = SlowStream()
+        stream.release.clear()
+        pipeline = LogPipeline(stream=stream, max_queue_size=50, batch_size=10, flush_interval=0.01)
+        pipeline.start()
+        configure_structlog(pipeline)
+        logger = structlog.get_logger("burst")
+
+        start_time = time.perf_counter()
+        for i in range(500):
+            logger.info("突发日志", index=i)
+        elapsed = time.perf_counter() - start_time
+
+        stream.release.set()
+        pipeline.stop()
+
+        stats = pipeline.stats
+        assert elapsed < 0.5
+        assert stats["dropped"] > 0
+        assert stats["enqueued"] + stats["dropped"] == 500
+        assert stats["written"] == stats["enqueued"]
+
+    def test_level_filter_skips_event_construction(self):
+        """低于配置级别的日志不入队"""
+        stream = SlowStream()
+        pipeline = LogPipeline(stream=stream)
+        pipeline.start()
+        configure_structlog(pipeline, level=logging.INFO)
+        logger = structlog.get_logger("filter")
+
+        for i in range(100):
+            logger.debug("调试信息", index=i)
+        logger.warning("警告")
+        pipeline.stop()
+
+        assert pipeline.stats["enqueued"] == 1
+        assert stream.lines()[0]["level"] == "warning"
+
+    def test_exception_captured_in_caller_thread(self):
+        """异常堆栈在调用线程中取出，由后台线程格式化"""
+        stream = SlowStream()
+        pipeline = LogPipeline(stream=stream)
+        pipeline.start()
+        configure_structlog(pipeline)
+        logger = structlog.get_logger("errors")
+
+        try:
+            raise ValueError("下单失败")
+        except ValueError:
+            logger.exception("订单异常")
+        pipeline.stop()
+
+        line = stream.lines()[0]
+        assert line["level"] == "error"
+        assert "ValueError: 下单失败" in line["exception"]
+
+    def test_stdlib_logging_routed_to_pipeline(self):
+        """标准库logging记录写入同一管道"""
+        stream = SlowStream()
+        pipeline = LogPipeline(stream=stream)
+        pipeline.start()
+
+        stdlib_logger = logging.getLogger("test_log_pipeline.stdlib")
+        stdlib_logger.propagate = False
+        stdlib_logger.setLevel(logging.INFO)
+        handler = PipelineHandler(pipeline)
+        stdlib_logger.addHandler(handler)
+        try:
+            stdlib_logger.info("执行订单 %s", "ORD-1")
+        finally:
+            stdlib_logger.removeHandler(handler)
+        pipeline.stop()
+
+        line = stream.lines()[0]
+        assert line["event"] == "执行订单 ORD-1"
+        assert line["logger"] == "test_log_pipeline.stdlib"
+
+    def test_cached_logger_follows_restarted_pipeline(self):
+        """重新配置日志后，已缓存的logger写入新管道，已停止管道上的handler同步写出"""
+        first_stream = SlowStream()
+        first = start_log_pipeline(stream=first_stream)
+        structlog.configure(
+            processors=[structlog.processors.add_log_level, add_timestamp],
+            logger_factory=QueueLoggerFactory(),
+            cache_logger_on_first_use=True
+        )
+        logger = structlog.get_logger("restart")
+        handler = PipelineHandler(first)
+        try:
+            logger.info("第一次")
+            stop_log_pipeline()
+
+            second_stream = SlowStream()
+            second = start_log_pipeline(stream=second_stream)
+            logger.info("第二次")
+            handler.emit(logging.LogRecord("restart.stdlib", logging.INFO, __file__, 0, "停止后", None, None))
+            stop_log_pipeline()
+            logger.info("关闭后")
+        finally:
+            stop_log_pipeline()
+
+        assert [line["event"] for line in first_stream.lines()] == ["第一次", "停止后"]
+        assert [line["event"] for line in second_stream.lines()] == ["第二次"]
+        assert first.stats["enqueued"] == second.stats["enqueued"] == 1
+
+
+class TestLogSampler:
+    """采样和限流测试"""
+
+    def test_debug_sampling_per_call_site(self):
+        """debug日志按调用点采样，info不受影响"""
+        stream = SlowStream()
+        pipeline = LogPipeline(stream=stream)
+        pipeline.start()
+        sampler = LogSampler(sample_rate=0.1)
+        configure_structlog(pipeline, sampler=sampler)
+        logger = structlog.get_logger("sampled")
+
+        for i in range(100):
+            logger.debug("订单簿更新", index=i)
+        for i in range(10):
+            logger.debug("另一个调用点", index=i)
+        for i in range(5):
+            logger.info("成交", index=i)
+        pipeline.stop()
+
+        events = [line["event"] for line in stream.lines()]
+        assert events.count("订单簿更新") == 10
+        assert events.count("另一个调用点") == 1
+        assert events.count("成交") == 5
+        assert sampler.stats["sampled_out"] == 99
+
+    def test_rate_limit_reports_suppressed_count(self):
+        """超过每秒上限的日志被抑制，下一条输出带上抑制条数"""
+        stream = SlowStream()
+        pipeline = LogPipeline(stream=stream)
+        pipeline.start()
+        sampler = LogSampler(rate_limit=5)
+        configure_structlog(pipeline, sampler=sampler)
+        logger = structlog.get_logger("limited")
+
+        def emit(count):
+            for i in range(count):
+                logger.info("风险检查", index=i)
+
+        emit(50)
+        # 打开新的一秒窗口
+        for state in sampler._sites.values():
+            state[1] -= 1.0
+        emit(1)
+        logger.error("风控错误")
+        pipeline.stop()
+
+        lines = stream.lines()
+        limited = [line for line in lines if line["event"] == "风险检查"]
+        assert len(limited) == 6
+        assert limited[-1]["suppressed"] == 45
+        assert any(line["event"] == "风控错误" for line in lines)
+        assert sampler.stats["rate_limited"] == 45
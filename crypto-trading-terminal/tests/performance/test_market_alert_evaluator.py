@@ -0,0 +1,202 @@
+"""
+市场预警评估测试
+验证增量滚动统计与逐次切片计算一致、同一交易对的条件共享统计时每笔行情只计入一次、
+分桶计数与最近预警查询，并测量多个预警类型的单笔行情评估耗时
+"""
+
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.conditions.base_conditions import ConditionOperator, MarketData
+from backend.src.conditions.market_alert_conditions import (
+    AlertRateCounter,
+    AlertType,
+    MarketAlertCondition,
+    SymbolAlertEvaluator,
+    SymbolAlertState
+)
+
+ALERT_TYPES = [
+    AlertType.PRICE_CHANGE,
+    AlertType.PRICE_BREAKOUT,
+    AlertType.VOLUME_SPIKE,
+    AlertType.VOLUME_DIVERGENCE,
+    AlertType.TREND_REVERSAL,
+    AlertType.VOLATILITY_EXPLOSION,
+    AlertType.GAPPING,
+    AlertType.MOVING_AVERAGE_CROSS,
+]
+
+
+def make_ticks(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    price = 30000.0
+    ticks = []
+    for i in range(count):
+        price *= 1 + rng.gauss(0, 0.004 if (i // 300) % 2 else 0.0005)
+        volume = rng.uniform(1e6, 2e6) * (3 if i % 97 == 0 else 1)
+        ticks.append(MarketData(
+            "BTCUSDT", price, volume, 0, 0, price, price, datetime.now(),
+            rsi=rng.uniform(0, 100),
+            moving_average_20=price,
+            moving_average_50=price * rng.uniform(0.99, 1.01)
+        ))
+    return ticks
+
+
+def make_condition(alert_type: AlertType, lookback: int, threshold: float = 0.5) -> MarketAlertCondition:
+    return MarketAlertCondition(alert_type, "BTCUSDT", ConditionOperator.GREATER_EQUAL, threshold,
+                                lookback_periods=lookback)
+
+
+def trend(data):
+    slope = statistics.linear_regression(list(range(len(data))), data).slope
+    return slope / statistics.mean(data)
+
+
+class TestRollingState:
+    """增量统计与切片计算一致"""
+
+    @pytest.mark.parametrize("lookback", [4, 5, 20, 21])
+    def test_matches_brute_force(self, lookback):
+        state = SymbolAlertState("BTCUSDT")
+        state.require(lookback)
+        prices, volumes = [], []
+
+        # 跨越缓冲区重算间隔
+        for tick in make_ticks(SymbolAlertState.RESYNC_INTERVAL + 500):
+            state.push(tick.price, tick.volume_24h)
+            prices.append(tick.price)
+            volumes.append(tick.volume_24h)
+            if len(prices) < lookback or len(prices) % 7:
+                continue
+
+            window = prices[-lookback:]
+            assert state.price_back(lookback) == window[0]
+            assert state.extremes(lookback).high == max(window)
+            assert state.extremes(lookback).low == min(window)
+            assert state.volume_sums(lookback).mean() == pytest.approx(statistics.mean(volumes[-lookback:]))
+            assert state.price_sums(lookback).trend() == pytest.approx(trend(window), rel=1e-6, abs=1e-9)
+
+            returns = [(b - a) / a for a, b in zip(window, window[1:])]
+            assert state.return_sums(lookback - 1).stdev() == pytest.approx(statistics.stdev(returns), rel=1e-6)
+
+            earlier_count, recent_trend, earlier_trend = state.split_trends(lookback)
+            half = (lookback + 1) // 2
+            assert earlier_count == lookback - half
+            assert recent_trend == pytest.approx(trend(window[-half:]), rel=1e-6, abs=1e-9)
+            assert earlier_trend == pytest.approx(trend(window[:-half]), rel=1e-6, abs=1e-9)
+
+    def test_require_after_ticks_builds_from_buffer(self):
+        state = SymbolAlertState("BTCUSDT")
+        state.require(10)
+        ticks = make_ticks(30)
+        for tick in ticks:
+            state.push(tick.price, tick.volume_24h)
+
+        state.require(6)
+        window = [tick.price for tick in ticks[-6:]]
+        assert state.extremes(6).high == max(window)
+        assert state.price_sums(6).mean() == pytest.approx(statistics.mean(window))
+
+
+class TestSharedEvaluation:
+    """共享统计的单次遍历评估"""
+
+    def test_shared_state_matches_private_state(self):
+        ticks = make_ticks(1500, seed=3)
+        private = [make_condition(alert_type, 20) for alert_type in ALERT_TYPES]
+        shared = [make_condition(alert_type, 20) for alert_type in ALERT_TYPES]
+        evaluator = SymbolAlertEvaluator("BTCUSDT")
+        for condition in shared:
+            evaluator.add_condition(condition)
+
+        for tick in ticks:
+            expected = [condition.evaluate(tick) for condition in private]
+            results = evaluator.evaluate(tick)
+            assert [r.satisfied for _, r in results] == [r.satisfied for r in expected]
+            assert [r.value.details if r.value else None for _, r in results] == \
+                   [r.value.details if r.value else None for r in expected]
+
+        # 每笔行情只计入一次
+        assert evaluator.state.ticks == len(ticks)
+        assert shared[0].price_history == private[0].price_history
+
+    def test_repeated_evaluation_by_same_condition_counts_again(self):
+        condition = make_condition(AlertType.GAPPING, 5)
+        tick = make_ticks(1)[0]
+        condition.evaluate(tick)
+        condition.evaluate(tick)
+        assert condition.alert_state.ticks == 2
+
+    def test_remove_condition_restores_private_state(self):
+        evaluator = SymbolAlertEvaluator("BTCUSDT")
+        short = make_condition(AlertType.PRICE_CHANGE, 5)
+        long = make_condition(AlertType.PRICE_CHANGE, 50)
+        evaluator.add_condition(short)
+        evaluator.add_condition(long)
+        assert evaluator.state.prices.maxlen == 50
+
+        for tick in make_ticks(60):
+            evaluator.evaluate(tick)
+        assert evaluator.remove_condition(long.condition_id)
+        assert long.alert_state is not evaluator.state
+        assert long.alert_state.ticks == 0
+        assert not evaluator.remove_condition(long.condition_id)
+
+        with pytest.raises(ValueError):
+            evaluator.add_condition(MarketAlertCondition(AlertType.GAPPING, "ETHUSDT", ConditionOperator.GREATER_EQUAL, 0.01))
+
+
+class TestAlertCounters:
+    """分桶计数与最近预警"""
+
+    def test_bucket_counter_window(self):
+        counter = AlertRateCounter(window=timedelta(hours=1), bucket=timedelta(minutes=1))
+        start = datetime(2024, 5, 1, 12)
+        for minute in range(120):
+            counter.record(start + timedelta(minutes=minute, seconds=30))
+        assert counter.count(start + timedelta(minutes=120)) == 60
+        assert counter.count(start + timedelta(hours=3)) == 0
+
+    def test_recent_alerts_and_statistics(self):
+        condition = make_condition(AlertType.VOLUME_SPIKE, 5, threshold=1.0)
+        for tick in make_ticks(200, seed=5):
+            condition.evaluate(tick)
+        fired = len(condition.alert_history)
+        assert fired > 0
+
+        # 较早的预警不在最近窗口内
+        for alert in condition.alert_history[:10]:
+            alert.timestamp -= timedelta(days=2)
+        assert len(condition.get_recent_alerts()) == fired - 10
+        assert condition.get_alert_statistics()["recent_alerts_count"] == fired
+
+        condition.clear_alert_history()
+        assert condition.alert_counter.count() == 0
+
+
+class TestEvaluationThroughput:
+    """单笔行情评估耗时"""
+
+    def test_multi_alert_tick_cost(self):
+        ticks = make_ticks(3000, seed=9)
+        evaluator = SymbolAlertEvaluator("BTCUSDT")
+        for alert_type in ALERT_TYPES:
+            evaluator.add_condition(make_condition(alert_type, 100))
+
+        started = time.perf_counter()
+        for tick in ticks:
+            evaluator.evaluate(tick)
+        elapsed = (time.perf_counter() - started) / len(ticks)
+
+        print(f"\n{len(ALERT_TYPES)}个预警类型, 回看100: 共享统计评估 {elapsed * 1e6:.0f}us/笔行情")
+        assert elapsed < 0.005
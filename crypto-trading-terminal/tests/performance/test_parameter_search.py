@@ -0,0 +1,205 @@
+"""
+参数搜索测试
+验证参数空间展开、共享行情、结果缓存、提前终止、逐次减半和进程池并行
+"""
+
+import pickle
+import random
+from dataclasses import replace
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.backtesting import (
+    Bar,
+    BacktestConfig,
+    EarlyStopping,
+    ParameterRange,
+    ParameterSearch,
+    SharedBars,
+    StrategyTemplate
+)
+from backend.src.strategies.base import StrategyConfig, StrategyType
+from backend.src.strategies.spot.grid import GridStrategy
+
+START = datetime(2023, 1, 1)
+
+
+def synthetic_bars(count: int, seed: int = 1, start_price: float = 30000.0,
+                   volatility: float = 0.0008, drift: float = 0.0):
+    rng = random.Random(seed)
+    bars = []
+    price = start_price
+    for i in range(count):
+        open_price = price
+        price = max(1.0, price * (1 + drift + rng.gauss(0, volatility)))
+        high = max(open_price, price) * (1 + abs(rng.gauss(0, volatility / 3)))
+        low = min(open_price, price) * (1 - abs(rng.gauss(0, volatility / 3)))
+        bars.append(Bar(START + timedelta(minutes=i + 1), open_price, high, low, price, rng.uniform(1, 10)))
+    return bars
+
+
+def grid_template() -> StrategyTemplate:
+    config = StrategyConfig(
+        strategy_id="sweep_grid",
+        strategy_type=StrategyType.GRID,
+        user_id=1,
+        account_id=1,
+        symbol="BTCUSDT",
+        base_quantity=Decimal('0.01')
+    )
+    return StrategyTemplate(GridStrategy, config)
+
+
+def grid_search(**kwargs) -> ParameterSearch:
+    return ParameterSearch(
+        grid_template(),
+        [ParameterRange("grid_spacing", low=0.001, high=0.004, step=0.001),
+         ParameterRange("grid_levels", values=[4, 8])],
+        objective=kwargs.pop("objective", "total_return"),
+        backtest_config=BacktestConfig(slippage_bps=1),
+        **kwargs
+    )
+
+
+class TestParameterSpace:
+    """参数空间"""
+
+    def test_grid_and_random_candidates(self):
+        search = grid_search(max_workers=0, seed=7)
+        candidates = search.grid_candidates()
+        assert len(candidates) == 8
+        assert {c["grid_spacing"] for c in candidates} == {0.001, 0.002, 0.003, 0.004}
+
+        sampled = search.random_candidates(6)
+        assert len(sampled) == 6
+        assert len({tuple(sorted(c.items())) for c in sampled}) == 6
+        assert all(0.001 <= c["grid_spacing"] <= 0.004 for c in sampled)
+
+    def test_template_converts_config_types(self):
+        strategy = grid_template().build({"grid_spacing": 0.003, "grid_levels": 6.0}, "abcdef0123")
+        assert strategy.config.grid_spacing == Decimal('0.003')
+        assert strategy.config.grid_levels == 6
+        assert strategy.config.strategy_id == "sweep_grid_abcdef01"
+
+        with pytest.raises(ValueError):
+            ParameterSearch(grid_template(), [ParameterRange("no_such_field", values=[1])])
+
+    def test_shared_bars_round_trip(self):
+        bars = synthetic_bars(50)
+        data = SharedBars.create(bars)
+        try:
+            attached = pickle.loads(pickle.dumps(data))
+            restored = list(attached.bars())
+            assert [b.timestamp for b in restored] == [b.timestamp for b in bars]
+            assert restored[-1].close == bars[-1].close
+            assert restored[0].funding_rate is None
+            assert not attached.array.flags.writeable
+            assert attached.fingerprint == data.fingerprint
+            attached.close()
+        finally:
+            data.close()
+
+
+class TestParameterSearch:
+    """搜索与并行"""
+
+    @pytest.mark.asyncio
+    async def test_grid_search_ranks_and_caches(self):
+        bars = synthetic_bars(2000)
+        search = grid_search(max_workers=0)
+        result = await search.grid_search(bars)
+
+        assert len(result.trials) == 8
+        scores = [trial.score for trial in result.trials]
+        assert scores == sorted(scores, reverse=True)
+        assert result.best.metrics["total_return"] == result.best.score
+        assert search.stats['trials_run'] == 8
+
+        # 同一数据再次搜索全部命中缓存
+        again = await search.grid_search(bars)
+        assert search.stats['trials_run'] == 8
+        assert search.stats['cache_hits'] == 8
+        assert all(trial.cached for trial in again.trials)
+        assert again.best_params == result.best_params
+
+    @pytest.mark.asyncio
+    async def test_cache_key_includes_base_config(self):
+        bars = synthetic_bars(500)
+        cache = {}
+        await grid_search(max_workers=0, cache=cache).grid_search(bars)
+
+        # 基础配置不同的模板不能复用缓存结果
+        template = grid_template()
+        template.base_config = replace(template.base_config, base_quantity=Decimal('0.02'))
+        search = ParameterSearch(
+            template,
+            [ParameterRange("grid_spacing", low=0.001, high=0.004, step=0.001),
+             ParameterRange("grid_levels", values=[4, 8])],
+            backtest_config=BacktestConfig(slippage_bps=1),
+            max_workers=0,
+            cache=cache
+        )
+        await search.grid_search(bars)
+        assert search.stats['cache_hits'] == 0
+        assert search.stats['trials_run'] == 8
+        assert len(cache) == 16
+
+    @pytest.mark.asyncio
+    async def test_process_pool_matches_sequential(self):
+        data = SharedBars.create(synthetic_bars(1500, seed=3))
+        try:
+            sequential = await grid_search(max_workers=0).grid_search(data)
+            parallel = await grid_search(max_workers=2).grid_search(data)
+        finally:
+            data.close()
+
+        assert [t.params for t in parallel.trials] == [t.params for t in sequential.trials]
+        assert [t.score for t in parallel.trials] == pytest.approx([t.score for t in sequential.trials])
+
+    @pytest.mark.asyncio
+    async def test_early_stopping_prunes_losing_trials(self):
+        # 单边下跌行情中网格不断接货
+        bars = synthetic_bars(3000, seed=5, volatility=0.002, drift=-0.0004)
+        search = ParameterSearch(
+            grid_template(),
+            [ParameterRange("base_quantity", values=[0.01, 5])],
+            objective="total_return",
+            backtest_config=BacktestConfig(initial_balance=100000),
+            early_stopping=EarlyStopping(max_drawdown=0.2, min_equity_ratio=None, check_interval=100),
+            max_workers=0
+        )
+        result = await search.grid_search(bars)
+        by_quantity = {trial.params["base_quantity"]: trial for trial in result.trials}
+
+        assert by_quantity[5].pruned
+        assert "回撤" in by_quantity[5].prune_reason
+        assert by_quantity[5].bars_processed < len(bars)
+        assert not by_quantity[0.01].pruned
+        assert result.trials[0] is by_quantity[0.01]
+
+    @pytest.mark.asyncio
+    async def test_successive_halving_narrows_candidates(self):
+        bars = synthetic_bars(2700, seed=2)
+        search = ParameterSearch(
+            grid_template(),
+            [ParameterRange("grid_spacing", low=0.0005, high=0.01, log_scale=True),
+             ParameterRange("grid_levels", low=3, high=20, integer=True)],
+            objective="sharpe_ratio",
+            max_workers=0,
+            seed=11
+        )
+        result = await search.successive_halving(bars, n_trials=9, eta=3)
+
+        budgets = sorted({trial.budget for trial in result.trials})
+        assert budgets == [900, 2700]
+        full = [trial for trial in result.trials if trial.budget == len(bars)]
+        assert len(full) == 3
+        assert result.trials[:3] == full
+        assert search.stats['trials_run'] == 12
+        assert search.stats['bars_replayed'] == 9 * 900 + 3 * 2700
@@ -0,0 +1,279 @@
+"""
+报表索引与流式下载测试
+验证键集分页与全量排序切片一致、按类型/用户/日期过滤和过期清理，
+下载接口支持字节范围请求，并对比目录扫描与索引分页的耗时
+"""
+
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.api.routes import reports as report_routes
+from backend.src.reports.report_generator import ReportGenerator
+from backend.src.reports.report_index import ReportIndex, ReportRecord
+from backend.src.reports.report_types import ExportFormat, ReportRequest, ReportType
+
+TYPES = [t.value for t in ReportType]
+NOW = datetime(2024, 5, 1, 12)
+
+
+def make_records(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        # 部分报表生成时间相同，分页需按report_id打破平局
+        created_at = NOW - timedelta(seconds=rng.randrange(0, 6 * 86400) // 10 * 10)
+        records.append(ReportRecord(
+            report_id=f"r{i:06d}",
+            file_path=f"/tmp/r{i:06d}.csv",
+            file_size=rng.randrange(100, 10000),
+            export_format=rng.choice(["csv", "pdf"]),
+            created_at=created_at,
+            expires_at=created_at + timedelta(days=rng.choice([1, 7])),
+            report_type=rng.choice(TYPES),
+            user_id=rng.randrange(1, 6)
+        ))
+    return records
+
+
+def expected_ids(records, now=NOW, report_type=None, user_id=None, start_date=None, end_date=None):
+    selected = [
+        r for r in records
+        if r.expires_at > now
+        and (report_type is None or r.report_type == report_type)
+        and (user_id is None or r.user_id == user_id)
+        and (start_date is None or r.created_at >= start_date)
+        and (end_date is None or r.created_at < end_date)
+    ]
+    selected.sort(key=lambda r: (r.created_at, r.report_id), reverse=True)
+    return [r.report_id for r in selected]
+
+
+def walk(index: ReportIndex, limit: int, **filters):
+    ids, cursor, pages = [], None, 0
+    while True:
+        records, cursor = index.list(limit=limit, cursor=cursor, now=NOW, **filters)
+        ids.extend(r.report_id for r in records)
+        pages += 1
+        if cursor is None:
+            return ids, pages
+
+
+class TestKeysetPagination:
+    """键集分页与过滤"""
+
+    @pytest.mark.parametrize("filters", [
+        {},
+        {"report_type": "trade_history"},
+        {"user_id": 3},
+        {"start_date": NOW - timedelta(days=2), "end_date": NOW - timedelta(hours=6)},
+        {"report_type": "pnl_analysis", "user_id": 2, "start_date": NOW - timedelta(days=3)},
+    ])
+    def test_pages_match_sorted_slice(self, filters):
+        records = make_records(3000)
+        index = ReportIndex()
+        for record in records:
+            index.add(record)
+
+        expected = expected_ids(records, **filters)
+        ids, pages = walk(index, 37, **filters)
+        assert ids == expected
+        # 最后一页恰好填满时不会多出一次空页查询
+        assert pages == max(1, -(-len(expected) // 37))
+        assert index.count(now=NOW, **filters) == len(expected)
+
+    def test_page_is_stable_under_inserts(self):
+        index = ReportIndex()
+        records = make_records(100)
+        for record in records:
+            index.add(record)
+
+        first, cursor = index.list(limit=10, now=NOW)
+        # 翻页期间生成的新报表不会让后续页重复或跳过
+        index.add(ReportRecord("new", "/tmp/new.csv", 1, "csv", NOW, NOW + timedelta(days=7)))
+        rest = []
+        while cursor:
+            page, cursor = index.list(limit=10, cursor=cursor, now=NOW)
+            rest.extend(r.report_id for r in page)
+        assert [r.report_id for r in first] + rest == expected_ids(records)
+
+    def test_invalid_cursor(self):
+        with pytest.raises(ValueError):
+            ReportIndex().list(cursor="not-a-cursor")
+
+
+class TestRetention:
+    """过期清理与历史文件补录"""
+
+    def test_purge_expired(self):
+        records = make_records(500)
+        index = ReportIndex()
+        for record in records:
+            index.add(record)
+
+        later = NOW + timedelta(days=2)
+        purged = index.purge_expired(later)
+        assert sorted(r.report_id for r in purged) == sorted(r.report_id for r in records if r.expires_at <= later)
+        assert index.count(now=datetime(2000, 1, 1)) == len(records) - len(purged)
+        assert index.purge_expired(later) == []
+
+    def test_backfill_existing_files(self, tmp_path):
+        old = tmp_path / "legacy.csv"
+        old.write_text("a,b\n")
+        (tmp_path / "notes.md").write_text("x")
+
+        generator = ReportGenerator(output_directory=str(tmp_path))
+        record = generator.index.get("legacy")
+        assert record.file_size == 4
+        assert record.report_type is None
+        assert generator.index.get("notes") is None
+
+        # 已有索引时不重复扫描
+        (tmp_path / "later.csv").write_text("c\n")
+        assert ReportGenerator(output_directory=str(tmp_path)).index.get("later") is None
+
+
+@pytest.fixture
+def client(tmp_path):
+    generator = ReportGenerator(output_directory=str(tmp_path))
+    app = FastAPI()
+    app.include_router(report_routes.router)
+    app.dependency_overrides[report_routes.get_report_generator] = lambda: generator
+    return TestClient(app), generator
+
+
+def generate(generator: ReportGenerator, user_id: int, report_type=ReportType.TRADE_HISTORY) -> str:
+    request = ReportRequest(report_type, ExportFormat.CSV, datetime(2024, 1, 1), datetime(2024, 2, 1),
+                            user_id=user_id)
+    return asyncio.run(generator.generate_report(request)).report_id
+
+
+class TestReportRoutes:
+    """列表与范围下载接口"""
+
+    def test_generate_list_and_delete(self, client):
+        http, generator = client
+        ids = [generate(generator, user_id=i % 2) for i in range(5)]
+
+        body = http.get("/reports/list", params={"limit": 2, "user_id": 1}).json()
+        assert body["total"] == 2
+        assert len(body["reports"]) == 2
+        assert body["next_cursor"] is None
+        assert {r["report_id"] for r in body["reports"]} == {ids[1], ids[3]}
+        assert body["reports"][0]["report_type"] == "trade_history"
+
+        body = http.get("/reports/list", params={"limit": 3}).json()
+        second = http.get("/reports/list", params={"limit": 3, "cursor": body["next_cursor"]}).json()
+        assert sorted(r["report_id"] for r in body["reports"] + second["reports"]) == sorted(ids)
+        assert http.get("/reports/list", params={"cursor": "???"}).status_code == 400
+
+        assert http.delete(f"/reports/delete/{ids[0]}").status_code == 200
+        assert not (Path(generator.output_directory) / f"{ids[0]}.csv").exists()
+        assert http.delete(f"/reports/delete/{ids[0]}").status_code == 404
+
+    def test_range_download(self, client):
+        http, generator = client
+        report_id = generate(generator, user_id=1)
+        content = (Path(generator.output_directory) / f"{report_id}.csv").read_bytes()
+
+        full = http.get(f"/reports/download/{report_id}")
+        assert full.status_code == 200
+        assert full.content == content
+        assert full.headers["accept-ranges"] == "bytes"
+        assert full.headers["content-type"].startswith("text/csv")
+
+        part = http.get(f"/reports/download/{report_id}", headers={"Range": "bytes=10-19"})
+        assert part.status_code == 206
+        assert part.content == content[10:20]
+        assert part.headers["content-range"] == f"bytes 10-19/{len(content)}"
+
+        tail = http.get(f"/reports/download/{report_id}", headers={"Range": "bytes=-7"})
+        assert tail.content == content[-7:]
+        open_ended = http.get(f"/reports/download/{report_id}", headers={"Range": "bytes=5-"})
+        assert open_ended.content == content[5:]
+
+        invalid = http.get(f"/reports/download/{report_id}", headers={"Range": f"bytes={len(content)}-"})
+        assert invalid.status_code == 416
+        assert invalid.headers["content-range"] == f"bytes */{len(content)}"
+        assert http.get("/reports/download/missing").status_code == 404
+
+    def test_expired_report_is_removed(self, client):
+        http, generator = client
+        report_id = generate(generator, user_id=1)
+        record = generator.index.get(report_id)
+        record.expires_at = datetime.now() - timedelta(seconds=1)
+        generator.index.add(record)
+
+        assert http.get(f"/reports/download/{report_id}").status_code == 404
+        assert generator.index.get(report_id) is None
+        assert not Path(record.file_path).exists()
+
+    def test_index_calls_do_not_block_event_loop(self, client):
+        http, generator = client
+        generate(generator, user_id=1)
+
+        async def run():
+            # 索引被其他线程占用期间，列表请求只等待自己的工作线程
+            generator.index._lock.acquire()
+            threading.Timer(0.3, generator.index._lock.release).start()
+            ticks = 0
+            async with httpx.AsyncClient(app=http.app, base_url="http://test") as async_http:
+                request = asyncio.create_task(async_http.get("/reports/list"))
+                while not request.done():
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+            return ticks, request.result()
+
+        ticks, response = asyncio.run(run())
+        assert response.status_code == 200
+        assert response.json()["total"] == 1
+        assert ticks >= 10
+
+
+class TestListingThroughput:
+    """目录扫描与索引分页耗时"""
+
+    def test_scan_vs_index(self, tmp_path):
+        count = 20000
+        index = ReportIndex(tmp_path / "report_index.db")
+        for record in make_records(count, seed=5):
+            path = tmp_path / f"{record.report_id}.csv"
+            path.write_bytes(b"x")
+            record.file_path = str(path)
+            record.created_at = datetime.now() - (NOW - record.created_at)
+            record.expires_at = record.created_at + timedelta(days=7)
+            index.add(record)
+
+        started = time.perf_counter()
+        files = []
+        for path in tmp_path.iterdir():
+            if path.suffix in ('.pdf', '.csv'):
+                stat = path.stat()
+                files.append((stat.st_mtime, path.stem, stat.st_size))
+        files.sort(reverse=True)
+        page = files[1000:1050]
+        scanned = time.perf_counter() - started
+
+        records, cursor = index.list(limit=1000)
+        started = time.perf_counter()
+        records, _ = index.list(limit=50, cursor=cursor)
+        total = index.count()
+        indexed = time.perf_counter() - started
+
+        print(f"\n{count}个报表文件: 目录扫描分页 {scanned * 1000:.1f}ms, "
+              f"索引键集分页+计数 {indexed * 1000:.2f}ms")
+        assert len(page) == len(records) == 50
+        assert total == count
+        assert indexed < scanned
@@ -0,0 +1,370 @@
+"""
+离线报表生成测试
+验证交易记录按块从数据库流式读取（含用户/交易所/币种过滤）、报表在工作进程中渲染并可轮询进度，
+对比直接在事件循环中渲染与工作进程渲染时的事件循环停顿，以及流式渲染的内存峰值
+"""
+
+import asyncio
+import csv
+import random
+import sqlite3
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.api.routes import reports as report_routes
+from backend.src.reports import report_jobs
+from backend.src.reports.csv_generator import CSVReportGenerator
+from backend.src.reports.report_generator import ReportGenerator
+from backend.src.reports.report_index import ReportIndex
+from backend.src.reports.report_sources import DatabaseTradeSource, StaticTradeSource, TradeSource
+from backend.src.reports.report_templates import ReportTemplateManager
+from backend.src.reports.report_types import ExportFormat, ReportJob, ReportJobStatus, ReportRequest, ReportType
+
+START = datetime(2024, 1, 1)
+END = datetime(2024, 3, 1)
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT"]
+
+
+def make_trade_db(path, count: int, seed: int = 1) -> str:
+    """按订单表和账户表结构建立测试库，返回数据库URL"""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE accounts (id INTEGER PRIMARY KEY, user_id INTEGER, exchange TEXT);
+        CREATE TABLE orders (
+            id INTEGER PRIMARY KEY, account_id INTEGER, symbol TEXT, order_side TEXT,
+            quantity_filled REAL, average_price REAL, price REAL, commission REAL,
+            order_time TIMESTAMP, exchange_order_id TEXT
+        );
+        CREATE INDEX idx_order_time ON orders (order_time);
+    """)
+    conn.executemany("INSERT INTO accounts VALUES (?, ?, ?)",
+                     [(i, i % 3 + 1, "binance" if i % 2 else "okx") for i in range(1, 7)])
+    span = (END - START).total_seconds()
+    rows = []
+    for i in range(1, count + 1):
+        moment = START - timedelta(days=5) + timedelta(seconds=rng.uniform(0, span + 10 * 86400))
+        rows.append((
+            i, rng.randint(1, 6), rng.choice(SYMBOLS), rng.choice(["buy", "sell"]),
+            round(rng.uniform(0, 2), 4) if rng.random() > 0.05 else 0.0,
+            round(rng.uniform(100, 60000), 2), None, round(rng.uniform(0, 5), 4),
+            moment.strftime("%Y-%m-%d %H:%M:%S.%f"), f"ex{i}"
+        ))
+    conn.executemany("INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return f"sqlite:///{path}"
+
+
+def make_request(export_format=ExportFormat.CSV, **kwargs) -> ReportRequest:
+    return ReportRequest(ReportType.TRADE_HISTORY, export_format, START, END, **kwargs)
+
+
+def expected_count(path, user_id=None, exchanges=None, assets=None) -> int:
+    conn = sqlite3.connect(path)
+    rows = conn.execute("""
+        SELECT a.user_id, a.exchange, o.symbol FROM orders o JOIN accounts a ON a.id = o.account_id
+        WHERE o.quantity_filled > 0 AND o.order_time >= ? AND o.order_time < ?
+    """, (START.strftime("%Y-%m-%d %H:%M:%S.%f"), END.strftime("%Y-%m-%d %H:%M:%S.%f"))).fetchall()
+    conn.close()
+    return sum(
+        1 for user, exchange, symbol in rows
+        if (user_id is None or user == user_id)
+        and (exchanges is None or exchange in exchanges)
+        and (assets is None or any(symbol.startswith(asset) for asset in assets))
+    )
+
+
+@pytest.fixture(scope="module")
+def trade_db(tmp_path_factory):
+    path = tmp_path_factory.mktemp("trades") / "trades.db"
+    return path, make_trade_db(path, 100000)
+
+
+class TestDatabaseSource:
+    """数据库交易记录分块读取"""
+
+    @pytest.mark.parametrize("filters", [
+        {},
+        {"user_id": 2},
+        {"exchanges": ["okx"]},
+        {"assets": ["BTC", "SOL"], "user_id": 1},
+    ])
+    def test_chunks_match_query(self, trade_db, filters):
+        path, url = trade_db
+        source = DatabaseTradeSource(url)
+        request = make_request(**filters)
+
+        sizes, previous = [], None
+        for chunk in source.iter_chunks(request, chunk_size=7000):
+            sizes.append(len(chunk))
+            for trade in chunk:
+                assert START <= trade.timestamp < END
+                assert trade.quantity > 0
+                assert previous is None or previous <= trade.timestamp
+                previous = trade.timestamp
+
+        expected = expected_count(path, **filters)
+        assert sum(sizes) == expected == source.count(request)
+        assert max(sizes) <= 7000
+
+    def test_source_pickles_without_engine(self, trade_db):
+        import pickle
+        source = DatabaseTradeSource(trade_db[1])
+        source.count(make_request())
+        restored = pickle.loads(pickle.dumps(source))
+        assert restored._engine is None
+        assert restored.count(make_request()) == source.count(make_request())
+
+    def test_source_must_implement_chunks(self):
+        class CountOnly(TradeSource):
+            def count(self, request):
+                return 0
+
+        with pytest.raises(TypeError):
+            CountOnly()
+
+
+class TestReportJobs:
+    """工作进程渲染与进度轮询"""
+
+    def test_job_progress_and_result(self, trade_db, tmp_path):
+        path, url = trade_db
+        generator = ReportGenerator(output_directory=str(tmp_path), max_workers=1, chunk_size=2000)
+        generator.set_trade_source(DatabaseTradeSource(url))
+        request = make_request(user_id=2)
+
+        async def run():
+            job = await generator.submit_report(request)
+            assert job.status == ReportJobStatus.QUEUED
+            seen = []
+            while True:
+                status = generator.jobs.get_job(job.job_id)
+                seen.append((status.status, status.progress))
+                if status.status in (ReportJobStatus.COMPLETED, ReportJobStatus.FAILED):
+                    return status, seen
+                await asyncio.sleep(0.05)
+
+        try:
+            job, seen = asyncio.run(run())
+        finally:
+            generator.jobs.shutdown()
+
+        expected = expected_count(path, user_id=2)
+        assert job.status == ReportJobStatus.COMPLETED, job.error
+        assert job.rows_written == job.total_rows == expected
+        progress = [p for _, p in seen]
+        assert progress == sorted(progress)
+        assert progress[-1] == 1.0
+
+        record = generator.index.get(job.report_id)
+        assert record.user_id == 2
+        assert record.report_type == "trade_history"
+        with open(record.file_path, newline="") as f:
+            rows = list(csv.reader(f))
+        start = rows.index(["Trade History"]) + 2
+        end = rows.index(["Trade Summary"]) - 1
+        assert end - start == expected
+        assert rows[rows.index(["Trade Summary"]) + 1] == ["Total Trades", str(expected)]
+        assert generator.jobs.get_statistics()["completed"] == 1
+
+    def test_failed_job_is_reported(self, tmp_path):
+        generator = ReportGenerator(output_directory=str(tmp_path), max_workers=1)
+        generator.set_trade_source(DatabaseTradeSource(f"sqlite:///{tmp_path / 'missing' / 'x.db'}"))
+
+        async def run():
+            job = await generator.submit_report(make_request())
+            with pytest.raises(Exception):
+                await generator.jobs.wait(job.job_id)
+            return generator.jobs.get_job(job.job_id)
+
+        try:
+            job = asyncio.run(run())
+        finally:
+            generator.jobs.shutdown()
+        assert job.status == ReportJobStatus.FAILED
+        assert job.error
+        assert generator.jobs.stats["failed"] == 1
+
+    def test_restart_fails_unfinished_jobs(self, tmp_path):
+        generator = ReportGenerator(output_directory=str(tmp_path), max_workers=1)
+        queued = ReportJob("queued", ReportJobStatus.QUEUED, ReportType.TRADE_HISTORY, ExportFormat.CSV,
+                           datetime.now(), datetime.now())
+        running = ReportJob("running", ReportJobStatus.RUNNING, ReportType.TRADE_HISTORY, ExportFormat.CSV,
+                            datetime.now(), datetime.now(), rows_written=10)
+        done = ReportJob("done", ReportJobStatus.COMPLETED, ReportType.TRADE_HISTORY, ExportFormat.CSV,
+                         datetime.now(), datetime.now(), report_id="r1")
+        for job in (queued, running, done):
+            generator.index.save_job(job)
+        generator.index.close()
+
+        # 进程重启后遗留的排队/运行中任务不会再完成
+        restarted = ReportGenerator(output_directory=str(tmp_path), max_workers=1)
+        assert restarted.jobs.get_statistics()["interrupted"] == 2
+        for job_id in ("queued", "running"):
+            job = restarted.jobs.get_job(job_id)
+            assert job.status == ReportJobStatus.FAILED
+            assert job.error == "Interrupted by service restart"
+        assert restarted.jobs.get_job("done").status == ReportJobStatus.COMPLETED
+        assert restarted.index.purge_jobs(datetime.now() + timedelta(seconds=1)) == 3
+
+    def test_only_orphaned_jobs_fail(self, tmp_path):
+        index = ReportIndex(str(tmp_path / "index.db"))
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()
+        owners = {
+            "live": report_jobs.process_owner(),
+            "remote": "other-host:1:abc",
+            "stale": "other-host:2:abc",
+            "exited": f"{report_jobs._HOST}:{exited.pid}:abc",
+            "previous": f"{report_jobs._HOST}:{os.getpid()}:abc",
+        }
+        for job_id, owner in owners.items():
+            index.save_job(ReportJob(job_id, ReportJobStatus.RUNNING, ReportType.TRADE_HISTORY,
+                                     ExportFormat.CSV, datetime.now(), datetime.now()), owner=owner)
+        index._conn.execute("UPDATE report_jobs SET heartbeat_at = ? WHERE job_id = 'stale'",
+                            ((datetime.now() - timedelta(minutes=5)).timestamp(),))
+
+        # 另一个进程启动时只处理所属进程已退出或心跳超时的任务
+        manager = report_jobs.ReportJobManager(index, max_workers=0)
+        assert manager.stats["interrupted"] == 3
+        statuses = {job_id: index.get_job(job_id).status for job_id in owners}
+        assert statuses == {
+            "live": ReportJobStatus.RUNNING,
+            "remote": ReportJobStatus.RUNNING,
+            "stale": ReportJobStatus.FAILED,
+            "exited": ReportJobStatus.FAILED,
+            "previous": ReportJobStatus.FAILED,
+        }
+        index.close()
+
+    def test_heartbeat_keeps_running_jobs(self, tmp_path):
+        index = ReportIndex(str(tmp_path / "index.db"))
+        manager = report_jobs.ReportJobManager(index, max_workers=0, heartbeat_interval=0.05)
+        index.save_job(ReportJob("mine", ReportJobStatus.RUNNING, ReportType.TRADE_HISTORY,
+                                 ExportFormat.CSV, datetime.now(), datetime.now()), owner=manager.owner)
+        index.save_job(ReportJob("abandoned", ReportJobStatus.RUNNING, ReportType.TRADE_HISTORY,
+                                 ExportFormat.CSV, datetime.now(), datetime.now()), owner="other-host:1:abc")
+        manager._start_heartbeat()
+        try:
+            time.sleep(0.5)
+        finally:
+            manager.shutdown()
+
+        assert index.get_job("mine").status == ReportJobStatus.RUNNING
+        assert index.get_job("abandoned").status == ReportJobStatus.FAILED
+        assert manager.stats["interrupted"] == 1
+        index.close()
+
+    def test_pdf_trade_history_is_bounded(self, tmp_path):
+        trades = list(next(DatabaseTradeSource(make_trade_db(tmp_path / "t.db", 5000)).iter_chunks(
+            make_request(), chunk_size=10000)))
+        generator = ReportGenerator(output_directory=str(tmp_path / "out"), max_workers=0, chunk_size=500)
+        generator.set_trade_source(StaticTradeSource(trades))
+
+        response = asyncio.run(generator.generate_report(make_request(ExportFormat.PDF)))
+        record = generator.index.get(response.report_id)
+        # 未安装reportlab时回退为文本文件，索引记录实际写出的路径
+        assert record.file_path == response.file_path
+        assert os.path.exists(response.file_path)
+        if response.file_path.endswith(".txt"):
+            with open(response.file_path) as f:
+                assert f"Total Trades: {len(trades)}" in f.read()
+
+    def test_app_generator_reads_configured_database(self, trade_db, tmp_path, monkeypatch):
+        path, _ = trade_db
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(report_routes.settings, "DATABASE_URL", f"sqlite+aiosqlite:///{path}")
+        monkeypatch.setattr(report_routes, "_report_generator", None)
+
+        generator = report_routes.get_report_generator()
+        assert isinstance(generator.trade_source, DatabaseTradeSource)
+        assert generator.trade_source.database_url == f"sqlite:///{path}"
+        request = make_request(user_id=3)
+
+        async def run():
+            response = await generator.generate_report(request)
+            assert generator.jobs.uses_processes and generator.jobs._executor is not None
+            await report_routes.shutdown_report_generator()
+            return response
+
+        response = asyncio.run(run())
+        assert generator.jobs._executor is None
+        assert report_routes._report_generator is None
+        with open(response.file_path, newline="") as f:
+            rows = list(csv.reader(f))
+        assert rows[rows.index(["Trade Summary"]) + 1] == ["Total Trades", str(expected_count(path, user_id=3))]
+
+
+class TestEventLoopResponsiveness:
+    """事件循环停顿与内存峰值"""
+
+    def test_loop_lag_and_memory(self, trade_db, tmp_path):
+        path, url = trade_db
+        source = DatabaseTradeSource(url)
+        request = make_request()
+        template = ReportTemplateManager().get_template("trade_history_default")
+        report_data = {"request": request, "report_period": {"start_date": START, "end_date": END}}
+
+        async def measure(work):
+            lags = []
+            done = asyncio.Event()
+
+            async def ticker():
+                while not done.is_set():
+                    started = time.perf_counter()
+                    await asyncio.sleep(0.01)
+                    lags.append(time.perf_counter() - started - 0.01)
+
+            task = asyncio.create_task(ticker())
+            await asyncio.sleep(0.02)
+            started = time.perf_counter()
+            await work()
+            elapsed = time.perf_counter() - started
+            done.set()
+            await task
+            return max(lags), elapsed
+
+        async def in_loop():
+            # 旧实现：声明为async但直接在事件循环上写文件
+            CSVReportGenerator().render(report_data, template, str(tmp_path / "inline.csv"),
+                                        source.iter_chunks(request))
+
+        generator = ReportGenerator(output_directory=str(tmp_path / "out"), max_workers=1)
+        generator.set_trade_source(source)
+
+        async def off_loop():
+            await generator.generate_report(request)
+
+        try:
+            inline_lag, inline_time = asyncio.run(measure(in_loop))
+            worker_lag, worker_time = asyncio.run(measure(off_loop))
+        finally:
+            generator.jobs.shutdown()
+
+        # 流式渲染的内存峰值与一次性加载全部交易记录对比
+        tracemalloc.start()
+        CSVReportGenerator().render(report_data, template, str(tmp_path / "stream.csv"),
+                                    source.iter_chunks(request, chunk_size=5000))
+        streamed_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        everything = [trade for chunk in source.iter_chunks(request) for trade in chunk]
+        CSVReportGenerator().render(report_data, template, str(tmp_path / "bulk.csv"), [everything])
+        bulk_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        rows = source.count(request)
+        print(f"\n{rows}笔交易CSV报表: 事件循环内渲染 {inline_time:.2f}s 最大停顿 {inline_lag * 1000:.0f}ms; "
+              f"工作进程渲染 {worker_time:.2f}s 最大停顿 {worker_lag * 1000:.1f}ms; "
+              f"内存峰值 流式 {streamed_peak / 1e6:.1f}MB / 全量 {bulk_peak / 1e6:.1f}MB")
+        assert worker_lag < inline_lag
+        assert worker_lag < 0.1
+        assert streamed_peak * 3 < bulk_peak
@@ -0,0 +1,168 @@
+"""
+抽样数据隔离验证测试
+验证预编译规则检查返回的违规代码和描述、按交易所/市场类型抽样、
+发现违规后自动切换为完整验证并在恢复后回到抽样，并报告每条被验证行情的开销
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.core.data_isolation import (
+    DataIsolationValidator,
+    ValidationMode,
+    ValidationResult,
+    ViolationCode
+)
+from backend.src.utils.exceptions import ValidationError
+
+
+@dataclass
+class Tick:
+    """带交易所和市场类型的行情"""
+    symbol: str
+    current_price: Optional[Decimal]
+    volume_24h: Decimal
+    timestamp: datetime
+    exchange: str
+    market_type: str
+
+
+def tick(symbol="BTCUSDT", price="50000", exchange="binance", market_type="spot", age=0.0, volume="100"):
+    return Tick(symbol, Decimal(price) if price is not None else None, Decimal(volume),
+                datetime.now(timezone.utc) - timedelta(seconds=age), exchange, market_type)
+
+
+class TestRuleChecks:
+    """规则检查的违规代码与描述"""
+
+    @pytest.mark.parametrize("data, expected_type, codes, result", [
+        (tick(), "spot", [], ValidationResult.VALID),
+        (tick(symbol="BTC-PERP", market_type="futures"), "futures", [], ValidationResult.VALID),
+        (tick(market_type="futures"), "futures", [ViolationCode.FUTURES_SYMBOL_FORMAT], ValidationResult.WARNING),
+        (tick(age=600), "spot", [ViolationCode.STALE_DATA], ValidationResult.WARNING),
+        (tick(age=-600), "spot", [ViolationCode.STALE_DATA, ViolationCode.FUTURE_TIMESTAMP], ValidationResult.WARNING),
+        (tick(), "futures", [ViolationCode.MARKET_TYPE_MISMATCH], ValidationResult.INVALID),
+        (tick(price=None), "spot", [ViolationCode.MISSING_FIELD], ValidationResult.INVALID),
+        (tick(price="0"), "spot", [ViolationCode.INVALID_PRICE, ViolationCode.PRICE_TOO_LOW], ValidationResult.INVALID),
+        (tick(price="2000000", volume="-1"), "spot",
+         [ViolationCode.INVALID_VOLUME, ViolationCode.PRICE_TOO_HIGH], ValidationResult.INVALID),
+        (tick(exchange="huobi", symbol="BTC-PERP", market_type="futures"), "futures",
+         [ViolationCode.UNSUPPORTED_MARKET], ValidationResult.INVALID),
+        (tick(exchange="kraken", market_type="margin"), "margin",
+         [ViolationCode.UNKNOWN_NAMESPACE, ViolationCode.UNKNOWN_EXCHANGE, ViolationCode.UNSUPPORTED_MARKET],
+         ValidationResult.INVALID),
+    ])
+    def test_codes_and_result(self, data, expected_type, codes, result):
+        validator = DataIsolationValidator()
+        assert [code for code, _ in validator.check_market_data(data, expected_type)] == codes
+        assert asyncio.run(validator.validate_market_data_isolation(data, expected_type)) == result
+
+        record = next(iter(validator.validation_cache.values()))[-1]
+        assert record.violation_codes == codes
+        assert len(record.violations) == len(codes)
+
+    def test_messages_and_handlers(self):
+        validator = DataIsolationValidator()
+        received = []
+        validator.add_validation_handler(received.append)
+
+        data = tick(exchange="huobi", symbol="ETH-PERP", market_type="futures", price=None)
+        assert asyncio.run(validator.validate_market_data_isolation(data, "spot")) == ValidationResult.INVALID
+        record = validator.validation_cache["huobi_futures_ETH-PERP"][-1]
+        assert record.violations == [
+            "市场类型不匹配: 期望 spot, 实际 futures",
+            "缺失必需字段: current_price",
+            "huobi 不支持 futures 市场"
+        ]
+        assert received[0].severity == "high"
+
+        # 无法访问字段的数据记为验证异常
+        assert asyncio.run(validator.validate_market_data_isolation(object(), "spot")) == ValidationResult.ERROR
+
+    def test_rules_follow_configuration(self):
+        validator = DataIsolationValidator()
+        data = tick(market_type="futures")
+        assert validator.check_market_data(data, "futures")
+
+        validator.isolation_rules['data_validation']['symbol_format_validation'] = False
+        validator.refresh_rules()
+        assert validator.check_market_data(data, "futures") == []
+
+
+class TestSampling:
+    """按数据流抽样与自动切换完整验证"""
+
+    def test_sampling_and_escalation(self):
+        validator = DataIsolationValidator()
+        validator.set_validation_mode(ValidationMode.SAMPLED, sample_every=50)
+        validator.set_sampling("okx", "spot", 1)
+        validator.escalation_clean_ticks = 200
+
+        async def feed(data, count):
+            return [await validator.validate_market_data_isolation(data, data.market_type) for _ in range(count)]
+
+        async def run():
+            await feed(tick(), 1000)
+            clean = validator.get_validation_statistics()
+            clean["records"] = len(validator.validation_cache["binance_spot_BTCUSDT"])
+            await feed(tick(exchange="okx"), 100)
+
+            # 违规持续出现：最多一个抽样间隔内被发现
+            stale = await feed(tick(age=900), 120)
+            escalated = validator.get_validation_statistics()
+            await feed(tick(), 199)
+            still_escalated = validator.stream_sampling[("binance", "spot")].escalated
+            await feed(tick(), 1)
+            return clean, stale, escalated, still_escalated
+
+        clean, stale, escalated, still_escalated = asyncio.run(run())
+        assert clean["total_validations"] == 20
+        assert clean["skipped_ticks"] == 980
+        assert clean["records"] == 0
+
+        first = stale.index(ValidationResult.WARNING)
+        assert first < 50
+        assert all(result == ValidationResult.WARNING for result in stale[first:])
+        assert escalated["escalations"] == 1
+        assert escalated["escalated_streams"] == 1
+        # 未受影响的数据流保持自己的抽样间隔
+        assert validator.stream_sampling[("okx", "spot")].escalated is False
+        assert escalated["total_validations"] == 20 + 100 + (first // 50 + 1) + len(stale) - first - 1
+
+        assert still_escalated
+        assert not validator.stream_sampling[("binance", "spot")].escalated
+        with pytest.raises(ValidationError):
+            validator.set_sampling("binance", "spot", 0)
+
+
+class TestValidationOverhead:
+    """每条被验证行情的开销"""
+
+    def test_overhead_per_validated_tick(self):
+        ticks = 20000
+        data = tick()
+
+        async def run(mode):
+            validator = DataIsolationValidator()
+            validator.set_validation_mode(mode, sample_every=100)
+            started = time.perf_counter()
+            for _ in range(ticks):
+                await validator.validate_market_data_isolation(data, "spot")
+            return (time.perf_counter() - started) / ticks, validator.get_validation_statistics()
+
+        full, full_stats = asyncio.run(run(ValidationMode.FULL))
+        sampled, sampled_stats = asyncio.run(run(ValidationMode.SAMPLED))
+        print(f"\n{ticks}条行情: 完整验证 {full * 1e6:.1f}us/条 (每条被验证行情 {full_stats['avg_validation_us']:.1f}us), "
+              f"抽样1/100 {sampled * 1e6:.2f}us/条 (每条被验证行情 {sampled_stats['avg_validation_us']:.1f}us)")
+        assert sampled_stats["total_validations"] == ticks // 100
+        assert sampled < full
@@ -0,0 +1,158 @@
+"""
+序列窗口测试
+验证步幅视图生成的训练序列与逐窗口iloc切片结果一致、超出内存限制时写入内存映射文件，
+并测量100万行数据的序列生成耗时
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import sys
+import os
+import types
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+pytest.importorskip("sklearn")
+
+# 绕过 ai/__init__（引用了不存在的 ai_analyzer）和 trainer/__init__（训练调度需要 schedule），
+# 直接导入用到的子模块
+AI_PACKAGE = Path(__file__).resolve().parents[2] / "backend" / "src" / "ai"
+for name, path in (("backend.src.ai", AI_PACKAGE), ("backend.src.ai.trainer", AI_PACKAGE / "trainer")):
+    if name not in sys.modules:
+        sys.modules[name] = types.ModuleType(name)
+        sys.modules[name].__path__ = [str(path)]
+
+from backend.src.ai.models.price_predictor import PricePredictor
+from backend.src.ai.trainer.data_processor import DataProcessor
+from backend.src.ai.utils.sequence_windows import (
+    feature_matrix,
+    flatten_sequences,
+    iter_sequence_chunks,
+    open_sequence_memmap,
+    sequence_windows
+)
+
+
+def market_frame(rows: int, seed: int = 1) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.001, rows)))
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2023-01-01", periods=rows, freq="min"),
+        "open": close * (1 + rng.normal(0, 0.0005, rows)),
+        "high": close * 1.001,
+        "low": close * 0.999,
+        "close": close,
+        "volume": rng.uniform(1, 100, rows),
+        "rsi": rng.uniform(0, 100, rows)
+    })
+
+
+def reference_sequences(df: pd.DataFrame, columns, sequence_length: int):
+    """原始逐窗口切片实现"""
+    sequences, targets = [], []
+    for i in range(sequence_length, len(df)):
+        sequences.append(df.iloc[i - sequence_length:i][columns].values.flatten())
+        targets.append(df.iloc[i]["close"])
+    return np.array(sequences), np.array(targets)
+
+
+class TestSequenceWindows:
+    """与逐窗口切片一致"""
+
+    def test_windows_are_views(self):
+        matrix = feature_matrix(market_frame(500), ["open", "close", "volume"])
+        windows = sequence_windows(matrix, 20)
+        assert windows.shape == (480, 20, 3)
+        assert np.shares_memory(windows, matrix)
+        assert np.array_equal(windows[7], matrix[7:27])
+        assert sequence_windows(matrix[:20], 20).shape == (0, 20, 3)
+
+        chunks = list(iter_sequence_chunks(matrix, 20, chunk_size=100))
+        assert [start for start, _ in chunks] == [0, 100, 200, 300, 400]
+        assert np.array_equal(np.concatenate([chunk for _, chunk in chunks]), flatten_sequences(matrix, 20))
+
+    @pytest.mark.asyncio
+    async def test_lstm_data_matches_reference(self):
+        processor = DataProcessor()
+        processor.config["sequence_length"] = 12
+        df = market_frame(400)
+        features, targets = await processor._prepare_lstm_data(df.copy())
+
+        expected_df = df.copy()
+        expected_df["price_change"] = (expected_df["close"] - expected_df["open"]) / expected_df["open"]
+        expected_df["volume_change"] = expected_df["volume"].pct_change()
+        columns = ["open", "high", "low", "close", "volume", "rsi", "price_change", "volume_change"]
+        expected_features, expected_targets = reference_sequences(expected_df, columns, 12)
+
+        assert features.shape == expected_features.shape
+        assert list(features.columns[:2]) == ["feature_0", "feature_1"]
+        assert features.dtypes.iloc[0] == np.float32
+        np.testing.assert_allclose(features.to_numpy(), expected_features.astype(np.float32), rtol=1e-6)
+        np.testing.assert_array_equal(targets["target"].to_numpy(), expected_targets)
+
+    @pytest.mark.asyncio
+    async def test_large_output_spills_to_memmap(self, tmp_path):
+        processor = DataProcessor()
+        processor.config.update({
+            "sequence_length": 30,
+            "sequence_chunk_size": 1000,
+            "sequence_memory_limit_mb": 1,
+            "sequence_output_dir": str(tmp_path)
+        })
+        features, targets = await processor._prepare_lstm_data(market_frame(5000))
+
+        files = list(tmp_path.glob("lstm_sequences_*.npy"))
+        assert len(files) == 1
+        stored = np.load(files[0], mmap_mode="r")
+        assert stored.shape == features.shape == (4970, 30 * 8)
+        np.testing.assert_array_equal(stored[4969], features.to_numpy()[4969])
+        assert len(targets) == 4970
+
+    def test_price_predictor_sequences(self):
+        predictor = PricePredictor(sequence_length=10, features=["price", "volume"])
+        df = market_frame(200).rename(columns={"close": "price"})
+        sequences, targets = predictor._create_sequences(df)
+        assert sequences.shape == (190, 10, 2)
+        np.testing.assert_allclose(sequences[5], df[["price", "volume"]].values[5:15].astype(np.float32))
+        assert targets[5] == df["price"].iloc[15]
+
+
+class TestSequenceThroughput:
+    """100万行数据的序列生成耗时"""
+
+    def test_one_million_rows(self, tmp_path):
+        rows, sequence_length = 1_000_000, 60
+        df = market_frame(rows)
+        columns = ["open", "high", "low", "close", "volume", "rsi"]
+
+        started = time.perf_counter()
+        matrix = feature_matrix(df, columns)
+        windows = sequence_windows(matrix, sequence_length)
+        checksum = 0.0
+        for _, chunk in iter_sequence_chunks(matrix, sequence_length):
+            checksum += float(chunk[:, -1].sum())
+        elapsed = time.perf_counter() - started
+
+        # 展开写入内存映射文件（20步，约480MB）
+        spill_started = time.perf_counter()
+        output = open_sequence_memmap(tmp_path / "sequences.npy", (rows - 20, 20 * len(columns)))
+        flatten_sequences(matrix, 20, out=output)
+        spill = time.perf_counter() - spill_started
+        assert np.array_equal(output[-1], matrix[-21:-1].ravel())
+        del output
+
+        # 对照：原始实现处理2000个窗口后按行数外推
+        sample = df.iloc[:2000 + sequence_length]
+        legacy_started = time.perf_counter()
+        reference_sequences(sample, columns, sequence_length)
+        legacy = (time.perf_counter() - legacy_started) / 2000 * len(windows)
+
+        print(f"\n100万行/{sequence_length}步/{len(columns)}个特征: 步幅窗口+分块遍历 {elapsed:.2f}s, "
+              f"20步展开写入内存映射 {spill:.2f}s, 逐窗口iloc外推约 {legacy:.0f}s")
+        assert windows.shape == (rows - sequence_length, sequence_length, len(columns))
+        assert checksum == pytest.approx(float(matrix[sequence_length - 1:-1, -1].sum()), rel=1e-4)
+        assert elapsed < legacy / 20
@@ -0,0 +1,97 @@
+"""
+API进程启动性能测试
+在独立子进程中导入应用，测量导入耗时和常驻内存，并检查按功能裁剪后的进程
+不会加载重量级依赖
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(PROJECT_ROOT)
+
+from backend.src.api.features import FEATURE_ROUTES, resolve_features
+
+HEAVY_MODULES = ["sklearn", "reportlab", "pandas", "ccxt", "torch", "tensorflow"]
+
+PROBE_SCRIPT = """
+import json, resource, sys, time
+start = time.perf_counter()
+import backend.src.main
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    "import_seconds": elapsed,
+    "max_rss_mb": rss_kb / 1024,
+    "routes": sorted(route.path for route in backend.src.main.app.routes),
+    "loaded": sorted(name for name in %r if name in sys.modules)
+}))
+"""
+
+
+def probe_startup(features: str) -> dict:
+    """在干净的子进程中导入应用并返回启动指标"""
+    env = dict(os.environ, ENABLED_FEATURES=features, LOG_ASYNC="false")
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE_SCRIPT % (HEAVY_MODULES,)],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestFeatureSelection:
+    """功能开关解析测试"""
+
+    def test_profiles_and_features(self):
+        assert resolve_features("all") == list(FEATURE_ROUTES.keys())
+        assert resolve_features("market") == ["market", "system"]
+        assert resolve_features("market, reports") == ["market", "system", "reports"]
+        assert resolve_features("trading,user") == [
+            "trading", "user", "system", "order_history", "risk_alerts", "emergency_stop"
+        ]
+
+    def test_unknown_feature_rejected(self):
+        with pytest.raises(ValueError):
+            resolve_features("market,backtest")
+
+
+class TestStartupFootprint:
+    """启动耗时和内存基准"""
+
+    def test_market_only_skips_heavy_subsystems(self):
+        """仅行情的进程不应导入sklearn或reportlab"""
+        metrics = probe_startup("market")
+
+        assert "sklearn" not in metrics["loaded"]
+        assert "reportlab" not in metrics["loaded"]
+        assert any(path.startswith("/api/v1/market") for path in metrics["routes"])
+        assert not any(path.startswith("/api/v1/trading") for path in metrics["routes"])
+        assert not any(path.startswith("/api/v1/reports") for path in metrics["routes"])
+
+    def test_reports_route_defers_reportlab(self):
+        """启用报表路由时，reportlab也只在生成PDF时才导入"""
+        metrics = probe_startup("reports")
+
+        assert "reportlab" not in metrics["loaded"]
+        assert any(path.startswith("/api/v1/reports") for path in metrics["routes"])
+
+    def test_startup_benchmark(self):
+        """比较不同功能组合的导入耗时和常驻内存"""
+        results = {}
+        for features in ("market", "market,user,reports"):
+            metrics = probe_startup(features)
+            results[features] = metrics
+            print(f"{features}: 导入 {metrics['import_seconds']:.2f}s, "
+                  f"内存 {metrics['max_rss_mb']:.1f}MB, 已加载 {metrics['loaded']}")
+
+        assert len(results["market"]["routes"]) < len(results["market,user,reports"]["routes"])
+        assert "reportlab" not in results["market,user,reports"]["loaded"]
@@ -0,0 +1,217 @@
+"""
+策略分发测试
+验证行情按交易对索引路由、紧急停止每轮只检查一次、单策略串行与行情合并、执行记录环形缓冲，
+并测量1000个策略下的分发延迟
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.strategies.base import BaseSpotStrategy, MarketData, StrategyConfig, StrategyType
+from backend.src.strategies.manager import StrategyManager
+
+
+class TickStrategy(BaseSpotStrategy):
+    """记录收到的行情，可选模拟耗时"""
+
+    delay = 0.0
+
+    def __init__(self, config, order_manager=None):
+        super().__init__(config, order_manager)
+        self.logger.disabled = True
+        self.seen = []
+        self.running = 0
+        self.max_running = 0
+
+    async def get_next_orders(self, market_data):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            self.seen.append(market_data.current_price)
+            return []
+        finally:
+            self.running -= 1
+
+    async def process_order_result(self, order_result):
+        return True
+
+
+class SlowTickStrategy(TickStrategy):
+    delay = 0.05
+
+
+class CountingStopService:
+    """记录检查次数的紧急停止服务"""
+
+    def __init__(self, active: bool = False):
+        self.active = active
+        self.checks = 0
+
+    async def is_any_stop_active(self, user_id=None, account_id=None, symbol=None):
+        self.checks += 1
+        return self.active
+
+
+def tick(symbol: str, price: int) -> MarketData:
+    value = Decimal(price)
+    return MarketData(
+        symbol=symbol,
+        current_price=value,
+        bid_price=value,
+        ask_price=value,
+        volume_24h=Decimal('1'),
+        price_change_24h=Decimal('0'),
+        timestamp=datetime.now()
+    )
+
+
+async def make_manager(count: int, symbols: int, strategy_class=TickStrategy, stop_service=None):
+    manager = StrategyManager(db_session=None, order_manager=None,
+                              emergency_stop_service=stop_service or CountingStopService())
+    manager.max_concurrent_strategies = count
+    manager.register_strategy_type(StrategyType.GRID.value, strategy_class)
+    for i in range(count):
+        config = StrategyConfig(
+            strategy_id=f"s{i}",
+            strategy_type=StrategyType.GRID,
+            user_id=1,
+            account_id=1,
+            symbol=f"SYM{i % symbols}USDT",
+            base_quantity=Decimal('0.01')
+        )
+        await manager.create_strategy(config)
+        assert await manager.start_strategy(config.strategy_id)
+    return manager
+
+
+async def shutdown(manager: StrategyManager):
+    for strategy_id in list(manager.strategies):
+        await manager.stop_strategy(strategy_id, force=True)
+
+
+class TestTickRouting:
+    """按交易对路由"""
+
+    @pytest.mark.asyncio
+    async def test_routes_only_to_subscribed_strategies(self):
+        stop_service = CountingStopService()
+        manager = await make_manager(12, symbols=4, stop_service=stop_service)
+        try:
+            task_ids = await manager.dispatch_tick(tick("SYM1USDT", 101))
+            assert len(task_ids) == 3
+            assert stop_service.checks == 1
+            for instance in manager.strategies.values():
+                expected = [Decimal(101)] if instance.config.symbol == "SYM1USDT" else []
+                assert instance.strategy.seen[-1:] == expected
+
+            assert await manager.dispatch_tick(tick("OTHERUSDT", 1)) == []
+            assert manager.dispatch_stats['ticks_unrouted'] == 1
+
+            # 暂停的策略不再接收行情
+            await manager.pause_strategy("s1")
+            assert len(await manager.dispatch_tick(tick("SYM1USDT", 102))) == 2
+            assert manager.strategies["s1"].strategy.seen[-1] == Decimal(101)
+        finally:
+            await shutdown(manager)
+
+    @pytest.mark.asyncio
+    async def test_emergency_stop_checked_once_per_cycle(self):
+        stop_service = CountingStopService(active=True)
+        manager = await make_manager(20, symbols=1, stop_service=stop_service)
+        try:
+            assert await manager.dispatch_tick(tick("SYM0USDT", 100)) == []
+            assert stop_service.checks == 1
+            assert manager.dispatch_stats['blocked_by_emergency_stop'] == 1
+            assert all(not instance.strategy.seen for instance in manager.strategies.values())
+
+            assert await manager.execute_all_active_strategies(tick("SYM0USDT", 100)) == []
+            assert stop_service.checks == 2
+        finally:
+            await shutdown(manager)
+
+
+class TestSerialization:
+    """单策略串行、不同交易对并发"""
+
+    @pytest.mark.asyncio
+    async def test_same_strategy_is_serialized_and_coalesced(self):
+        manager = await make_manager(1, symbols=1, strategy_class=SlowTickStrategy)
+        try:
+            strategy = manager.strategies["s0"].strategy
+            tasks = [manager.submit_tick(tick("SYM0USDT", price)) for price in range(100, 105)]
+            await asyncio.gather(*tasks)
+
+            assert strategy.max_running == 1
+            # 执行期间到达的行情只保留最新一笔
+            assert set(strategy.seen) == {Decimal(100), Decimal(104)}
+            assert manager.execution_engine.stats['coalesced_ticks'] == 3
+        finally:
+            await shutdown(manager)
+
+    @pytest.mark.asyncio
+    async def test_different_symbols_run_concurrently(self):
+        manager = await make_manager(4, symbols=4, strategy_class=SlowTickStrategy)
+        try:
+            started = time.perf_counter()
+            await asyncio.gather(*(manager.submit_tick(tick(f"SYM{i}USDT", 100)) for i in range(4)))
+            elapsed = time.perf_counter() - started
+            # 每个策略单次执行至少耗时2倍delay（process_market_data与get_next_orders各一次）
+            assert elapsed < 4 * SlowTickStrategy.delay * 2
+        finally:
+            await shutdown(manager)
+
+    @pytest.mark.asyncio
+    async def test_execution_records_are_bounded(self):
+        manager = await make_manager(1, symbols=1)
+        try:
+            for price in range(1500):
+                await manager.dispatch_tick(tick("SYM0USDT", price + 1))
+            engine = manager.execution_engine
+            assert len(engine.completed_tasks) == engine.max_task_history
+            assert engine.completed_tasks[-1].market_data.current_price == Decimal(1500)
+            assert engine.get_execution_status()['total_executed'] == 1500
+            assert not engine.active_tasks
+        finally:
+            await shutdown(manager)
+
+
+class TestDispatchLatency:
+    """1000个策略下的分发延迟"""
+
+    @pytest.mark.asyncio
+    async def test_dispatch_latency_with_1000_strategies(self):
+        manager = await make_manager(1000, symbols=200)
+        try:
+            ticks = [tick(f"SYM{i % 200}USDT", 100 + i) for i in range(2000)]
+
+            started = time.perf_counter()
+            for market_data in ticks:
+                await manager.dispatch_tick(market_data)
+            routed = (time.perf_counter() - started) / len(ticks)
+
+            # 对照：每笔行情遍历全部活跃策略
+            started = time.perf_counter()
+            for market_data in ticks[:50]:
+                await manager.execute_all_active_strategies(market_data)
+                await asyncio.sleep(0)
+                while manager.execution_engine.active_tasks:
+                    await asyncio.sleep(0)
+            full_scan = (time.perf_counter() - started) / 50
+
+            latency = manager.get_dispatch_latency()
+            print(f"\n1000个策略/200个交易对: 按交易对分发 {routed * 1e3:.2f}ms/笔 "
+                  f"(p99 {latency['p99_ms']:.2f}ms), 全量执行 {full_scan * 1e3:.2f}ms/笔")
+            assert manager.dispatch_stats['strategy_executions'] == 2000 * 5
+            assert routed < full_scan / 10
+        finally:
+            await shutdown(manager)
@@ -0,0 +1,141 @@
+"""
+摆动点与支撑阻力位性能测试
+验证增量实现与逐点比较、两两聚类的原始算法结果一致，并测量长回看周期下的单次更新开销
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.strategies.futures.swing import PricePatternAnalyzer
+
+START = datetime(2023, 1, 1)
+
+
+def random_walk(count: int, seed: int = 3, start: float = 30000.0, tick: str = "0.5"):
+    """按最小变动价位取整的随机游走，包含相等价格"""
+    rng = random.Random(seed)
+    step = Decimal(tick)
+    prices = []
+    price = start
+    for _ in range(count):
+        price = max(100.0, price * (1 + rng.gauss(0, 0.003)))
+        prices.append((Decimal(str(price)) / step).quantize(Decimal('1')) * step)
+    return prices
+
+
+def reference_cluster(prices, tolerance=Decimal('0.02')):
+    """原始两两比较聚类"""
+    if not prices:
+        return []
+    clustered_levels = []
+    used = [False] * len(prices)
+    for i, price in enumerate(prices):
+        if used[i]:
+            continue
+        cluster = [price]
+        used[i] = True
+        for j, other_price in enumerate(prices[i + 1:], i + 1):
+            if not used[j] and abs(other_price - price) / price <= tolerance:
+                cluster.append(other_price)
+                used[j] = True
+        clustered_levels.append(sum(cluster) / Decimal(str(len(cluster))))
+    return sorted(clustered_levels)
+
+
+def reference_levels(history, lookback=50):
+    """原始支撑阻力位识别"""
+    if len(history) < lookback:
+        return {'support': [], 'resistance': []}
+    recent = history[-lookback:]
+    highs, lows = [], []
+    for i in range(2, len(recent) - 2):
+        neighbours = (recent[i - 2], recent[i - 1], recent[i + 1], recent[i + 2])
+        if all(recent[i] > other for other in neighbours):
+            highs.append(recent[i])
+        if all(recent[i] < other for other in neighbours):
+            lows.append(recent[i])
+    return {
+        'support': sorted(reference_cluster(lows, tolerance=0.02)),
+        'resistance': sorted(reference_cluster(highs, tolerance=0.02), reverse=True)
+    }
+
+
+def feed(analyzer: PricePatternAnalyzer, prices):
+    for i, price in enumerate(prices):
+        analyzer.add_data_point(price, Decimal('1'), START + timedelta(minutes=i))
+        yield prices[:i + 1]
+
+
+class TestSwingLevelsMatchReference:
+    """增量结果与原始算法一致"""
+
+    @pytest.mark.parametrize("seed,tick", [(3, "0.5"), (8, "10"), (21, "0.01")])
+    def test_support_resistance_matches(self, seed, tick):
+        analyzer = PricePatternAnalyzer()
+        for history in feed(analyzer, random_walk(1500, seed=seed, tick=tick)):
+            assert analyzer.identify_support_resistance() == reference_levels(history)
+
+    def test_clustering_matches_on_tight_clusters(self):
+        analyzer = PricePatternAnalyzer()
+        rng = random.Random(5)
+        for _ in range(200):
+            prices = [Decimal(str(round(rng.uniform(95, 105), 1))) for _ in range(rng.randint(1, 40))]
+            assert analyzer._cluster_price_levels(prices) == reference_cluster(prices)
+        # 恰好落在容差边界上的价格
+        boundary = [Decimal('100'), Decimal('102'), Decimal('98'), Decimal('104.04'), Decimal('96')]
+        assert analyzer._cluster_price_levels(boundary) == reference_cluster(boundary)
+
+    def test_swing_analysis_matches(self):
+        analyzer = PricePatternAnalyzer()
+        prices = random_walk(2500, seed=13, tick="1")
+        for history in feed(analyzer, prices):
+            recent = analyzer.price_history[-30:]
+            result = analyzer.analyze_swing_pattern()
+            if len(analyzer.price_history) < 30:
+                assert result['pattern'] == 'insufficient_data'
+                continue
+
+            highs = analyzer._find_swing_points(recent, 'high')
+            lows = analyzer._find_swing_points(recent, 'low')
+            assert result['swing_highs'] == highs
+            assert result['swing_lows'] == lows
+            assert result['strength'] == analyzer._calculate_swing_strength(recent, highs, lows)
+            assert result['volatility'] == pytest.approx(analyzer._calculate_volatility(recent),
+                                                         rel=Decimal('1e-20'), abs=Decimal('1e-24'))
+            assert result['pattern'] == analyzer._analyze_swing_pattern(recent, highs, lows)['pattern']
+
+        # 非默认回看周期走区间重算
+        wide = analyzer.analyze_swing_pattern(lookback_period=120)
+        recent = analyzer.price_history[-120:]
+        assert wide['swing_highs'] == analyzer._find_swing_points(recent, 'high')
+        assert wide['volatility'] == analyzer._calculate_volatility(recent)
+
+
+class TestSwingLevelsThroughput:
+    """长回看周期下的单次更新开销"""
+
+    def test_long_lookback_per_tick_cost(self):
+        lookback = 900
+        analyzer = PricePatternAnalyzer(swing_lookback=lookback)
+        prices = random_walk(6000, seed=17)
+        for price in prices[:lookback]:
+            analyzer.add_data_point(price, Decimal('1'), START)
+
+        ticks = prices[lookback:]
+        started = time.perf_counter()
+        for price in ticks:
+            analyzer.add_data_point(price, Decimal('1'), START)
+            analyzer.identify_support_resistance(lookback_period=lookback)
+            analyzer.analyze_swing_pattern(lookback_period=lookback)
+        per_tick_us = (time.perf_counter() - started) / len(ticks) * 1e6
+
+        print(f"\n回看{lookback}根: 每个数据点 {per_tick_us:.1f}us")
+        assert per_tick_us < 2000
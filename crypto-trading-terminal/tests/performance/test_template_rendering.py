@@ -0,0 +1,99 @@
+"""
+通知模板渲染性能测试
+比较逐次解析渲染、编译缓存渲染和批量渲染的吞吐量
+"""
+
+import time
+from datetime import datetime
+
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.notification.templates.template_engine import TemplateEngine
+
+
+PRICE_ALERT = "🔔 价格预警: $condition_name 触发 ${symbol} 当前 ${value}|upper ($result_details, $trigger_time_datetime)"
+RENDER_COUNT = 20000
+
+
+def make_contexts(count: int):
+    return [
+        {
+            'condition_name': f'价格预警{i % 10}',
+            'symbol': 'BTCUSDT',
+            'value': f'{50000 + i}.5',
+            'result_details': '价格突破阻力位',
+            'trigger_time': datetime(2024, 1, 15, 14, 30, i % 60)
+        }
+        for i in range(count)
+    ]
+
+
+def renders_per_second(elapsed: float, count: int = RENDER_COUNT) -> float:
+    return count / elapsed if elapsed > 0 else float('inf')
+
+
+class TestTemplateRenderingPerformance:
+    """模板渲染吞吐量基准"""
+
+    @pytest.fixture
+    def template_engine(self):
+        return TemplateEngine()
+
+    def test_compiled_render_throughput(self, template_engine):
+        """编译缓存渲染应明显快于逐次解析渲染"""
+        contexts = make_contexts(RENDER_COUNT)
+
+        start_time = time.perf_counter()
+        uncached = [
+            template_engine._render_python_template(PRICE_ALERT, template_engine._preprocess_variables(context))
+            for context in contexts
+        ]
+        uncached_elapsed = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        cached = [
+            template_engine.render_template(PRICE_ALERT, context, 'python_template')
+            for context in contexts
+        ]
+        cached_elapsed = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        batched = template_engine.render_batch(PRICE_ALERT, contexts, 'python_template')
+        batch_elapsed = time.perf_counter() - start_time
+
+        print(f"逐次解析渲染: {renders_per_second(uncached_elapsed):,.0f} 次/秒")
+        print(f"编译缓存渲染: {renders_per_second(cached_elapsed):,.0f} 次/秒")
+        print(f"批量渲染: {renders_per_second(batch_elapsed):,.0f} 次/秒")
+
+        assert cached == uncached
+        assert batched == uncached
+        assert template_engine.get_cache_statistics()['misses'] == 1
+        assert cached_elapsed < uncached_elapsed
+        assert batch_elapsed < uncached_elapsed
+
+    def test_named_template_batch_throughput(self, template_engine):
+        """注册模板的批量渲染只编译一次"""
+        template_engine.register_template('price_alert_fast', PRICE_ALERT)
+        contexts = make_contexts(RENDER_COUNT)
+        template = template_engine.custom_templates['price_alert_fast']
+
+        start_time = time.perf_counter()
+        results = template_engine.render_batch(template, contexts, 'python_template', template_id='price_alert_fast')
+        elapsed = time.perf_counter() - start_time
+
+        print(f"注册模板批量渲染: {renders_per_second(elapsed):,.0f} 次/秒")
+
+        assert len(results) == RENDER_COUNT
+        assert 'BTCUSDT' in results[0]
+        assert template_engine.get_cache_statistics()['misses'] == 1
+
+        # 编辑模板后新版本重新编译
+        template_engine.register_template('price_alert_fast', PRICE_ALERT + " v2")
+        template = template_engine.custom_templates['price_alert_fast']
+        results = template_engine.render_batch(template, contexts[:10], 'python_template', template_id='price_alert_fast')
+        assert results[0].endswith(" v2")
+        assert template_engine.get_cache_statistics()['misses'] == 2
@@ -0,0 +1,184 @@
+"""
+时间条件调度测试
+验证状态缓存在各时间类型下与逐次完整评估结果一致（含夏令时切换和节假日）、
+调度器只在状态转换时刻重新评估，并测量行情驱动评估的单次耗时
+"""
+
+import random
+import time as time_module
+from datetime import datetime, time, timedelta
+
+import pytest
+import pytz
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.conditions.base_conditions import ConditionOperator
+from backend.src.conditions.time_conditions import (
+    TimeCondition,
+    TimeConditionScheduler,
+    TimeType,
+    TimeZone
+)
+
+NEW_YORK = pytz.timezone(TimeZone.EST.value)
+
+CONFIGS = [
+    (TimeType.CURRENT_TIME, ConditionOperator.EQUAL, "12:00", "crypto"),
+    (TimeType.CURRENT_TIME, ConditionOperator.GREATER_THAN, "02:30:15", "crypto"),
+    (TimeType.CURRENT_TIME, ConditionOperator.LESS_EQUAL, time(23, 59, 30), "crypto"),
+    (TimeType.MARKET_OPEN, ConditionOperator.EQUAL, None, "stock"),
+    (TimeType.MARKET_CLOSE, ConditionOperator.EQUAL, None, "stock"),
+    (TimeType.TRADING_HOURS, ConditionOperator.EQUAL, None, "stock"),
+    (TimeType.TRADING_HOURS, ConditionOperator.EQUAL, None, "forex"),
+    (TimeType.TIME_RANGE, ConditionOperator.EQUAL, "22:00-02:30", "crypto"),
+    (TimeType.TIME_RANGE, ConditionOperator.EQUAL, {"start": "09:15", "end": "17:45"}, "crypto"),
+    (TimeType.TIME_RANGE, ConditionOperator.EQUAL, "01:30-01:45", "crypto"),
+    (TimeType.RECURRING_TIME, ConditionOperator.EQUAL, {"time": "00:02", "weekdays": [0, 2, 4]}, "crypto"),
+    (TimeType.MARKET_SESSION, ConditionOperator.EQUAL, "after_hours", "stock"),
+    (TimeType.MARKET_SESSION, ConditionOperator.EQUAL, "pre_market", "stock"),
+    (TimeType.WEEKEND, ConditionOperator.EQUAL, True, "crypto"),
+    (TimeType.HOLIDAY, ConditionOperator.EQUAL, None, "crypto"),
+    (TimeType.COUNTDOWN, ConditionOperator.EQUAL, {"target": "2024-03-10T03:30:00", "threshold_seconds": 5400}, "crypto"),
+]
+
+
+def make_condition(time_type, operator, value, market) -> TimeCondition:
+    return TimeCondition(time_type, operator, value, timezone=TimeZone.EST, target_market=market)
+
+
+def sweep(start: datetime, hours: int, seed: int = 7):
+    """每分钟一个随机秒数的时刻"""
+    rng = random.Random(seed)
+    moment = start
+    for _ in range(hours * 60):
+        moment = moment + timedelta(seconds=60 + rng.uniform(-1, 1))
+        yield NEW_YORK.normalize(moment)
+
+
+class TestStateCache:
+    """缓存结果与完整评估一致"""
+
+    @pytest.mark.parametrize("config", CONFIGS, ids=lambda c: f"{c[0].value}-{c[3]}")
+    def test_cached_matches_full_evaluation(self, config):
+        cached = make_condition(*config)
+        reference = make_condition(*config)
+
+        # 跨越元旦、2024-03-10夏令时开始和2024-11-03夏令时结束
+        for start in (datetime(2023, 12, 31, 12), datetime(2024, 3, 8, 12), datetime(2024, 11, 1, 12)):
+            for moment in sweep(NEW_YORK.localize(start), 72):
+                result = cached.evaluate_at(moment)
+                expected = reference._evaluate_time_condition(moment, None)
+                assert result.satisfied == expected.satisfied, (moment, result.details, expected.details)
+
+        stats = cached.schedule_stats
+        assert stats["cache_hits"] > stats["recomputes"]
+
+    def test_boundaries_are_exact(self):
+        condition = make_condition(TimeType.TRADING_HOURS, ConditionOperator.EQUAL, None, "stock")
+        open_at = NEW_YORK.localize(datetime(2024, 3, 11, 9, 30))
+        close_at = NEW_YORK.localize(datetime(2024, 3, 11, 16, 0))
+
+        assert not condition.evaluate_at(open_at - timedelta(microseconds=1)).satisfied
+        assert condition.next_transition_time == open_at
+        assert condition.evaluate_at(open_at).satisfied
+        assert condition.evaluate_at(close_at).satisfied
+        assert not condition.evaluate_at(close_at + timedelta(microseconds=1)).satisfied
+
+    def test_holiday_and_countdown_value(self):
+        holiday = make_condition(TimeType.HOLIDAY, ConditionOperator.EQUAL, None, "crypto")
+        assert holiday.evaluate_at(datetime(2024, 12, 25, 15)).satisfied
+        assert not holiday.evaluate_at(datetime(2024, 12, 26, 15)).satisfied
+
+        countdown = make_condition(TimeType.COUNTDOWN, ConditionOperator.EQUAL,
+                                   {"target": "2024-05-01T12:00:00", "threshold_seconds": 60}, "crypto")
+        countdown.evaluate_at(datetime(2024, 5, 1, 11, 0))
+        result = countdown.evaluate_at(datetime(2024, 5, 1, 11, 30))
+        assert countdown.schedule_stats["cache_hits"] == 1
+        assert result.value == 1800
+        assert not result.satisfied
+
+    def test_history_dependent_condition_is_not_cached(self):
+        condition = make_condition(TimeType.TIME_ELAPSED, ConditionOperator.EQUAL, "5", "crypto")
+        for minute in range(3):
+            condition.evaluate_at(datetime(2024, 5, 1, 12, minute))
+        assert condition.next_transition_time is None
+        assert condition.schedule_stats == {"cache_hits": 0, "recomputes": 3}
+
+
+class TestScheduler:
+    """调度器只在转换时刻触发"""
+
+    def test_fires_on_transitions(self):
+        scheduler = TimeConditionScheduler()
+        trading = make_condition(TimeType.TRADING_HOURS, ConditionOperator.EQUAL, None, "stock")
+        weekend = make_condition(TimeType.WEEKEND, ConditionOperator.EQUAL, True, "crypto")
+        elapsed = make_condition(TimeType.TIME_ELAPSED, ConditionOperator.EQUAL, "5", "crypto")
+
+        # 2024-03-08 周五 08:00 纽约
+        start = NEW_YORK.localize(datetime(2024, 3, 8, 8))
+        assert scheduler.add(trading, start) == NEW_YORK.localize(datetime(2024, 3, 8, 9, 30))
+        assert scheduler.add(weekend, start) == NEW_YORK.localize(datetime(2024, 3, 9))
+        assert scheduler.add(elapsed, start) is None
+
+        events = []
+        moment = start
+        while moment < start + timedelta(days=4):
+            moment = moment + timedelta(minutes=1)
+            events.extend((c.time_type, r.satisfied) for c, r in scheduler.due(moment))
+
+        assert events == [
+            (TimeType.TRADING_HOURS, True),    # 周五开盘
+            (TimeType.TRADING_HOURS, False),   # 周五收盘
+            (TimeType.WEEKEND, True),          # 周六零点
+            (TimeType.WEEKEND, False),         # 周一零点
+            (TimeType.TRADING_HOURS, True),    # 周一开盘
+            (TimeType.TRADING_HOURS, False),   # 周一收盘
+        ]
+        # 每个交易日零点、开盘、收盘，加上周末零点
+        assert scheduler.stats["fired"] < 20
+        assert scheduler.get_statistics()["scheduled"] == 2
+
+        assert scheduler.remove(trading.condition_id)
+        # 移除后只剩周末条件，下个周六零点转换
+        later = scheduler.due(NEW_YORK.localize(datetime(2024, 3, 16, 0, 0, 1)))
+        assert [(c, r.satisfied) for c, r in later] == [(weekend, True)]
+
+    def test_tick_refresh_does_not_hide_transition(self):
+        scheduler = TimeConditionScheduler()
+        condition = make_condition(TimeType.TRADING_HOURS, ConditionOperator.EQUAL, None, "stock")
+        start = NEW_YORK.localize(datetime(2024, 3, 11, 9))
+        scheduler.add(condition, start)
+
+        # 行情先越过开盘边界刷新了条件缓存
+        assert condition.evaluate_at(start + timedelta(minutes=31)).satisfied
+        transitions = scheduler.due(start + timedelta(minutes=31))
+        assert [(c, r.satisfied) for c, r in transitions] == [(condition, True)]
+
+
+class TestEvaluationThroughput:
+    """行情驱动评估的单次耗时"""
+
+    def test_cached_evaluation_cost(self):
+        ticks = 20000
+        conditions = [make_condition(*config) for config in CONFIGS if config[0] != TimeType.COUNTDOWN]
+        start = NEW_YORK.localize(datetime(2024, 3, 11, 10))
+        moments = [start + timedelta(milliseconds=50 * i) for i in range(ticks)]
+
+        started = time_module.perf_counter()
+        for condition in conditions:
+            for moment in moments:
+                condition.evaluate_at(moment)
+        cached = (time_module.perf_counter() - started) / (ticks * len(conditions))
+
+        started = time_module.perf_counter()
+        for condition in conditions:
+            for moment in moments[:2000]:
+                condition._evaluate_time_condition(moment, None)
+        full = (time_module.perf_counter() - started) / (2000 * len(conditions))
+
+        print(f"\n{len(conditions)}个时间条件 x {ticks}笔行情: 缓存评估 {cached * 1e6:.1f}us/次, "
+              f"完整评估 {full * 1e6:.1f}us/次")
+        assert cached < full
@@ -0,0 +1,224 @@
+"""
+趋势策略技术指标性能测试
+验证float64增量实现与Decimal参考实现一致，并比较两者的计算吞吐量
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.strategies.futures.trend import TechnicalIndicators, TrendFollowingStrategy
+from backend.src.strategies.futures.fast_indicators import (
+    IncrementalIndicators,
+    compute_indicator_series,
+    get_shared_indicators
+)
+from backend.src.strategies.futures.base_futures_strategy import (
+    FuturesMarketData,
+    FuturesStrategyConfig,
+    FuturesStrategyType
+)
+
+REL_TOL = 1e-9
+
+
+def random_walk(count: int, seed: int = 7, start: float = 50000.0):
+    rng = random.Random(seed)
+    prices = []
+    price = start
+    for _ in range(count):
+        price = max(1.0, price * (1 + rng.gauss(0, 0.002)))
+        prices.append(Decimal(f"{price:.2f}"))
+    return prices
+
+
+def assert_close(fast_value, reference_value, abs_tol: float = 1e-6):
+    if reference_value is None:
+        assert fast_value is None
+        return
+    assert fast_value is not None
+    assert fast_value == pytest.approx(float(reference_value), rel=REL_TOL, abs=abs_tol)
+
+
+def reference_snapshot(prices):
+    return {
+        'sma_short': TechnicalIndicators.simple_moving_average(prices, 10),
+        'sma_long': TechnicalIndicators.simple_moving_average(prices, 20),
+        'ema_fast': TechnicalIndicators.exponential_moving_average(prices, 12),
+        'ema_slow': TechnicalIndicators.exponential_moving_average(prices, 26),
+        'rsi': TechnicalIndicators.relative_strength_index(prices, 14),
+        'macd': TechnicalIndicators.macd(prices),
+        'bollinger': TechnicalIndicators.bollinger_bands(prices, 20)
+    }
+
+
+def make_config(strategy_id: str, symbol: str = "BTCUSDT", **metadata) -> FuturesStrategyConfig:
+    return FuturesStrategyConfig(
+        strategy_id=strategy_id,
+        strategy_type=FuturesStrategyType.TREND_FOLLOWING,
+        user_id=1,
+        account_id=1,
+        symbol=symbol,
+        base_quantity=Decimal('0.01'),
+        metadata=metadata
+    )
+
+
+def make_market_data(price: Decimal, timestamp: datetime, symbol: str = "BTCUSDT") -> FuturesMarketData:
+    return FuturesMarketData(
+        symbol=symbol,
+        current_price=price,
+        bid_price=price - Decimal('0.5'),
+        ask_price=price + Decimal('0.5'),
+        volume_24h=Decimal('1000'),
+        price_change_24h=Decimal('0'),
+        timestamp=timestamp
+    )
+
+
+class TestIndicatorEquivalence:
+    """float64增量实现与Decimal参考实现对比"""
+
+    def test_incremental_matches_reference(self):
+        prices = random_walk(400)
+        indicators = IncrementalIndicators()
+
+        for i, price in enumerate(prices):
+            fast = indicators.update(float(price))
+            reference = reference_snapshot(prices[:i + 1])
+
+            for key in ('sma_short', 'sma_long', 'ema_fast', 'ema_slow', 'rsi'):
+                assert_close(fast[key], reference[key])
+
+            assert fast['macd'].keys() == reference['macd'].keys()
+            for key in reference['macd']:
+                assert_close(fast['macd'][key], reference['macd'][key])
+
+            assert fast['bollinger'].keys() == reference['bollinger'].keys()
+            for key in reference['bollinger']:
+                # 参考实现的Decimal开方精度为28位，float总体标准差误差在1e-6量级
+                assert_close(fast['bollinger'][key], reference['bollinger'][key], abs_tol=1e-5)
+
+    def test_macd_signal_line_is_ema_of_macd(self):
+        """MACD信号线不再等于MACD线"""
+        prices = random_walk(120, seed=11)
+        macd = TechnicalIndicators.macd(prices)
+
+        assert macd['signal'] != macd['macd']
+        assert macd['histogram'] == macd['macd'] - macd['signal']
+        assert TechnicalIndicators.macd(prices[:33]) == {}
+        assert TechnicalIndicators.macd(prices[:34]) != {}
+
+    def test_rsi_without_losses_is_100(self):
+        indicators = IncrementalIndicators()
+        for i in range(30):
+            snapshot = indicators.update(100.0 + i)
+        assert snapshot['rsi'] == 100.0
+
+    def test_vectorized_series_matches_incremental(self):
+        prices = [float(p) for p in random_walk(300, seed=3)]
+        series = compute_indicator_series(prices)
+        indicators = IncrementalIndicators()
+
+        for i, price in enumerate(prices):
+            snapshot = indicators.update(price)
+            if snapshot['sma_long'] is None:
+                assert np.isnan(series['sma_long'][i])
+            else:
+                assert series['sma_long'][i] == pytest.approx(snapshot['sma_long'], rel=REL_TOL)
+            if snapshot['rsi'] is not None:
+                assert series['rsi'][i] == pytest.approx(snapshot['rsi'], rel=1e-7)
+            if snapshot['bollinger']:
+                assert series['bollinger_upper'][i] == pytest.approx(snapshot['bollinger']['upper'], rel=REL_TOL)
+
+    def test_long_run_resync_keeps_precision(self):
+        """长时间运行后滚动和仍与参考实现一致"""
+        prices = random_walk(IncrementalIndicators.RESYNC_INTERVAL * 3 + 17, seed=5)
+        indicators = IncrementalIndicators()
+        fast = indicators.warm_up(float(p) for p in prices)
+        reference = reference_snapshot(prices[-300:])
+
+        assert_close(fast['sma_long'], reference['sma_long'])
+        assert_close(fast['rsi'], reference['rsi'])
+        assert_close(fast['bollinger']['upper'], reference['bollinger']['upper'], abs_tol=1e-5)
+
+
+class TestSharedIndicators:
+    """同一交易对和周期的策略共享指标状态"""
+
+    def test_strategies_share_state(self):
+        first = TrendFollowingStrategy(make_config("trend_share_1"))
+        second = TrendFollowingStrategy(make_config("trend_share_2"))
+        other_symbol = TrendFollowingStrategy(make_config("trend_share_3", symbol="ETHUSDT"))
+        other_timeframe = TrendFollowingStrategy(make_config("trend_share_4", timeframe="1m"))
+
+        assert first.fast_indicators is second.fast_indicators
+        assert first.fast_indicators is not other_symbol.fast_indicators
+        assert first.fast_indicators is not other_timeframe.fast_indicators
+
+    @pytest.mark.asyncio
+    async def test_shared_update_counts_each_tick_once(self):
+        strategies = [TrendFollowingStrategy(make_config(f"trend_tick_{i}", symbol="SOLUSDT")) for i in range(3)]
+        for strategy in strategies:
+            await strategy._initialize_specific()
+
+        start = datetime(2024, 1, 1)
+        prices = random_walk(60, seed=9, start=100.0)
+        for i, price in enumerate(prices):
+            market_data = make_market_data(price, start + timedelta(seconds=i), symbol="SOLUSDT")
+            for strategy in strategies:
+                strategy.trend_analyzer.add_data_point(price, market_data.volume_24h, market_data.timestamp)
+                strategy._update_technical_indicators(market_data)
+
+        shared = strategies[0].fast_indicators
+        assert shared.count == len(prices)
+        reference = reference_snapshot(prices)
+        for strategy in strategies:
+            assert_close(strategy.technical_indicators['sma_long'][-1], reference['sma_long'])
+            assert_close(strategy.technical_indicators['rsi'][-1], reference['rsi'])
+
+    def test_decimal_mode_keeps_reference_path(self):
+        strategy = TrendFollowingStrategy(make_config("trend_decimal", indicator_mode="decimal"))
+        assert strategy.fast_indicators is None
+
+    def test_get_shared_indicators_keyed_by_params(self):
+        a = get_shared_indicators("XRPUSDT", "5m", rsi_period=14)
+        b = get_shared_indicators("xrpusdt", "5m", rsi_period=14)
+        c = get_shared_indicators("XRPUSDT", "5m", rsi_period=7)
+        assert a is b
+        assert a is not c
+
+
+class TestIndicatorThroughput:
+    """吞吐量对比"""
+
+    def test_incremental_faster_than_reference(self):
+        prices = random_walk(2000, seed=21)
+        history = []
+
+        start_time = time.perf_counter()
+        for price in prices:
+            history.append(price)
+            if len(history) > 500:
+                history = history[-250:]
+            reference_snapshot(history)
+        reference_elapsed = time.perf_counter() - start_time
+
+        indicators = IncrementalIndicators()
+        start_time = time.perf_counter()
+        for price in prices:
+            indicators.update(float(price))
+        fast_elapsed = time.perf_counter() - start_time
+
+        print(f"Decimal参考实现: {len(prices) / reference_elapsed:,.0f} 次/秒")
+        print(f"float增量实现: {len(prices) / fast_elapsed:,.0f} 次/秒")
+
+        assert fast_elapsed * 10 < reference_elapsed
@@ -0,0 +1,252 @@
+"""
+批量写回测试
+验证按数量和时间触发的批量写入、背压、失败行隔离与停止时写完缓冲区，
+并对比SQLite上逐行 add + flush 与批量写回的每秒写入行数
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Optional
+
+import pytest
+from sqlalchemy import JSON, DateTime, Float, ForeignKey, Integer, String, Text, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.src.storage.write_behind import WriteBehindWriter, WriteDurability
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LogRow(Base):
+    """与system_logs结构相同的测试表"""
+    __tablename__ = "log_rows"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    level: Mapped[str] = mapped_column(String(20), nullable=False)
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+    module: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    price: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    retry_count: Mapped[int] = mapped_column(Integer, default=0)
+    extra_data: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class UniqueRow(Base):
+    __tablename__ = "unique_rows"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    key: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
+
+
+class ParentRow(Base):
+    __tablename__ = "parent_rows"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+
+class ChildRow(Base):
+    """引用父行的只追加记录，对应订单执行记录"""
+    __tablename__ = "child_rows"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    parent_id: Mapped[int] = mapped_column(ForeignKey("parent_rows.id"), nullable=False)
+
+
+class Level(Enum):
+    INFO = "info"
+
+
+def log_row(i: int) -> Dict[str, Any]:
+    return {
+        "level": "info",
+        "message": f"event {i}",
+        "module": "orders",
+        "extra_data": {"i": i},
+        "timestamp": datetime.now(timezone.utc)
+    }
+
+
+async def make_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'write_behind.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+
+async def count(engine, model) -> int:
+    async with engine.connect() as conn:
+        return (await conn.execute(select(func.count()).select_from(model))).scalar()
+
+
+class TestBatching:
+    """批量触发与行转换"""
+
+    @pytest.mark.asyncio
+    async def test_size_and_time_triggers(self, tmp_path):
+        engine = await make_engine(tmp_path)
+        writer = WriteBehindWriter(engine, batch_size=100, flush_interval=0.05)
+        writer.start()
+        try:
+            for i in range(250):
+                assert writer.enqueue(LogRow, log_row(i))
+            # 不同列组合、枚举和Decimal
+            writer.enqueue(LogRow, {"level": Level.INFO, "message": "priced", "price": Decimal("1.5"),
+                                    "timestamp": datetime.now(timezone.utc)})
+            await asyncio.sleep(0.2)
+
+            assert await count(engine, LogRow) == 251
+            stats = writer.get_statistics()
+            assert stats["queue_size"] == 0
+            assert stats["stats"]["rows_written"] == 251
+            assert stats["stats"]["largest_batch"] == 100
+
+            async with engine.connect() as conn:
+                row = (await conn.execute(select(LogRow.__table__).where(LogRow.message == "priced"))).one()
+            assert (row.level, row.price, row.retry_count) == ("info", 1.5, 0)
+        finally:
+            await writer.stop()
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_stop_drains_pending_rows(self, tmp_path):
+        engine = await make_engine(tmp_path)
+        writer = WriteBehindWriter(engine, batch_size=10000, flush_interval=60,
+                                   durability=WriteDurability.FSYNC)
+        writer.start()
+        for i in range(500):
+            writer.enqueue(LogRow, log_row(i))
+        await writer.stop()
+
+        assert await count(engine, LogRow) == 500
+        assert not writer.running
+        # 持久化设置只作用于写回批次
+        async with engine.connect() as conn:
+            assert (await conn.exec_driver_sql("PRAGMA synchronous")).scalar() == 2
+        await engine.dispose()
+
+
+class TestBackpressureAndFailures:
+    """背压与失败隔离"""
+
+    @pytest.mark.asyncio
+    async def test_full_buffer_rejects_or_waits(self, tmp_path):
+        engine = await make_engine(tmp_path)
+        writer = WriteBehindWriter(engine, max_queue_size=50, batch_size=50, flush_interval=60)
+        assert all(writer.enqueue(LogRow, log_row(i)) for i in range(50))
+        assert not writer.enqueue(LogRow, log_row(50))
+        assert writer.stats["rows_rejected"] == 1
+
+        writer.start()
+        try:
+            # put() 等待后台写出腾出空间
+            await asyncio.wait_for(writer.put(LogRow, log_row(51)), timeout=2)
+            assert writer.stats["producer_waits"] >= 1
+            await writer.flush()
+            assert await count(engine, LogRow) == 51
+        finally:
+            await writer.stop()
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_failed_rows_are_isolated(self, tmp_path):
+        engine = await make_engine(tmp_path)
+        writer = WriteBehindWriter(engine, max_retries=1, retry_backoff=0.01)
+        for key in ["a", "b", "a", "c"]:
+            writer.enqueue(UniqueRow, {"key": key})
+        await writer.flush()
+
+        assert await count(engine, UniqueRow) == 3
+        assert writer.stats["retries"] == 1
+        assert writer.stats["rows_failed"] == 1
+        assert [(table, row) for table, row, _ in writer.dead_letters] == [("unique_rows", {"key": "a"})]
+        await engine.dispose()
+
+
+class TestTransactionOrdering:
+    """引用未提交行的记录"""
+
+    @pytest.mark.asyncio
+    async def test_rows_wait_for_owning_commit(self, tmp_path):
+        engine = await make_engine(tmp_path)
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def enable_foreign_keys(dbapi_connection, _):
+            dbapi_connection.execute("PRAGMA foreign_keys = ON")
+
+        writer = WriteBehindWriter(engine, max_retries=0)
+        try:
+            async with AsyncSession(engine) as session:
+                parent = ParentRow()
+                session.add(parent)
+                await session.flush()
+                writer.enqueue_after_commit(session, ChildRow, {"parent_id": parent.id})
+
+                # 提交前不进入缓冲区，写回不会等待会话的写锁
+                started = time.perf_counter()
+                await writer.flush()
+                assert time.perf_counter() - started < 0.5
+                assert writer.stats["rows_enqueued"] == 0
+
+                await session.commit()
+            await writer.flush()
+            assert await count(engine, ChildRow) == 1
+
+            async with AsyncSession(engine) as session:
+                parent = ParentRow()
+                session.add(parent)
+                await session.flush()
+                writer.enqueue_after_commit(session, ChildRow, {"parent_id": parent.id})
+                await session.rollback()
+            await writer.flush()
+
+            # 回滚后不留下引用不存在父行的记录
+            assert await count(engine, ParentRow) == 1
+            assert await count(engine, ChildRow) == 1
+            assert writer.stats["rows_enqueued"] == 1
+            assert writer.stats["rows_failed"] == 0
+        finally:
+            await engine.dispose()
+
+
+class TestWriteThroughput:
+    """SQLite上逐行写入与批量写回的吞吐量"""
+
+    @pytest.mark.asyncio
+    async def test_rows_per_second(self, tmp_path):
+        engine = await make_engine(tmp_path)
+        rows = 3000
+
+        # 逐行 add + flush，最后提交
+        started = time.perf_counter()
+        async with AsyncSession(engine) as session:
+            for i in range(rows):
+                session.add(LogRow(**log_row(i)))
+                await session.flush()
+            await session.commit()
+        per_row = rows / (time.perf_counter() - started)
+
+        # 批量写回：生产者只入队，停止时写完
+        writer = WriteBehindWriter(engine, max_queue_size=rows, batch_size=500, flush_interval=0.05)
+        writer.start()
+        started = time.perf_counter()
+        for i in range(rows):
+            writer.enqueue(LogRow, log_row(i))
+        enqueue_time = time.perf_counter() - started
+        await writer.stop()
+        batched = rows / (time.perf_counter() - started)
+
+        print(f"\nSQLite {rows}行: 逐行flush {per_row:.0f}行/秒, 批量写回 {batched:.0f}行/秒, "
+              f"入队 {enqueue_time / rows * 1e6:.1f}us/行")
+        assert await count(engine, LogRow) == 2 * rows
+        assert batched > per_row * 3
+        await engine.dispose()